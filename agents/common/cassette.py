@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""Record and replay kubectl and Jaeger traffic.
+
+In record mode every call through a cassette is made live and its request,
+response and latency are appended to a cassette file; in replay mode the
+calls are answered from the file, optionally with the recorded latencies,
+so investigations can be re-run and profiled offline.
+
+File layout:
+
+    MAGIC
+    records   uint32 length + deflated JSON {service, key, request, response, error, latency}
+    index     deflated JSON {key: [[offset, length, latency], ...]}
+    footer    uint64 index offset, uint64 index length, MAGIC
+
+A cassette whose recording was interrupted has no footer; its index is
+rebuilt by scanning the records.
+
+Enable with CASSETTE_MODE=record|replay and CASSETTE_PATH, or use_cassette().
+
+Usage:
+    python -m agents.common.cassette PATH
+"""
+from typing import Dict, Any, Optional, List, Callable, Iterator, Tuple
+from contextlib import contextmanager
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+
+MAGIC = b"K8SCAS1\n"
+FOOTER = struct.Struct("<QQ")
+RECORD_HEADER = struct.Struct("<I")
+
+RECORD = "record"
+REPLAY = "replay"
+
+# Request parameters that change on every run (time ranges relative to now)
+VOLATILE_PARAMS = frozenset(("start", "end", "endTs", "lookback", "start_time", "end_time"))
+
+class CassetteMiss(LookupError):
+    """A replayed request that was never recorded."""
+
+class CassetteError(RuntimeError):
+    """A recorded call that failed live; replayed as the same failure."""
+
+def request_key(service: str, request: Dict[str, Any]) -> str:
+    """Stable lookup key of a request, ignoring volatile parameters."""
+    def strip(value: Any) -> Any:
+        if isinstance(value, dict):
+            return {k: strip(v) for k, v in value.items() if k not in VOLATILE_PARAMS and v is not None}
+        return value
+    canonical = json.dumps(strip(request), sort_keys=True, separators=(",", ":"), default=str)
+    return f"{service}:{hashlib.blake2b(canonical.encode(), digest_size=12).hexdigest()}"
+
+class Cassette:
+    """One cassette file, opened for recording or replay."""
+
+    def __init__(self, path: str, mode: str = REPLAY, latency: bool = False, latency_scale: float = 1.0):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.calls = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # key -> [[offset, length, latency], ...] in recording order
+        self._index: Dict[str, List[List[float]]] = {}
+        self._cursors: Dict[str, int] = {}
+        if mode == RECORD:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._file = open(path, "wb")
+            self._file.write(MAGIC)
+        else:
+            self._file = open(path, "rb")
+            self._index = self._load_index()
+
+    def __enter__(self) -> "Cassette":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._index.values())
+
+    def call(self, service: str, request: Dict[str, Any], live: Callable[[], Any]) -> Any:
+        """Answer request from the cassette, or make it live and record it."""
+        key = request_key(service, request)
+        self.calls += 1
+        if self.mode == REPLAY:
+            return self._replay(key, service, request)
+
+        started = time.monotonic()
+        try:
+            response = live()
+        except Exception as e:
+            self._append(service, key, request, None, f"{type(e).__name__}: {e}", time.monotonic() - started)
+            raise
+        self._append(service, key, request, response, None, time.monotonic() - started)
+        return response
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """Every record in file order (replay mode)."""
+        entries = sorted(entry for entries in self._index.values() for entry in entries)
+        for offset, length, _ in entries:
+            yield self._read(int(offset), int(length))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "mode": self.mode,
+            "records": len(self),
+            "requests": len(self._index),
+            "calls": self.calls,
+            "misses": self.misses
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+            if self.mode == RECORD:
+                index = zlib.compress(json.dumps(self._index, separators=(",", ":")).encode())
+                offset = self._file.tell()
+                self._file.write(index)
+                self._file.write(FOOTER.pack(offset, len(index)) + MAGIC)
+            self._file.close()
+
+    def _replay(self, key: str, service: str, request: Dict[str, Any]) -> Any:
+        with self._lock:
+            entries = self._index.get(key)
+            if not entries:
+                self.misses += 1
+                raise CassetteMiss(f"{service} request not in cassette {self.path}: {json.dumps(request, default=str)[:200]}")
+            # Repeated requests get their responses in recording order; the last one repeats
+            position = self._cursors.get(key, 0)
+            self._cursors[key] = position + 1
+            offset, length, latency = entries[min(position, len(entries) - 1)]
+            record = self._read(int(offset), int(length))
+        if self.latency and latency:
+            time.sleep(latency * self.latency_scale)
+        if record.get("error") is not None:
+            raise CassetteError(record["error"])
+        return record["response"]
+
+    def _append(
+        self, service: str, key: str, request: Dict[str, Any], response: Any, error: Optional[str], latency: float
+    ) -> None:
+        blob = zlib.compress(json.dumps({
+            "service": service, "key": key, "request": request,
+            "response": response, "error": error, "latency": round(latency, 6)
+        }, separators=(",", ":"), default=str).encode())
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(RECORD_HEADER.pack(len(blob)) + blob)
+            self._file.flush()
+            self._index.setdefault(key, []).append([offset + RECORD_HEADER.size, len(blob), round(latency, 6)])
+
+    def _read(self, offset: int, length: int) -> Dict[str, Any]:
+        self._file.seek(offset)
+        return json.loads(zlib.decompress(self._file.read(length)))
+
+    def _load_index(self) -> Dict[str, List[List[float]]]:
+        if self._file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{self.path} is not a cassette file")
+        size = os.fstat(self._file.fileno()).st_size
+        tail = FOOTER.size + len(MAGIC)
+        if size >= len(MAGIC) + tail:
+            self._file.seek(size - tail)
+            footer = self._file.read(tail)
+            if footer.endswith(MAGIC):
+                offset, length = FOOTER.unpack(footer[:FOOTER.size])
+                self._file.seek(offset)
+                return json.loads(zlib.decompress(self._file.read(length)))
+        return self._scan()
+
+    def _scan(self) -> Dict[str, List[List[float]]]:
+        """Rebuild the index of a cassette whose recording did not finish."""
+        index: Dict[str, List[List[float]]] = {}
+        offset = len(MAGIC)
+        self._file.seek(offset)
+        while True:
+            header = self._file.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                break
+            (length,) = RECORD_HEADER.unpack(header)
+            blob = self._file.read(length)
+            try:
+                record = json.loads(zlib.decompress(blob))
+            except (zlib.error, ValueError):
+                # Truncated last record
+                break
+            index.setdefault(record["key"], []).append([offset + RECORD_HEADER.size, length, record.get("latency", 0.0)])
+            offset += RECORD_HEADER.size + length
+        return index
+
+_active: Optional[Cassette] = None
+_active_lock = threading.Lock()
+_env_checked = False
+
+def active_cassette() -> Optional[Cassette]:
+    """The cassette in use, opened from CASSETTE_MODE/CASSETTE_PATH on first call."""
+    global _active, _env_checked
+    if _env_checked:
+        return _active
+    with _active_lock:
+        if not _env_checked:
+            mode = os.getenv("CASSETTE_MODE")
+            if mode and _active is None:
+                _active = Cassette(
+                    os.getenv("CASSETTE_PATH", "session.cassette"),
+                    mode,
+                    latency=os.getenv("CASSETTE_LATENCY", "none") == "recorded"
+                )
+                atexit.register(_active.close)
+            _env_checked = True
+    return _active
+
+@contextmanager
+def use_cassette(path: str, mode: str = REPLAY, latency: bool = False, latency_scale: float = 1.0) -> Iterator[Cassette]:
+    """Route kubectl and Jaeger calls through a cassette within the block."""
+    global _active, _env_checked
+    cassette = Cassette(path, mode, latency, latency_scale)
+    with _active_lock:
+        previous, previous_checked = _active, _env_checked
+        _active, _env_checked = cassette, True
+    try:
+        yield cassette
+    finally:
+        with _active_lock:
+            _active, _env_checked = previous, previous_checked
+        cassette.close()
+
+def through(service: str, request: Dict[str, Any], live: Callable[[], Any]) -> Any:
+    """Make a call via the active cassette, or live when none is in use."""
+    cassette = active_cassette()
+    if cassette is None:
+        return live()
+    return cassette.call(service, request, live)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--list", action="store_true", help="print every recorded request")
+    args = parser.parse_args()
+
+    with Cassette(args.path) as cassette:
+        services: Dict[str, Tuple[int, float]] = {}
+        for record in cassette.records():
+            count, latency = services.get(record["service"], (0, 0.0))
+            services[record["service"]] = (count + 1, latency + record.get("latency", 0.0))
+            if args.list:
+                status = "error" if record.get("error") else "ok"
+                print(f"{record['service']:8} {record.get('latency', 0.0) * 1000:8.1f}ms {status:5} "
+                      f"{json.dumps(record['request'], default=str)[:160]}")
+        for service, (count, latency) in sorted(services.items()):
+            print(f"{service}: {count} calls, {latency:.2f}s recorded latency")
+        stats = cassette.stats()
+        print(f"{stats['records']} records, {stats['requests']} distinct requests, {os.path.getsize(args.path)} bytes")
+
+if __name__ == "__main__":
+    main()
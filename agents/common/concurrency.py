@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+from typing import Dict, Any, Iterator, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+import os
+import threading
+import time
+
+class Priority(IntEnum):
+    """Priority classes for API-server-bound calls; lower values win."""
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+# Priority of the calls made by the current task or thread
+request_priority: ContextVar[Priority] = ContextVar("request_priority", default=Priority.INTERACTIVE)
+
+@contextmanager
+def priority(level: Priority) -> Iterator[None]:
+    """Run the enclosed calls with the given priority class."""
+    token = request_priority.set(level)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+# Relative cost of kubectl verbs against the API server
+VERB_COSTS = {
+    "get": 1.0,
+    "top": 2.0,
+    "describe": 2.0,
+    "exec": 2.0,
+    "logs": 2.0,
+}
+
+def command_cost(command: str) -> float:
+    """Estimate the API server cost of a kubectl command."""
+    parts = command.split()
+    if not parts:
+        return 1.0
+
+    cost = VERB_COSTS.get(parts[0], 1.0)
+    if "--raw" in parts:
+        # Full /metrics scrapes are among the most expensive reads
+        cost = 5.0
+    if "-A" in parts or "--all-namespaces" in parts:
+        cost += 2.0
+    if "json" in parts or "-ojson" in parts or "--output=json" in parts:
+        cost += 1.0
+    for part in parts:
+        if part.startswith("--tail="):
+            tail = part.split("=", 1)[1]
+            if tail.isdigit() and int(tail) >= 1000:
+                cost += 2.0
+    return cost
+
+class LimiterTimeout(Exception):
+    """Raised when a call waited longer than the queue timeout for capacity."""
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter with priority classes and weighted calls.
+
+    The limit is expressed in cost units. Each completed call feeds back its
+    latency (normalised by cost) and whether it failed: failures and latency
+    well above the observed baseline shrink the limit multiplicatively, while
+    healthy completions grow it additively. Background calls may only use a
+    share of the limit and never overtake waiting interactive calls.
+    """
+
+    def __init__(
+        self,
+        initial_limit: float = 8.0,
+        min_limit: float = 1.0,
+        max_limit: float = 64.0,
+        background_share: float = 0.5,
+        backoff: float = 0.7,
+        latency_tolerance: float = 2.0,
+        decrease_cooldown: float = 1.0,
+        baseline_window: float = 30.0,
+        queue_timeout: float = 30.0
+    ):
+        self.limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.background_share = background_share
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.decrease_cooldown = decrease_cooldown
+        self.baseline_window = baseline_window
+        self.queue_timeout = queue_timeout
+
+        self._cond = threading.Condition()
+        self._in_use = 0.0
+        self._in_use_by_class = {level: 0.0 for level in Priority}
+        self._waiting = {level: 0 for level in Priority}
+        # Baseline latency is the minimum over the current and previous window
+        self._window_min: Optional[float] = None
+        self._previous_window_min: Optional[float] = None
+        self._window_started = time.monotonic()
+        self._last_decrease = 0.0
+        self._counters = {"completed": 0, "errors": 0, "increases": 0, "decreases": 0, "timeouts": 0}
+
+    @contextmanager
+    def slot(self, command: str, level: Optional[Priority] = None) -> Iterator[Dict[str, Any]]:
+        """Hold capacity for one call; set outcome["error"] = True on failure."""
+        cost = command_cost(command)
+        level = request_priority.get() if level is None else level
+        self.acquire(cost, level)
+        outcome = {"error": False}
+        started = time.monotonic()
+        try:
+            yield outcome
+        except BaseException:
+            outcome["error"] = True
+            raise
+        finally:
+            self.release(cost, level, time.monotonic() - started, outcome["error"])
+
+    def acquire(self, cost: float, level: Priority = Priority.INTERACTIVE) -> None:
+        """Block until `cost` units are available to the given priority class."""
+        deadline = time.monotonic() + self.queue_timeout
+        with self._cond:
+            self._waiting[level] += 1
+            try:
+                while not self._can_admit(cost, level):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._cond.wait(remaining):
+                        if not self._can_admit(cost, level):
+                            self._counters["timeouts"] += 1
+                            raise LimiterTimeout(
+                                f"Waited {self.queue_timeout}s for API server capacity (limit {self.limit:.1f})"
+                            )
+            finally:
+                self._waiting[level] -= 1
+            self._in_use += cost
+            self._in_use_by_class[level] += cost
+
+    def release(self, cost: float, level: Priority, latency: float, error: bool) -> None:
+        """Return capacity and adjust the limit from the call's outcome."""
+        with self._cond:
+            self._in_use -= cost
+            self._in_use_by_class[level] -= cost
+            self._counters["completed"] += 1
+            self._update_limit(latency / cost, error)
+            self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Export the current limit, usage and counters."""
+        with self._cond:
+            return {
+                "limit": round(self.limit, 2),
+                "background_limit": round(self.limit * self.background_share, 2),
+                "in_use": self._in_use,
+                "in_use_by_class": {level.name.lower(): used for level, used in self._in_use_by_class.items()},
+                "waiting_by_class": {level.name.lower(): count for level, count in self._waiting.items()},
+                "baseline_latency_per_cost": self._baseline(),
+                **self._counters
+            }
+
+    def _can_admit(self, cost: float, level: Priority) -> bool:
+        # A call costlier than the whole limit may still run on its own
+        fits = self._in_use + cost <= self.limit or self._in_use == 0
+        if level == Priority.INTERACTIVE:
+            return fits
+        if self._waiting[Priority.INTERACTIVE] > 0:
+            return False
+        background_used = self._in_use_by_class[Priority.BACKGROUND]
+        return fits and (background_used + cost <= self.limit * self.background_share or background_used == 0)
+
+    def _baseline(self) -> Optional[float]:
+        candidates = [m for m in (self._window_min, self._previous_window_min) if m is not None]
+        return min(candidates) if candidates else None
+
+    def _update_limit(self, latency_per_cost: float, error: bool) -> None:
+        now = time.monotonic()
+        if now - self._window_started >= self.baseline_window:
+            # Rotating windows lets the baseline follow a cluster that got slower
+            self._previous_window_min = self._window_min
+            self._window_min = None
+            self._window_started = now
+        if not error and (self._window_min is None or latency_per_cost < self._window_min):
+            self._window_min = latency_per_cost
+
+        baseline = self._baseline()
+        congested = error or (baseline is not None and latency_per_cost > baseline * self.latency_tolerance)
+        if error:
+            self._counters["errors"] += 1
+        if congested:
+            if now - self._last_decrease >= self.decrease_cooldown:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+                self._counters["decreases"] += 1
+        elif self._in_use + 1 >= self.limit * 0.5:
+            # Only grow while the limit is actually being used
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._counters["increases"] += 1
+
+def api_server_limiter_from_env() -> AdaptiveLimiter:
+    """A limiter for one API server, configured by the KUBECTL_* environment variables."""
+    return AdaptiveLimiter(
+        initial_limit=float(os.getenv("KUBECTL_LIMIT_INITIAL", "8")),
+        min_limit=float(os.getenv("KUBECTL_LIMIT_MIN", "1")),
+        max_limit=float(os.getenv("KUBECTL_LIMIT_MAX", "64")),
+        background_share=float(os.getenv("KUBECTL_BACKGROUND_SHARE", "0.5")),
+        queue_timeout=float(os.getenv("KUBECTL_QUEUE_TIMEOUT", "30"))
+    )
+
+# Shared limiter for every call that reaches the local API server through /execute
+api_server_limiter = api_server_limiter_from_env()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+from typing import Dict, Any, Optional
+import requests
+
+from . import cassette
+from .concurrency import AdaptiveLimiter, LimiterTimeout, api_server_limiter
+
+class KubectlClient:
+    """Client for the kubectl /execute API, shared by all agents."""
+
+    def __init__(
+        self,
+        api_url: str = "http://localhost:8000",
+        limiter: Optional[AdaptiveLimiter] = None,
+        timeout: float = 30
+    ):
+        self.api_url = api_url
+        self.limiter = limiter or api_server_limiter
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def execute(self, command: str, namespace: Optional[str] = None) -> Dict[str, Any]:
+        """Execute a kubectl command through the API."""
+        try:
+            return cassette.through(
+                "kubectl",
+                {"command": command, "namespace": namespace},
+                lambda: self._execute(command, namespace)
+            )
+        except (cassette.CassetteMiss, cassette.CassetteError) as e:
+            return {"error": str(e)}
+
+    def _execute(self, command: str, namespace: Optional[str]) -> Dict[str, Any]:
+        try:
+            with self.limiter.slot(command) as outcome:
+                try:
+                    response = self.session.post(
+                        f"{self.api_url}/execute",
+                        json={
+                            "command": command,
+                            "namespace": namespace
+                        },
+                        timeout=self.timeout
+                    )
+                    response.raise_for_status()
+                    return response.json()
+                except requests.exceptions.RequestException as e:
+                    # Client errors say nothing about API server load
+                    status = getattr(e.response, "status_code", None)
+                    outcome["error"] = status is None or status >= 500 or status == 429
+                    return {"error": str(e)}
+        except LimiterTimeout as e:
+            return {"error": str(e)}
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+from typing import Any, Callable, Dict, List, Optional
+import functools
+import sys
+import threading
+
+class LazyTool:
+    """A langchain tool that is only built the first time it is used."""
+
+    def __init__(self, name: str, func: Callable[..., Any]):
+        self.name = name
+        self.func = func
+        self._tool: Optional[Any] = None
+        self._lock = threading.Lock()
+        functools.update_wrapper(self, func)
+
+    @property
+    def tool(self) -> Any:
+        """Build the underlying langchain tool, importing langchain on first use."""
+        if self._tool is None:
+            with self._lock:
+                if self._tool is None:
+                    from langchain_core.tools import tool
+                    self._tool = tool(self.name)(self.func)
+        return self._tool
+
+    def __get__(self, instance: Any, owner: type) -> Any:
+        # Mirrors @tool on a method: the tool is shared at class level
+        return self.tool
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.tool(*args, **kwargs)
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.tool, attr)
+
+def lazy_tool(name: str) -> Callable[[Callable[..., Any]], LazyTool]:
+    """Drop-in replacement for langchain's @tool that defers importing langchain."""
+    def decorator(func: Callable[..., Any]) -> LazyTool:
+        return LazyTool(name, func)
+    return decorator
+
+def resolve_tools(tools: List[Any]) -> List[Any]:
+    """Turn a list that may contain LazyTools into real langchain tools."""
+    return [item.tool if isinstance(item, LazyTool) else item for item in tools]
+
+def lazy_attributes(module_name: str, **factories: Callable[[Any], Any]) -> Callable[[str], Any]:
+    """Build a module __getattr__ that constructs attributes on first access.
+
+    Each factory receives the module object and its result is cached in the
+    module namespace, so later lookups do not go through __getattr__ again.
+    """
+    lock = threading.RLock()
+
+    def __getattr__(name: str) -> Any:
+        factory = factories.get(name)
+        if factory is None:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        module = sys.modules[module_name]
+        with lock:
+            namespace: Dict[str, Any] = module.__dict__
+            if name not in namespace:
+                namespace[name] = factory(module)
+            return namespace[name]
+
+    return __getattr__
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""AgentExecutor that runs the tool calls of one model turn concurrently.
+
+The stock AgentExecutor performs the tool calls the model asks for in one
+turn one after another, although the model issued them without seeing each
+other's results. ParallelAgentExecutor starts them all when the first one is
+performed, in a thread pool of at most max_concurrency workers, and hands the
+results back in the order the model asked for them. A turn then costs its
+slowest call rather than the sum of all calls.
+
+Each call runs in a copy of the caller's context, so its kubectl calls keep
+the caller's priority class. A call that runs longer than its timeout is
+answered with a timeout observation; its thread is left to finish in the
+background. Timings of recent calls and turns are kept for inspection.
+"""
+from typing import Dict, Any, Optional, List
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+import contextvars
+import os
+import threading
+import time
+
+from langchain.agents import AgentExecutor
+from langchain_core.agents import AgentAction, AgentStep
+from langchain_core.pydantic_v1 import Field
+
+# Tool calls of one turn running at the same time
+TOOL_CALL_CONCURRENCY = int(os.getenv("TOOL_CALL_CONCURRENCY", "4"))
+# Seconds a tool call may run before the model is told it timed out; 0 waits indefinitely
+TOOL_CALL_TIMEOUT = float(os.getenv("TOOL_CALL_TIMEOUT", "60"))
+# Calls and turns whose timings are kept
+MAX_RECORDED_CALLS = 200
+
+class _ToolBatch(dict):
+    """The name -> tool map of one turn, carrying that turn's tool calls."""
+
+    def __init__(self, tools: Dict[str, Any]):
+        super().__init__(tools)
+        self.actions: List[AgentAction] = []
+        self.futures: Optional[List[Future]] = None
+        self.started: List[Optional[float]] = []
+        self.dispatched = 0.0
+        self.finished = 0
+
+class ParallelAgentExecutor(AgentExecutor):
+    """AgentExecutor whose tool calls from one turn run concurrently, with per-tool timeouts."""
+
+    max_concurrency: int = TOOL_CALL_CONCURRENCY
+    tool_timeout: float = TOOL_CALL_TIMEOUT
+    # Per-tool overrides of tool_timeout, by tool name
+    tool_timeouts: Dict[str, float] = Field(default_factory=dict)
+    call_timings: Any = Field(default_factory=lambda: deque(maxlen=MAX_RECORDED_CALLS))
+    turn_timings: Any = Field(default_factory=lambda: deque(maxlen=MAX_RECORDED_CALLS))
+
+    def _iter_next_step(
+        self,
+        name_to_tool_map: Dict[str, Any],
+        color_mapping: Dict[str, str],
+        inputs: Dict[str, str],
+        intermediate_steps: List[Any],
+        run_manager: Optional[Any] = None
+    ) -> Any:
+        # The base class yields every action of the turn before performing the first one
+        batch = _ToolBatch(name_to_tool_map)
+        for step in super()._iter_next_step(batch, color_mapping, inputs, intermediate_steps, run_manager):
+            if isinstance(step, AgentAction):
+                batch.actions.append(step)
+            yield step
+
+    def _perform_agent_action(
+        self,
+        name_to_tool_map: Dict[str, Any],
+        color_mapping: Dict[str, str],
+        agent_action: AgentAction,
+        run_manager: Optional[Any] = None
+    ) -> AgentStep:
+        batch = name_to_tool_map
+        if not isinstance(batch, _ToolBatch) or not any(action is agent_action for action in batch.actions):
+            return super()._perform_agent_action(name_to_tool_map, color_mapping, agent_action, run_manager)
+        if batch.futures is None:
+            self._dispatch(batch, color_mapping, run_manager)
+        index = next(i for i, action in enumerate(batch.actions) if action is agent_action)
+        try:
+            step = self._result(batch, index)
+        except FutureTimeout:
+            timeout = self._timeout(agent_action.tool)
+            self.call_timings.append({"tool": agent_action.tool, "status": "timeout", "seconds": timeout})
+            step = AgentStep(action=agent_action, observation=f"Tool {agent_action.tool} timed out after {timeout:g}s")
+        batch.finished += 1
+        if batch.finished == len(batch.actions):
+            self.turn_timings.append({
+                "calls": len(batch.actions),
+                "seconds": round(time.perf_counter() - batch.dispatched, 4)
+            })
+        return step
+
+    def timing_summary(self) -> Dict[str, Any]:
+        """Recent calls and turns: wall time per turn against the time its calls took in total."""
+        calls = [call for call in self.call_timings if call["status"] != "timeout"]
+        return {
+            "calls": len(calls),
+            "timeouts": sum(1 for call in self.call_timings if call["status"] == "timeout"),
+            "errors": sum(1 for call in calls if call["status"] == "error"),
+            "tool_seconds": round(sum(call["seconds"] for call in calls), 4),
+            "turns": len(self.turn_timings),
+            "turn_seconds": round(sum(turn["seconds"] for turn in self.turn_timings), 4),
+            "slowest_calls": sorted(calls, key=lambda call: call["seconds"], reverse=True)[:5]
+        }
+
+    def _dispatch(self, batch: _ToolBatch, color_mapping: Dict[str, str], run_manager: Optional[Any]) -> None:
+        count = len(batch.actions)
+        batch.started = [None] * count
+        batch.dispatched = time.perf_counter()
+        pool = ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, count)), thread_name_prefix="tool-call")
+        try:
+            batch.futures = [
+                pool.submit(contextvars.copy_context().run, self._run, batch, index, color_mapping, run_manager)
+                for index in range(count)
+            ]
+        finally:
+            # Workers exit once the turn's calls are done, including calls that outlive their timeout
+            pool.shutdown(wait=False)
+
+    def _run(self, batch: _ToolBatch, index: int, color_mapping: Dict[str, str], run_manager: Optional[Any]) -> AgentStep:
+        action = batch.actions[index]
+        started = batch.started[index] = time.perf_counter()
+        status = "error"
+        try:
+            step = super()._perform_agent_action(dict(batch), color_mapping, action, run_manager)
+            status = "ok"
+            return step
+        finally:
+            self.call_timings.append({
+                "tool": action.tool,
+                "status": status,
+                "seconds": round(time.perf_counter() - started, 4),
+                "queued_seconds": round(started - batch.dispatched, 4),
+                "thread": threading.current_thread().name
+            })
+
+    def _result(self, batch: _ToolBatch, index: int) -> AgentStep:
+        """The call's step; FutureTimeout once it has run longer than its tool's timeout."""
+        future = batch.futures[index]
+        timeout = self._timeout(batch.actions[index].tool)
+        while True:
+            started = batch.started[index]
+            # Time spent queued behind other calls does not count against the timeout
+            remaining = timeout if started is None else started + timeout - time.perf_counter()
+            try:
+                return future.result(timeout=max(remaining, 0) if timeout else None)
+            except FutureTimeout:
+                started = batch.started[index]
+                if started is not None and time.perf_counter() - started >= timeout:
+                    raise
+
+    def _timeout(self, tool: str) -> float:
+        return self.tool_timeouts.get(tool, self.tool_timeout)
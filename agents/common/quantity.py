@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Kubernetes resource quantities.
+
+A quantity is a signed decimal number followed by a binary suffix (Ki, Mi,
+Gi, Ti, Pi, Ei), a decimal suffix (n, u, m, "", k, M, G, T, P, E) or a
+decimal exponent (e3, E-2), as accepted by the API server: "4", "250m",
+"1.5", "16Gi", "500Mi", "128974848", "129e6", "100M". Values are returned in
+the base unit, so CPU is in cores and memory in bytes.
+"""
+from typing import Optional
+import functools
+import re
+
+BINARY_SUFFIXES = {"Ki": 2 ** 10, "Mi": 2 ** 20, "Gi": 2 ** 30, "Ti": 2 ** 40, "Pi": 2 ** 50, "Ei": 2 ** 60}
+DECIMAL_SUFFIXES = {
+    "n": 1e-9, "u": 1e-6, "m": 1e-3, "": 1.0, "k": 1e3, "M": 1e6, "G": 1e9, "T": 1e12, "P": 1e15, "E": 1e18
+}
+
+QUANTITY_PATTERN = re.compile(
+    r"^([+-]?(?:[0-9]+(?:\.[0-9]*)?|\.[0-9]+))"
+    r"(?:([eE][+-]?[0-9]+)|(Ki|Mi|Gi|Ti|Pi|Ei|n|u|m|k|M|G|T|P|E)?)$"
+)
+
+class QuantityError(ValueError):
+    """A string that is not a Kubernetes quantity."""
+
+def parse_quantity(value: object) -> float:
+    """Value of a quantity in its base unit; numbers are returned as they are."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    return _parse(str(value))
+
+# Clusters repeat a handful of request strings across thousands of pods
+@functools.lru_cache(maxsize=4096)
+def _parse(value: str) -> float:
+    match = QUANTITY_PATTERN.match(value.strip())
+    if not match:
+        raise QuantityError(f"invalid quantity: {value!r}")
+    number, exponent, suffix = match.groups()
+    if exponent:
+        return float(number + exponent)
+    suffix = suffix or ""
+    return float(number) * BINARY_SUFFIXES.get(suffix, DECIMAL_SUFFIXES.get(suffix, 1.0))
+
+def try_parse_quantity(value: object, default: Optional[float] = None) -> Optional[float]:
+    """parse_quantity, or default for a missing or malformed value."""
+    if value is None:
+        return default
+    try:
+        return parse_quantity(value)
+    except QuantityError:
+        return default
+
+def format_quantity(value: float, resource: str = "") -> str:
+    """Short quantity string: millicores for CPU, binary suffixes for memory and storage."""
+    if resource == "cpu":
+        millicores = round(value * 1000)
+        return str(millicores // 1000) if millicores % 1000 == 0 else f"{millicores}m"
+    if resource in ("memory", "ephemeral-storage") or resource.startswith("hugepages-"):
+        for suffix in ("Ei", "Pi", "Ti", "Gi", "Mi", "Ki"):
+            scale = BINARY_SUFFIXES[suffix]
+            if abs(value) >= scale:
+                return f"{round(value / scale, 2):g}{suffix}"
+        return str(int(value))
+    return f"{value:g}"
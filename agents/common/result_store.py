@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+from typing import Dict, Any, Optional, List
+from dataclasses import dataclass
+from collections import OrderedDict
+from uuid import uuid4
+import os
+import re
+import threading
+import time
+
+from .lazy import lazy_attributes, lazy_tool, resolve_tools
+
+# Outputs larger than this are stored and replaced by a summary plus a handle
+INLINE_OUTPUT_LIMIT = int(os.getenv("RESULT_STORE_INLINE_LIMIT", "4000"))
+# Number of leading/trailing lines shown in a summary
+PREVIEW_LINES = 15
+
+@dataclass
+class StoredResult:
+    """Full output of a tool call, kept behind an opaque handle."""
+    handle: str
+    source: str
+    lines: List[str]
+    size: int
+    created_at: float
+
+class ResultStore:
+    """Bounded in-process store for large tool outputs with LRU eviction."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_entries: int = 256):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._results: "OrderedDict[str, StoredResult]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def put(self, content: str, source: str) -> str:
+        """Store the full output and return its handle."""
+        if len(content) > self.max_bytes:
+            # Keep the most recent part; logs and metrics are read from the end
+            content = content[-self.max_bytes:]
+            content = content[content.find("\n") + 1:]
+
+        result = StoredResult(
+            handle=f"res-{uuid4().hex[:12]}",
+            source=source,
+            lines=content.split("\n"),
+            size=len(content),
+            created_at=time.time()
+        )
+
+        with self._lock:
+            self._results[result.handle] = result
+            self._total_bytes += result.size
+            self._evict()
+        return result.handle
+
+    def get(self, handle: str) -> Optional[StoredResult]:
+        """Look up a stored result, marking it as recently used."""
+        with self._lock:
+            result = self._results.get(handle)
+            if result is not None:
+                self._results.move_to_end(handle)
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Report the current occupancy of the store."""
+        with self._lock:
+            return {
+                "entries": len(self._results),
+                "total_bytes": self._total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes
+            }
+
+    def slice(self, handle: str, start: int = 0, count: int = 100) -> Optional[List[str]]:
+        """Return `count` lines starting at line `start`."""
+        result = self.get(handle)
+        if result is None:
+            return None
+        start = max(start, 0)
+        return result.lines[start:start + max(count, 0)]
+
+    def tail(self, handle: str, count: int = 100) -> Optional[List[str]]:
+        """Return the last `count` lines."""
+        result = self.get(handle)
+        if result is None:
+            return None
+        return result.lines[-count:] if count > 0 else []
+
+    def grep(
+        self,
+        handle: str,
+        pattern: str,
+        max_matches: int = 50,
+        context: int = 0,
+        ignore_case: bool = True
+    ) -> Optional[List[str]]:
+        """Return lines matching `pattern`, prefixed with their line numbers."""
+        result = self.get(handle)
+        if result is None:
+            return None
+
+        flags = re.IGNORECASE if ignore_case else 0
+        try:
+            regex = re.compile(pattern, flags)
+        except re.error:
+            regex = re.compile(re.escape(pattern), flags)
+
+        matches = []
+        last_emitted = -1
+        lines = result.lines
+        for index, line in enumerate(lines):
+            if max_matches <= 0:
+                break
+            if not regex.search(line):
+                continue
+            first = max(index - context, last_emitted + 1)
+            last = min(index + context, len(lines) - 1)
+            if matches and first > last_emitted + 1 and context:
+                matches.append("--")
+            for i in range(first, last + 1):
+                marker = ":" if i == index else "-"
+                matches.append(f"{i}{marker} {lines[i]}")
+            last_emitted = last
+            max_matches -= 1
+        return matches
+
+    def _evict(self) -> None:
+        """Drop least recently used results until within limits."""
+        while self._results and (
+            len(self._results) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            _, evicted = self._results.popitem(last=False)
+            self._total_bytes -= evicted.size
+
+def summarize_result(result: StoredResult) -> str:
+    """Build a compact summary of a stored result for the agent."""
+    lines = result.lines
+    parts = [
+        f"[{result.source}: {len(lines)} lines, {result.size} bytes stored as handle {result.handle}]"
+    ]
+    if len(lines) <= 2 * PREVIEW_LINES:
+        parts.extend(lines)
+    else:
+        parts.append(f"--- first {PREVIEW_LINES} lines ---")
+        parts.extend(lines[:PREVIEW_LINES])
+        parts.append(f"--- {len(lines) - 2 * PREVIEW_LINES} lines omitted ---")
+        parts.append(f"--- last {PREVIEW_LINES} lines ---")
+        parts.extend(lines[-PREVIEW_LINES:])
+    parts.append(
+        f"Use read_result_lines, grep_result or tail_result with handle {result.handle} to inspect the full output."
+    )
+    return "\n".join(parts)
+
+def compact_output(content: str, source: str, store: Optional[ResultStore] = None) -> str:
+    """Return small outputs inline and large ones as a summary plus handle."""
+    if len(content) <= INLINE_OUTPUT_LIMIT:
+        return content
+
+    store = store or result_store
+    handle = store.put(content, source)
+    result = store.get(handle)
+    return summarize_result(result) if result else content
+
+def _missing_handle(handle: str) -> str:
+    return f"No stored result for handle {handle}; it may have been evicted, re-run the original tool"
+
+@lazy_tool("read_result_lines")
+def read_result_lines(handle: str, start: int = 0, count: int = 100) -> str:
+    """Read a range of lines from a stored tool output."""
+    lines = result_store.slice(handle, start, count)
+    if lines is None:
+        return _missing_handle(handle)
+    return "\n".join(f"{start + i}: {line}" for i, line in enumerate(lines)) or "No lines in range"
+
+@lazy_tool("grep_result")
+def grep_result(handle: str, pattern: str, max_matches: int = 50, context: int = 0) -> str:
+    """Search a stored tool output for lines matching a regular expression."""
+    matches = result_store.grep(handle, pattern, max_matches, context)
+    if matches is None:
+        return _missing_handle(handle)
+    return "\n".join(matches) or f"No lines matching '{pattern}'"
+
+@lazy_tool("tail_result")
+def tail_result(handle: str, lines: int = 100) -> str:
+    """Read the last lines of a stored tool output."""
+    tail = result_store.tail(handle, lines)
+    if tail is None:
+        return _missing_handle(handle)
+    return "\n".join(tail) or "Stored result is empty"
+
+# Shared store for all agents in this process
+result_store = ResultStore(
+    max_bytes=int(os.getenv("RESULT_STORE_MAX_BYTES", str(64 * 1024 * 1024))),
+    max_entries=int(os.getenv("RESULT_STORE_MAX_ENTRIES", "256"))
+)
+
+# Companion tools for reading stored results, built on first use
+__getattr__ = lazy_attributes(
+    __name__,
+    result_tools=lambda module: resolve_tools([
+        module.read_result_lines,
+        module.grep_result,
+        module.tail_result
+    ])
+)
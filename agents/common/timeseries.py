@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+from typing import Dict, Any, Optional, List, Tuple
+from collections import OrderedDict
+import math
+import threading
+import numpy as np
+
+# Relative change over the window below which a series counts as flat
+FLAT_CHANGE = 0.1
+
+class SeriesBuffer:
+    """Fixed-capacity ring of (timestamp, value) samples in two float64 arrays."""
+    __slots__ = ("times", "values", "start", "size")
+
+    def __init__(self, capacity: int):
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.start = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def nbytes(self) -> int:
+        return self.times.nbytes + self.values.nbytes
+
+    def append(self, timestamp: float, value: float) -> None:
+        capacity = len(self.times)
+        end = (self.start + self.size) % capacity
+        self.times[end] = timestamp
+        self.values[end] = value
+        if self.size < capacity:
+            self.size += 1
+        else:
+            self.start = (self.start + 1) % capacity
+
+    def latest(self) -> Optional[Tuple[float, float]]:
+        if not self.size:
+            return None
+        last = (self.start + self.size - 1) % len(self.times)
+        return float(self.times[last]), float(self.values[last])
+
+    def since(self, timestamp: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Samples at or after timestamp, oldest first."""
+        order = (self.start + np.arange(self.size)) % len(self.times)
+        times = self.times[order]
+        # Samples are appended in time order, so the window is a suffix
+        first = int(np.searchsorted(times, timestamp, side="left"))
+        return times[first:], self.values[order[first:]]
+
+class TimeSeriesStore:
+    """Named series in ring buffers, bounded by a total memory budget.
+
+    Every series has the same capacity; when a new series would exceed
+    max_bytes the least recently updated series is dropped.
+    """
+
+    def __init__(self, capacity: int = 720, max_bytes: int = 8 * 1024 * 1024):
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.evicted = 0
+        self._series: "OrderedDict[str, SeriesBuffer]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._series
+
+    @property
+    def nbytes(self) -> int:
+        return sum(series.nbytes for series in self._series.values())
+
+    def append(self, name: str, timestamp: float, value: float) -> None:
+        if value is None or not math.isfinite(value):
+            return
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                series_bytes = 16 * self.capacity
+                while self._series and (len(self._series) + 1) * series_bytes > self.max_bytes:
+                    self._series.popitem(last=False)
+                    self.evicted += 1
+                series = self._series[name] = SeriesBuffer(self.capacity)
+            else:
+                self._series.move_to_end(name)
+            series.append(timestamp, value)
+
+    def latest(self, name: str) -> Optional[Tuple[float, float]]:
+        series = self._series.get(name)
+        return series.latest() if series is not None else None
+
+    def window(self, name: str, start: float) -> Tuple[np.ndarray, np.ndarray]:
+        """(times, values) of a series from start on; empty arrays if unknown."""
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                return np.zeros(0), np.zeros(0)
+            times, values = series.since(start)
+            return times.copy(), values.copy()
+
+    def names(self, prefix: str = "") -> List[str]:
+        with self._lock:
+            return [name for name in self._series if name.startswith(prefix)]
+
+    def trend(self, name: str, start: float, min_samples: int = 3) -> Optional[Dict[str, Any]]:
+        """Least-squares trend of a series since start, or None with too few samples."""
+        times, values = self.window(name, start)
+        if len(values) < min_samples:
+            return None
+        return describe_trend(times, values)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "series": len(self._series),
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "capacity": self.capacity,
+            "evicted": self.evicted
+        }
+
+def describe_trend(times: np.ndarray, values: np.ndarray) -> Dict[str, Any]:
+    """Direction and size of the linear trend through the samples."""
+    span = float(times[-1] - times[0])
+    if span > 0 and np.ptp(values) > 0:
+        slope = float(np.polyfit(times - times[0], values, 1)[0])
+    else:
+        slope = 0.0
+    fitted_change = slope * span
+    baseline = float(np.mean(np.abs(values)))
+    relative = fitted_change / baseline if baseline else 0.0
+    if abs(relative) < FLAT_CHANGE:
+        direction = "flat"
+    else:
+        direction = "rising" if relative > 0 else "falling"
+    return {
+        "direction": direction,
+        "first": float(values[0]),
+        "last": float(values[-1]),
+        "min": float(values.min()),
+        "max": float(values.max()),
+        "slope_per_minute": slope * 60,
+        "relative_change": round(relative, 3),
+        "samples": int(len(values)),
+        "span_seconds": round(span, 1)
+    }
+
+def histogram_quantile(q: float, buckets: Dict[float, float]) -> Optional[float]:
+    """Prometheus-style quantile from cumulative bucket counts keyed by upper bound."""
+    bounds = sorted(buckets)
+    if not bounds:
+        return None
+    total = buckets[bounds[-1]]
+    if total <= 0:
+        return None
+    rank = q * total
+    lower, below = 0.0, 0.0
+    for bound in bounds:
+        count = buckets[bound]
+        if count >= rank:
+            if math.isinf(bound):
+                # The quantile lies above the largest finite bucket
+                return lower
+            if count == below:
+                return bound
+            return lower + (bound - lower) * (rank - below) / (count - below)
+        lower, below = bound, count
+    return lower
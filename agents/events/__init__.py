@@ -0,0 +1 @@
+"""Streaming cluster events: aggregation of resource events, metrics and logs."""
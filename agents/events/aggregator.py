@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""Join resource events, metrics and pod logs into aggregated events.
+
+Python counterpart of the EventAggregator in TECHNICAL_DESIGN.md §3.1.
+Items are joined by object key in event time: a resource event opens a
+window that starts window_before seconds earlier (filled from a short
+per-object history of metrics and logs) and closes window_after seconds
+later. Windows close once the watermark, the newest event time seen minus
+allowed_lateness, passes their end.
+
+Memory is bounded by the number of tracked objects (least recently seen
+are evicted), the history kept per object and the number of open windows.
+The asyncio stages are connected by bounded queues, so a slow sink blocks
+the joiner, which in turn blocks the sources.
+"""
+from typing import Dict, Any, Optional, List, AsyncIterable, Awaitable, Callable, Iterable
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+import asyncio
+import hashlib
+import heapq
+import os
+import time
+
+from .model import (
+    AggregatedEvent, ResourceEvent, ResourceMetrics, StreamItem,
+    STREAM_EVENT, STREAM_LOG, STREAM_METRICS
+)
+
+Sink = Callable[[List[AggregatedEvent]], Awaitable[None]]
+
+@dataclass
+class AggregatorConfig:
+    """Window sizes, memory bounds and batching of the event pipeline."""
+    window_before: float = 60.0
+    window_after: float = 30.0
+    allowed_lateness: float = 5.0
+    max_keys: int = 10000
+    max_open_windows: int = 10000
+    max_metrics_per_key: int = 16
+    max_logs_per_key: int = 100
+    max_related_events: int = 50
+    # §8.2 EventProcessing: batchSize 100, processingTimeout 5s
+    batch_size: int = 100
+    processing_timeout: float = 5.0
+    queue_size: int = 1000
+
+    @classmethod
+    def from_env(cls) -> "AggregatorConfig":
+        """Build the configuration from EVENT_* environment variables."""
+        return cls(
+            window_before=float(os.getenv("EVENT_WINDOW_BEFORE", cls.window_before)),
+            window_after=float(os.getenv("EVENT_WINDOW_AFTER", cls.window_after)),
+            allowed_lateness=float(os.getenv("EVENT_ALLOWED_LATENESS", cls.allowed_lateness)),
+            max_keys=int(os.getenv("EVENT_MAX_KEYS", cls.max_keys)),
+            max_open_windows=int(os.getenv("EVENT_MAX_OPEN_WINDOWS", cls.max_open_windows)),
+            batch_size=int(os.getenv("EVENT_BATCH_SIZE", cls.batch_size)),
+            processing_timeout=float(os.getenv("EVENT_PROCESSING_TIMEOUT", cls.processing_timeout)),
+            queue_size=int(os.getenv("EVENT_QUEUE_SIZE", cls.queue_size)),
+        )
+
+@dataclass
+class AggregatorStats:
+    """Counters of one pipeline run."""
+    received: Dict[str, int] = field(default_factory=lambda: {STREAM_EVENT: 0, STREAM_METRICS: 0, STREAM_LOG: 0})
+    emitted: int = 0
+    batches: int = 0
+    closed_early: int = 0
+    evicted_keys: int = 0
+    truncated_items: int = 0
+    peak_keys: int = 0
+    peak_open_windows: int = 0
+    peak_queue_depth: int = 0
+
+class _ObjectState:
+    """Recent metrics and logs of one object and its open window, if any."""
+    __slots__ = ("metrics", "logs", "open", "last_seen")
+
+    def __init__(self, config: AggregatorConfig):
+        self.metrics: deque = deque(maxlen=config.max_metrics_per_key)
+        self.logs: deque = deque(maxlen=config.max_logs_per_key)
+        self.open: Optional[AggregatedEvent] = None
+        self.last_seen = 0.0
+
+class WindowJoiner:
+    """Synchronous event-time join; the asyncio stages are a thin shell around it."""
+
+    def __init__(self, config: Optional[AggregatorConfig] = None, stats: Optional[AggregatorStats] = None):
+        self.config = config or AggregatorConfig()
+        self.stats = stats or AggregatorStats()
+        self.watermark = float("-inf")
+        self._objects: "OrderedDict[str, _ObjectState]" = OrderedDict()
+        # (window_end, sequence, state, window); entries of windows closed early are skipped
+        self._deadlines: List[tuple] = []
+        self._open = 0
+        self._sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def add(self, item: StreamItem) -> List[AggregatedEvent]:
+        """Add one item and return the windows it caused to close."""
+        closed: List[AggregatedEvent] = []
+        key = item.key
+        state = self._objects.get(key)
+        if state is None:
+            state = self._objects[key] = _ObjectState(self.config)
+            if len(self._objects) > self.config.max_keys:
+                self._evict(closed)
+            self.stats.peak_keys = max(self.stats.peak_keys, len(self._objects))
+        else:
+            self._objects.move_to_end(key)
+        state.last_seen = max(state.last_seen, item.timestamp)
+
+        window = state.open
+        if isinstance(item, ResourceEvent):
+            self.stats.received[STREAM_EVENT] += 1
+            if window is not None and item.timestamp <= window.window_end:
+                self._append(window.related_events, item, self.config.max_related_events)
+            else:
+                self._open_window(key, state, item, closed)
+        elif isinstance(item, ResourceMetrics):
+            self.stats.received[STREAM_METRICS] += 1
+            state.metrics.append(item)
+            if window is not None and item.timestamp <= window.window_end:
+                self._append(window.metrics, item, self.config.max_metrics_per_key * 4)
+        else:
+            self.stats.received[STREAM_LOG] += 1
+            state.logs.append(item)
+            if window is not None and item.timestamp <= window.window_end:
+                self._append(window.logs, item, self.config.max_logs_per_key * 2)
+
+        watermark = item.timestamp - self.config.allowed_lateness
+        if watermark > self.watermark:
+            self.advance(watermark, closed)
+        return closed
+
+    def advance(self, watermark: float, closed: Optional[List[AggregatedEvent]] = None) -> List[AggregatedEvent]:
+        """Move the watermark forward, closing windows that end before it."""
+        closed = [] if closed is None else closed
+        self.watermark = max(self.watermark, watermark)
+        while self._deadlines and self._deadlines[0][0] <= self.watermark:
+            _, _, state, window = heapq.heappop(self._deadlines)
+            self._close(state, window, closed)
+        self._expire_idle()
+        return closed
+
+    def flush(self) -> List[AggregatedEvent]:
+        """Close every open window, e.g. when the input ends."""
+        return self.advance(float("inf"))
+
+    def _open_window(self, key: str, state: _ObjectState, event: ResourceEvent, closed: List[AggregatedEvent]) -> None:
+        if state.open is not None:
+            # A new event after the window ended but before the watermark passed it
+            self._close(state, state.open, closed)
+        start = event.timestamp - self.config.window_before
+        window = AggregatedEvent(
+            id=_window_id(key, event),
+            key=key,
+            main_event=event,
+            window_start=start,
+            window_end=event.timestamp + self.config.window_after,
+            metrics=[sample for sample in state.metrics if sample.timestamp >= start],
+            logs=[line for line in state.logs if line.timestamp >= start]
+        )
+        state.open = window
+        self._open += 1
+        self._sequence += 1
+        heapq.heappush(self._deadlines, (window.window_end, self._sequence, state, window))
+        self.stats.peak_open_windows = max(self.stats.peak_open_windows, self._open)
+        while self._open > self.config.max_open_windows:
+            _, _, oldest_state, oldest = heapq.heappop(self._deadlines)
+            if self._close(oldest_state, oldest, closed):
+                oldest.context["closed_early"] = "max_open_windows"
+                self.stats.closed_early += 1
+
+    def _close(self, state: _ObjectState, window: AggregatedEvent, closed: List[AggregatedEvent]) -> bool:
+        if state.open is not window:
+            return False
+        state.open = None
+        self._open -= 1
+        window.metrics.sort(key=lambda sample: sample.timestamp)
+        window.logs.sort(key=lambda line: line.timestamp)
+        closed.append(window)
+        return True
+
+    def _evict(self, closed: List[AggregatedEvent]) -> None:
+        _, state = self._objects.popitem(last=False)
+        self.stats.evicted_keys += 1
+        window = state.open
+        if window is not None and self._close(state, window, closed):
+            window.context["closed_early"] = "max_keys"
+            self.stats.closed_early += 1
+
+    def _expire_idle(self) -> None:
+        # Objects are ordered by last arrival, so idle ones collect at the front
+        cutoff = self.watermark - self.config.window_before
+        while self._objects:
+            key, state = next(iter(self._objects.items()))
+            if state.open is not None or state.last_seen >= cutoff:
+                break
+            del self._objects[key]
+
+    def _append(self, items: list, item: Any, limit: int) -> None:
+        if len(items) < limit:
+            items.append(item)
+        else:
+            self.stats.truncated_items += 1
+
+class EventAggregator:
+    """Asyncio pipeline: sources -> bounded queue -> joiner -> bounded queue -> batched sink."""
+
+    def __init__(self, config: Optional[AggregatorConfig] = None):
+        self.config = config or AggregatorConfig.from_env()
+        self.stats = AggregatorStats()
+        self.joiner = WindowJoiner(self.config, self.stats)
+
+    async def run(self, sources: Iterable[AsyncIterable[StreamItem]], sink: Sink) -> AggregatorStats:
+        """Consume every source to the end and deliver aggregated events to sink in batches."""
+        inputs: asyncio.Queue = asyncio.Queue(maxsize=self.config.queue_size)
+        outputs: asyncio.Queue = asyncio.Queue(maxsize=self.config.batch_size * 2)
+        producers = [asyncio.create_task(self._produce(source, inputs)) for source in sources]
+        joiner = asyncio.create_task(self._join(inputs, outputs, len(producers)))
+        batcher = asyncio.create_task(self._batch(outputs, sink))
+        try:
+            await asyncio.gather(*producers, joiner, batcher)
+        finally:
+            tasks = (*producers, joiner, batcher)
+            for task in tasks:
+                task.cancel()
+            # Let every stage unwind before returning, so none outlives the run
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return self.stats
+
+    async def _produce(self, source: AsyncIterable[StreamItem], inputs: asyncio.Queue) -> None:
+        try:
+            async for item in source:
+                # Blocks while the joiner is behind: this is the backpressure point for sources
+                await inputs.put(item)
+        except BaseException:
+            # Cancelled or failed: the joiner may be gone, so never wait on a full queue
+            try:
+                inputs.put_nowait(None)
+            except asyncio.QueueFull:
+                pass
+            raise
+        await inputs.put(None)
+
+    async def _join(self, inputs: asyncio.Queue, outputs: asyncio.Queue, producers: int) -> None:
+        remaining = producers
+        idle_since = time.monotonic()
+        while remaining:
+            self.stats.peak_queue_depth = max(self.stats.peak_queue_depth, inputs.qsize())
+            if not inputs.empty():
+                # Fast path while the sources are ahead; _get costs a task per call
+                item = inputs.get_nowait()
+            else:
+                try:
+                    item = await _get(inputs, self.config.processing_timeout)
+                except asyncio.TimeoutError:
+                    # Quiet sources: let event time follow wall-clock time so windows still close
+                    now = time.monotonic()
+                    for window in self.joiner.advance(self.joiner.watermark + (now - idle_since)):
+                        await outputs.put(window)
+                    idle_since = now
+                    continue
+            idle_since = time.monotonic()
+            if item is None:
+                remaining -= 1
+                continue
+            for window in self.joiner.add(item):
+                await outputs.put(window)
+        for window in self.joiner.flush():
+            await outputs.put(window)
+        await outputs.put(None)
+
+    async def _batch(self, outputs: asyncio.Queue, sink: Sink) -> None:
+        done = False
+        while not done:
+            window = await outputs.get()
+            if window is None:
+                break
+            batch = [window]
+            deadline = time.monotonic() + self.config.processing_timeout
+            while len(batch) < self.config.batch_size:
+                try:
+                    window = outputs.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        window = await _get(outputs, remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if window is None:
+                    done = True
+                    break
+                batch.append(window)
+            await sink(batch)
+            self.stats.emitted += len(batch)
+            self.stats.batches += 1
+
+async def _get(queue: asyncio.Queue, timeout: float) -> Any:
+    """queue.get() that raises asyncio.TimeoutError after timeout seconds.
+
+    Before Python 3.12, wait_for drops a cancellation that arrives as the
+    get completes, which would leave a stage running after run() stopped it.
+    """
+    getter = asyncio.ensure_future(queue.get())
+    try:
+        done, _ = await asyncio.wait((getter,), timeout=timeout)
+    finally:
+        if not getter.done():
+            getter.cancel()
+            await asyncio.wait((getter,))
+    if not done:
+        raise asyncio.TimeoutError
+    return getter.result()
+
+def _window_id(key: str, event: ResourceEvent) -> str:
+    # Stable across replays of the same stream
+    seed = f"{key}|{event.timestamp:.6f}|{event.type}|{event.reason}"
+    return hashlib.blake2b(seed.encode(), digest_size=8).hexdigest()
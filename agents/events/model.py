@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+from typing import Dict, Any, Optional, List, Union
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timezone
+import re
+
+# Kubernetes watch event types
+ADDED = "ADDED"
+MODIFIED = "MODIFIED"
+DELETED = "DELETED"
+
+# Discriminator used when items are serialized to one JSONL stream
+STREAM_EVENT = "event"
+STREAM_METRICS = "metrics"
+STREAM_LOG = "log"
+
+LEVEL_PATTERN = re.compile(r"\b(FATAL|PANIC|ERROR|ERR|WARNING|WARN|INFO|DEBUG)\b", re.IGNORECASE)
+LEVEL_NAMES = {"FATAL": "error", "PANIC": "error", "ERROR": "error", "ERR": "error", "WARNING": "warning", "WARN": "warning"}
+
+def object_key(namespace: Optional[str], kind: str, name: str) -> str:
+    """Join key shared by events, metrics and logs of one object."""
+    return f"{namespace or ''}/{kind}/{name}"
+
+def parse_time(value: Optional[str]) -> Optional[float]:
+    """RFC 3339 timestamp to epoch seconds, or None."""
+    if not value:
+        return None
+    value = str(value)
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    # Python < 3.11 only accepts up to microsecond precision
+    value = re.sub(r"(\.\d{6})\d+", r"\1", value)
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+def format_time(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+def log_level(message: str) -> str:
+    """Best-effort severity of a log line: error, warning or info."""
+    match = LEVEL_PATTERN.search(message[:200])
+    return LEVEL_NAMES.get(match.group(1).upper(), "info") if match else "info"
+
+@dataclass
+class ResourceEvent:
+    """A change to a cluster object, as reported by a watch or the events API."""
+    type: str
+    kind: str
+    namespace: Optional[str]
+    name: str
+    timestamp: float
+    reason: str = ""
+    message: str = ""
+    metadata: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return object_key(self.namespace, self.kind, self.name)
+
+@dataclass
+class ResourceMetrics:
+    """One resource usage sample for an object."""
+    kind: str
+    namespace: Optional[str]
+    name: str
+    timestamp: float
+    cpu_millicores: float = 0.0
+    memory_bytes: float = 0.0
+    # Zero when the limit is unknown, e.g. for plain `kubectl top` samples
+    cpu_limit_millicores: float = 0.0
+    memory_limit_bytes: float = 0.0
+
+    @property
+    def key(self) -> str:
+        return object_key(self.namespace, self.kind, self.name)
+
+@dataclass
+class PodLog:
+    """One log line of a pod container."""
+    namespace: Optional[str]
+    pod: str
+    container: str
+    message: str
+    timestamp: float
+    level: str = "info"
+
+    @property
+    def key(self) -> str:
+        return object_key(self.namespace, "Pod", self.pod)
+
+StreamItem = Union[ResourceEvent, ResourceMetrics, PodLog]
+
+STREAM_TYPES = {STREAM_EVENT: ResourceEvent, STREAM_METRICS: ResourceMetrics, STREAM_LOG: PodLog}
+STREAM_NAMES = {cls: name for name, cls in STREAM_TYPES.items()}
+
+@dataclass
+class AggregatedEvent:
+    """A resource event joined with the metrics and logs around it."""
+    id: str
+    key: str
+    main_event: ResourceEvent
+    window_start: float
+    window_end: float
+    related_events: List[ResourceEvent] = field(default_factory=list)
+    metrics: List[ResourceMetrics] = field(default_factory=list)
+    logs: List[PodLog] = field(default_factory=list)
+    context: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+def to_record(item: StreamItem) -> Dict[str, Any]:
+    """Serialize a stream item for replay files."""
+    return {"stream": STREAM_NAMES[type(item)], **asdict(item)}
+
+def from_record(record: Dict[str, Any]) -> StreamItem:
+    """Inverse of to_record."""
+    record = dict(record)
+    return STREAM_TYPES[record.pop("stream")](**record)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""Inputs and outputs of the event aggregation pipeline.
+
+ReplaySource plays back a recorded or synthetic stream, optionally paced by
+its timestamps; KubectlSource polls a live cluster through the shared
+kubectl client at background priority.
+"""
+from typing import Dict, Any, Optional, List, AsyncIterator, Iterable, Tuple, TYPE_CHECKING
+import asyncio
+import json
+import time
+
+from ..common.concurrency import Priority, priority
+from ..common.quantity import try_parse_quantity
+from .model import (
+    ADDED, MODIFIED, AggregatedEvent, PodLog, ResourceEvent, ResourceMetrics, StreamItem,
+    from_record, log_level, parse_time, to_record
+)
+
+if TYPE_CHECKING:
+    from ..common.kubectl import KubectlClient
+
+class ReplaySource:
+    """Async iterator over recorded stream items.
+
+    With speed=None items are yielded as fast as the pipeline accepts them;
+    otherwise gaps between timestamps are slept, divided by speed.
+    """
+
+    def __init__(self, items: Iterable[StreamItem], speed: Optional[float] = None):
+        self.items = items
+        self.speed = speed
+
+    @classmethod
+    def from_jsonl(cls, path: str, speed: Optional[float] = None) -> "ReplaySource":
+        def read() -> Iterable[StreamItem]:
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        yield from_record(json.loads(line))
+        return cls(read(), speed)
+
+    async def __aiter__(self) -> AsyncIterator[StreamItem]:
+        previous: Optional[float] = None
+        for count, item in enumerate(self.items):
+            if self.speed and previous is not None and item.timestamp > previous:
+                await asyncio.sleep((item.timestamp - previous) / self.speed)
+            elif count % 256 == 0:
+                # Give the other stages a turn even when the queue never fills
+                await asyncio.sleep(0)
+            previous = item.timestamp
+            yield item
+
+class KubectlSource:
+    """Polls events, pod metrics and logs of warned-about pods from the cluster."""
+
+    def __init__(
+        self,
+        client: "KubectlClient",
+        namespace: Optional[str] = None,
+        interval: float = 15.0,
+        log_tail: int = 50,
+        max_log_pods: int = 10
+    ):
+        self.client = client
+        self.namespace = namespace
+        self.interval = interval
+        self.log_tail = log_tail
+        self.max_log_pods = max_log_pods
+        # Event UID -> last seen count, to report only new or repeated events
+        self._seen: Dict[str, int] = {}
+
+    async def __aiter__(self) -> AsyncIterator[StreamItem]:
+        while True:
+            started = time.monotonic()
+            events = await self._poll_events()
+            for event in events:
+                yield event
+            for sample in await self._poll_metrics():
+                yield sample
+            for line in await self._poll_logs(events):
+                yield line
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    async def _execute(self, command: str) -> Dict[str, Any]:
+        def call() -> Dict[str, Any]:
+            with priority(Priority.BACKGROUND):
+                return self.client.execute(command, self.namespace)
+        return await asyncio.to_thread(call)
+
+    def _scope(self) -> str:
+        return "" if self.namespace else " -A"
+
+    async def _poll_events(self) -> List[ResourceEvent]:
+        result = await self._execute(f"get events{self._scope()} -o json")
+        if "error" in result:
+            return []
+        events = []
+        seen: Dict[str, int] = {}
+        for item in _items(result):
+            metadata = item.get("metadata", {})
+            uid = metadata.get("uid") or metadata.get("name", "")
+            count = item.get("count") or 1
+            seen[uid] = count
+            previous = self._seen.get(uid)
+            if previous is not None and previous >= count:
+                continue
+            involved = item.get("involvedObject", {})
+            timestamp = (
+                parse_time(item.get("lastTimestamp")) or parse_time(item.get("eventTime"))
+                or parse_time(metadata.get("creationTimestamp")) or time.time()
+            )
+            events.append(ResourceEvent(
+                type=ADDED if previous is None else MODIFIED,
+                kind=involved.get("kind", ""),
+                namespace=involved.get("namespace") or metadata.get("namespace"),
+                name=involved.get("name", ""),
+                timestamp=timestamp,
+                reason=item.get("reason", ""),
+                message=item.get("message", ""),
+                metadata={"severity": item.get("type", ""), "count": str(count)}
+            ))
+        # Events that expired from the API server are forgotten with it
+        self._seen = seen
+        events.sort(key=lambda event: event.timestamp)
+        return events
+
+    async def _poll_metrics(self) -> List[ResourceMetrics]:
+        result = await self._execute(f"top pods{self._scope()} --no-headers")
+        if "error" in result:
+            return []
+        now = time.time()
+        samples = []
+        for line in result.get("output", "").splitlines():
+            parts = line.split()
+            if self.namespace and len(parts) >= 3:
+                parts = [self.namespace] + parts
+            if len(parts) < 4:
+                continue
+            samples.append(ResourceMetrics(
+                kind="Pod",
+                namespace=parts[0],
+                name=parts[1],
+                timestamp=now,
+                cpu_millicores=_cpu_millicores(parts[2]),
+                memory_bytes=_memory_bytes(parts[3])
+            ))
+        return samples
+
+    async def _poll_logs(self, events: List[ResourceEvent]) -> List[PodLog]:
+        pods: List[Tuple[str, str]] = []
+        for event in events:
+            target = (event.namespace or "", event.name)
+            if event.kind == "Pod" and event.metadata.get("severity") == "Warning" and target not in pods:
+                pods.append(target)
+        lines = []
+        for namespace, pod in pods[:self.max_log_pods]:
+            result = await self._execute(
+                f"logs {pod} -n {namespace} --all-containers --timestamps "
+                f"--since={int(self.interval) + 1}s --tail={self.log_tail}"
+            )
+            if "error" in result:
+                continue
+            for line in result.get("output", "").splitlines():
+                stamp, _, message = line.partition(" ")
+                timestamp = parse_time(stamp)
+                if timestamp is None:
+                    timestamp, message = time.time(), line
+                lines.append(PodLog(
+                    namespace=namespace, pod=pod, container="", message=message,
+                    timestamp=timestamp, level=log_level(message)
+                ))
+        return lines
+
+class JsonlSink:
+    """Appends aggregated events to a JSONL file, one batch per write."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    async def __call__(self, batch: List[AggregatedEvent]) -> None:
+        lines = "".join(json.dumps(event.to_dict(), separators=(",", ":")) + "\n" for event in batch)
+        await asyncio.to_thread(self._write, lines)
+
+    def _write(self, lines: str) -> None:
+        with open(self.path, "a") as f:
+            f.write(lines)
+
+def write_replay(items: Iterable[StreamItem], path: str) -> int:
+    """Record stream items for ReplaySource.from_jsonl."""
+    count = 0
+    with open(path, "w") as f:
+        for item in items:
+            f.write(json.dumps(to_record(item), separators=(",", ":")) + "\n")
+            count += 1
+    return count
+
+def _items(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    if "items" in result:
+        return result["items"]
+    try:
+        return json.loads(result.get("output") or "{}").get("items", [])
+    except (ValueError, AttributeError):
+        return []
+
+def _cpu_millicores(value: str) -> float:
+    return (try_parse_quantity(value) or 0.0) * 1000
+
+def _memory_bytes(value: str) -> float:
+    return try_parse_quantity(value) or 0.0
@@ -1,35 +1,69 @@
 #!/usr/bin/env python3
-from typing import Dict, Any, Optional, List
-import requests
-from langchain_core.tools import tool
+from typing import Dict, Any, Optional, List, Tuple, TYPE_CHECKING
 import json
+import os
+import threading
+import time
 from datetime import datetime, timedelta
 
+from ..common import result_store as results
+from ..common.kubectl import KubectlClient
+from ..common.lazy import lazy_attributes, lazy_tool
+
+if TYPE_CHECKING:
+    from .capacity import NodeCapacityIndex
+    from .collector import ControlPlaneCollector
+
+# Number of slowest latency series returned inline by check_api_server_metrics
+MAX_INLINE_LATENCY_SERIES = 25
+# Seconds between background samples of the control plane; 0 leaves the collector off
+CONTROL_PLANE_SAMPLE_INTERVAL = float(os.getenv("CONTROL_PLANE_SAMPLE_INTERVAL", "0"))
+# Seconds a node capacity index is reused before nodes and pods are listed again
+CAPACITY_INDEX_TTL = float(os.getenv("CAPACITY_INDEX_TTL", "30"))
+# Pending pods explained by analyze_scheduler_decisions
+MAX_EXPLAINED_PENDING_PODS = 10
+
 class K8sControlPlaneAgent:
     """Agent for managing and monitoring Kubernetes control plane components."""
     
-    def __init__(self):
-        self.k8s_api_url = "http://localhost:8000"
+    def __init__(self, api_url: str = "http://localhost:8000", kubectl: Optional[KubectlClient] = None):
+        self.k8s_api_url = api_url
+        self.kubectl = kubectl or KubectlClient(api_url)
+        self.collector: Optional["ControlPlaneCollector"] = None
+        self._capacity: Optional["NodeCapacityIndex"] = None
+        self._capacity_built = 0.0
+        self._capacity_lock = threading.Lock()
+        if CONTROL_PLANE_SAMPLE_INTERVAL > 0:
+            self.start_collector(CONTROL_PLANE_SAMPLE_INTERVAL)
+
+    def start_collector(self, interval: float = 30.0) -> "ControlPlaneCollector":
+        """Sample the control plane in the background so tools answer from memory."""
+        from .collector import ControlPlaneCollector
+        if self.collector is None:
+            self.collector = ControlPlaneCollector(self, interval)
+        return self.collector.start()
+
+    def stop_collector(self) -> None:
+        if self.collector is not None:
+            self.collector.stop()
+
+    def _sampled(self, signal: str) -> Optional[Dict[str, Any]]:
+        """Answer from the background collector when it has a fresh sample."""
+        if self.collector is None:
+            return None
+        return self.collector.answer(signal)
 
     def execute_kubectl(self, command: str, namespace: Optional[str] = None) -> Dict[str, Any]:
         """Execute a kubectl command through the API."""
-        try:
-            response = requests.post(
-                f"{self.k8s_api_url}/execute",
-                json={
-                    "command": command,
-                    "namespace": namespace
-                },
-                timeout=30
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            return {"error": str(e)}
+        return self.kubectl.execute(command, namespace)
 
-    @tool("get_control_plane_status")
+    @lazy_tool("get_control_plane_status")
     def get_control_plane_status(self) -> Dict[str, Any]:
         """Get the status of all control plane components."""
+        return self._sampled("control_plane_status") or self.collect_control_plane_status()
+
+    def collect_control_plane_status(self) -> Dict[str, Any]:
+        """Query the status of all control plane components."""
         components = [
             "kube-apiserver",
             "kube-controller-manager",
@@ -85,9 +119,13 @@ class K8sControlPlaneAgent:
         
         return status
 
-    @tool("analyze_etcd_health")
+    @lazy_tool("analyze_etcd_health")
     def analyze_etcd_health(self) -> Dict[str, Any]:
         """Analyze the health of the etcd cluster."""
+        return self._sampled("etcd_health") or self.collect_etcd_health()
+
+    def collect_etcd_health(self) -> Dict[str, Any]:
+        """Query etcd endpoint health and status."""
         # Get etcd endpoints health
         result = self.execute_kubectl("exec -n kube-system etcd-control-plane -- etcdctl endpoint health --cluster")
         
@@ -130,10 +168,20 @@ class K8sControlPlaneAgent:
         
         return health_status
 
-    @tool("check_api_server_metrics")
+    @lazy_tool("check_api_server_metrics")
     def check_api_server_metrics(self) -> Dict[str, Any]:
         """Check key metrics from the Kubernetes API server."""
+        sampled = self._sampled("api_server_metrics")
+        if sampled is not None:
+            return sampled
+        metrics, _ = self.scrape_api_server_metrics()
+        return metrics
+
+    def scrape_api_server_metrics(self, keep_raw: bool = True) -> Tuple[Dict[str, Any], Dict[str, Dict[float, float]]]:
+        """Scrape and analyze API server metrics; also returns the latency buckets per resource/verb."""
+        from ..common.timeseries import histogram_quantile
         result = self.execute_kubectl("get --raw /metrics")
+        buckets: Dict[str, Dict[float, float]] = {}
         
         metrics = {
             "request_latency": {},
@@ -144,14 +192,18 @@ class K8sControlPlaneAgent:
         }
         
         if "error" not in result:
-            lines = result.get("output", "").split("\n")
+            output = result.get("output", "")
+            if keep_raw:
+                # Keep the raw exposition text behind a handle for grep_result
+                metrics["raw_metrics_handle"] = results.result_store.put(output, "check_api_server_metrics")
+            lines = output.split("\n")
             for line in lines:
                 if line.startswith("#"):
                     continue
                 
                 # Parse request latency metrics
                 if "apiserver_request_duration_seconds" in line:
-                    self._parse_latency_metric(line, metrics)
+                    self._parse_latency_metric(line, buckets)
                 
                 # Parse error rate metrics
                 if "apiserver_request_total" in line and 'code="5' in line:
@@ -160,15 +212,29 @@ class K8sControlPlaneAgent:
                 # Parse etcd request metrics
                 if "etcd_request_duration_seconds" in line:
                     self._parse_etcd_metric(line, metrics)
+
+            # p99 since API server start, in seconds
+            for key, counts in buckets.items():
+                p99 = histogram_quantile(0.99, counts)
+                if p99 is not None:
+                    metrics["request_latency"][key] = round(p99, 4)
         
         # Analyze metrics for issues
         self._analyze_metrics_issues(metrics)
+
+        # Only the slowest series are returned inline
+        latency = metrics["request_latency"]
+        if len(latency) > MAX_INLINE_LATENCY_SERIES:
+            metrics["omitted_latency_series"] = len(latency) - MAX_INLINE_LATENCY_SERIES
+            metrics["request_latency"] = dict(
+                sorted(latency.items(), key=lambda item: item[1], reverse=True)[:MAX_INLINE_LATENCY_SERIES]
+            )
         
-        return metrics
+        return metrics, buckets
 
-    @tool("analyze_scheduler_decisions")
+    @lazy_tool("analyze_scheduler_decisions")
     def analyze_scheduler_decisions(self) -> Dict[str, Any]:
-        """Analyze recent scheduler decisions and identify potential issues."""
+        """Analyze recent scheduler decisions, node allocation and pending pods."""
         # Get scheduler logs
         result = self.execute_kubectl("logs -n kube-system -l component=kube-scheduler --tail=1000")
         
@@ -177,7 +243,8 @@ class K8sControlPlaneAgent:
             "successful_schedules": 0,
             "failed_schedules": 0,
             "common_failure_reasons": {},
-            "node_utilization": {},
+            "node_allocation": {},
+            "pending_pods": [],
             "issues": []
         }
         
@@ -194,48 +261,106 @@ class K8sControlPlaneAgent:
             
             analysis["scheduling_attempts"] = analysis["successful_schedules"] + analysis["failed_schedules"]
             
-            # Get node utilization
-            result = self.execute_kubectl("get nodes -o json")
-            if "error" not in result:
-                nodes = result.get("items", [])
-                for node in nodes:
-                    name = node["metadata"]["name"]
-                    allocatable = node["status"]["allocatable"]
-                    capacity = node["status"]["capacity"]
-                    
-                    cpu_alloc = float(allocatable["cpu"].rstrip("m")) / 1000
-                    cpu_cap = float(capacity["cpu"].rstrip("m")) / 1000
-                    mem_alloc = int(allocatable["memory"].rstrip("Ki")) / (1024 * 1024)
-                    mem_cap = int(capacity["memory"].rstrip("Ki")) / (1024 * 1024)
-                    
-                    analysis["node_utilization"][name] = {
-                        "cpu_utilization": (cpu_cap - cpu_alloc) / cpu_cap * 100,
-                        "memory_utilization": (mem_cap - mem_alloc) / mem_cap * 100
-                    }
-            
             # Analyze for issues
             if analysis["failed_schedules"] > analysis["successful_schedules"] * 0.1:  # >10% failure rate
                 analysis["issues"].append("High scheduling failure rate detected")
-            
-            for node, util in analysis["node_utilization"].items():
-                if util["cpu_utilization"] > 80:
-                    analysis["issues"].append(f"High CPU utilization on node {node}")
-                if util["memory_utilization"] > 80:
-                    analysis["issues"].append(f"High memory utilization on node {node}")
+        
+        # Allocation is what pods request of each node's allocatable, which is what the scheduler fits against
+        index, error = self.capacity_index()
+        if index is None:
+            analysis["node_allocation"] = {"error": error}
+            return analysis
+        allocation = index.summary()
+        analysis["node_allocation"] = allocation
+        for resource in ("cpu", "memory"):
+            crowded = [node["node"] for node in allocation["most_allocated"] if node[f"{resource}_requested_percent"] > 80]
+            if crowded:
+                analysis["issues"].append(
+                    f"{allocation[f'high_{resource}_nodes']} node(s) have more than 80% of allocatable {resource} "
+                    f"requested ({', '.join(crowded)})"
+                )
+        
+        # Oldest pending pods first, with the reason no node takes them
+        pending = sorted(index.pending, key=lambda pod: pod["metadata"].get("creationTimestamp", ""))
+        for pod in pending[:MAX_EXPLAINED_PENDING_PODS]:
+            explanation = index.explain(pod)
+            condition = next(
+                (c for c in pod.get("status", {}).get("conditions", []) if c.get("type") == "PodScheduled"), {}
+            )
+            if condition.get("message"):
+                explanation["scheduler_message"] = condition["message"]
+            analysis["pending_pods"].append(explanation)
+        unplaceable = [pod for pod in analysis["pending_pods"] if not pod["fitting_nodes"]]
+        if unplaceable:
+            analysis["issues"].append(
+                f"{len(unplaceable)} pending pod(s) fit on no node, e.g. {unplaceable[0]['pod']}: {unplaceable[0]['message']}"
+            )
         
         return analysis
 
-    def _parse_latency_metric(self, line: str, metrics: Dict) -> None:
-        """Parse API server latency metrics."""
+    @lazy_tool("find_node_fit")
+    def find_node_fit(
+        self,
+        cpu: str = "0",
+        memory: str = "0",
+        node_selector: Optional[Dict[str, str]] = None,
+        tolerations: Optional[List[Dict[str, str]]] = None,
+        extended_resources: Optional[Dict[str, str]] = None,
+        pod: Optional[str] = None,
+        namespace: str = "default",
+        limit: int = 10
+    ) -> Dict[str, Any]:
+        """Find the nodes a pod with the given requests (e.g. cpu="500m", memory="2Gi") fits on, least allocated first,
+        and why the other nodes reject it. With pod set, the requests, selector, affinity and tolerations of that pod are used."""
+        from .capacity import parse_requests, pod_requests
+
+        index, error = self.capacity_index()
+        if index is None:
+            return {"error": error}
+        affinity = None
+        if pod:
+            result = self.execute_kubectl(f"get pod {pod} -o json", namespace)
+            if "error" in result:
+                return result
+            spec = result.get("spec", {})
+            requests = pod_requests(spec)
+            node_selector = spec.get("nodeSelector")
+            tolerations = spec.get("tolerations")
+            affinity = spec.get("affinity")
+        else:
+            requests = parse_requests(cpu, memory, extended_resources)
+        return index.fit(requests, node_selector, tolerations, affinity, limit)
+
+    def capacity_index(self, max_age: float = CAPACITY_INDEX_TTL) -> Tuple[Optional["NodeCapacityIndex"], Optional[str]]:
+        """Node capacity index from one node list and one pod list, rebuilt once it is max_age seconds old."""
+        from .capacity import NodeCapacityIndex
+
+        with self._capacity_lock:
+            if self._capacity is not None and time.monotonic() - self._capacity_built < max_age:
+                return self._capacity, None
+            nodes = self.execute_kubectl("get nodes -o json")
+            if "error" in nodes:
+                return None, nodes["error"]
+            pods = self.execute_kubectl("get pods -A -o json --field-selector=status.phase!=Succeeded,status.phase!=Failed")
+            if "error" in pods:
+                return None, pods["error"]
+            self._capacity = NodeCapacityIndex(nodes.get("items", []), pods.get("items", []))
+            self._capacity_built = time.monotonic()
+            return self._capacity, None
+
+    def _parse_latency_metric(self, line: str, buckets: Dict[str, Dict[float, float]]) -> None:
+        """Accumulate API server latency histogram buckets per resource/verb."""
         if "bucket" in line:
             parts = line.split("{")[1].split("}")[0].split(",")
             resource = next((p.split("=")[1].strip('"') for p in parts if "resource=" in p), "")
             verb = next((p.split("=")[1].strip('"') for p in parts if "verb=" in p), "")
+            bound = next((p.split("=")[1].strip('"') for p in parts if p.startswith("le=")), "")
             
-            if resource and verb:
-                key = f"{resource}/{verb}"
-                value = float(line.split(" ")[-1])
-                metrics["request_latency"][key] = value
+            if resource and verb and bound:
+                # Series differing only in scope, group or component are summed
+                counts = buckets.setdefault(f"{resource}/{verb}", {})
+                le = float(bound)
+                counts[le] = counts.get(le, 0.0) + float(line.split(" ")[-1])
 
     def _parse_error_metric(self, line: str, metrics: Dict) -> None:
         """Parse API server error metrics."""
@@ -282,8 +407,12 @@ class K8sControlPlaneAgent:
         common_reasons = [
             "insufficient cpu",
             "insufficient memory",
+            "too many pods",
+            "node(s) had untolerated taint",
             "node(s) had taint",
+            "node(s) didn't match pod's node affinity/selector",
             "node(s) didn't match node selector",
+            "node(s) were unschedulable",
             "0/1 nodes are available"
         ]
         
@@ -293,13 +422,16 @@ class K8sControlPlaneAgent:
                 return reason
         return "unknown"
 
-# Create the agent instance
-k8s_agent = K8sControlPlaneAgent()
-
-# List of available tools
-k8s_tools = [
-    k8s_agent.get_control_plane_status,
-    k8s_agent.analyze_etcd_health,
-    k8s_agent.check_api_server_metrics,
-    k8s_agent.analyze_scheduler_decisions
-] 
\ No newline at end of file
+# Agent instance and tool list are built on first use
+__getattr__ = lazy_attributes(
+    __name__,
+    k8s_agent=lambda module: K8sControlPlaneAgent(),
+    k8s_tools=lambda module: [
+        module.k8s_agent.get_control_plane_status,
+        module.k8s_agent.analyze_etcd_health,
+        module.k8s_agent.check_api_server_metrics,
+        module.k8s_agent.analyze_scheduler_decisions,
+        module.k8s_agent.find_node_fit,
+        *results.result_tools
+    ]
+)
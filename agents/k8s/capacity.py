@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""Schedulable capacity of every node, from one node list and one pod list.
+
+Allocatable resources and the summed requests of the pods bound to each
+node are kept as (nodes, resources) float64 matrices, so "where would a pod
+with 2 CPUs and 4Gi fit" is one vectorized comparison of free capacity
+against the request. Taints are grouped by distinct taint set and labels are
+indexed by key and value, so tolerations, nodeSelector and required node
+affinity are matched once per taint set or label value rather than once per
+node.
+
+A pod's request follows the scheduler: the larger of the sum of its
+containers' requests and the largest init container request, plus pod
+overhead, with limits standing in for requests that are not set. Nodes that
+reject a pod are attributed to the first filter they fail, in the
+scheduler's order (unschedulable, taints, node affinity/selector,
+resources), and summarized in the scheduler's "0/N nodes are available"
+form.
+"""
+from typing import Dict, Any, Optional, List, Tuple
+import numpy as np
+
+from ..common.quantity import format_quantity, try_parse_quantity
+
+# Resources every index tracks; extended resources such as nvidia.com/gpu are added as nodes report them
+BASE_RESOURCES = ("cpu", "memory", "pods", "ephemeral-storage")
+# Taint effects that keep new pods off a node
+BLOCKING_EFFECTS = ("NoSchedule", "NoExecute")
+UNSCHEDULABLE_TAINT = "node.kubernetes.io/unschedulable"
+# Share of allocatable requested above which a node counts as highly allocated
+HIGH_ALLOCATION = 0.8
+
+Taint = Tuple[str, str, str]
+
+def pod_requests(spec: Dict[str, Any]) -> Dict[str, float]:
+    """Effective requests of a pod spec in base units, including one "pods" slot."""
+    totals: Dict[str, float] = {}
+    for container in spec.get("containers", []):
+        for resource, value in _container_requests(container).items():
+            totals[resource] = totals.get(resource, 0.0) + value
+    for container in spec.get("initContainers", []):
+        for resource, value in _container_requests(container).items():
+            totals[resource] = max(totals.get(resource, 0.0), value)
+    for resource, quantity in (spec.get("overhead") or {}).items():
+        totals[resource] = totals.get(resource, 0.0) + (try_parse_quantity(quantity) or 0.0)
+    totals["pods"] = 1.0
+    return totals
+
+def _container_requests(container: Dict[str, Any]) -> Dict[str, float]:
+    resources = container.get("resources") or {}
+    # The API server defaults a missing request to the limit
+    quantities = {**(resources.get("limits") or {}), **(resources.get("requests") or {})}
+    return {resource: try_parse_quantity(value) or 0.0 for resource, value in quantities.items()}
+
+def tolerates(tolerations: List[Dict[str, Any]], taint: Taint) -> bool:
+    """Whether any toleration matches the (key, value, effect) taint."""
+    key, value, effect = taint
+    for toleration in tolerations:
+        if toleration.get("effect") and toleration["effect"] != effect:
+            continue
+        if toleration.get("operator") == "Exists":
+            if not toleration.get("key") or toleration["key"] == key:
+                return True
+        elif toleration.get("key") == key and (toleration.get("value") or "") == value:
+            return True
+    return False
+
+class NodeCapacityIndex:
+    """Allocatable and requested resources of all nodes, with taint and label lookups."""
+
+    def __init__(self, nodes: List[Dict[str, Any]], pods: List[Dict[str, Any]]):
+        self.names: List[str] = [node["metadata"]["name"] for node in nodes]
+        self.positions = {name: index for index, name in enumerate(self.names)}
+        self.resources: List[str] = list(BASE_RESOURCES)
+        for node in nodes:
+            for resource in node.get("status", {}).get("allocatable", {}):
+                if resource not in self.resources:
+                    self.resources.append(resource)
+        self.columns = {resource: index for index, resource in enumerate(self.resources)}
+
+        count = len(self.names)
+        self.allocatable = np.zeros((count, len(self.resources)))
+        self.unschedulable = np.zeros(count, dtype=bool)
+        taint_sets: Dict[Tuple[Taint, ...], List[int]] = {}
+        labels: Dict[str, Dict[str, List[int]]] = {}
+        for index, node in enumerate(nodes):
+            for resource, quantity in node.get("status", {}).get("allocatable", {}).items():
+                self.allocatable[index, self.columns[resource]] = try_parse_quantity(quantity) or 0.0
+            spec = node.get("spec", {})
+            self.unschedulable[index] = bool(spec.get("unschedulable"))
+            taints = tuple(sorted(
+                (taint.get("key", ""), taint.get("value") or "", taint.get("effect", ""))
+                for taint in spec.get("taints") or []
+                if taint.get("effect") in BLOCKING_EFFECTS
+            ))
+            taint_sets.setdefault(taints, []).append(index)
+            for key, value in (node["metadata"].get("labels") or {}).items():
+                labels.setdefault(key, {}).setdefault(value, []).append(index)
+        self.taint_sets = {taints: np.array(rows, dtype=np.int64) for taints, rows in taint_sets.items()}
+        self.labels = {
+            key: {value: np.array(rows, dtype=np.int64) for value, rows in values.items()}
+            for key, values in labels.items()
+        }
+
+        # Requests of bound pods as (node, resource, value) triples, summed per node in one scatter-add
+        rows: List[int] = []
+        columns: List[int] = []
+        values: List[float] = []
+        self.pending: List[Dict[str, Any]] = []
+        self.bound_pods = 0
+        for pod in pods:
+            status = pod.get("status", {})
+            if status.get("phase") in ("Succeeded", "Failed"):
+                continue
+            spec = pod.get("spec", {})
+            node = spec.get("nodeName")
+            if not node:
+                if status.get("phase", "Pending") == "Pending":
+                    self.pending.append(pod)
+                continue
+            index = self.positions.get(node)
+            if index is None:
+                continue
+            self.bound_pods += 1
+            for resource, value in pod_requests(spec).items():
+                column = self.columns.get(resource)
+                if column is not None and value:
+                    rows.append(index)
+                    columns.append(column)
+                    values.append(value)
+        self.requested = np.zeros_like(self.allocatable)
+        np.add.at(self.requested, (np.array(rows, dtype=np.int64), np.array(columns, dtype=np.int64)), np.array(values))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def vector(self, requests: Dict[str, float]) -> np.ndarray:
+        """Requests as a row over the index's resources; resources no node offers are dropped."""
+        row = np.zeros(len(self.resources))
+        for resource, value in requests.items():
+            column = self.columns.get(resource)
+            if column is not None:
+                row[column] = value
+        return row
+
+    @property
+    def free(self) -> np.ndarray:
+        return self.allocatable - self.requested
+
+    def allocation(self) -> np.ndarray:
+        """Requested share of allocatable per node and resource; 0 where nothing is allocatable."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            share = self.requested / self.allocatable
+        share[self.allocatable == 0] = 0.0
+        return share
+
+    def evaluate(
+        self,
+        requests: Dict[str, float],
+        node_selector: Optional[Dict[str, str]] = None,
+        tolerations: Optional[List[Dict[str, Any]]] = None,
+        affinity: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Per-node masks of the first filter that rejects a pod, and of the nodes it fits."""
+        count = len(self.names)
+        tolerations = tolerations or []
+        unschedulable = self.unschedulable.copy()
+        if tolerates(tolerations, (UNSCHEDULABLE_TAINT, "", "NoSchedule")):
+            unschedulable[:] = False
+
+        untolerated = np.zeros(count, dtype=bool)
+        taint_reasons: Dict[Taint, np.ndarray] = {}
+        for taints, rows in self.taint_sets.items():
+            taint = next((t for t in taints if t[0] != UNSCHEDULABLE_TAINT and not tolerates(tolerations, t)), None)
+            if taint is not None:
+                untolerated[rows] = True
+                taint_reasons[taint] = np.concatenate([taint_reasons[taint], rows]) if taint in taint_reasons else rows
+        untolerated &= ~unschedulable
+
+        mismatched = ~self._selector_mask(node_selector, affinity) & ~unschedulable & ~untolerated
+        candidates = ~(unschedulable | untolerated | mismatched)
+
+        wanted = self.vector(requests)
+        missing = [resource for resource, value in requests.items() if value > 0 and resource not in self.columns]
+        columns = np.nonzero(wanted > 0)[0]
+        short = self.free[:, columns] < wanted[columns]
+        fits = candidates & ~short.any(axis=1)
+        if missing:
+            fits[:] = False
+        return {
+            "fits": fits,
+            "unschedulable": unschedulable,
+            "untolerated": untolerated,
+            "taints": taint_reasons,
+            "mismatched": mismatched,
+            "insufficient": {
+                self.resources[column]: short[:, position] & candidates
+                for position, column in enumerate(columns)
+            },
+            "missing": {resource: candidates.copy() for resource in missing}
+        }
+
+    def fit(
+        self,
+        requests: Dict[str, float],
+        node_selector: Optional[Dict[str, str]] = None,
+        tolerations: Optional[List[Dict[str, Any]]] = None,
+        affinity: Optional[Dict[str, Any]] = None,
+        limit: int = 10
+    ) -> Dict[str, Any]:
+        """Nodes a pod fits on, least allocated first, and why the others reject it."""
+        result = self.evaluate(requests, node_selector, tolerations, affinity)
+        rows = np.nonzero(result["fits"])[0]
+        wanted = self.vector(requests)
+        remaining = self.free[rows] - wanted
+        cpu, memory = self.columns["cpu"], self.columns["memory"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # The scheduler's LeastAllocated score: mean free share of CPU and memory after placement
+            score = np.nan_to_num(remaining[:, [cpu, memory]] / self.allocatable[rows][:, [cpu, memory]]).mean(axis=1)
+        order = np.argsort(-score, kind="stable")[:limit]
+        return {
+            "nodes": len(self.names),
+            "fitting_nodes": int(len(rows)),
+            "best_nodes": [
+                {
+                    "node": self.names[rows[i]],
+                    "free_cpu_after": format_quantity(remaining[i, cpu], "cpu"),
+                    "free_memory_after": format_quantity(remaining[i, memory], "memory")
+                }
+                for i in order
+            ],
+            "message": self.message(result)
+        }
+
+    def explain(self, pod: Dict[str, Any]) -> Dict[str, Any]:
+        """Why a pod does or does not fit, from its spec."""
+        spec = pod.get("spec", {})
+        requests = pod_requests(spec)
+        result = self.evaluate(requests, spec.get("nodeSelector"), spec.get("tolerations"), spec.get("affinity"))
+        return {
+            "pod": f"{pod['metadata'].get('namespace', 'default')}/{pod['metadata']['name']}",
+            "requests": {
+                resource: format_quantity(value, resource)
+                for resource, value in requests.items() if value and resource != "pods"
+            },
+            "fitting_nodes": int(result["fits"].sum()),
+            "message": self.message(result)
+        }
+
+    def message(self, result: Dict[str, Any]) -> str:
+        """The scheduler's summary: "0/N nodes are available: 3 Insufficient cpu, ..."."""
+        reasons: List[Tuple[int, str]] = []
+        if result["unschedulable"].any():
+            reasons.append((int(result["unschedulable"].sum()), "node(s) were unschedulable"))
+        for (key, value, _), rows in result["taints"].items():
+            blocked = int(result["untolerated"][rows].sum())
+            if blocked:
+                reasons.append((blocked, f"node(s) had untolerated taint {{{key}: {value}}}"))
+        if result["mismatched"].any():
+            reasons.append((int(result["mismatched"].sum()), "node(s) didn't match Pod's node affinity/selector"))
+        for resource, mask in {**result["insufficient"], **result["missing"]}.items():
+            if mask.any():
+                label = "Too many pods" if resource == "pods" else f"Insufficient {resource}"
+                reasons.append((int(mask.sum()), label))
+        reasons.sort(key=lambda item: (-item[0], item[1]))
+        available = int(result["fits"].sum())
+        summary = f"{available}/{len(self.names)} nodes are available"
+        if not reasons:
+            return summary
+        return f"{summary}: " + ", ".join(f"{count} {reason}" for count, reason in reasons)
+
+    def summary(self, limit: int = 10, threshold: float = HIGH_ALLOCATION) -> Dict[str, Any]:
+        """Cluster-wide requested share, the most allocated nodes and how many exceed the threshold."""
+        share = self.allocation()
+        cpu, memory, pods = self.columns["cpu"], self.columns["memory"], self.columns["pods"]
+        totals = self.allocatable.sum(axis=0)
+        requested = self.requested.sum(axis=0)
+        free = self.free
+        peak = share[:, [cpu, memory, pods]].max(axis=1)
+        order = np.argsort(-peak, kind="stable")[:limit]
+        return {
+            "nodes": len(self.names),
+            "unschedulable_nodes": int(self.unschedulable.sum()),
+            "bound_pods": self.bound_pods,
+            "pending_pods": len(self.pending),
+            "cpu_requested_percent": _percent(requested[cpu], totals[cpu]),
+            "memory_requested_percent": _percent(requested[memory], totals[memory]),
+            "high_cpu_nodes": int((share[:, cpu] > threshold).sum()),
+            "high_memory_nodes": int((share[:, memory] > threshold).sum()),
+            "most_allocated": [
+                {
+                    "node": self.names[i],
+                    "cpu_requested_percent": round(float(share[i, cpu]) * 100, 1),
+                    "memory_requested_percent": round(float(share[i, memory]) * 100, 1),
+                    "pods_percent": round(float(share[i, pods]) * 100, 1),
+                    "free_cpu": format_quantity(free[i, cpu], "cpu"),
+                    "free_memory": format_quantity(free[i, memory], "memory")
+                }
+                for i in order
+            ]
+        }
+
+    def _selector_mask(self, node_selector: Optional[Dict[str, str]], affinity: Optional[Dict[str, Any]]) -> np.ndarray:
+        count = len(self.names)
+        mask = np.ones(count, dtype=bool)
+        for key, value in (node_selector or {}).items():
+            mask &= self._rows_mask(self.labels.get(key, {}).get(value))
+        required = ((affinity or {}).get("nodeAffinity") or {}).get("requiredDuringSchedulingIgnoredDuringExecution")
+        terms = (required or {}).get("nodeSelectorTerms") or []
+        if terms:
+            # Terms are ORed, expressions within a term ANDed
+            matched = np.zeros(count, dtype=bool)
+            for term in terms:
+                term_mask = np.ones(count, dtype=bool)
+                for expression in term.get("matchExpressions") or []:
+                    term_mask &= self._expression_mask(expression, self.labels.get(expression.get("key", ""), {}))
+                for expression in term.get("matchFields") or []:
+                    if expression.get("key") == "metadata.name":
+                        names = {name: np.array([i]) for name, i in self.positions.items()}
+                        term_mask &= self._expression_mask(expression, names)
+                matched |= term_mask
+            mask &= matched
+        return mask
+
+    def _expression_mask(self, expression: Dict[str, Any], values: Dict[str, np.ndarray]) -> np.ndarray:
+        operator = expression.get("operator")
+        wanted = expression.get("values") or []
+        if operator in ("In", "NotIn"):
+            mask = self._rows_mask(*(values.get(value) for value in wanted))
+            return mask if operator == "In" else ~mask
+        if operator in ("Exists", "DoesNotExist"):
+            mask = self._rows_mask(*values.values())
+            return mask if operator == "Exists" else ~mask
+        if operator in ("Gt", "Lt") and wanted:
+            bound = int(wanted[0])
+            matching = [
+                rows for value, rows in values.items()
+                if value.lstrip("-").isdigit() and (int(value) > bound if operator == "Gt" else int(value) < bound)
+            ]
+            return self._rows_mask(*matching)
+        return np.zeros(len(self.names), dtype=bool)
+
+    def _rows_mask(self, *groups: Optional[np.ndarray]) -> np.ndarray:
+        mask = np.zeros(len(self.names), dtype=bool)
+        for rows in groups:
+            if rows is not None:
+                mask[rows] = True
+        return mask
+
+def parse_requests(
+    cpu: Optional[str] = None, memory: Optional[str] = None, extended: Optional[Dict[str, str]] = None
+) -> Dict[str, float]:
+    """Requests from quantity strings, with the "pods" slot pod_requests adds."""
+    requests = {"cpu": try_parse_quantity(cpu, 0.0), "memory": try_parse_quantity(memory, 0.0), "pods": 1.0}
+    for resource, quantity in (extended or {}).items():
+        requests[resource] = try_parse_quantity(quantity, 0.0)
+    return requests
+
+def _percent(part: float, whole: float) -> float:
+    return round(float(part / whole) * 100, 1) if whole else 0.0
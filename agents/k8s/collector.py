@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Background sampling of control-plane signals.
+
+A daemon thread runs the control-plane, etcd and API server checks every
+interval at background priority, keeps the latest result of each, and
+records numeric signals in ring-buffer time series. The agent's tools
+answer from the latest sample while it is fresh and add the trends seen
+over the trend window, e.g. a p99 that has been rising for 15 minutes.
+"""
+from typing import Dict, Any, Optional, List, Callable, TYPE_CHECKING
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import os
+import threading
+import time
+
+from ..common.concurrency import Priority, priority
+from ..common.timeseries import TimeSeriesStore, histogram_quantile
+
+if TYPE_CHECKING:
+    from .agent import K8sControlPlaneAgent
+
+# Period over which trends are reported
+TREND_WINDOW = float(os.getenv("CONTROL_PLANE_TREND_WINDOW", "900"))
+# Memory budget for all series together
+SERIES_MAX_BYTES = int(os.getenv("CONTROL_PLANE_SERIES_MAX_BYTES", str(8 * 1024 * 1024)))
+# Samples kept per series: 6h at the default 30s interval
+SERIES_CAPACITY = int(os.getenv("CONTROL_PLANE_SERIES_CAPACITY", "720"))
+
+# Tools fall back to live collection once the latest sample is this many intervals old
+MAX_SAMPLE_AGE_INTERVALS = 3
+MAX_REPORTED_TRENDS = 10
+
+# Series recorded for each sampled signal
+SERIES_PREFIXES = {
+    "control_plane_status": "control_plane.",
+    "etcd_health": "etcd.",
+    "api_server_metrics": "apiserver.",
+}
+
+@dataclass
+class Sample:
+    """The latest result of one sampled tool."""
+    result: Dict[str, Any]
+    timestamp: float
+    duration: float
+
+class ControlPlaneCollector:
+    """Periodically samples the agent's checks into time series."""
+
+    def __init__(
+        self,
+        agent: "K8sControlPlaneAgent",
+        interval: float = 30.0,
+        store: Optional[TimeSeriesStore] = None,
+        trend_window: float = TREND_WINDOW
+    ):
+        self.agent = agent
+        self.interval = interval
+        self.trend_window = trend_window
+        self.store = store or TimeSeriesStore(SERIES_CAPACITY, SERIES_MAX_BYTES)
+        self.samples_taken = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self._signals: Dict[str, Callable[[float], Dict[str, Any]]] = {
+            "control_plane_status": self._sample_control_plane,
+            "etcd_health": self._sample_etcd,
+            "api_server_metrics": self._sample_api_server,
+        }
+        self._latest: Dict[str, Sample] = {}
+        # Previous cumulative counters, to turn them into per-interval values
+        self._previous_buckets: Dict[str, Dict[float, float]] = {}
+        self._previous_errors: Dict[str, float] = {}
+        self._previous_time: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "ControlPlaneCollector":
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="control-plane-collector", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def collect_once(self, now: Optional[float] = None) -> None:
+        """Take one sample of every signal."""
+        now = time.time() if now is None else now
+        with priority(Priority.BACKGROUND):
+            for name, sample in self._signals.items():
+                started = time.monotonic()
+                try:
+                    result = sample(now)
+                except Exception as e:
+                    # Keep sampling the other signals; the tool falls back to a live call
+                    self.errors += 1
+                    self.last_error = f"{name}: {e}"
+                    continue
+                self._latest[name] = Sample(result, now, time.monotonic() - started)
+        self._previous_time = now
+        self.samples_taken += 1
+
+    def latest(self, name: str, max_age: Optional[float] = None) -> Optional[Sample]:
+        sample = self._latest.get(name)
+        if sample is None:
+            return None
+        if max_age is None:
+            max_age = self.interval * MAX_SAMPLE_AGE_INTERVALS
+        return sample if time.time() - sample.timestamp <= max_age else None
+
+    def trends(self, name: str, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Rising or falling series of a signal over the trend window, largest change first."""
+        now = time.time() if now is None else now
+        minutes = self.trend_window / 60
+        found = []
+        for series in self.store.names(SERIES_PREFIXES[name]):
+            trend = self.store.trend(series, now - self.trend_window)
+            if trend is None or trend["direction"] == "flat":
+                continue
+            trend["series"] = series
+            trend["summary"] = (
+                f"{series} {trend['direction']} over the last {minutes:.0f}m "
+                f"({trend['first']:.4g} -> {trend['last']:.4g}, {trend['relative_change']:+.0%})"
+            )
+            found.append(trend)
+        found.sort(key=lambda trend: abs(trend["relative_change"]), reverse=True)
+        return found[:MAX_REPORTED_TRENDS]
+
+    def answer(self, name: str) -> Optional[Dict[str, Any]]:
+        """A tool result from the latest fresh sample, with trends; None if there is none."""
+        sample = self.latest(name)
+        if sample is None:
+            return None
+        return {
+            **sample.result,
+            "sampled_at": datetime.fromtimestamp(sample.timestamp, timezone.utc).isoformat(),
+            "sample_age_seconds": round(time.time() - sample.timestamp, 1),
+            "trends": self.trends(name)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "samples_taken": self.samples_taken,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "series": self.store.stats()
+        }
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self.collect_once()
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def _sample_control_plane(self, now: float) -> Dict[str, Any]:
+        status = self.agent.collect_control_plane_status()
+        for component, info in status.items():
+            if info.get("status") == "error":
+                continue
+            for field in ("ready", "not_ready", "restarts"):
+                self.store.append(f"control_plane.{component}.{field}", now, info.get(field, 0))
+        return status
+
+    def _sample_etcd(self, now: float) -> Dict[str, Any]:
+        health = self.agent.collect_etcd_health()
+        for field in ("healthy_endpoints", "unhealthy_endpoints"):
+            self.store.append(f"etcd.{field}", now, health.get(field, 0))
+        self.store.append("etcd.issues", now, len(health.get("issues", [])))
+        return health
+
+    def _sample_api_server(self, now: float) -> Dict[str, Any]:
+        metrics, buckets = self.agent.scrape_api_server_metrics(keep_raw=False)
+        # Latency quantiles over the last interval, from bucket count deltas
+        for key, counts in buckets.items():
+            previous = self._previous_buckets.get(key)
+            if previous is not None:
+                delta = {bound: count - previous.get(bound, 0.0) for bound, count in counts.items()}
+                p99 = histogram_quantile(0.99, delta)
+                if p99 is not None:
+                    self.store.append(f"apiserver.latency_p99.{key}", now, p99)
+        self._previous_buckets = buckets
+
+        elapsed = now - self._previous_time if self._previous_time is not None else None
+        for key, total in metrics.get("errors", {}).items():
+            previous = self._previous_errors.get(key)
+            # Counter resets (API server restarts) show up as a negative delta
+            if previous is not None and elapsed and total >= previous:
+                self.store.append(f"apiserver.errors_per_second.{key}", now, (total - previous) / elapsed)
+        self._previous_errors = dict(metrics.get("errors", {}))
+        return metrics
@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 from typing import Dict, Any, Optional, List
 from dataclasses import dataclass
-import requests
-from langchain_core.tools import tool
+
+from ..common import result_store as results
+from ..common.kubectl import KubectlClient
+from ..common.lazy import lazy_attributes, lazy_tool
+from .events import EventIndex
 
 @dataclass
 class ResourceRequest:
@@ -18,24 +21,14 @@ class K8sControlAgent:
     
     def __init__(self, api_url: str = "http://localhost:8000"):
         self.api_url = api_url
+        self.kubectl = KubectlClient(api_url)
+        self.events = EventIndex()
 
     def execute_kubectl(self, command: str, namespace: Optional[str] = None) -> Dict[str, Any]:
         """Execute a kubectl command through the API."""
-        try:
-            response = requests.post(
-                f"{self.api_url}/execute",
-                json={
-                    "command": command,
-                    "namespace": namespace
-                },
-                timeout=30
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            return {"error": str(e)}
+        return self.kubectl.execute(command, namespace)
 
-    @tool("get_resource_status")
+    @lazy_tool("get_resource_status")
     def get_resource_status(self, request: ResourceRequest) -> str:
         """Get status of Kubernetes resources matching the request."""
         cmd_parts = ["get", request.resource_type]
@@ -53,7 +46,7 @@ class K8sControlAgent:
         result = self.execute_kubectl(command, request.namespace)
         return result.get("output", "") or result.get("error", f"Failed to get {request.resource_type}")
 
-    @tool("describe_resource")
+    @lazy_tool("describe_resource")
     def describe_resource(self, request: ResourceRequest) -> str:
         """Get detailed information about a specific Kubernetes resource."""
         if not request.name:
@@ -61,9 +54,11 @@ class K8sControlAgent:
         
         command = f"describe {request.resource_type} {request.name}"
         result = self.execute_kubectl(command, request.namespace)
-        return result.get("output", "") or result.get("error", f"Failed to describe {request.resource_type}")
+        if result.get("output"):
+            return results.compact_output(result["output"], f"describe {request.resource_type}/{request.name}")
+        return result.get("error", f"Failed to describe {request.resource_type}")
 
-    @tool("get_resource_metrics")
+    @lazy_tool("get_resource_metrics")
     def get_resource_metrics(self, request: ResourceRequest) -> str:
         """Get metrics for the specified resource."""
         if request.resource_type not in ["nodes", "pods"]:
@@ -76,7 +71,7 @@ class K8sControlAgent:
         result = self.execute_kubectl(command, request.namespace)
         return result.get("output", "") or result.get("error", f"Failed to get metrics for {request.resource_type}")
 
-    @tool("get_resource_logs")
+    @lazy_tool("get_resource_logs")
     def get_resource_logs(self, request: ResourceRequest) -> str:
         """Get logs from a pod or deployment."""
         if not request.name:
@@ -87,9 +82,11 @@ class K8sControlAgent:
         
         command = f"logs {request.name}"
         result = self.execute_kubectl(command, request.namespace)
-        return result.get("output", "") or result.get("error", f"Failed to get logs for {request.name}")
+        if result.get("output"):
+            return results.compact_output(result["output"], f"logs {request.name}")
+        return result.get("error", f"Failed to get logs for {request.name}")
 
-    @tool("check_resource_health")
+    @lazy_tool("check_resource_health")
     def check_resource_health(self, request: ResourceRequest) -> Dict[str, Any]:
         """Comprehensive health check for a Kubernetes resource."""
         health_info = {
@@ -116,22 +113,27 @@ class K8sControlAgent:
             if "error" not in metrics_result:
                 health_info["details"]["metrics"] = metrics_result
         
-        # Get recent events
-        events_cmd = f"get events --field-selector involvedObject.name={request.name}"
-        events_result = self.execute_kubectl(events_cmd, request.namespace)
-        if "error" not in events_result:
-            health_info["events"] = events_result.get("output", "").split("\n")
+        # Get recent events, from one listing per namespace compacted by reason and message template
+        if request.name and self.events.refresh(self.execute_kubectl, request.namespace) is None:
+            health_info["events"] = self.events.query(request.name, request.namespace)
+            for event in health_info["events"]:
+                if event["type"] == "Warning":
+                    health_info["warnings"].append(
+                        f"{event['reason']} x{event['count']} since {event['first_seen']}: {event['message']}"
+                    )
         
         return health_info
 
-# Create the agent instance
-k8s_control_agent = K8sControlAgent()
-
-# List of available tools
-k8s_control_tools = [
-    k8s_control_agent.get_resource_status,
-    k8s_control_agent.describe_resource,
-    k8s_control_agent.get_resource_metrics,
-    k8s_control_agent.get_resource_logs,
-    k8s_control_agent.check_resource_health
-] 
\ No newline at end of file
+# Agent instance and tool list are built on first use
+__getattr__ = lazy_attributes(
+    __name__,
+    k8s_control_agent=lambda module: K8sControlAgent(),
+    k8s_control_tools=lambda module: [
+        module.k8s_control_agent.get_resource_status,
+        module.k8s_control_agent.describe_resource,
+        module.k8s_control_agent.get_resource_metrics,
+        module.k8s_control_agent.get_resource_logs,
+        module.k8s_control_agent.check_resource_health,
+        *results.result_tools
+    ]
+)
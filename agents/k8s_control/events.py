@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""Kubernetes events compacted by object, reason and message template.
+
+Events are ingested in bulk, one `get events -o json` per namespace (or
+all namespaces), or one watch notification at a time. The API server keeps
+re-listing the same Event objects with a growing count, so each Event's
+last count is remembered by uid and only the increase is added. Occurrences
+are grouped by (involved object, reason, message template), where the
+template is the message with pod suffixes, IPs, IDs and numbers replaced by
+placeholders. A crash-looping pod's thousands of BackOff and Unhealthy events
+become a couple of groups, each with a count, first/last seen times and the
+latest message.
+
+Memory is bounded: at most max_groups groups are kept, least recently seen
+first out, and groups not seen for max_age seconds are dropped. Health
+checks query the index per object instead of listing events per resource.
+"""
+from typing import Dict, Any, Optional, List, Callable, Iterable, Set, Tuple
+from collections import OrderedDict
+import os
+import threading
+import time
+
+from ..events.model import format_time, object_key, parse_time
+from ..tracing.model import normalize_error_message
+
+# Event groups kept across all objects
+EVENT_INDEX_MAX_GROUPS = int(os.getenv("EVENT_INDEX_MAX_GROUPS", "20000"))
+# Seconds a namespace's listing is reused before events are listed again
+EVENT_INDEX_TTL = float(os.getenv("EVENT_INDEX_TTL", "15"))
+# Groups not seen for this many seconds are dropped; the API server keeps events for an hour by default
+EVENT_INDEX_MAX_AGE = float(os.getenv("EVENT_INDEX_MAX_AGE", "3600"))
+ALL_NAMESPACES = "*"
+
+GroupKey = Tuple[str, str, str]
+
+class EventGroup:
+    """Occurrences of one reason and message template on one object."""
+    __slots__ = ("kind", "namespace", "name", "reason", "type", "template", "message", "count", "first_seen", "last_seen")
+
+    def __init__(self, kind: str, namespace: str, name: str, reason: str, event_type: str, template: str):
+        self.kind = kind
+        self.namespace = namespace
+        self.name = name
+        self.reason = reason
+        self.type = event_type
+        self.template = template
+        self.message = ""
+        self.count = 0
+        self.first_seen = 0.0
+        self.last_seen = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "object": f"{self.kind}/{self.name}",
+            "namespace": self.namespace,
+            "type": self.type,
+            "reason": self.reason,
+            "count": self.count,
+            "first_seen": format_time(self.first_seen),
+            "last_seen": format_time(self.last_seen),
+            "message": self.message
+        }
+
+class EventIndex:
+    """Deduplicated events of a cluster, queried per object."""
+
+    def __init__(self, max_groups: int = EVENT_INDEX_MAX_GROUPS, max_age: float = EVENT_INDEX_MAX_AGE):
+        self.max_groups = max_groups
+        self.max_age = max_age
+        self.ingested = 0
+        self.evicted = 0
+        # Least recently seen first
+        self._groups: "OrderedDict[GroupKey, EventGroup]" = OrderedDict()
+        # Involved object name -> its groups
+        self._by_name: Dict[str, Set[GroupKey]] = {}
+        # Event uid -> (count already added, namespace, group)
+        self._counts: Dict[str, Tuple[int, str, Optional[GroupKey]]] = {}
+        self._listed: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def refresh(
+        self,
+        execute: Callable[[str, Optional[str]], Dict[str, Any]],
+        namespace: Optional[str] = None,
+        max_age: float = EVENT_INDEX_TTL
+    ) -> Optional[str]:
+        """List the namespace's events (all namespaces for None) unless listed within max_age; returns an error."""
+        scope = namespace or ALL_NAMESPACES
+        now = time.monotonic()
+        # A recent listing of all namespaces covers every namespace
+        if any(now - self._listed.get(key, -max_age) < max_age for key in (scope, ALL_NAMESPACES)):
+            return None
+        result = execute("get events -o json" if namespace else "get events -A -o json", namespace)
+        if "error" in result:
+            return result["error"]
+        self.ingest(result.get("items", []), scope)
+        self._listed[scope] = now
+        return None
+
+    def ingest(self, items: Iterable[Dict[str, Any]], scope: Optional[str] = None) -> int:
+        """Add Event objects or watch notifications ({"type", "object"}); returns the new occurrences.
+
+        With scope set, items are a complete listing of that scope and uids
+        missing from it, which expired on the API server, are forgotten.
+        """
+        added = 0
+        listed: Set[str] = set()
+        with self._lock:
+            for item in items:
+                if "object" in item and "involvedObject" not in item:
+                    if item.get("type") == "DELETED":
+                        # Expired on the API server; its occurrences stay counted
+                        self._counts.pop(item["object"].get("metadata", {}).get("uid"), None)
+                        continue
+                    item = item["object"]
+                added += self._add(item, listed)
+            if scope:
+                expired = [
+                    uid for uid, (_, namespace, _) in self._counts.items()
+                    if uid not in listed and scope in (ALL_NAMESPACES, namespace)
+                ]
+                for uid in expired:
+                    del self._counts[uid]
+            self._expire()
+        self.ingested += added
+        return added
+
+    def query(
+        self,
+        name: str,
+        namespace: Optional[str] = None,
+        kind: Optional[str] = None,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """Event groups of an object, warnings first, then most recently seen."""
+        with self._lock:
+            groups = [
+                self._groups[key] for key in self._by_name.get(name, ())
+                # Cluster-scoped objects such as nodes have no namespace
+                if (not namespace or self._groups[key].namespace in (namespace, ""))
+                and (not kind or self._groups[key].kind.lower() == kind.lower())
+            ]
+        groups.sort(key=lambda group: (group.type == "Warning", group.last_seen), reverse=True)
+        return [group.to_dict() for group in groups[:limit]]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "groups": len(self._groups),
+            "objects": len({key[0] for key in self._groups}),
+            "occurrences": self.ingested,
+            "evicted": self.evicted,
+            "listed_scopes": sorted(self._listed)
+        }
+
+    def _add(self, item: Dict[str, Any], listed: Set[str]) -> int:
+        metadata = item.get("metadata", {})
+        uid = metadata.get("uid") or f"{metadata.get('namespace')}/{metadata.get('name')}"
+        count = item.get("count") or (item.get("series") or {}).get("count") or 1
+        listed.add(uid)
+        previous, _, key = self._counts.get(uid, (0, "", None))
+        new = count - previous
+        if new <= 0:
+            return 0
+
+        last_seen = (
+            parse_time(item.get("lastTimestamp")) or parse_time((item.get("series") or {}).get("lastObservedTime"))
+            or parse_time(item.get("eventTime")) or parse_time(metadata.get("creationTimestamp")) or time.time()
+        )
+        message = item.get("message") or item.get("note") or ""
+        # An Event's object, reason and message never change, so a re-listed Event reuses its group
+        group = self._groups.get(key) if key is not None else None
+        if group is None:
+            involved = item.get("involvedObject") or item.get("regarding") or {}
+            kind = involved.get("kind", "")
+            namespace = involved.get("namespace") or metadata.get("namespace") or ""
+            name = involved.get("name", "")
+            reason = item.get("reason", "")
+            key = (object_key(namespace, kind, name), reason, normalize_error_message(message))
+            group = self._groups.get(key)
+            if group is None:
+                group = self._groups[key] = EventGroup(kind, namespace, name, reason, item.get("type", ""), key[2])
+                self._by_name.setdefault(name, set()).add(key)
+                if len(self._groups) > self.max_groups:
+                    self._evict(next(iter(self._groups)))
+        self._counts[uid] = (count, metadata.get("namespace") or "", key)
+        if not previous:
+            first_seen = parse_time(item.get("firstTimestamp")) or last_seen
+            group.first_seen = min(group.first_seen, first_seen) if group.count else first_seen
+        group.count += new
+        if last_seen >= group.last_seen:
+            group.last_seen = last_seen
+            group.message = message
+            group.type = item.get("type", group.type)
+        self._groups.move_to_end(key)
+        return new
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.max_age
+        # Roughly ordered by last seen, so expired groups are at the front
+        while self._groups:
+            key, group = next(iter(self._groups.items()))
+            if group.last_seen >= cutoff:
+                break
+            self._evict(key)
+
+    def _evict(self, key: GroupKey) -> None:
+        name = self._groups.pop(key).name
+        keys = self._by_name.get(name)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_name[name]
+        self.evicted += 1
@@ -0,0 +1 @@
+"""Training label corpus: normalization, storage and indexing."""
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+from typing import Dict, Any, Optional, List, Iterator
+from dataclasses import dataclass, field
+import hashlib
+import json
+import os
+
+# Repository training data; override with TRAINING_DATA_DIR
+DEFAULT_LABEL_ROOT = os.getenv(
+    "TRAINING_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "training-data")
+)
+
+# Top-level keys that carry the label ID of incident-style labels
+INCIDENT_ID_KEYS = ("incident_id", "deployment_incident", "dependency_incident", "mesh_observation")
+
+# Label shapes found in training-data
+SHAPE_BASIC_QA = "basic_qa"
+SHAPE_OBSERVATION = "observation"
+SHAPE_INCIDENT = "incident"
+SHAPE_RESOURCE = "resource"
+
+@dataclass
+class LabelRecord:
+    """A training label normalized to the fields shared by every shape."""
+    label_id: str
+    path: str
+    category: str
+    shape: str
+    label_type: str
+    question: str
+    answer: str = ""
+    root_cause: str = ""
+    resolution: str = ""
+    component: Optional[str] = None
+    namespace: Optional[str] = None
+    severity: Optional[str] = None
+    timestamp: Optional[str] = None
+    k8s_version: Optional[str] = None
+    tags: List[str] = field(default_factory=list)
+    data: Dict[str, Any] = field(default_factory=dict)
+
+    def text(self) -> str:
+        """Searchable text of the label."""
+        return "\n".join(part for part in (
+            self.question, self.answer, self.root_cause, self.resolution, " ".join(self.tags)
+        ) if part)
+
+def content_hash(content: bytes) -> str:
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+def iter_label_files(root: str = DEFAULT_LABEL_ROOT) -> Iterator[str]:
+    """Yield label file paths under root in a stable order."""
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories.sort()
+        for name in sorted(files):
+            if name.endswith(".json"):
+                yield os.path.join(directory, name)
+
+def label_shape(data: Dict[str, Any]) -> str:
+    """Classify the top-level layout of a label document."""
+    if data.get("kind") == "Label":
+        return SHAPE_RESOURCE
+    if "perf_observation" in data:
+        return SHAPE_OBSERVATION
+    if any(key in data for key in INCIDENT_ID_KEYS):
+        return SHAPE_INCIDENT
+    if "question" in data and "answer" in data:
+        return SHAPE_BASIC_QA
+    raise ValueError(f"Unrecognized label layout with keys {sorted(data)[:8]}")
+
+def load_label(path: str, root: str = DEFAULT_LABEL_ROOT, content: Optional[bytes] = None) -> LabelRecord:
+    """Read and normalize one label file."""
+    if content is None:
+        with open(path, "rb") as f:
+            content = f.read()
+    return normalize_label(json.loads(content), os.path.relpath(path, root))
+
+def normalize_label(data: Dict[str, Any], relative_path: str) -> LabelRecord:
+    """Map any supported label shape onto a LabelRecord."""
+    relative_path = relative_path.replace(os.sep, "/")
+    category = relative_path.split("/", 1)[0] if "/" in relative_path else "uncategorized"
+    fallback_id = os.path.splitext(relative_path)[0].replace("/", "-")
+    shape = label_shape(data)
+    metadata = data.get("metadata") or {}
+
+    if shape == SHAPE_RESOURCE:
+        spec = data.get("spec") or {}
+        labels = metadata.get("labels") or {}
+        issue = spec.get("issue") or {}
+        return LabelRecord(
+            label_id=metadata.get("name") or fallback_id,
+            path=relative_path,
+            category=category,
+            shape=shape,
+            label_type=labels.get("type") or category,
+            question=issue.get("title", ""),
+            answer=issue.get("description", ""),
+            root_cause=flatten_text((spec.get("diagnosis") or {}).get("root_causes")),
+            resolution=flatten_text(spec.get("remediation")),
+            component=labels.get("component"),
+            namespace=metadata.get("namespace"),
+            severity=labels.get("severity"),
+            timestamp=normalize_timestamp((spec.get("metadata") or {}).get("creation_date")),
+            tags=[value for key, value in sorted(labels.items()) if key not in ("type", "severity")],
+            data=data
+        )
+
+    if shape == SHAPE_BASIC_QA:
+        answer = data.get("answer") or {}
+        return LabelRecord(
+            label_id=fallback_id,
+            path=relative_path,
+            category=category,
+            shape=shape,
+            label_type=data.get("category") or category,
+            question=data.get("question", ""),
+            answer=flatten_text(answer) if isinstance(answer, dict) else str(answer),
+            component=data.get("category"),
+            tags=[data["difficulty_level"]] if data.get("difficulty_level") else [],
+            data=data
+        )
+
+    analysis = data.get("analysis") or {}
+    resolution = data.get("resolution") or analysis.get("resolution") or {}
+    if shape == SHAPE_OBSERVATION:
+        label_id = data["perf_observation"]
+        context = data.get("context") or {}
+        question = data.get("question") or context.get("issue") or context.get("detection") or ""
+    else:
+        label_id = next(data[key] for key in INCIDENT_ID_KEYS if key in data)
+        context = next((value for key, value in data.items() if key.endswith("_context")), None) or {}
+        question = data.get("question", "")
+
+    root_cause = analysis.get("root_cause")
+    if root_cause is None and isinstance(resolution, dict):
+        root_cause = resolution.get("root_cause")
+    environment = data.get("environment") or {}
+    return LabelRecord(
+        label_id=label_id or fallback_id,
+        path=relative_path,
+        category=category,
+        shape=shape,
+        label_type=metadata.get("label_type") or category,
+        question=question,
+        answer=flatten_text(analysis.get("impact") or analysis.get("evidence")),
+        root_cause=flatten_text(root_cause),
+        resolution=flatten_text(resolution),
+        component=metadata.get("component_type") or context.get("service") or context.get("operator"),
+        namespace=context.get("namespace") or metadata.get("namespace") or _first_namespace(context),
+        severity=metadata.get("severity"),
+        timestamp=normalize_timestamp(data.get("timestamp") or context.get("timestamp") or metadata.get("timestamp")),
+        k8s_version=environment.get("k8s_version") or context.get("k8s_version"),
+        tags=list(metadata.get("tags") or []),
+        data=data
+    )
+
+def flatten_text(value: Any) -> str:
+    """Join the string leaves of a nested JSON value into one text block."""
+    if value is None:
+        return ""
+    parts: List[str] = []
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            parts.append(item)
+        elif isinstance(item, dict):
+            stack.extend(reversed(list(item.values())))
+        elif isinstance(item, (list, tuple)):
+            stack.extend(reversed(item))
+    return "\n".join(parts)
+
+def normalize_timestamp(value: Optional[str]) -> Optional[str]:
+    """Return an ISO-8601 UTC timestamp that sorts lexically, or None."""
+    if not value:
+        return None
+    value = str(value)
+    if len(value) == 10:
+        # Dates without a time, e.g. creation_date in resource labels
+        return f"{value}T00:00:00Z"
+    if value.endswith("+00:00"):
+        return value[:-6] + "Z"
+    return value
+
+def _first_namespace(context: Dict[str, Any]) -> Optional[str]:
+    for component in context.get("components") or ():
+        if isinstance(component, dict) and component.get("namespace"):
+            return component["namespace"]
+    return None
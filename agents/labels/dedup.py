@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""Find near-duplicate labels with MinHash signatures and LSH banding.
+
+Each label's question, root cause and resolution text is shingled into
+word n-grams and summarized by a MinHash signature. Signatures are split
+into bands; labels sharing any band bucket become candidate pairs, which
+are confirmed by their estimated Jaccard similarity and grouped into
+clusters. Cost is roughly linear in the number of labels.
+
+--keep-best picks one label per cluster to keep and marks the others to
+drop; labels are not merged, the kept one is left as it is.
+
+Usage:
+    python -m agents.labels.dedup [--root training-data] [--threshold 0.8] [--json]
+    python -m agents.labels.dedup --keep-best [--move-to DIR]
+"""
+from typing import Dict, Optional, List, Tuple, Iterable
+from dataclasses import dataclass, field
+import argparse
+import json
+import os
+import re
+import shutil
+import zlib
+import numpy as np
+
+from .corpus import DEFAULT_LABEL_ROOT, LabelRecord, iter_label_files, load_label
+from .validation import validate_label
+
+# Modulus of the universal hash family; signatures keep its low 32 bits
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+# Each bucket member is compared with up to this many members before it,
+# which keeps huge buckets (e.g. of empty texts) from going quadratic
+MAX_BUCKET_WINDOW = 64
+
+@dataclass
+class DuplicateCluster:
+    """Labels that are near-duplicates of each other."""
+    members: List[str]
+    similarity: float
+    keep: Optional[str] = None
+    drop: List[str] = field(default_factory=list)
+
+def shingles(text: str, size: int = 3) -> np.ndarray:
+    """Hashes of the word n-grams of text, as unique uint64 values."""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < size:
+        grams = [" ".join(words)] if words else []
+    else:
+        grams = [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    return np.unique(np.fromiter(
+        (zlib.crc32(gram.encode()) for gram in grams), dtype=np.uint64, count=len(grams)
+    ))
+
+def dedup_text(record: LabelRecord) -> str:
+    """The parts of a label that define what it is about."""
+    return "\n".join((record.question, record.root_cause, record.resolution))
+
+class MinHasher:
+    """Computes MinHash signatures with num_perm universal hash functions."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, hashes: np.ndarray) -> np.ndarray:
+        if not len(hashes):
+            return np.full(self.num_perm, MAX_HASH, dtype=np.uint32)
+        # Wrapping uint64 arithmetic before the modulo is intended; with
+        # multipliers below 2^32 the result would stay monotone in h
+        permuted = (np.outer(self.a, hashes) + self.b[:, None]) % MERSENNE_PRIME
+        return (permuted.min(axis=1) & MAX_HASH).astype(np.uint32)
+
+def lsh_parameters(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """Pick (bands, rows) whose S-curve midpoint is closest to threshold."""
+    best = (num_perm, 1)
+    best_gap = float("inf")
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        # Similarity at which a pair has a 50% chance to share a bucket
+        midpoint = (1 - 0.5 ** (1 / bands)) ** (1 / rows)
+        # Prefer slightly low midpoints: missed duplicates cost more than extra candidates
+        gap = abs(midpoint - (threshold - 0.05))
+        if gap < best_gap:
+            best, best_gap = (bands, rows), gap
+    return best
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, a: int, b: int) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+def find_duplicates(
+    records: List[LabelRecord],
+    threshold: float = 0.8,
+    num_perm: int = 128,
+    shingle_size: int = 3
+) -> List[DuplicateCluster]:
+    """Group records whose estimated Jaccard similarity reaches threshold."""
+    if len(records) < 2:
+        return []
+    hasher = MinHasher(num_perm)
+    signatures = np.vstack([hasher.signature(shingles(dedup_text(r), shingle_size)) for r in records])
+    bands, rows = lsh_parameters(threshold, num_perm)
+
+    candidates = set()
+    for band in range(bands):
+        buckets: Dict[bytes, List[int]] = {}
+        block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        for index in range(len(records)):
+            buckets.setdefault(block[index].tobytes(), []).append(index)
+        for members in buckets.values():
+            # Every pair: a member can miss the threshold against one member
+            # of a cluster and still reach it against another
+            for position in range(1, len(members)):
+                other = members[position]
+                candidates.update(
+                    (earlier, other) for earlier in members[max(0, position - MAX_BUCKET_WINDOW):position]
+                )
+
+    union = _UnionFind(len(records))
+    pair_similarity: Dict[int, List[float]] = {}
+    for a, b in candidates:
+        similarity = float(np.mean(signatures[a] == signatures[b]))
+        if similarity >= threshold:
+            union.union(a, b)
+            pair_similarity.setdefault(a, []).append(similarity)
+
+    groups: Dict[int, List[int]] = {}
+    for index in range(len(records)):
+        groups.setdefault(union.find(index), []).append(index)
+
+    clusters = []
+    for root, members in groups.items():
+        if len(members) < 2:
+            continue
+        similarities = [s for member in members for s in pair_similarity.get(member, [])]
+        clusters.append(DuplicateCluster(
+            members=[records[m].path for m in members],
+            similarity=round(min(similarities), 3) if similarities else 1.0
+        ))
+    clusters.sort(key=lambda cluster: (-len(cluster.members), cluster.members[0]))
+    return clusters
+
+def label_quality(record: LabelRecord) -> Tuple[int, int, int, str]:
+    """Sort key for keep-best: fewest schema errors, most complete, newest."""
+    filled = sum(1 for value in (
+        record.question, record.answer, record.root_cause, record.resolution,
+        record.component, record.namespace, record.severity, record.timestamp, record.k8s_version
+    ) if value)
+    return (
+        -len(validate_label(record.data, record.path)) if record.data else 0,
+        filled,
+        len(record.text()),
+        record.timestamp or ""
+    )
+
+def choose_keepers(clusters: List[DuplicateCluster], records: Iterable[LabelRecord]) -> None:
+    """Fill in keep/drop for each cluster using label_quality."""
+    by_path = {record.path: record for record in records}
+    for cluster in clusters:
+        ranked = sorted(cluster.members, key=lambda path: label_quality(by_path[path]), reverse=True)
+        cluster.keep = ranked[0]
+        cluster.drop = ranked[1:]
+
+def load_records(root: str = DEFAULT_LABEL_ROOT) -> List[LabelRecord]:
+    records = []
+    for path in iter_label_files(root):
+        try:
+            records.append(load_label(path, root))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            continue
+    return records
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", default=DEFAULT_LABEL_ROOT)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--num-perm", type=int, default=128)
+    parser.add_argument("--keep-best", action="store_true", help="pick one label to keep per cluster (nothing is merged)")
+    parser.add_argument("--move-to", help="with --keep-best, move the other labels into this directory")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+    if args.move_to and not args.keep_best:
+        parser.error("--move-to requires --keep-best")
+
+    records = load_records(args.root)
+    clusters = find_duplicates(records, args.threshold, args.num_perm)
+    if args.keep_best:
+        choose_keepers(clusters, records)
+
+    if args.json:
+        print(json.dumps([vars(cluster) for cluster in clusters], indent=2))
+    else:
+        for cluster in clusters:
+            print(f"{len(cluster.members)} labels, similarity >= {cluster.similarity}")
+            for path in cluster.members:
+                marker = "keep" if path == cluster.keep else ("drop" if path in cluster.drop else "-")
+                print(f"  [{marker}] {path}")
+        duplicates = sum(len(cluster.members) - 1 for cluster in clusters)
+        print(f"{len(records)} labels, {len(clusters)} duplicate clusters, {duplicates} redundant labels")
+
+    if args.move_to:
+        for cluster in clusters:
+            for path in cluster.drop:
+                target = os.path.join(args.move_to, path)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.move(os.path.join(args.root, path), target)
+
+if __name__ == "__main__":
+    main()
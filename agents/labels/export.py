@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""Export labels into compressed, indexed JSONL shards and read them back.
+
+Layout of an export directory:
+
+    manifest.json             splits, shards, record counts and settings
+    dictionary.bin            shared deflate dictionary for all records
+    train/shard-00000.jsonl.z concatenated, individually compressed records
+    train/shard-00000.idx     little-endian uint64 offsets (records + 1)
+    validation/...
+
+Every record is compressed on its own against the shared dictionary, so a
+reader can memory-map the index and decompress any record in O(1).
+
+Usage:
+    python -m agents.labels.export OUT_DIR [--root training-data]
+        [--shard-size-mb 64] [--validation-fraction 0.1] [--seed 0]
+"""
+from typing import Dict, Any, Optional, List, Iterable, Iterator
+from bisect import bisect_right
+import argparse
+import hashlib
+import itertools
+import json
+import mmap
+import os
+import zlib
+import numpy as np
+
+from .corpus import DEFAULT_LABEL_ROOT, iter_label_files, load_label
+
+FORMAT_VERSION = 1
+SPLITS = ("train", "validation")
+
+# Leading records used to build the shared compression dictionary
+DICTIONARY_SAMPLES = 256
+DICTIONARY_BYTES = 32 * 1024
+
+# Raw deflate streams without zlib headers: the dictionary is loaded when
+# the decompressor is created, which is several times cheaper per record
+RAW_DEFLATE = -15
+
+def corpus_records(root: str = DEFAULT_LABEL_ROOT) -> Iterator[Dict[str, Any]]:
+    """Export records for every label file under root."""
+    for path in iter_label_files(root):
+        try:
+            record = load_label(path, root)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            continue
+        yield {"id": record.label_id, "category": record.category, "path": record.path, "label": record.data}
+
+def split_of(record: Dict[str, Any], validation_fraction: float, seed: int) -> str:
+    """Stable split assignment: depends only on the record ID and seed."""
+    return "validation" if _unit_hash(f"split:{seed}:{record['id']}") < validation_fraction else "train"
+
+def export_dataset(
+    records: Iterable[Dict[str, Any]],
+    out_dir: str,
+    shard_bytes: int = 64 * 1024 * 1024,
+    validation_fraction: float = 0.1,
+    seed: int = 0,
+    level: int = 6
+) -> Dict[str, Any]:
+    """Write records as shuffled, size-bounded shards per split.
+
+    Records need an "id" and a "category"; the split is decided per record
+    from its ID, so every category is represented in both splits in
+    proportion. Output order is a deterministic shuffle keyed by seed.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    records = iter(records)
+    # The dictionary is built from the leading records; everything after is
+    # held compressed while the shuffle order is established
+    head = []
+    for record in records:
+        head.append(record)
+        if len(head) >= DICTIONARY_SAMPLES:
+            break
+    dictionary = _build_dictionary([_encode(record) for record in head])
+    with open(os.path.join(out_dir, "dictionary.bin"), "wb") as f:
+        f.write(dictionary)
+
+    compressed: Dict[str, List[tuple]] = {split: [] for split in SPLITS}
+    for record in itertools.chain(head, records):
+        line = _encode(record)
+        order = _unit_hash(f"order:{seed}:{record['id']}")
+        compressed[split_of(record, validation_fraction, seed)].append(
+            (order, record["id"], record["category"], _compress(line, dictionary, level), len(line))
+        )
+
+    manifest: Dict[str, Any] = {
+        "format_version": FORMAT_VERSION,
+        "seed": seed,
+        "validation_fraction": validation_fraction,
+        "compression": {"codec": "deflate-raw", "level": level, "dictionary": "dictionary.bin"},
+        "splits": {}
+    }
+    for split, items in compressed.items():
+        items.sort(key=lambda item: (item[0], item[1]))
+        split_dir = os.path.join(out_dir, split)
+        os.makedirs(split_dir, exist_ok=True)
+        shards = []
+        categories: Dict[str, int] = {}
+        writer: Optional[_ShardWriter] = None
+        for _, _, category, blob, raw_size in items:
+            if writer is None or writer.size >= shard_bytes:
+                if writer is not None:
+                    shards.append(writer.close())
+                writer = _ShardWriter(split_dir, f"shard-{len(shards):05d}")
+            writer.write(blob, raw_size)
+            categories[category] = categories.get(category, 0) + 1
+        if writer is not None:
+            shards.append(writer.close())
+        manifest["splits"][split] = {
+            "records": len(items),
+            "categories": dict(sorted(categories.items())),
+            "shards": [{**shard, "path": f"{split}/{shard['path']}"} for shard in shards]
+        }
+
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+class ShardedDataset:
+    """Random-access and streaming reader for one split of an export."""
+
+    def __init__(self, path: str, split: str = "train"):
+        with open(os.path.join(path, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported export format {self.manifest.get('format_version')}")
+        with open(os.path.join(path, self.manifest["compression"]["dictionary"]), "rb") as f:
+            self._dictionary = f.read()
+
+        self.split = split
+        self._shards = self.manifest["splits"][split]["shards"]
+        self._paths = [os.path.join(path, shard["path"]) for shard in self._shards]
+        self._starts: List[int] = []
+        total = 0
+        for shard in self._shards:
+            self._starts.append(total)
+            total += shard["records"]
+        self._length = total
+        # Opened on first access; each holds (index memmap, data mmap)
+        self._open: Dict[int, tuple] = {}
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, position: int) -> Dict[str, Any]:
+        if position < 0:
+            position += self._length
+        if not 0 <= position < self._length:
+            raise IndexError(position)
+        shard = bisect_right(self._starts, position) - 1
+        offsets, data = self._shard(shard)
+        local = position - self._starts[shard]
+        return self._decode(data[int(offsets[local]):int(offsets[local + 1])])
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Stream records in stored order, one shard at a time."""
+        for shard in range(len(self._shards)):
+            offsets, data = self._shard(shard)
+            for local in range(len(offsets) - 1):
+                yield self._decode(data[int(offsets[local]):int(offsets[local + 1])])
+            self._release(shard)
+
+    def shuffled(self, seed: int = 0, epoch: int = 0) -> Iterator[Dict[str, Any]]:
+        """Iterate in a deterministic per-(seed, epoch) random order."""
+        order = np.random.default_rng([seed, epoch]).permutation(self._length)
+        for position in order.tolist():
+            yield self[position]
+
+    def close(self) -> None:
+        for shard in list(self._open):
+            self._release(shard)
+
+    def _shard(self, shard: int) -> tuple:
+        opened = self._open.get(shard)
+        if opened is None:
+            offsets = np.memmap(_index_path(self._paths[shard]), dtype="<u8", mode="r")
+            with open(self._paths[shard], "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+            opened = self._open[shard] = (offsets, data)
+        return opened
+
+    def _release(self, shard: int) -> None:
+        opened = self._open.pop(shard, None)
+        if opened is not None and isinstance(opened[1], mmap.mmap):
+            opened[1].close()
+
+    def _decode(self, blob: bytes) -> Dict[str, Any]:
+        decompressor = zlib.decompressobj(RAW_DEFLATE, zdict=self._dictionary)
+        return json.loads(decompressor.decompress(blob) + decompressor.flush())
+
+class _ShardWriter:
+    """Appends compressed records to a shard and tracks their offsets."""
+
+    def __init__(self, directory: str, name: str):
+        self.name = f"{name}.jsonl.z"
+        self.path = os.path.join(directory, self.name)
+        self.offsets = [0]
+        self.size = 0
+        self.raw_size = 0
+        self._file = open(self.path, "wb")
+
+    def write(self, blob: bytes, raw_size: int) -> None:
+        self._file.write(blob)
+        self.size += len(blob)
+        self.raw_size += raw_size
+        self.offsets.append(self.size)
+
+    def close(self) -> Dict[str, Any]:
+        self._file.close()
+        np.asarray(self.offsets, dtype="<u8").tofile(_index_path(self.path))
+        return {
+            "path": self.name,
+            "records": len(self.offsets) - 1,
+            "bytes": self.size,
+            "uncompressed_bytes": self.raw_size
+        }
+
+def _encode(record: Dict[str, Any]) -> bytes:
+    return json.dumps(record, separators=(",", ":"), sort_keys=True).encode() + b"\n"
+
+def _compress(line: bytes, dictionary: bytes, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, RAW_DEFLATE, zdict=dictionary)
+    return compressor.compress(line) + compressor.flush()
+
+def _build_dictionary(lines: List[bytes]) -> bytes:
+    """Shared zlib dictionary from sample records.
+
+    zlib favours matches near the end of the dictionary, and JSON keys and
+    common values repeat across labels, so a tail of concatenated samples
+    works well for small records.
+    """
+    return b"".join(lines)[-DICTIONARY_BYTES:]
+
+def _index_path(shard_path: str) -> str:
+    return shard_path[:-len(".jsonl.z")] + ".idx"
+
+def _unit_hash(value: str) -> float:
+    digest = hashlib.blake2b(value.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2**64
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("out_dir")
+    parser.add_argument("--root", default=DEFAULT_LABEL_ROOT)
+    parser.add_argument("--shard-size-mb", type=float, default=64)
+    parser.add_argument("--validation-fraction", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    manifest = export_dataset(
+        corpus_records(args.root),
+        args.out_dir,
+        shard_bytes=int(args.shard_size_mb * 1024 * 1024),
+        validation_fraction=args.validation_fraction,
+        seed=args.seed
+    )
+    for split, info in manifest["splits"].items():
+        compressed = sum(shard["bytes"] for shard in info["shards"])
+        raw = sum(shard["uncompressed_bytes"] for shard in info["shards"])
+        print(f"{split}: {info['records']} records in {len(info['shards'])} shard(s), "
+              f"{raw} -> {compressed} bytes, categories {info['categories']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+from typing import Dict, Optional, List, Iterable, Callable, Tuple
+from dataclasses import dataclass
+import re
+import zlib
+import numpy as np
+
+from .corpus import DEFAULT_LABEL_ROOT, SHAPE_BASIC_QA, LabelRecord, iter_label_files, load_label
+
+# Hashed feature space; collisions are rare at the corpus vocabulary size
+DEFAULT_FEATURES = 1 << 20
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9_.\-]*[a-z0-9]|[a-z0-9]")
+
+# Words that carry no signal in incident text
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were "
+    "with without not no after before during into".split()
+)
+
+# Relative weight of each label field in its document vector
+FIELD_WEIGHTS = (("question", 1.0), ("root_cause", 2.0), ("answer", 1.0), ("component", 1.0), ("tags", 1.0))
+
+@dataclass
+class IncidentMatch:
+    """A past label close to the current findings."""
+    label_id: str
+    path: str
+    category: str
+    question: str
+    root_cause: str
+    resolution: str
+    score: float
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens plus adjacent-word bigrams."""
+    words = [word for word in TOKEN_PATTERN.findall(text.lower()) if word not in STOP_WORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+def feature_id(token: str, n_features: int) -> int:
+    # crc32 is stable across processes, unlike hash()
+    return zlib.crc32(token.encode()) & (n_features - 1)
+
+class LabelIndex:
+    """Hashed TF-IDF index over labels with top-k cosine search.
+
+    Document vectors are stored column-wise (feature -> postings), so a
+    query only touches the postings of its own features and scoring is a
+    few NumPy scatter-adds followed by an argpartition.
+    """
+
+    def __init__(self, records: List[LabelRecord], n_features: int = DEFAULT_FEATURES):
+        if n_features & (n_features - 1):
+            raise ValueError("n_features must be a power of two")
+        self.n_features = n_features
+        self.records = records
+
+        rows: List[np.ndarray] = []
+        features: List[np.ndarray] = []
+        counts: List[np.ndarray] = []
+        for row, record in enumerate(records):
+            ids, tf = self._term_frequencies(_weighted_fields(record))
+            rows.append(np.full(len(ids), row, dtype=np.int32))
+            features.append(ids)
+            counts.append(tf)
+        row_ids = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int32)
+        feature_ids = np.concatenate(features) if features else np.zeros(0, dtype=np.int64)
+        tf = np.concatenate(counts) if counts else np.zeros(0, dtype=np.float32)
+
+        document_frequency = np.bincount(feature_ids, minlength=n_features)
+        self.idf = (np.log((1 + len(records)) / (1 + document_frequency)) + 1).astype(np.float32)
+        weights = (1 + np.log(tf)) * self.idf[feature_ids]
+
+        # L2-normalize each document so dot products are cosine similarities
+        norms = np.sqrt(np.bincount(row_ids, weights=weights * weights, minlength=len(records)))
+        weights = weights / np.maximum(norms[row_ids], 1e-12)
+
+        order = np.argsort(feature_ids, kind="stable")
+        self.postings_rows = row_ids[order]
+        self.postings_weights = weights[order].astype(np.float32)
+        self.offsets = np.zeros(n_features + 1, dtype=np.int64)
+        np.cumsum(document_frequency, out=self.offsets[1:])
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @classmethod
+    def from_corpus(
+        cls,
+        root: str = DEFAULT_LABEL_ROOT,
+        include: Optional[Callable[[LabelRecord], bool]] = None,
+        n_features: int = DEFAULT_FEATURES
+    ) -> "LabelIndex":
+        """Index every (matching) label file under root."""
+        records = []
+        for path in iter_label_files(root):
+            try:
+                record = load_label(path, root)
+            except (ValueError, KeyError, TypeError, AttributeError):
+                continue
+            if include is None or include(record):
+                # Only the normalized fields are needed for matching
+                record.data = {}
+                records.append(record)
+        return cls(records, n_features)
+
+    def search(self, text: str, k: int = 5, min_score: float = 0.0) -> List[IncidentMatch]:
+        """Return the k labels most similar to text."""
+        if not self.records:
+            return []
+        ids, tf = self._term_frequencies([(text, 1.0)])
+        if not len(ids):
+            return []
+        query = (1 + np.log(tf)) * self.idf[ids]
+        query /= max(float(np.linalg.norm(query)), 1e-12)
+
+        scores = np.zeros(len(self.records), dtype=np.float32)
+        for feature, weight in zip(ids.tolist(), query.tolist()):
+            start, end = self.offsets[feature], self.offsets[feature + 1]
+            if start != end:
+                # A document appears at most once per feature, so plain fancy-index add is safe
+                scores[self.postings_rows[start:end]] += self.postings_weights[start:end] * weight
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            _match(self.records[row], float(scores[row]))
+            for row in top.tolist() if scores[row] > min_score
+        ]
+
+    def _term_frequencies(self, fields: Iterable[Tuple[str, float]]) -> Tuple[np.ndarray, np.ndarray]:
+        counts: Dict[int, float] = {}
+        for text, weight in fields:
+            for token in tokenize(text):
+                feature = feature_id(token, self.n_features)
+                counts[feature] = counts.get(feature, 0.0) + weight
+        ids = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        return ids, tf
+
+def incident_index(root: str = DEFAULT_LABEL_ROOT) -> LabelIndex:
+    """Index of incident-style labels, leaving out basic kubectl Q&A."""
+    return LabelIndex.from_corpus(root, include=lambda record: record.shape != SHAPE_BASIC_QA)
+
+def _weighted_fields(record: LabelRecord) -> List[Tuple[str, float]]:
+    values = {
+        "question": record.question,
+        "root_cause": record.root_cause,
+        "answer": record.answer,
+        "component": record.component or "",
+        "tags": " ".join(map(str, record.tags)),
+    }
+    return [(values[name], weight) for name, weight in FIELD_WEIGHTS if values[name]]
+
+def _match(record: LabelRecord, score: float) -> IncidentMatch:
+    return IncidentMatch(
+        label_id=record.label_id,
+        path=record.path,
+        category=record.category,
+        question=record.question,
+        root_cause=_first_lines(record.root_cause, 3),
+        resolution=_first_lines(record.resolution, 5),
+        score=round(score, 4)
+    )
+
+def _first_lines(text: str, count: int) -> str:
+    return "\n".join(text.splitlines()[:count])
@@ -0,0 +1,655 @@
+#!/usr/bin/env python3
+"""Generate training labels from cluster event streams with threshold rules.
+
+Rules declare the streams (event, metrics, log), resource kinds and event
+reasons they consume; the engine indexes them on that triple so every item
+is offered only to the rules that can use it. Per-object rule state is a
+fixed-size ring buffer of (timestamp, value) pairs. Findings are written in
+the perf_observation format of training-data and validated before they are
+returned.
+
+ShardedRuleEngine runs one engine per worker process and routes items by a
+hash of their object key, so all state of an object lives in one worker.
+
+Usage:
+    python -m agents.labels.rules STREAM.jsonl [--out DIR] [--workers N]
+        [--k8s-version 1.28.5] [--cluster-type development]
+"""
+from typing import Dict, Any, Optional, List, Tuple, Iterable, Union
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import zlib
+
+from ..events.model import (
+    AggregatedEvent, PodLog, ResourceEvent, StreamItem, STREAM_EVENT, STREAM_METRICS, STREAM_NAMES
+)
+from .validation import K8S_VERSION, validate_label
+
+WILDCARD = "*"
+
+# Recent warning events and error logs kept per object as label evidence
+EVIDENCE_LINES = 5
+
+class RingBuffer:
+    """Fixed-capacity ring of (timestamp, value) pairs backed by two float arrays."""
+    __slots__ = ("_times", "_values", "_start", "_size")
+
+    def __init__(self, capacity: int):
+        self._times = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, timestamp: float, value: float = 0.0) -> bool:
+        """Append a sample, overwriting the oldest when full.
+
+        Samples older than the newest one, and exact repeats of it (the same
+        metric sample seen through overlapping windows), are ignored.
+        """
+        capacity = len(self._times)
+        if self._size:
+            last = (self._start + self._size - 1) % capacity
+            if timestamp < self._times[last] or (timestamp == self._times[last] and value == self._values[last]):
+                return False
+        end = (self._start + self._size) % capacity
+        self._times[end] = timestamp
+        self._values[end] = value
+        if self._size < capacity:
+            self._size += 1
+        else:
+            self._start = (self._start + 1) % capacity
+        return True
+
+    def oldest(self) -> float:
+        return self._times[self._start]
+
+    def latest(self) -> float:
+        return self._times[(self._start + self._size - 1) % len(self._times)]
+
+    def samples(self, since: float = float("-inf")) -> List[Tuple[float, float]]:
+        """Samples in time order, optionally only those at or after since."""
+        capacity = len(self._times)
+        ordered = ((self._times[i % capacity], self._values[i % capacity]) for i in range(self._start, self._start + self._size))
+        return [sample for sample in ordered if sample[0] >= since]
+
+    def clear(self) -> None:
+        self._start = self._size = 0
+
+class RuleState:
+    """Per-object state of one rule."""
+    __slots__ = ("ring", "since", "last_fired")
+
+    def __init__(self, capacity: int):
+        self.ring = RingBuffer(capacity)
+        self.since: Optional[float] = None
+        self.last_fired = float("-inf")
+
+@dataclass
+class Finding:
+    """A rule condition that held for an object."""
+    rule: str
+    kind: str
+    namespace: Optional[str]
+    name: str
+    timestamp: float
+    first_seen: float
+    details: Dict[str, Any] = field(default_factory=dict)
+
+@dataclass
+class GeneratedLabel:
+    """A label produced by a rule, with its path relative to the label root."""
+    path: str
+    data: Dict[str, Any]
+
+class LabelRule(ABC):
+    """Base class for label rules (TECHNICAL_DESIGN.md §4.3 LabelRule)."""
+    name = "rule"
+    category = "performance"
+    id_prefix = "perf"
+    streams: Tuple[str, ...] = ()
+    kinds: Tuple[str, ...] = (WILDCARD,)
+    # Event reasons; empty matches every reason
+    reasons: Tuple[str, ...] = ()
+
+    def applies(self, stream: str, kind: str, reason: str = "") -> bool:
+        """Whether items of this stream, resource kind and reason can affect the rule."""
+        if stream not in self.streams:
+            return False
+        if WILDCARD not in self.kinds and kind not in self.kinds:
+            return False
+        return stream != STREAM_EVENT or not self.reasons or reason in self.reasons
+
+    @abstractmethod
+    def new_state(self) -> Any:
+        """Fresh per-object state for observe()."""
+
+    @abstractmethod
+    def observe(self, item: StreamItem, state: Any) -> Optional[Finding]:
+        """Update the object's state with item; return a finding when the rule fires."""
+
+    @abstractmethod
+    def generate_label(self, finding: Finding, evidence: List[str], environment: Dict[str, Any]) -> Dict[str, Any]:
+        """Label data for a finding, in the observation shape."""
+
+@dataclass
+class PodCrashRule(LabelRule):
+    """Fires when a pod reports crash_threshold crash events within time_window seconds."""
+    crash_threshold: int = 3
+    time_window: float = 600.0
+    crash_reasons: Tuple[str, ...] = ("BackOff", "CrashLoopBackOff", "OOMKilled", "OOMKilling")
+
+    name = "pod_crash"
+    category = "troubleshooting"
+    id_prefix = "crash"
+    streams = (STREAM_EVENT,)
+    kinds = ("Pod",)
+
+    def __post_init__(self):
+        self.reasons = self.crash_reasons
+
+    def new_state(self) -> RuleState:
+        return RuleState(self.crash_threshold)
+
+    def observe(self, item: StreamItem, state: RuleState) -> Optional[Finding]:
+        # The value records which reason it was, as an index into crash_reasons
+        state.ring.push(item.timestamp, float(self.crash_reasons.index(item.reason)))
+        ring = state.ring
+        if len(ring) < self.crash_threshold or ring.latest() - ring.oldest() > self.time_window:
+            return None
+        if item.timestamp < state.last_fired + self.time_window:
+            return None
+        state.last_fired = item.timestamp
+        reasons: Dict[str, int] = {}
+        for _, value in ring.samples():
+            reason = self.crash_reasons[int(value)]
+            reasons[reason] = reasons.get(reason, 0) + 1
+        return Finding(
+            rule=self.name, kind=item.kind, namespace=item.namespace, name=item.name,
+            timestamp=item.timestamp, first_seen=ring.oldest(),
+            details={"crash_events": len(ring), "reasons": reasons}
+        )
+
+    def generate_label(self, finding: Finding, evidence: List[str], environment: Dict[str, Any]) -> Dict[str, Any]:
+        reasons = finding.details["reasons"]
+        oom = any(reason.startswith("OOM") for reason in reasons) or any(
+            "OOMKilled" in line or "exit code 137" in line for line in evidence
+        )
+        window = _duration(self.time_window)
+        if oom:
+            root_cause = "Container exceeds its memory limit and is OOM-killed repeatedly"
+            actions = [
+                {"type": "Resource adjustment", "change": "Raise the container memory limit", "effect": "Stops OOM kills"},
+                {"type": "Investigation", "change": "Check memory growth for leaks or unbounded caches", "effect": "Confirms the sizing"},
+            ]
+            tags = ["oom-kill", "memory-management"]
+        else:
+            root_cause = "Container exits shortly after start and is restarted in a crash loop"
+            actions = [
+                {"type": "Investigation", "change": "Inspect logs of the previous container (kubectl logs --previous)", "effect": "Identifies the exit cause"},
+                {"type": "Configuration review", "change": "Check probes, command, environment and mounted configuration", "effect": "Stops the crash loop"},
+            ]
+            tags = ["crashloopbackoff", "pod-restarts"]
+        detection = ", ".join(f"{count}x {reason}" for reason, count in sorted(reasons.items()))
+        return {
+            "perf_observation": _label_id(self, finding),
+            "question": f"Why does {finding.kind.lower()} {finding.name} in {finding.namespace} keep restarting?",
+            "timestamp": _rfc3339(finding.timestamp),
+            "environment": environment,
+            "context": {
+                "components": [_component(finding)],
+                "duration": _duration(finding.timestamp - finding.first_seen),
+                "detection": f"{detection} within {window}",
+            },
+            "metrics": {
+                finding.name: {
+                    "degraded": {"crash_events": finding.details["crash_events"], "window": window, "reasons": reasons}
+                }
+            },
+            "analysis": {
+                "root_cause": root_cause,
+                "evidence": evidence or [f"{finding.details['crash_events']} crash events within {window}"],
+            },
+            "resolution": {"immediate_actions": [{"component": finding.name, "actions": actions}]},
+            "metadata": _metadata(self, finding, "high", tags),
+        }
+
+@dataclass
+class ResourceUtilizationRule(LabelRule):
+    """Fires when CPU or memory stays above its threshold for duration seconds.
+
+    Thresholds are fractions of the container limit; samples without a
+    limit use the absolute cpu_millicores / memory_bytes thresholds when set.
+    """
+    cpu_threshold: float = 0.9
+    memory_threshold: float = 0.9
+    duration: float = 300.0
+    cooldown: float = 3600.0
+    cpu_millicores: Optional[float] = None
+    memory_bytes: Optional[float] = None
+
+    name = "resource_utilization"
+    streams = (STREAM_METRICS,)
+    kinds = ("Pod",)
+
+    def new_state(self) -> Dict[str, RuleState]:
+        return {"cpu": RuleState(32), "memory": RuleState(32)}
+
+    def observe(self, item: StreamItem, state: Dict[str, RuleState]) -> Optional[Finding]:
+        for resource, usage, limit, threshold, absolute in (
+            ("memory", item.memory_bytes, item.memory_limit_bytes, self.memory_threshold, self.memory_bytes),
+            ("cpu", item.cpu_millicores, item.cpu_limit_millicores, self.cpu_threshold, self.cpu_millicores),
+        ):
+            if limit > 0:
+                ceiling = limit * threshold
+            elif absolute:
+                ceiling = absolute
+            else:
+                continue
+            resource_state = state[resource]
+            if not resource_state.ring.push(item.timestamp, usage):
+                continue
+            if usage < ceiling:
+                resource_state.since = None
+                continue
+            if resource_state.since is None:
+                resource_state.since = item.timestamp
+            if item.timestamp - resource_state.since < self.duration:
+                continue
+            if item.timestamp < resource_state.last_fired + self.cooldown:
+                continue
+            resource_state.last_fired = item.timestamp
+            values = [value for _, value in resource_state.ring.samples(resource_state.since)]
+            return Finding(
+                rule=self.name, kind=item.kind, namespace=item.namespace, name=item.name,
+                timestamp=item.timestamp, first_seen=resource_state.since,
+                details={
+                    "resource": resource, "peak": max(values), "mean": sum(values) / len(values),
+                    "limit": limit, "ceiling": ceiling, "samples": len(values)
+                }
+            )
+        return None
+
+    def generate_label(self, finding: Finding, evidence: List[str], environment: Dict[str, Any]) -> Dict[str, Any]:
+        details = finding.details
+        resource = details["resource"]
+        formatter = _format_bytes if resource == "memory" else _format_millicores
+        limit = details["limit"]
+        level = details["peak"] / limit if limit else None
+        sustained = _duration(finding.timestamp - finding.first_seen)
+        usage = {
+            f"{resource}_usage_peak": formatter(details["peak"]),
+            f"{resource}_usage_mean": formatter(details["mean"]),
+            f"{resource}_limit": formatter(limit) if limit else "none",
+        }
+        if level is not None:
+            root_cause = f"Sustained {resource} usage at {level:.0%} of the container limit for {sustained}"
+            change = f"Raise the {resource} limit to {formatter(details['peak'] * 1.5)} or reduce usage"
+        else:
+            root_cause = f"Sustained {resource} usage above {formatter(details['ceiling'])} for {sustained}"
+            change = f"Set a {resource} limit and request sized from observed usage"
+        if resource == "memory":
+            tags, risk = ["memory-pressure", "resource-limits"], "OOM kill when the limit is reached"
+        else:
+            tags, risk = ["cpu-saturation", "cpu-throttling"], "CPU throttling and higher latency"
+        return {
+            "perf_observation": _label_id(self, finding),
+            "question": f"Why is {finding.kind.lower()} {finding.name} in {finding.namespace} running out of {resource}?",
+            "timestamp": _rfc3339(finding.timestamp),
+            "environment": environment,
+            "context": {
+                "components": [_component(finding)],
+                "duration": sustained,
+                "detection": f"{resource} above threshold in {details['samples']} consecutive samples",
+            },
+            "metrics": {finding.name: {"degraded": usage}},
+            "analysis": {
+                "root_cause": root_cause,
+                "evidence": evidence or [f"{resource} peak {usage[f'{resource}_usage_peak']}, limit {usage[f'{resource}_limit']}"],
+                "impact": {"risk": risk},
+            },
+            "resolution": {
+                "immediate_actions": [
+                    {"component": finding.name, "actions": [{"type": "Resource adjustment", "change": change}]}
+                ]
+            },
+            "metadata": _metadata(self, finding, "high" if level is not None and level >= 0.98 else "medium", tags),
+        }
+
+def default_rules() -> List[LabelRule]:
+    return [PodCrashRule(), ResourceUtilizationRule()]
+
+def default_environment() -> Dict[str, Any]:
+    """Environment section of generated labels, from LABEL_CLUSTER_TYPE and LABEL_K8S_VERSION."""
+    environment: Dict[str, Any] = {"cluster_type": os.getenv("LABEL_CLUSTER_TYPE", "development")}
+    if os.getenv("LABEL_K8S_VERSION"):
+        environment["k8s_version"] = os.getenv("LABEL_K8S_VERSION")
+    return check_environment(environment)
+
+def check_environment(environment: Dict[str, Any]) -> Dict[str, Any]:
+    """Raise ValueError unless labels generated with environment can pass validation."""
+    version = environment.get("k8s_version")
+    if not version:
+        raise ValueError("k8s_version is required for generated labels (LABEL_K8S_VERSION or --k8s-version)")
+    if not isinstance(version, str) or not K8S_VERSION.match(version):
+        raise ValueError(f"k8s_version must look like 1.28 or v1.28.5, got {version!r}")
+    return environment
+
+class _ObjectRules:
+    """Rule states and recent evidence of one object."""
+    __slots__ = ("states", "evidence")
+
+    def __init__(self):
+        self.states: Dict[int, Any] = {}
+        self.evidence: deque = deque(maxlen=EVIDENCE_LINES)
+
+class RuleEngine:
+    """Applies indexed rules to stream items and aggregated events of one shard."""
+
+    def __init__(
+        self,
+        rules: Optional[List[LabelRule]] = None,
+        environment: Optional[Dict[str, Any]] = None,
+        max_objects: int = 100000
+    ):
+        self.rules = rules if rules is not None else default_rules()
+        self.environment = check_environment(environment) if environment else default_environment()
+        self.max_objects = max_objects
+        # (stream, kind, reason) -> indexes of the rules that apply; filled on first sight
+        self._index: Dict[Tuple[str, str, str], List[int]] = {}
+        self._objects: "OrderedDict[str, _ObjectRules]" = OrderedDict()
+        self.processed = 0
+        self.rejected: List[Tuple[str, str]] = []
+
+    def rules_for(self, stream: str, kind: str, reason: str = "") -> List[int]:
+        key = (stream, kind, reason)
+        matching = self._index.get(key)
+        if matching is None:
+            matching = self._index[key] = [
+                index for index, rule in enumerate(self.rules) if rule.applies(stream, kind, reason)
+            ]
+        return matching
+
+    def process(self, item: Union[StreamItem, AggregatedEvent]) -> List[GeneratedLabel]:
+        """Feed one item, or every item of an aggregated event, and return new labels."""
+        if isinstance(item, AggregatedEvent):
+            items = [*item.metrics, *item.logs, item.main_event, *item.related_events]
+            items.sort(key=lambda member: member.timestamp)
+            labels = []
+            for member in items:
+                labels.extend(self.process(member))
+            return labels
+
+        self.processed += 1
+        stream = STREAM_NAMES[type(item)]
+        if isinstance(item, PodLog):
+            kind, reason = "Pod", ""
+        else:
+            kind, reason = item.kind, getattr(item, "reason", "")
+        matching = self.rules_for(stream, kind, reason)
+        note = _evidence_line(item)
+        if not matching and note is None:
+            return []
+
+        state = self._object(item.key)
+        if note is not None:
+            state.evidence.append(note)
+        labels = []
+        for index in matching:
+            rule = self.rules[index]
+            rule_state = state.states.get(index)
+            if rule_state is None:
+                rule_state = state.states[index] = rule.new_state()
+            finding = rule.observe(item, rule_state)
+            if finding is not None:
+                label = self._label(rule, finding, list(state.evidence))
+                if label is not None:
+                    labels.append(label)
+        return labels
+
+    def _object(self, key: str) -> _ObjectRules:
+        state = self._objects.get(key)
+        if state is None:
+            state = self._objects[key] = _ObjectRules()
+            if len(self._objects) > self.max_objects:
+                self._objects.popitem(last=False)
+        else:
+            self._objects.move_to_end(key)
+        return state
+
+    def _label(self, rule: LabelRule, finding: Finding, evidence: List[str]) -> Optional[GeneratedLabel]:
+        data = rule.generate_label(finding, evidence, self.environment)
+        path = f"{rule.category}/{data['perf_observation']}-{rule.name.replace('_', '-')}-{finding.name}.json"
+        errors = validate_label(data, path)
+        if errors:
+            if len(self.rejected) < 100:
+                self.rejected.append((path, f"{errors[0].field}: {errors[0].message}"))
+            return None
+        return GeneratedLabel(path, data)
+
+def shard_of(key: str, shards: int) -> int:
+    """Worker that owns an object key; stable across processes."""
+    return zlib.crc32(key.encode()) % shards
+
+def _run_shard(rules: List[LabelRule], environment: Dict[str, Any], inbox: Any, outbox: Any) -> None:
+    """Worker loop: process batches until a None sentinel arrives."""
+    engine = RuleEngine(rules, environment)
+    while True:
+        batch = inbox.get()
+        if batch is None:
+            break
+        labels = []
+        for item in batch:
+            labels.extend(engine.process(item))
+        if labels:
+            outbox.put(labels)
+    outbox.put((engine.processed, engine.rejected))
+
+class ShardedRuleEngine:
+    """Runs one RuleEngine per worker process, sharded by object key.
+
+    Worker inboxes are bounded, so submit blocks when the workers fall
+    behind. Labels are collected as they arrive and by close().
+    """
+
+    def __init__(
+        self,
+        rules: Optional[List[LabelRule]] = None,
+        environment: Optional[Dict[str, Any]] = None,
+        workers: Optional[int] = None,
+        batch_size: int = 512,
+        max_pending_batches: int = 8
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        rules = rules if rules is not None else default_rules()
+        environment = check_environment(environment) if environment else default_environment()
+        self._inboxes = [multiprocessing.Queue(max_pending_batches) for _ in range(self.workers)]
+        self._outbox = multiprocessing.Queue()
+        self._buffers: List[list] = [[] for _ in range(self.workers)]
+        self._processes = [
+            multiprocessing.Process(target=_run_shard, args=(rules, environment, inbox, self._outbox), daemon=True)
+            for inbox in self._inboxes
+        ]
+        for process in self._processes:
+            process.start()
+        self._finished = 0
+        self.processed = 0
+        self.rejected: List[Tuple[str, str]] = []
+
+    def __enter__(self) -> "ShardedRuleEngine":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._finished < self.workers:
+            self.close()
+
+    def submit(self, items: Iterable[Union[StreamItem, AggregatedEvent]]) -> List[GeneratedLabel]:
+        """Route items to their shards and return the labels produced so far."""
+        for item in items:
+            shard = shard_of(item.key, self.workers)
+            buffer = self._buffers[shard]
+            buffer.append(item)
+            if len(buffer) >= self.batch_size:
+                self._inboxes[shard].put(buffer)
+                self._buffers[shard] = []
+        return self._collect(block=False)
+
+    def close(self) -> List[GeneratedLabel]:
+        """Flush pending items, stop the workers and return the remaining labels."""
+        for shard, buffer in enumerate(self._buffers):
+            if buffer:
+                self._inboxes[shard].put(buffer)
+            self._inboxes[shard].put(None)
+        self._buffers = [[] for _ in range(self.workers)]
+        labels = self._collect(block=True)
+        for process in self._processes:
+            process.join()
+        return labels
+
+    def _collect(self, block: bool) -> List[GeneratedLabel]:
+        labels: List[GeneratedLabel] = []
+        while self._finished < self.workers:
+            if not block and self._outbox.empty():
+                break
+            message = self._outbox.get()
+            if isinstance(message, tuple):
+                processed, rejected = message
+                self.processed += processed
+                self.rejected.extend(rejected)
+                self._finished += 1
+            else:
+                labels.extend(message)
+        return labels
+
+class LabelSink:
+    """EventAggregator sink that turns aggregated events into label files."""
+
+    def __init__(self, engine: RuleEngine, root: str):
+        self.engine = engine
+        self.root = root
+        self.written: List[str] = []
+
+    async def __call__(self, batch: List[AggregatedEvent]) -> None:
+        labels = []
+        for event in batch:
+            labels.extend(self.engine.process(event))
+        self.written.extend(write_labels(labels, self.root))
+
+def write_labels(labels: Iterable[GeneratedLabel], root: str) -> List[str]:
+    """Write labels under root, keeping any existing file; return the paths written."""
+    written = []
+    for label in labels:
+        target = os.path.join(root, label.path)
+        if os.path.exists(target):
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "w") as f:
+            json.dump(label.data, f, indent=4)
+            f.write("\n")
+        written.append(label.path)
+    return written
+
+def _evidence_line(item: StreamItem) -> Optional[str]:
+    if isinstance(item, PodLog):
+        if item.level == "info":
+            return None
+        return f"{item.container or item.pod}: {item.message.strip()[:200]}"
+    if isinstance(item, ResourceEvent) and item.message and item.metadata.get("severity") != "Normal":
+        return f"{item.reason}: {item.message.strip()[:200]}"
+    return None
+
+def _component(finding: Finding) -> Dict[str, Any]:
+    return {"name": finding.name, "namespace": finding.namespace, "type": finding.kind.lower()}
+
+def _metadata(rule: LabelRule, finding: Finding, severity: str, tags: List[str]) -> Dict[str, Any]:
+    return {
+        "label_type": rule.category,
+        "severity": severity,
+        "component_type": finding.kind.lower(),
+        "namespace": finding.namespace or "",
+        "tags": tags + ["rule-generated", finding.name],
+        "generated_by": f"rule:{rule.name}",
+    }
+
+def _label_id(rule: LabelRule, finding: Finding) -> str:
+    """Rule prefix and hour of the finding, with a short hash of object, rule and time to keep IDs unique."""
+    digest = hashlib.blake2b(
+        f"{finding.namespace}/{finding.kind}/{finding.name}|{rule.name}|{finding.timestamp}".encode(), digest_size=3
+    ).hexdigest()
+    return f"{rule.id_prefix}-{datetime.fromtimestamp(finding.timestamp, timezone.utc):%Y%m%d%H}-{digest}"
+
+def _rfc3339(timestamp: float) -> str:
+    return f"{datetime.fromtimestamp(timestamp, timezone.utc):%Y-%m-%dT%H:%M:%SZ}"
+
+def _duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    if seconds >= 3600 and seconds % 3600 == 0:
+        return f"{seconds // 3600}h"
+    if seconds >= 60:
+        return f"{seconds // 60}m"
+    return f"{seconds}s"
+
+def _format_bytes(value: float) -> str:
+    for unit, size in (("Gi", 1024 ** 3), ("Mi", 1024 ** 2), ("Ki", 1024)):
+        if value >= size:
+            return f"{value / size:.0f}{unit}" if value >= 10 * size else f"{value / size:.1f}{unit}"
+    return f"{value:.0f}"
+
+def _format_millicores(value: float) -> str:
+    return f"{value:.0f}m"
+
+def main() -> None:
+    from ..events.model import from_record
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("stream", help="JSONL stream written by agents.events.sources.write_replay")
+    parser.add_argument("--out", help="write labels under this directory (default: only list them)")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--k8s-version", default=os.getenv("LABEL_K8S_VERSION"))
+    parser.add_argument("--cluster-type", default=os.getenv("LABEL_CLUSTER_TYPE", "development"))
+    args = parser.parse_args()
+
+    environment: Dict[str, Any] = {"cluster_type": args.cluster_type}
+    if args.k8s_version:
+        environment["k8s_version"] = args.k8s_version
+    try:
+        check_environment(environment)
+    except ValueError as e:
+        parser.error(str(e))
+
+    def items() -> Iterable[StreamItem]:
+        with open(args.stream) as f:
+            for line in f:
+                if line.strip():
+                    yield from_record(json.loads(line))
+
+    if args.workers > 1:
+        with ShardedRuleEngine(environment=environment, workers=args.workers) as engine:
+            labels = engine.submit(items())
+            labels.extend(engine.close())
+    else:
+        engine = RuleEngine(environment=environment)
+        labels = [label for item in items() for label in engine.process(item)]
+
+    for label in labels:
+        print(label.path)
+    if args.out:
+        written = write_labels(labels, args.out)
+        print(f"wrote {len(written)} of {len(labels)} labels to {args.out}")
+    for path, error in engine.rejected:
+        print(f"rejected {path}: {error}")
+    print(f"{engine.processed} items, {len(labels)} labels, {len(engine.rejected)} rejected")
+
+if __name__ == "__main__":
+    main()
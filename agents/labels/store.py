@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""SQLite-backed label store with incremental ingest and full-text search.
+
+Usage:
+    python -m agents.labels.store ingest [--root training-data] [--db path]
+    python -m agents.labels.store search "jaeger oom" [--category performance] [--limit 10]
+"""
+from typing import Dict, Any, Optional, List, Tuple
+from dataclasses import dataclass, field
+import argparse
+import json
+import os
+import sqlite3
+import threading
+
+from .corpus import DEFAULT_LABEL_ROOT, LabelRecord, content_hash, iter_label_files, load_label
+
+# Database location; override with LABEL_STORE_PATH
+DEFAULT_STORE_PATH = os.getenv(
+    "LABEL_STORE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "k8s-labeler", "labels.db")
+)
+
+SCHEMA_VERSION = 1
+
+# Follows the labels table of TECHNICAL_DESIGN.md §5.1, with the fields the
+# corpus filters on promoted to indexed columns and file bookkeeping for
+# incremental ingest. JSON columns hold text since SQLite has no JSONB.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS labels (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL,
+    path TEXT NOT NULL UNIQUE,
+    content_hash TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    shape TEXT NOT NULL,
+    type TEXT NOT NULL,
+    question TEXT NOT NULL,
+    answer TEXT,
+    root_cause TEXT,
+    resolution TEXT,
+    component TEXT,
+    namespace TEXT,
+    severity TEXT,
+    k8s_version TEXT,
+    created_at TEXT,
+    cluster_id TEXT,
+    quality_score REAL,
+    context TEXT NOT NULL,
+    metadata TEXT
+);
+CREATE INDEX IF NOT EXISTS labels_id ON labels(id);
+CREATE INDEX IF NOT EXISTS labels_category ON labels(category, created_at);
+CREATE INDEX IF NOT EXISTS labels_component ON labels(component);
+CREATE INDEX IF NOT EXISTS labels_namespace ON labels(namespace);
+CREATE INDEX IF NOT EXISTS labels_created_at ON labels(created_at);
+CREATE INDEX IF NOT EXISTS labels_k8s_version ON labels(k8s_version);
+
+CREATE TABLE IF NOT EXISTS label_tags (
+    label_rowid INTEGER NOT NULL REFERENCES labels(rowid) ON DELETE CASCADE,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (tag, label_rowid)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS label_tags_label ON label_tags(label_rowid);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS labels_fts USING fts5(
+    question, answer, root_cause, resolution, tags,
+    tokenize = 'porter unicode61'
+);
+"""
+
+# Columns returned by search(); the full document is available via get()
+SUMMARY_COLUMNS = (
+    "id", "path", "category", "type", "question", "component", "namespace",
+    "severity", "k8s_version", "created_at"
+)
+
+# Filters accepted by search(), mapped to their column and comparison
+FILTERS = {
+    "category": "l.category = ?",
+    "label_type": "l.type = ?",
+    "component": "l.component = ?",
+    "namespace": "l.namespace = ?",
+    "severity": "l.severity = ?",
+    "k8s_version": "l.k8s_version = ?",
+    "since": "l.created_at >= ?",
+    "until": "l.created_at < ?",
+    "tag": "l.rowid IN (SELECT label_rowid FROM label_tags WHERE tag = ?)",
+}
+
+@dataclass
+class IngestReport:
+    """Outcome of one incremental ingest pass."""
+    scanned: int = 0
+    added: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    errors: Dict[str, str] = field(default_factory=dict)
+
+class LabelStore:
+    """Indexed, queryable store for the training-data label corpus."""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH, root: str = DEFAULT_LABEL_ROOT):
+        self.path = path
+        self.root = root
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+            self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def ingest(self, root: Optional[str] = None) -> IngestReport:
+        """Bring the store in line with the label files under root.
+
+        Files whose size and mtime are unchanged are skipped without being
+        read; the rest are hashed and only re-parsed when the hash changed.
+        Labels whose files disappeared are removed.
+        """
+        root = root or self.root
+        report = IngestReport()
+        with self._lock, self._conn:
+            known: Dict[str, Tuple[int, str, int, int]] = {
+                row["path"]: (row["rowid"], row["content_hash"], row["mtime_ns"], row["size"])
+                for row in self._conn.execute("SELECT rowid, path, content_hash, mtime_ns, size FROM labels")
+            }
+            seen = set()
+            for file_path in iter_label_files(root):
+                relative_path = os.path.relpath(file_path, root).replace(os.sep, "/")
+                seen.add(relative_path)
+                report.scanned += 1
+                stat = os.stat(file_path)
+                previous = known.get(relative_path)
+                if previous and previous[2] == stat.st_mtime_ns and previous[3] == stat.st_size:
+                    report.unchanged += 1
+                    continue
+
+                with open(file_path, "rb") as f:
+                    content = f.read()
+                digest = content_hash(content)
+                if previous and previous[1] == digest:
+                    # Touched but not modified
+                    self._conn.execute(
+                        "UPDATE labels SET mtime_ns = ?, size = ? WHERE rowid = ?",
+                        (stat.st_mtime_ns, stat.st_size, previous[0])
+                    )
+                    report.unchanged += 1
+                    continue
+
+                try:
+                    record = load_label(file_path, root, content)
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    report.errors[relative_path] = str(e)
+                    continue
+                if previous:
+                    self._delete(previous[0])
+                    report.updated += 1
+                else:
+                    report.added += 1
+                self._insert(record, digest, stat.st_mtime_ns, stat.st_size)
+
+            for relative_path, (rowid, _, _, _) in known.items():
+                if relative_path not in seen:
+                    self._delete(rowid)
+                    report.removed += 1
+        return report
+
+    def search(
+        self,
+        text: Optional[str] = None,
+        limit: int = 20,
+        match_any: bool = False,
+        **filters: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """Find labels by full-text query and/or field filters.
+
+        Filters: category, label_type, component, namespace, severity,
+        k8s_version, tag, since and until (ISO-8601 bounds on created_at).
+        Text queries match labels containing every term, or any term with
+        match_any. Text matches are ordered by BM25 rank, the rest newest first.
+        """
+        clauses, params = _filter_clauses(filters)
+        columns = ", ".join(f"l.{column}" for column in SUMMARY_COLUMNS)
+        if text:
+            sql = (
+                f"SELECT {columns}, bm25(labels_fts) AS score FROM labels_fts "
+                f"JOIN labels l ON l.rowid = labels_fts.rowid WHERE labels_fts MATCH ?"
+            )
+            params.insert(0, fts_query(text, match_any))
+            order = "score"
+        else:
+            sql = f"SELECT {columns} FROM labels l WHERE 1"
+            order = "l.created_at DESC, l.id"
+        for clause in clauses:
+            sql += f" AND {clause}"
+        sql += f" ORDER BY {order} LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def get(self, label_id: str) -> Optional[Dict[str, Any]]:
+        """Return the full label document for an ID or relative path."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT context FROM labels WHERE id = ? OR path = ? ORDER BY rowid LIMIT 1",
+                (label_id, label_id)
+            ).fetchone()
+        return json.loads(row["context"]) if row else None
+
+    def records(self, **filters: Optional[str]) -> List[Dict[str, Any]]:
+        """Return every label's searchable fields, optionally filtered."""
+        clauses, params = _filter_clauses(filters)
+        sql = (
+            "SELECT l.id, l.path, l.category, l.type, l.question, l.answer, l.root_cause, "
+            "l.resolution, l.component, l.namespace, l.severity, l.created_at FROM labels l"
+        )
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql + " ORDER BY l.rowid", params)]
+
+    def count(self, **filters: Optional[str]) -> int:
+        clauses, params = _filter_clauses(filters)
+        sql = "SELECT COUNT(*) FROM labels l"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    def facets(self, column: str) -> Dict[str, int]:
+        """Label counts per value of an indexed column."""
+        if column not in ("category", "type", "component", "namespace", "severity", "k8s_version"):
+            raise ValueError(f"Cannot facet on {column!r}")
+        with self._lock:
+            return {
+                row[0]: row[1] for row in self._conn.execute(
+                    f"SELECT {column}, COUNT(*) FROM labels GROUP BY {column} ORDER BY COUNT(*) DESC"
+                )
+            }
+
+    def _insert(self, record: LabelRecord, digest: str, mtime_ns: int, size: int) -> None:
+        metadata = record.data.get("metadata")
+        cursor = self._conn.execute(
+            """INSERT INTO labels (
+                id, path, content_hash, mtime_ns, size, category, shape, type, question,
+                answer, root_cause, resolution, component, namespace, severity, k8s_version,
+                created_at, context, metadata
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (
+                record.label_id, record.path, digest, mtime_ns, size, record.category,
+                record.shape, record.label_type, record.question, record.answer,
+                record.root_cause, record.resolution, record.component, record.namespace,
+                record.severity, record.k8s_version, record.timestamp,
+                json.dumps(record.data, separators=(",", ":")),
+                json.dumps(metadata, separators=(",", ":")) if metadata is not None else None
+            )
+        )
+        rowid = cursor.lastrowid
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO label_tags (label_rowid, tag) VALUES (?, ?)",
+            [(rowid, str(tag)) for tag in record.tags]
+        )
+        self._conn.execute(
+            "INSERT INTO labels_fts (rowid, question, answer, root_cause, resolution, tags) VALUES (?, ?, ?, ?, ?, ?)",
+            (rowid, record.question, record.answer, record.root_cause, record.resolution, " ".join(map(str, record.tags)))
+        )
+
+    def _delete(self, rowid: int) -> None:
+        self._conn.execute("DELETE FROM labels_fts WHERE rowid = ?", (rowid,))
+        self._conn.execute("DELETE FROM label_tags WHERE label_rowid = ?", (rowid,))
+        self._conn.execute("DELETE FROM labels WHERE rowid = ?", (rowid,))
+
+def _filter_clauses(filters: Dict[str, Optional[str]]) -> Tuple[List[str], List[Any]]:
+    clauses: List[str] = []
+    params: List[Any] = []
+    for name, value in filters.items():
+        if name not in FILTERS:
+            raise ValueError(f"Unknown filter {name!r}; expected one of {sorted(FILTERS)}")
+        if value is not None:
+            clauses.append(FILTERS[name])
+            params.append(value)
+    return clauses, params
+
+def fts_query(text: str, match_any: bool = False) -> str:
+    """Turn free text into an FTS5 query of quoted terms."""
+    # Quoting keeps FTS5 operators and punctuation in user text literal
+    terms = ['"' + term.replace('"', '""') + '"' for term in text.split()]
+    return (" OR " if match_any else " ").join(terms)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=DEFAULT_STORE_PATH)
+    parser.add_argument("--root", default=DEFAULT_LABEL_ROOT)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("ingest")
+    search = commands.add_parser("search")
+    search.add_argument("text", nargs="?")
+    search.add_argument("--limit", type=int, default=20)
+    for name in FILTERS:
+        search.add_argument(f"--{name.replace('_', '-')}", dest=name)
+    args = parser.parse_args()
+
+    store = LabelStore(args.db, args.root)
+    if args.command == "ingest":
+        report = store.ingest()
+        print(json.dumps(report.__dict__, indent=2))
+    else:
+        filters = {name: getattr(args, name) for name in FILTERS}
+        for row in store.search(args.text, limit=args.limit, **filters):
+            print(json.dumps(row))
+    store.close()
+
+if __name__ == "__main__":
+    main()
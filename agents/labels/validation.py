@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""Validate training-data labels against per-shape schemas.
+
+Schemas are compiled once into nested check functions, files are checked
+in a process pool, and results are cached by content hash so unchanged
+labels are never re-parsed.
+
+Usage:
+    python -m agents.labels.validation [paths ...] [--root training-data]
+        [--workers N] [--no-cache] [--json]
+"""
+from typing import Dict, Any, Optional, List, Tuple, Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+
+from .corpus import (
+    DEFAULT_LABEL_ROOT, INCIDENT_ID_KEYS, SHAPE_BASIC_QA, SHAPE_INCIDENT, SHAPE_OBSERVATION,
+    SHAPE_RESOURCE, content_hash, iter_label_files, label_shape
+)
+
+# Cache location; override with LABEL_VALIDATION_CACHE
+DEFAULT_CACHE_PATH = os.getenv(
+    "LABEL_VALIDATION_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "k8s-labeler", "validation.json")
+)
+
+# Below this many files the pool's startup cost outweighs the parallelism
+MIN_PARALLEL_FILES = 64
+CHUNK_SIZE = 256
+
+RFC3339 = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:\d{2})$")
+DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+K8S_VERSION = re.compile(r"^v?\d+\.\d+(\.\d+)?$")
+# Prefix and hour, with a short hash when generated by a rule
+OBSERVATION_ID = re.compile(r"^[a-z]+-\d{10}(-[0-9a-f]{6})?$")
+SEVERITIES = ("critical", "high", "medium", "low", "info")
+DIFFICULTIES = ("basic", "intermediate", "advanced")
+
+@dataclass
+class FieldError:
+    """One schema violation, located by a dotted field path."""
+    field: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.field or '<root>'}: {self.message}"
+
+@dataclass
+class ValidationReport:
+    """Outcome of validating a set of label files."""
+    checked: int = 0
+    cached: int = 0
+    errors: Dict[str, List[FieldError]] = field(default_factory=dict)
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+# Schema nodes. They only describe the contract; compile_schema() turns them into
+# check functions of the form check(value, path, errors).
+
+@dataclass
+class Str:
+    min_length: int = 1
+    pattern: Optional["re.Pattern"] = None
+    choices: Optional[Tuple[str, ...]] = None
+
+@dataclass
+class Int:
+    minimum: Optional[int] = None
+
+@dataclass
+class Bool:
+    pass
+
+@dataclass
+class Anything:
+    pass
+
+@dataclass
+class ListOf:
+    items: Any
+    min_items: int = 0
+
+@dataclass
+class Obj:
+    fields: Dict[str, Any]
+    required: Tuple[str, ...] = ()
+
+@dataclass
+class OneOf:
+    options: Tuple[Any, ...]
+
+Check = Callable[[Any, str, List[FieldError]], None]
+
+def compile_schema(node: Any) -> Check:
+    """Compile a schema node into a check function."""
+    if isinstance(node, Str):
+        def check_str(value, path, errors):
+            if not isinstance(value, str):
+                errors.append(FieldError(path, f"expected string, got {type(value).__name__}"))
+            elif len(value.strip()) < node.min_length:
+                errors.append(FieldError(path, "must not be empty"))
+            elif node.pattern is not None and not node.pattern.match(value):
+                errors.append(FieldError(path, f"{value!r} does not match {node.pattern.pattern}"))
+            elif node.choices is not None and value not in node.choices:
+                errors.append(FieldError(path, f"{value!r} is not one of {', '.join(node.choices)}"))
+        return check_str
+
+    if isinstance(node, Int):
+        def check_int(value, path, errors):
+            if not isinstance(value, int) or isinstance(value, bool):
+                errors.append(FieldError(path, f"expected integer, got {type(value).__name__}"))
+            elif node.minimum is not None and value < node.minimum:
+                errors.append(FieldError(path, f"must be >= {node.minimum}"))
+        return check_int
+
+    if isinstance(node, Bool):
+        def check_bool(value, path, errors):
+            if not isinstance(value, bool):
+                errors.append(FieldError(path, f"expected boolean, got {type(value).__name__}"))
+        return check_bool
+
+    if isinstance(node, Anything):
+        return lambda value, path, errors: None
+
+    if isinstance(node, ListOf):
+        check_item = compile_schema(node.items)
+
+        def check_list(value, path, errors):
+            if not isinstance(value, list):
+                errors.append(FieldError(path, f"expected list, got {type(value).__name__}"))
+                return
+            if len(value) < node.min_items:
+                errors.append(FieldError(path, f"expected at least {node.min_items} item(s)"))
+            for index, item in enumerate(value):
+                check_item(item, f"{path}[{index}]", errors)
+        return check_list
+
+    if isinstance(node, Obj):
+        checks = [(name, compile_schema(child)) for name, child in node.fields.items()]
+        required = node.required
+
+        def check_obj(value, path, errors):
+            if not isinstance(value, dict):
+                errors.append(FieldError(path, f"expected object, got {type(value).__name__}"))
+                return
+            prefix = f"{path}." if path else ""
+            for name in required:
+                if name not in value:
+                    errors.append(FieldError(prefix + name, "is required"))
+            for name, check in checks:
+                if name in value:
+                    check(value[name], prefix + name, errors)
+        return check_obj
+
+    if isinstance(node, OneOf):
+        options = [compile_schema(option) for option in node.options]
+
+        def check_one_of(value, path, errors):
+            attempts = []
+            for option in options:
+                option_errors: List[FieldError] = []
+                option(value, path, option_errors)
+                if not option_errors:
+                    return
+                attempts.append(option_errors)
+            # Report the alternative that came closest
+            errors.extend(min(attempts, key=len))
+        return check_one_of
+
+    raise TypeError(f"Unknown schema node {node!r}")
+
+TEXT_OR_LIST = OneOf((Str(), ListOf(Str(), min_items=1)))
+
+METADATA = Obj(
+    {
+        "label_type": Str(),
+        "severity": Str(choices=SEVERITIES),
+        "component_type": Str(),
+        "environment": Str(),
+        "namespace": Str(),
+        "timestamp": Str(pattern=RFC3339),
+        "tags": ListOf(Str()),
+    },
+    required=("label_type", "severity", "component_type", "tags")
+)
+
+# Per-shape contracts, mirroring BaseLabel (id, question, timestamp) and the
+# label structs in pkg/types as they are actually written in training-data
+SCHEMAS = {
+    SHAPE_BASIC_QA: Obj(
+        {
+            "question": Str(),
+            "category": Str(),
+            "answer": Obj({"command": Str(), "explanation": Str()}, required=("command", "explanation")),
+            "tool_call": Obj({"type": Str(), "command": Str()}, required=("type", "command")),
+            "related_commands": ListOf(Str()),
+            "difficulty_level": Str(choices=DIFFICULTIES),
+            "prerequisites": ListOf(Str()),
+        },
+        required=("question", "category", "answer")
+    ),
+    SHAPE_OBSERVATION: Obj(
+        {
+            "perf_observation": Str(pattern=OBSERVATION_ID),
+            "question": Str(),
+            "timestamp": Str(pattern=RFC3339),
+            "environment": Obj(
+                {"cluster_type": Str(), "k8s_version": Str(pattern=K8S_VERSION), "node_count": Int(minimum=1)},
+                required=("k8s_version",)
+            ),
+            "context": Obj({}),
+            "metrics": Obj({}),
+            "analysis": Obj(
+                {"root_cause": TEXT_OR_LIST, "evidence": TEXT_OR_LIST, "impact": Anything()},
+                required=("root_cause",)
+            ),
+            "resolution": Obj({}),
+            "prevention": Anything(),
+            "metadata": METADATA,
+        },
+        required=("perf_observation", "timestamp", "environment", "context", "analysis", "resolution", "metadata")
+    ),
+    SHAPE_INCIDENT: Obj(
+        {
+            **{key: Str(pattern=re.compile(r"^[a-z]+-\d{10}$")) for key in INCIDENT_ID_KEYS},
+            "question": Str(),
+            "analysis": Obj({"root_cause": TEXT_OR_LIST, "evidence": Anything()}),
+            "resolution": Obj({"root_cause": TEXT_OR_LIST, "fix": Str()}),
+            "metadata": METADATA,
+        },
+        required=("question", "analysis", "metadata")
+    ),
+    SHAPE_RESOURCE: Obj(
+        {
+            "kind": Str(choices=("Label",)),
+            "apiVersion": Str(pattern=re.compile(r"^k8s-labeler\.io/v\d+((alpha|beta)\d+)?$")),
+            "metadata": Obj(
+                {
+                    "name": Str(pattern=re.compile(r"^[a-z0-9_\-]+$")),
+                    "namespace": Str(),
+                    "labels": Obj(
+                        {"type": Str(), "component": Str(), "severity": Str(choices=SEVERITIES), "category": Str()},
+                        required=("type", "component", "severity")
+                    ),
+                },
+                required=("name", "labels")
+            ),
+            "spec": Obj(
+                {
+                    "issue": Obj({"title": Str(), "description": Str()}, required=("title", "description")),
+                    "metadata": Obj({"creation_date": Str(pattern=DATE), "last_updated": Str(pattern=DATE)}),
+                },
+                required=("issue",)
+            ),
+        },
+        required=("kind", "apiVersion", "metadata", "spec")
+    ),
+}
+
+# Compiled once per process
+COMPILED = {shape: compile_schema(schema) for shape, schema in SCHEMAS.items()}
+
+# Bump when _check_cross_field changes; schema edits are picked up automatically
+RULES_VERSION = 1
+
+# Changes whenever the rules do, invalidating cached results
+SCHEMA_FINGERPRINT = hashlib.blake2b(
+    f"{RULES_VERSION}:{sorted(SCHEMAS.items())!r}".encode(), digest_size=8
+).hexdigest()
+
+def validate_label(data: Any, relative_path: str = "") -> List[FieldError]:
+    """Validate one parsed label document."""
+    if not isinstance(data, dict):
+        return [FieldError("", f"expected a JSON object, got {type(data).__name__}")]
+    try:
+        shape = label_shape(data)
+    except ValueError as e:
+        return [FieldError("", str(e))]
+
+    errors: List[FieldError] = []
+    COMPILED[shape](data, "", errors)
+    _check_cross_field(shape, data, relative_path, errors)
+    return errors
+
+def validate_content(content: bytes, relative_path: str = "") -> List[FieldError]:
+    """Parse and validate the raw bytes of a label file."""
+    try:
+        data = json.loads(content)
+    except ValueError as e:
+        return [FieldError("", f"invalid JSON: {e}")]
+    return validate_label(data, relative_path)
+
+def _check_cross_field(shape: str, data: Dict[str, Any], relative_path: str, errors: List[FieldError]) -> None:
+    """Rules that span several fields and cannot be expressed per field."""
+    if shape == SHAPE_INCIDENT:
+        present = [key for key in INCIDENT_ID_KEYS if key in data]
+        if len(present) > 1:
+            errors.append(FieldError("", f"has several ID fields: {', '.join(present)}"))
+        analysis = data.get("analysis") if isinstance(data.get("analysis"), dict) else {}
+        resolution = data.get("resolution") if isinstance(data.get("resolution"), dict) else {}
+        if "root_cause" not in analysis and "root_cause" not in resolution:
+            errors.append(FieldError("analysis.root_cause", "is required (or resolution.root_cause)"))
+
+    if shape in (SHAPE_INCIDENT, SHAPE_OBSERVATION) and "/" in relative_path:
+        category = relative_path.split("/", 1)[0]
+        label_type = (data.get("metadata") or {}).get("label_type")
+        if isinstance(label_type, str) and label_type != category:
+            errors.append(FieldError("metadata.label_type", f"{label_type!r} does not match directory {category!r}"))
+
+def _validate_files(items: List[Tuple[str, str]]) -> List[Tuple[str, str, List[Tuple[str, str]]]]:
+    """Pool worker: read, hash and validate (path, relative path) pairs."""
+    results = []
+    for file_path, relative_path in items:
+        with open(file_path, "rb") as f:
+            content = f.read()
+        errors = validate_content(content, relative_path)
+        results.append((relative_path, content_hash(content), [(e.field, e.message) for e in errors]))
+    return results
+
+class LabelValidator:
+    """Validates label files incrementally, in parallel when it pays off."""
+
+    def __init__(
+        self,
+        root: str = DEFAULT_LABEL_ROOT,
+        cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+        workers: Optional[int] = None
+    ):
+        self.root = root
+        self.cache_path = cache_path
+        self.workers = workers or os.cpu_count() or 1
+        self._cache = self._load_cache()
+
+    def validate(self, paths: Optional[Iterable[str]] = None) -> ValidationReport:
+        """Validate the given files, or every label under root."""
+        report = ValidationReport()
+        by_hash: Dict[str, List[List[str]]] = self._cache["results"]
+        files: Dict[str, List[Any]] = self._cache["files"]
+
+        pending: List[Tuple[str, str]] = []
+        for file_path in (paths if paths is not None else iter_label_files(self.root)):
+            relative_path = os.path.relpath(file_path, self.root).replace(os.sep, "/")
+            report.checked += 1
+            stat = os.stat(file_path)
+            known = files.get(relative_path)
+            digest = None
+            if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+                digest = known[2]
+            else:
+                with open(file_path, "rb") as f:
+                    digest = content_hash(f.read())
+                files[relative_path] = [stat.st_mtime_ns, stat.st_size, digest]
+            # Path-dependent rules make the directory part of the cache key
+            key = f"{_category(relative_path)}:{digest}"
+            if key in by_hash:
+                report.cached += 1
+                self._record(report, relative_path, by_hash[key])
+            else:
+                pending.append((file_path, relative_path))
+
+        for relative_path, digest, errors in self._run(pending):
+            by_hash[f"{_category(relative_path)}:{digest}"] = errors
+            self._record(report, relative_path, errors)
+        self._save_cache()
+        return report
+
+    def _run(self, pending: List[Tuple[str, str]]) -> Iterable[Tuple[str, str, List[Tuple[str, str]]]]:
+        if len(pending) < MIN_PARALLEL_FILES or self.workers == 1:
+            return _validate_files(pending)
+        chunks = [pending[i:i + CHUNK_SIZE] for i in range(0, len(pending), CHUNK_SIZE)]
+        results = []
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for chunk_results in pool.map(_validate_files, chunks):
+                results.extend(chunk_results)
+        return results
+
+    def _record(self, report: ValidationReport, relative_path: str, errors: List[Any]) -> None:
+        if errors:
+            report.errors[relative_path] = [FieldError(field_path, message) for field_path, message in errors]
+
+    def _load_cache(self) -> Dict[str, Any]:
+        empty = {"fingerprint": SCHEMA_FINGERPRINT, "files": {}, "results": {}}
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return empty
+        try:
+            with open(self.cache_path) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return empty
+        if cache.get("fingerprint") != SCHEMA_FINGERPRINT:
+            return empty
+        return cache
+
+    def _save_cache(self) -> None:
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        temporary = f"{self.cache_path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(self._cache, f, separators=(",", ":"))
+        os.replace(temporary, self.cache_path)
+
+def _category(relative_path: str) -> str:
+    return relative_path.split("/", 1)[0] if "/" in relative_path else ""
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="label files to check (default: every label under --root)")
+    parser.add_argument("--root", default=DEFAULT_LABEL_ROOT)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH)
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    validator = LabelValidator(args.root, None if args.no_cache else args.cache, args.workers)
+    report = validator.validate(args.paths or None)
+    if args.json:
+        print(json.dumps({
+            "checked": report.checked,
+            "cached": report.cached,
+            "errors": {path: [vars(e) for e in errors] for path, errors in report.errors.items()}
+        }, indent=2))
+    else:
+        for path, errors in sorted(report.errors.items()):
+            for error in errors:
+                print(f"{path}: {error}")
+        print(f"{report.checked} labels checked ({report.cached} cached), {len(report.errors)} invalid")
+    sys.exit(0 if report.valid else 1)
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,26 @@
 #!/usr/bin/env python3
-from typing import Dict, Any, Optional
-import requests
-from langchain_core.tools import tool
+from typing import Dict, Any, Optional, List
+import time
+
+from ..common import result_store as results
+from ..common.kubectl import KubectlClient
+from ..common.lazy import lazy_attributes, lazy_tool, resolve_tools
+from .prometheus import PrometheusError, Series, parse_duration, prometheus_client, series_name
+
+# Series listed per query in tool output
+MAX_SERIES_SHOWN = 50
 
 class ObservabilityTool:
     """Tool for executing observability-related commands."""
     def __init__(self, api_url: str = "http://localhost:8000"):
         self.api_url = api_url
+        self.kubectl = KubectlClient(api_url)
 
     def execute_kubectl(self, command: str, namespace: Optional[str] = None) -> Dict[str, Any]:
         """Execute a kubectl command through the API."""
-        try:
-            response = requests.post(
-                f"{self.api_url}/execute",
-                json={
-                    "command": command,
-                    "namespace": namespace
-                },
-                timeout=30
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            return {"error": str(e)}
-
-@tool("get_prometheus_metrics")
+        return self.kubectl.execute(command, namespace)
+
+@lazy_tool("get_prometheus_metrics")
 def get_prometheus_metrics(namespace: str = "monitoring") -> str:
     """Get Prometheus metrics endpoints and targets."""
     tool = ObservabilityTool()
@@ -42,7 +38,65 @@ def get_prometheus_metrics(namespace: str = "monitoring") -> str:
     
     return "\n".join(output) or "Failed to get Prometheus metrics"
 
-@tool("get_grafana_dashboards")
+@lazy_tool("query_prometheus")
+def query_prometheus(query: str, time_offset: str = "0s") -> str:
+    """Run an instant PromQL query, optionally evaluated time_offset (e.g. "15m") ago."""
+    try:
+        series = prometheus_client.query(query, time.time() - parse_duration(time_offset))
+    except (PrometheusError, ValueError) as e:
+        return f"Prometheus query failed: {e}"
+    if not series:
+        return f"No data for {query}"
+
+    series.sort(key=lambda item: item["value"][1], reverse=True)
+    lines = [f"{series_name(item['metric'])} {_format_value(item['value'][1])}" for item in series]
+    return results.compact_output("\n".join(lines), f"promql {query}")
+
+@lazy_tool("query_prometheus_range")
+def query_prometheus_range(query: str, minutes: int = 60, step: str = "1m") -> str:
+    """Run a PromQL range query over the last minutes and summarize each series."""
+    end = time.time()
+    try:
+        series = prometheus_client.query_range(query, end - minutes * 60, end, step)
+    except (PrometheusError, ValueError) as e:
+        return f"Prometheus query failed: {e}"
+    if not series:
+        return f"No data for {query} over the last {minutes}m"
+    return results.compact_output("\n".join(_summarize_series(series)), f"promql range {query}")
+
+@lazy_tool("get_performance_metrics")
+def get_performance_metrics(namespace: Optional[str] = None, minutes: int = 30, step: str = "1m") -> str:
+    """Get node and pod CPU/memory and API server latency and errors over the last minutes."""
+    selector = f', namespace="{namespace}"' if namespace else ""
+    queries = {
+        "Node CPU utilization": '1 - avg by (instance) (rate(node_cpu_seconds_total{mode="idle"}[5m]))',
+        "Node memory utilization": "1 - node_memory_MemAvailable_bytes / node_memory_MemTotal_bytes",
+        "Pod CPU cores (top 10)": (
+            f'topk(10, sum by (namespace, pod) (rate(container_cpu_usage_seconds_total{{container!=""{selector}}}[5m])))'
+        ),
+        "Pod memory working set bytes (top 10)": (
+            f'topk(10, sum by (namespace, pod) (container_memory_working_set_bytes{{container!=""{selector}}}))'
+        ),
+        "API server p99 latency seconds": (
+            "histogram_quantile(0.99, sum by (le, verb) (rate(apiserver_request_duration_seconds_bucket[5m])))"
+        ),
+        "API server 5xx ratio": (
+            'sum(rate(apiserver_request_total{code=~"5.."}[5m])) / sum(rate(apiserver_request_total[5m]))'
+        )
+    }
+    end = time.time()
+    try:
+        answers = prometheus_client.query_range_many(queries, end - minutes * 60, end, step)
+    except (PrometheusError, ValueError) as e:
+        return f"Prometheus query failed: {e}"
+
+    output = []
+    for title, series in answers.items():
+        output.append(f"=== {title} (last {minutes}m) ===")
+        output.extend(_summarize_series(series) or ["no data"])
+    return results.compact_output("\n".join(output), "performance metrics")
+
+@lazy_tool("get_grafana_dashboards")
 def get_grafana_dashboards(namespace: str = "monitoring") -> str:
     """Get Grafana dashboards and status."""
     tool = ObservabilityTool()
@@ -60,7 +114,7 @@ def get_grafana_dashboards(namespace: str = "monitoring") -> str:
     
     return "\n".join(output) or "Failed to get Grafana information"
 
-@tool("get_jaeger_traces")
+@lazy_tool("get_jaeger_traces")
 def get_jaeger_traces(namespace: str = "observability") -> str:
     """Get Jaeger tracing information."""
     tool = ObservabilityTool()
@@ -78,7 +132,7 @@ def get_jaeger_traces(namespace: str = "observability") -> str:
     
     return "\n".join(output) or "Failed to get Jaeger information"
 
-@tool("get_application_logs")
+@lazy_tool("get_application_logs")
 def get_application_logs(app_label: str, namespace: Optional[str] = None) -> str:
     """Get logs from all pods with a specific app label."""
     tool = ObservabilityTool()
@@ -102,12 +156,42 @@ def get_application_logs(app_label: str, namespace: Optional[str] = None) -> str
             output.append(f"=== Logs from {pod_name} ===")
             output.append(logs_result["output"])
     
-    return "\n".join(output) or f"No logs found for app={app_label}"
-
-# Create the tools list
-observability_tools = [
-    get_prometheus_metrics,
-    get_grafana_dashboards,
-    get_jaeger_traces,
-    get_application_logs
-] 
\ No newline at end of file
+    if not output:
+        return f"No logs found for app={app_label}"
+    return results.compact_output("\n".join(output), f"logs app={app_label}")
+
+def _summarize_series(series: List[Series]) -> List[str]:
+    """One line per series with its last, min, average and max value, highest last value first."""
+    lines = []
+    for item in series:
+        values = [value for _, value in item["values"] if value == value]
+        if not values:
+            continue
+        lines.append((values[-1], (
+            f"{series_name(item['metric'])} last={_format_value(values[-1])} "
+            f"min={_format_value(min(values))} avg={_format_value(sum(values) / len(values))} "
+            f"max={_format_value(max(values))} points={len(values)}"
+        )))
+    lines.sort(key=lambda line: line[0], reverse=True)
+    shown = [line for _, line in lines[:MAX_SERIES_SHOWN]]
+    if len(lines) > MAX_SERIES_SHOWN:
+        shown.append(f"... {len(lines) - MAX_SERIES_SHOWN} more series")
+    return shown
+
+def _format_value(value: float) -> str:
+    return f"{value:.4g}"
+
+# Tool list is built on first use
+__getattr__ = lazy_attributes(
+    __name__,
+    observability_tools=lambda module: resolve_tools([
+        module.get_prometheus_metrics,
+        module.query_prometheus,
+        module.query_prometheus_range,
+        module.get_performance_metrics,
+        module.get_grafana_dashboards,
+        module.get_jaeger_traces,
+        module.get_application_logs,
+        *results.result_tools
+    ])
+)
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""Prometheus HTTP API client with range batching and a step-aligned cache.
+
+Range queries have their start and end aligned down to a multiple of the
+step, so the same expression asked again a minute later evaluates at the
+same timestamps as before. Points older than CACHE_SETTLE_SECONDS are
+treated as immutable and cached per (expression, step) as one contiguous
+covered range; an overlapping query only fetches what lies outside it,
+typically the newest few steps.
+
+Several expressions over the same range are sent as one query: each is
+wrapped in label_replace() with a distinct __query__ label and the results
+are joined with `or`, then split apart again. Expressions that cannot be
+combined (e.g. scalars) fall back to one query each.
+"""
+from typing import Dict, Any, Optional, List, Tuple, Union
+from collections import OrderedDict
+import math
+import os
+import re
+import threading
+import time
+import requests
+
+from ..common import cassette
+
+PROMETHEUS_URL = os.getenv("PROMETHEUS_URL", "http://localhost:30090")
+# Points at least this old are not expected to change any more
+CACHE_SETTLE_SECONDS = float(os.getenv("PROMETHEUS_CACHE_SETTLE", "120"))
+CACHE_MAX_POINTS = int(os.getenv("PROMETHEUS_CACHE_MAX_POINTS", "2000000"))
+# Expressions combined into one range query
+MAX_BATCH = 20
+# Upper bound on points per series Prometheus accepts in one range query
+MAX_POINTS_PER_QUERY = 11000
+BATCH_LABEL = "__query__"
+
+DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h|d|w|y)")
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800, "y": 31536000}
+
+Series = Dict[str, Any]
+
+class PrometheusError(RuntimeError):
+    """A query Prometheus rejected or could not be reached for."""
+
+def parse_duration(value: Union[str, float, int]) -> float:
+    """Seconds in a Prometheus duration such as "30s", "1m" or "1h30m"."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = DURATION_PATTERN.findall(value)
+    if not parts or "".join(number + unit for number, unit in parts) != value:
+        raise ValueError(f"Invalid duration {value!r}")
+    return sum(float(number) * DURATION_UNITS[unit] for number, unit in parts)
+
+def series_name(metric: Dict[str, str]) -> str:
+    """PromQL-style name of a series: name{label="value", ...}."""
+    labels = ", ".join(f'{key}="{value}"' for key, value in sorted(metric.items()) if key != "__name__")
+    return f"{metric.get('__name__', '')}{{{labels}}}"
+
+class _CachedRange:
+    """Settled points of one (expression, step) between start and end inclusive."""
+    __slots__ = ("start", "end", "series", "points")
+
+    def __init__(self, start: float, end: float):
+        self.start = start
+        self.end = end
+        # Sorted label items -> (metric, {timestamp: value})
+        self.series: Dict[Tuple, Tuple[Dict[str, str], Dict[float, float]]] = {}
+        self.points = 0
+
+    def add(self, results: List[Series], start: float, end: float) -> None:
+        for result in results:
+            metric = result["metric"]
+            entry = self.series.get(_series_key(metric))
+            if entry is None:
+                entry = self.series[_series_key(metric)] = (metric, {})
+            for timestamp, value in result["values"]:
+                if start <= timestamp <= end and timestamp not in entry[1]:
+                    entry[1][timestamp] = value
+                    self.points += 1
+
+    def window(self, start: float, end: float) -> List[Series]:
+        results = []
+        for metric, points in self.series.values():
+            values = [[t, v] for t, v in points.items() if start <= t <= end]
+            if values:
+                results.append({"metric": metric, "values": values})
+        return results
+
+class PrometheusClient:
+    """Client for Prometheus' query API."""
+
+    def __init__(
+        self,
+        base_url: str = PROMETHEUS_URL,
+        timeout: float = 30,
+        cache_max_points: int = CACHE_MAX_POINTS,
+        settle_seconds: float = CACHE_SETTLE_SECONDS
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.cache_max_points = cache_max_points
+        self.settle_seconds = settle_seconds
+        self.session = requests.Session()
+        self.requests = 0
+        self.points_fetched = 0
+        self.points_cached = 0
+        self._cache: "OrderedDict[Tuple[str, float], _CachedRange]" = OrderedDict()
+        self._cached_points = 0
+        self._lock = threading.Lock()
+
+    def query(self, expr: str, at: Optional[float] = None) -> List[Series]:
+        """Instant query; each result has metric and value [timestamp, float]."""
+        params: Dict[str, Any] = {"query": expr}
+        if at is not None:
+            params["time"] = at
+        data = self._request("/api/v1/query", params)
+        if data["resultType"] in ("scalar", "string"):
+            timestamp, value = data["result"]
+            return [{"metric": {}, "value": [timestamp, _float(value)]}]
+        return [
+            {"metric": result["metric"], "value": [result["value"][0], _float(result["value"][1])]}
+            for result in data["result"]
+        ]
+
+    def query_range(self, expr: str, start: float, end: float, step: Union[str, float]) -> List[Series]:
+        """Range query over step-aligned [start, end]; each result has metric and values."""
+        return self.query_range_many({expr: expr}, start, end, step)[expr]
+
+    def query_range_many(
+        self, queries: Dict[str, str], start: float, end: float, step: Union[str, float]
+    ) -> Dict[str, List[Series]]:
+        """Range queries for several named expressions, batched and served from cache where possible."""
+        step = parse_duration(step)
+        if step <= 0:
+            raise ValueError("step must be positive")
+        start = math.floor(start / step) * step
+        end = math.floor(end / step) * step
+        if end < start:
+            end = start
+        settled = math.floor((time.time() - self.settle_seconds) / step) * step
+
+        # Ranges each expression still needs, grouped so equal plans share one request
+        plans: Dict[Tuple[Tuple[float, float], ...], List[str]] = {}
+        snapshots: Dict[str, Optional[_CachedRange]] = {}
+        with self._lock:
+            for name, expr in queries.items():
+                pieces, snapshots[name] = self._plan(expr, step, start, end)
+                plans.setdefault(pieces, []).append(name)
+
+        fetched: Dict[str, List[Tuple[float, float, List[Series]]]] = {name: [] for name in queries}
+        for pieces, names in plans.items():
+            for first in range(0, len(names), MAX_BATCH):
+                batch = names[first:first + MAX_BATCH]
+                for piece_start, piece_end in pieces:
+                    for name, results in self._fetch(
+                        {name: queries[name] for name in batch}, piece_start, piece_end, step
+                    ).items():
+                        fetched[name].append((piece_start, piece_end, results))
+
+        answers = {}
+        with self._lock:
+            for name, expr in queries.items():
+                answers[name] = self._merge(expr, step, start, end, settled, snapshots[name], fetched[name])
+            self._evict()
+        return answers
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "points_fetched": self.points_fetched,
+            "points_from_cache": self.points_cached,
+            "cached_queries": len(self._cache),
+            "cached_points": self._cached_points
+        }
+
+    def _plan(
+        self, expr: str, step: float, start: float, end: float
+    ) -> Tuple[Tuple[Tuple[float, float], ...], Optional[_CachedRange]]:
+        """Sub-ranges of [start, end] to fetch, and the cached range covering the rest."""
+        cached = self._cache.get((expr, step))
+        if cached is None or not _adjacent(cached, start, end, step):
+            return ((start, end),), None
+        pieces = []
+        if start < cached.start:
+            pieces.append((start, cached.start - step))
+        if end > cached.end:
+            pieces.append((cached.end + step, end))
+        return tuple(pieces), cached
+
+    def _fetch(self, queries: Dict[str, str], start: float, end: float, step: float) -> Dict[str, List[Series]]:
+        """Fetch [start, end] for several expressions, in as few requests as possible."""
+        results: Dict[str, List[Series]] = {name: [] for name in queries}
+        # Prometheus caps the points per series of one query
+        span = (MAX_POINTS_PER_QUERY - 1) * step
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(end, chunk_start + span)
+            if len(queries) == 1:
+                (name, expr), = queries.items()
+                results[name].extend(self._query_range(expr, chunk_start, chunk_end, step))
+            else:
+                names = list(queries)
+                combined = " or ".join(
+                    f'label_replace({queries[name]}, "{BATCH_LABEL}", "{index}", "", "")'
+                    for index, name in enumerate(names)
+                )
+                try:
+                    for result in self._query_range(combined, chunk_start, chunk_end, step):
+                        metric = dict(result["metric"])
+                        index = int(metric.pop(BATCH_LABEL))
+                        results[names[index]].append({"metric": metric, "values": result["values"]})
+                except PrometheusError:
+                    # Some expression is not an instant vector; ask for each separately
+                    for name, expr in queries.items():
+                        results[name].extend(self._query_range(expr, chunk_start, chunk_end, step))
+            chunk_start = chunk_end + step
+        return results
+
+    def _query_range(self, expr: str, start: float, end: float, step: float) -> List[Series]:
+        data = self._request("/api/v1/query_range", {"query": expr, "start": start, "end": end, "step": step})
+        if data["resultType"] != "matrix":
+            raise PrometheusError(f"Expected a matrix result, got {data['resultType']}")
+        results = [
+            {"metric": result["metric"], "values": [[t, _float(v)] for t, v in result["values"]]}
+            for result in data["result"]
+        ]
+        self.points_fetched += sum(len(result["values"]) for result in results)
+        return results
+
+    def _merge(
+        self,
+        expr: str,
+        step: float,
+        start: float,
+        end: float,
+        settled: float,
+        snapshot: Optional[_CachedRange],
+        fetched: List[Tuple[float, float, List[Series]]]
+    ) -> List[Series]:
+        """Combine cached and fetched points for [start, end] and cache the settled ones."""
+        answer = _CachedRange(start, end)
+        if snapshot is not None:
+            answer.add(snapshot.window(start, end), start, end)
+            self.points_cached += answer.points
+        for _, _, results in fetched:
+            answer.add(results, start, end)
+
+        key = (expr, step)
+        if start <= settled:
+            cached = self._cache.get(key)
+            if cached is not None and snapshot is None and not _adjacent(cached, start, end, step) and start > cached.end:
+                # A newer window than the cached one replaces it
+                self._drop(key)
+                cached = None
+            # Only extend the range the plan was made against; if it changed meanwhile, skip caching
+            if cached is snapshot:
+                if cached is None:
+                    cached = self._cache[key] = _CachedRange(start, start - step)
+                self._cache.move_to_end(key)
+                before = cached.points
+                for piece_start, piece_end, results in fetched:
+                    piece_end = min(piece_end, settled)
+                    if piece_start > piece_end:
+                        continue
+                    cached.add(results, piece_start, piece_end)
+                    cached.start = min(cached.start, piece_start)
+                    cached.end = max(cached.end, piece_end)
+                self._cached_points += cached.points - before
+
+        return [
+            {"metric": metric, "values": [[t, points[t]] for t in sorted(points)]}
+            for metric, points in answer.series.values()
+        ]
+
+    def _drop(self, key: Tuple[str, float]) -> None:
+        cached = self._cache.pop(key, None)
+        if cached is not None:
+            self._cached_points -= cached.points
+
+    def _evict(self) -> None:
+        while self._cache and self._cached_points > self.cache_max_points:
+            _, cached = self._cache.popitem(last=False)
+            self._cached_points -= cached.points
+
+    def _request(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        def live() -> Dict[str, Any]:
+            # POST keeps long batched expressions out of the URL
+            response = self.session.post(f"{self.base_url}{path}", data=params, timeout=self.timeout)
+            body = response.json()
+            if response.status_code >= 400 or body.get("status") != "success":
+                raise PrometheusError(body.get("error") or f"HTTP {response.status_code}")
+            return body["data"]
+
+        self.requests += 1
+        try:
+            return cassette.through("prometheus", {"path": path, "params": params}, live)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise PrometheusError(str(e)) from e
+        except cassette.CassetteError as e:
+            raise PrometheusError(str(e)) from e
+
+def _adjacent(cached: _CachedRange, start: float, end: float, step: float) -> bool:
+    """Whether [start, end] overlaps or touches the cached range."""
+    return start <= cached.end + step and end >= cached.start - step
+
+def _series_key(metric: Dict[str, str]) -> Tuple:
+    return tuple(sorted(metric.items()))
+
+def _float(value: Any) -> float:
+    # Prometheus encodes sample values as strings, including "NaN" and "+Inf"
+    return float(value)
+
+# Shared client for all agents in this process, so the cache is reused across tool calls
+prometheus_client = PrometheusClient()
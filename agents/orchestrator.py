@@ -1,37 +1,49 @@
 #!/usr/bin/env python3
-from typing import Dict, List, Tuple, Any, Annotated
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
-from langchain_anthropic import ChatAnthropic
-from langchain.agents import AgentExecutor, create_openai_tools_agent
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.output_parsers import StrOutputParser
-from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolExecutor
+from typing import Dict, List, Tuple, Any, Annotated, TYPE_CHECKING
+from functools import lru_cache
 import os
+import sys
 from dotenv import load_dotenv
 
-# Import our agent tools
-from k8s.agent import k8s_tools
-from observability.agent import observability_tools
+# Allow running this file directly; the agent packages use relative imports
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if TYPE_CHECKING:
+    # langchain, langgraph and anthropic are imported on first use
+    from langchain.agents import AgentExecutor
+    from langchain_core.language_models import BaseChatModel
+    from langchain_core.messages import BaseMessage
+    from langgraph.graph import StateGraph
 
 # Load environment variables
 load_dotenv()
 
-# Initialize the LLM
-llm = ChatAnthropic(
-    model="claude-3-sonnet-20240307",
-    anthropic_api_key=os.getenv("ANTHROPIC_API_KEY"),
-    temperature=0
-)
+# Run the tool calls of one model turn concurrently (agents.common.parallel_executor)
+PARALLEL_TOOL_CALLS = os.getenv("PARALLEL_TOOL_CALLS", "1") != "0"
+
+@lru_cache(maxsize=None)
+def get_llm() -> "BaseChatModel":
+    """Initialize the LLM on first use."""
+    from langchain_anthropic import ChatAnthropic
+
+    return ChatAnthropic(
+        model="claude-3-sonnet-20240307",
+        anthropic_api_key=os.getenv("ANTHROPIC_API_KEY"),
+        temperature=0
+    )
 
 class AgentState(dict):
     """State object for the multi-agent system."""
-    messages: List[BaseMessage]
+    messages: List["BaseMessage"]
     current_agent: str
     context: Dict[str, Any]
 
-def create_agent_executor(name: str, tools: List[Any]) -> AgentExecutor:
-    """Create an agent executor with specific tools."""
+def create_agent_executor(name: str, tools: List[Any], parallel: bool = PARALLEL_TOOL_CALLS) -> "AgentExecutor":
+    """Create an agent executor with specific tools; with parallel, tool calls of one turn run concurrently."""
+    from langchain.agents import AgentExecutor, create_openai_tools_agent
+    from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
     prompt = ChatPromptTemplate.from_messages([
         ("system", f"""You are the {name} agent, specialized in {name}-related tasks in a Kubernetes environment.
 You have access to the following tools:
@@ -44,7 +56,10 @@ If you encounter errors, explain them in user-friendly terms."""),
         MessagesPlaceholder(variable_name="agent_scratchpad"),
     ])
     
-    agent = create_openai_tools_agent(llm, tools, prompt)
+    agent = create_openai_tools_agent(get_llm(), tools, prompt)
+    if parallel:
+        from agents.common.parallel_executor import ParallelAgentExecutor
+        return ParallelAgentExecutor(agent=agent, tools=tools)
     return AgentExecutor(agent=agent, tools=tools)
 
 def route_to_agent(state: AgentState) -> str:
@@ -64,8 +79,14 @@ def route_to_agent(state: AgentState) -> str:
     else:
         return "k8s"  # Default to k8s agent
 
-def setup_multi_agent_system() -> StateGraph:
+def setup_multi_agent_system() -> "StateGraph":
     """Set up the multi-agent system with LangGraph."""
+    from langgraph.graph import StateGraph, END
+
+    # Import our agent tools
+    from agents.k8s.agent import k8s_tools
+    from agents.observability.agent import observability_tools
+
     # Initialize tools for each agent
     security_tools = []  # TODO: Add security tools
     deployment_tools = []  # TODO: Add deployment tools
@@ -105,6 +126,8 @@ def setup_multi_agent_system() -> StateGraph:
 
 def main():
     """Main function to run the multi-agent system."""
+    from langchain_core.messages import HumanMessage
+
     workflow = setup_multi_agent_system()
     app = workflow.compile()
     
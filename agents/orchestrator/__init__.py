@@ -0,0 +1 @@
+"""Orchestrator agent coordinating the specialized agents."""
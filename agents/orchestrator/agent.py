@@ -1,23 +1,61 @@
 #!/usr/bin/env python3
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Dict, List, Tuple, Any, Optional, TYPE_CHECKING
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
 from dataclasses import dataclass
+from functools import cached_property
 from uuid import uuid4
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
-from langchain_anthropic import ChatAnthropic
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.output_parsers import JsonOutputParser
-from langgraph.graph import StateGraph, END
+import contextvars
 import json
 import os
+import threading
+import time
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 
+from ..common.concurrency import api_server_limiter_from_env
+from ..common.kubectl import KubectlClient
+from ..common.lazy import lazy_attributes
 from ..k8s.agent import K8sControlPlaneAgent
 from ..tracing.agent import TracingAgent, TraceRequest
 
+if TYPE_CHECKING:
+    # langchain and anthropic are imported on first use
+    from langchain_core.language_models import BaseChatModel
+    from langchain_core.prompts import ChatPromptTemplate
+    from ..labels.retrieval import LabelIndex
+    from ..observability.prometheus import PrometheusClient
+    from .fleet import Cluster, ClusterRegistry
+
 # Load environment variables
 load_dotenv()
 
+# Past incidents attached to a health analysis, and the minimum cosine similarity
+SIMILAR_INCIDENTS_LIMIT = int(os.getenv("SIMILAR_INCIDENTS_LIMIT", "3"))
+SIMILAR_INCIDENTS_MIN_SCORE = float(os.getenv("SIMILAR_INCIDENTS_MIN_SCORE", "0.05"))
+# Correlated causes reported per analysis, and the longest lead time considered
+MAX_CORRELATED_ISSUES = 5
+CORRELATION_MAX_LAG_SECONDS = float(os.getenv("CORRELATION_MAX_LAG_SECONDS", "300"))
+
+# Control-plane series fetched from Prometheus for correlation
+CONTROL_PLANE_QUERIES = {
+    "apiserver.latency_p99": (
+        'histogram_quantile(0.99, sum by (le) (rate(apiserver_request_duration_seconds_bucket{verb!~"WATCH|CONNECT"}[1m])))'
+    ),
+    "apiserver.errors_per_second": 'sum(rate(apiserver_request_total{code=~"5.."}[1m]))',
+    "etcd.request_latency_p99": "histogram_quantile(0.99, sum by (le) (rate(etcd_request_duration_seconds_bucket[1m])))",
+    "scheduler.unschedulable_per_second": 'sum(rate(scheduler_schedule_attempts_total{result="unschedulable"}[1m]))'
+}
+# Issue type of a cause series, by name prefix; the types drive the recommendations
+CAUSE_TYPES = (
+    ("scheduler.", "scheduling_impact"),
+    ("control_plane.kube-scheduler", "scheduling_impact"),
+    ("apiserver.", "api_server_latency_impact"),
+    ("control_plane.kube-apiserver", "api_server_latency_impact"),
+    ("etcd.", "etcd_impact"),
+    ("control_plane.etcd", "etcd_impact"),
+    ("trace.", "dependency_impact")
+)
+
 @dataclass
 class Entity:
     """Represents an identified entity in user input."""
@@ -47,20 +85,76 @@ class AnalysisRequest:
 class OrchestratorAgent:
     """Agent for coordinating between K8s Control Plane and Tracing agents."""
     
-    def __init__(self):
-        self.k8s_agent = K8sControlPlaneAgent()
-        self.tracing_agent = TracingAgent()
-        self.llm = ChatAnthropic(
+    def __init__(self, cluster: Optional["Cluster"] = None, registry: Optional["ClusterRegistry"] = None):
+        self.cluster = cluster
+        if cluster is None:
+            self.k8s_agent = K8sControlPlaneAgent()
+            self.tracing_agent = TracingAgent()
+        else:
+            # Each cluster has its own connection pools and API server limiter
+            timeout = min(30.0, cluster.deadline)
+            kubectl = KubectlClient(cluster.api_url, api_server_limiter_from_env(), timeout)
+            self.k8s_agent = K8sControlPlaneAgent(cluster.api_url, kubectl)
+            self.tracing_agent = TracingAgent(
+                cluster.jaeger_url, cluster.api_url, kubectl, None if cluster.local else cluster.name, timeout
+            )
+        self._registry = registry
+        self._cluster_agents: Dict[str, "OrchestratorAgent"] = {}
+        self._cluster_lock = threading.Lock()
+
+    @cached_property
+    def registry(self) -> "ClusterRegistry":
+        """Clusters of the fleet, from CLUSTER_REGISTRY unless given."""
+        from .fleet import ClusterRegistry
+        return self._registry or ClusterRegistry.load()
+
+    @cached_property
+    def prometheus(self) -> Optional["PrometheusClient"]:
+        """Prometheus of this agent's cluster; None for a remote cluster without one."""
+        from ..observability.prometheus import PrometheusClient, prometheus_client
+
+        if self.cluster is None or (self.cluster.local and not self.cluster.prometheus_url):
+            return prometheus_client
+        if not self.cluster.prometheus_url:
+            return None
+        return PrometheusClient(self.cluster.prometheus_url, timeout=min(30.0, self.cluster.deadline))
+
+    @cached_property
+    def llm(self) -> "BaseChatModel":
+        """LLM client, created on first use."""
+        from langchain_anthropic import ChatAnthropic
+
+        return ChatAnthropic(
             model="claude-3-sonnet-20240307",
             anthropic_api_key=os.getenv("ANTHROPIC_API_KEY"),
             temperature=0
         )
-        self.entity_classifier = self._create_entity_classifier()
-        self.cot_reasoner = self._create_cot_reasoner()
-        self.result_synthesizer = self._create_result_synthesizer()
 
-    def _create_entity_classifier(self) -> ChatPromptTemplate:
+    @cached_property
+    def incident_index(self) -> "LabelIndex":
+        """TF-IDF index over labeled past incidents in training-data."""
+        from ..labels.retrieval import incident_index
+        return incident_index()
+
+    @cached_property
+    def entity_classifier(self) -> "ChatPromptTemplate":
+        """Entity classifier prompt, created on first use."""
+        return self._create_entity_classifier()
+
+    @cached_property
+    def cot_reasoner(self) -> "ChatPromptTemplate":
+        """Chain of thought prompt, created on first use."""
+        return self._create_cot_reasoner()
+
+    @cached_property
+    def result_synthesizer(self) -> "ChatPromptTemplate":
+        """Result synthesis prompt, created on first use."""
+        return self._create_result_synthesizer()
+
+    def _create_entity_classifier(self) -> "ChatPromptTemplate":
         """Creates the entity classifier prompt."""
+        from langchain_core.prompts import ChatPromptTemplate
+
         return ChatPromptTemplate.from_messages([
             ("system", """You are an entity classifier for Kubernetes operations.
 Identify entities in user queries and classify them with high precision.
@@ -80,8 +174,10 @@ Output JSON format:
             ("user", "{input}"),
         ])
 
-    def _create_cot_reasoner(self) -> ChatPromptTemplate:
+    def _create_cot_reasoner(self) -> "ChatPromptTemplate":
         """Creates the chain of thought reasoning prompt."""
+        from langchain_core.prompts import ChatPromptTemplate
+
         return ChatPromptTemplate.from_messages([
             ("system", """You are a reasoning engine for Kubernetes operations.
 Break down complex queries into logical steps and determine required actions.
@@ -102,8 +198,10 @@ Output JSON format:
             ("user", "Entities found: {entities}"),
         ])
 
-    def _create_result_synthesizer(self) -> ChatPromptTemplate:
+    def _create_result_synthesizer(self) -> "ChatPromptTemplate":
         """Creates the result synthesis prompt."""
+        from langchain_core.prompts import ChatPromptTemplate
+
         return ChatPromptTemplate.from_messages([
             ("system", """You are a result synthesizer for Kubernetes operations.
 Combine technical data into clear, actionable insights.
@@ -202,11 +300,104 @@ Output format: Natural language response that:
         Perform a comprehensive system health analysis using both K8s and tracing data.
         This is the main entry point for system analysis.
         """
+        analysis = self._analyze_cluster(request)
+
+        # Look up labeled past incidents resembling the findings
+        self._attach_similar_incidents(analysis, request)
+        
+        return analysis
+
+    def analyze_fleet_health(
+        self,
+        request: AnalysisRequest,
+        clusters: Optional[List[str]] = None,
+        details: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Run the control-plane and tracing analyses against every registered cluster (or the
+        named ones) concurrently, each within its deadline, and merge them into a cross-cluster
+        view that highlights outliers. With details, the full per-cluster analyses are included.
+        """
+        from .fleet import FLEET_CONCURRENCY, fleet_budget, merge_fleet
+
+        selected = self.registry.select(clusters)
+        workers = max(1, min(FLEET_CONCURRENCY, len(selected)))
+        budget = fleet_budget(selected, workers)
+        # Clusters queued behind hung ones are given up on past this point
+        fleet_deadline = time.perf_counter() + budget
+        started: Dict[str, float] = {}
+
+        def analyze(cluster: "Cluster") -> Dict[str, Any]:
+            started[cluster.name] = time.perf_counter()
+            return self._cluster_agent(cluster)._analyze_cluster(request)
+
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cluster")
+        try:
+            futures = {cluster.name: pool.submit(contextvars.copy_context().run, analyze, cluster) for cluster in selected}
+        finally:
+            # A cluster past its deadline is reported as such; its thread finishes in the background
+            pool.shutdown(wait=False)
+
+        analyses: Dict[str, Dict[str, Any]] = {}
+        failures: Dict[str, str] = {}
+        seconds: Dict[str, float] = {}
+        for cluster in selected:
+            try:
+                analyses[cluster.name] = self._await_cluster(futures[cluster.name], started, cluster, fleet_deadline)
+            except FutureTimeout:
+                if cluster.name in started:
+                    failures[cluster.name] = f"analysis exceeded its {cluster.deadline:g}s deadline"
+                else:
+                    futures[cluster.name].cancel()
+                    failures[cluster.name] = f"still queued when the fleet's {budget:g}s budget ran out"
+            except Exception as e:
+                failures[cluster.name] = f"{type(e).__name__}: {e}"
+            seconds[cluster.name] = round(time.perf_counter() - started.get(cluster.name, time.perf_counter()), 3)
+
+        view = merge_fleet(analyses, failures, {cluster.name: cluster for cluster in selected}, seconds)
+        if details:
+            view["analyses"] = analyses
+        return view
+
+    def _cluster_agent(self, cluster: "Cluster") -> "OrchestratorAgent":
+        """The orchestrator of one cluster, kept so its baselines, graph and caches carry over."""
+        with self._cluster_lock:
+            agent = self._cluster_agents.get(cluster.name)
+            if agent is None or agent.cluster != cluster:
+                agent = self._cluster_agents[cluster.name] = OrchestratorAgent(cluster)
+            return agent
+
+    def _await_cluster(
+        self,
+        future: Future,
+        started: Dict[str, float],
+        cluster: "Cluster",
+        fleet_deadline: float
+    ) -> Dict[str, Any]:
+        """The cluster's analysis; FutureTimeout once it has run longer than its deadline or is still queued at fleet_deadline."""
+        while True:
+            # Time spent queued behind other clusters only counts once the fleet's budget is spent
+            began = started.get(cluster.name)
+            now = time.perf_counter()
+            remaining = min(cluster.deadline, fleet_deadline - now) if began is None else began + cluster.deadline - now
+            try:
+                return future.result(timeout=max(remaining, 0))
+            except FutureTimeout:
+                began = started.get(cluster.name)
+                now = time.perf_counter()
+                if began is None and now >= fleet_deadline:
+                    raise
+                if began is not None and now - began >= cluster.deadline:
+                    raise
+
+    def _analyze_cluster(self, request: AnalysisRequest) -> Dict[str, Any]:
+        """Control-plane and tracing analysis of this agent's cluster, correlated."""
         analysis = {
             "timestamp": datetime.utcnow().isoformat(),
             "control_plane_status": None,
             "tracing_analysis": None,
             "correlated_issues": [],
+            "similar_incidents": [],
             "recommendations": []
         }
 
@@ -221,7 +412,7 @@ Output format: Natural language response that:
         # Correlate issues and generate recommendations
         if analysis["control_plane_status"] and analysis["tracing_analysis"]:
             self._correlate_issues(analysis)
-        
+
         return analysis
 
     def _analyze_control_plane(self) -> Dict[str, Any]:
@@ -276,6 +467,9 @@ Output format: Natural language response that:
         
         # Analyze traces
         trace_analysis = self.tracing_agent.analyze_service_traces(trace_request)
+
+        # Who is affected by this service, from the accumulated dependency graph
+        blast_radius = self.tracing_agent.get_blast_radius(request.service_name)
         
         analysis = {
             "service_health": {
@@ -284,7 +478,9 @@ Output format: Natural language response that:
                 "issues": []
             },
             "dependencies": dependencies,
+            "blast_radius": blast_radius,
             "latency_analysis": trace_analysis.get("latency_stats", {}),
+            "timeline": trace_analysis.get("timeline", {}),
             "error_analysis": trace_analysis.get("error_traces", []),
             "operation_stats": {}
         }
@@ -304,6 +500,10 @@ Output format: Natural language response that:
                 f"High error rate in dependency: {dep['source']} -> {dep['target']}"
                 for dep in dep_analysis["error_prone_dependencies"]
             ])
+        analysis["service_health"]["issues"].extend([
+            f"Errors propagate along {' -> '.join(path['path'])} (likely origin: {path['origin']})"
+            for path in blast_radius.get("error_paths", [])[:3]
+        ])
 
         return analysis
 
@@ -315,12 +515,70 @@ Output format: Natural language response that:
         if not control_plane or not tracing:
             return
 
-        # Correlation patterns to check
-        self._check_scheduling_impact(analysis)
-        self._check_api_server_impact(analysis)
-        self._check_etcd_impact(analysis)
+        if not self._rank_correlations(analysis):
+            # Too little time-series data to correlate; fall back to point-in-time checks
+            self._check_scheduling_impact(analysis)
+            self._check_api_server_impact(analysis)
+            self._check_etcd_impact(analysis)
         self._generate_recommendations(analysis)
 
+    def _rank_correlations(self, analysis: Dict[str, Any]) -> bool:
+        """Add the control-plane and dependency series that best lead the service's latency and errors.
+
+        Returns False when there are not enough aligned series to correlate.
+        """
+        from .correlation import rank_causes, series_from_store, series_from_timeline
+
+        tracing = analysis["tracing_analysis"]
+        timeline = tracing.get("timeline") or {}
+        service = tracing["service_health"]["name"]
+        step = timeline.get("step") or 0
+        if not step or service not in timeline.get("series", {}):
+            return False
+        start = timeline["start"]
+        bins = len(timeline["series"][service]["latency_ms"])
+        end = start + step * (bins - 1)
+
+        trace_series = series_from_timeline(timeline)
+        effect_prefix = f"trace.{service}."
+        effects = {name: series for name, series in trace_series.items() if name.startswith(effect_prefix)}
+        causes = {name: series for name, series in trace_series.items() if not name.startswith(effect_prefix)}
+        collector = self.k8s_agent.collector
+        if collector is not None:
+            causes.update(series_from_store(collector.store, start - CORRELATION_MAX_LAG_SECONDS))
+        causes.update(self._control_plane_series(start - CORRELATION_MAX_LAG_SECONDS, end, step))
+
+        ranked = rank_causes(causes, effects, start, end, step, CORRELATION_MAX_LAG_SECONDS)
+        if ranked is None:
+            return False
+        for candidate in ranked[:MAX_CORRELATED_ISSUES]:
+            lead = f"{candidate['lead_seconds']:.0f}s ahead" if candidate["lead_seconds"] else "at the same time"
+            analysis["correlated_issues"].append({
+                "type": next(
+                    (kind for prefix, kind in CAUSE_TYPES if candidate["cause"].startswith(prefix)),
+                    "control_plane_impact"
+                ),
+                "description": (
+                    f"{candidate['effect']} follows {candidate['cause']} "
+                    f"(r={candidate['correlation']:+.2f}, {lead})"
+                ),
+                "evidence": candidate
+            })
+        return True
+
+    def _control_plane_series(self, start: float, end: float, step: float) -> Dict[str, Any]:
+        """Control-plane range series from Prometheus, or none if it cannot be queried."""
+        from ..observability.prometheus import PrometheusError
+        from .correlation import series_from_prometheus
+
+        if self.prometheus is None:
+            return {}
+        try:
+            answers = self.prometheus.query_range_many(CONTROL_PLANE_QUERIES, start, end, step)
+        except (PrometheusError, ValueError):
+            return {}
+        return series_from_prometheus(answers)
+
     def _check_scheduling_impact(self, analysis: Dict[str, Any]) -> None:
         """Check for correlations between scheduling issues and service performance."""
         scheduler = analysis["control_plane_status"]["scheduler_analysis"]
@@ -352,7 +610,7 @@ Output format: Natural language response that:
                 "description": "Service latency may be affected by API server performance",
                 "evidence": {
                     "high_latency_endpoints": high_latency_endpoints,
-                    "service_p95_latency": tracing["latency_analysis"]["p95"]
+                    "service_p95_latency_ms": tracing["latency_analysis"]["p95"]
                 }
             })
 
@@ -373,7 +631,12 @@ Output format: Natural language response that:
 
     def _generate_recommendations(self, analysis: Dict[str, Any]) -> None:
         """Generate recommendations based on correlated issues."""
+        seen = set()
         for issue in analysis["correlated_issues"]:
+            # One recommendation per kind of issue, however many series point at it
+            if issue["type"] in seen:
+                continue
+            seen.add(issue["type"])
             if issue["type"] == "scheduling_impact":
                 analysis["recommendations"].append({
                     "priority": "high",
@@ -395,6 +658,13 @@ Output format: Natural language response that:
                     "details": "etcd problems are affecting overall system stability"
                 })
 
+            elif issue["type"] == "dependency_impact":
+                analysis["recommendations"].append({
+                    "priority": "medium",
+                    "action": f"Investigate {issue['evidence']['cause']}",
+                    "details": issue["description"]
+                })
+
         # Add general recommendations based on service health
         service_health = analysis["tracing_analysis"]["service_health"]
         if service_health["status"] == "critical":
@@ -404,8 +674,46 @@ Output format: Natural language response that:
                 "details": "Service is in critical state with multiple issues"
             })
 
-# Create the orchestrator instance
-orchestrator = OrchestratorAgent()
+    def _attach_similar_incidents(self, analysis: Dict[str, Any], request: AnalysisRequest) -> None:
+        """Attach the nearest labeled past incidents and their resolutions."""
+        findings = self._describe_findings(analysis)
+        if not findings:
+            return
+
+        matches = self.incident_index.search(
+            " ".join([request.service_name or "", *findings]),
+            k=SIMILAR_INCIDENTS_LIMIT,
+            min_score=SIMILAR_INCIDENTS_MIN_SCORE
+        )
+        analysis["similar_incidents"] = [vars(match) for match in matches]
+        for match in matches:
+            analysis["recommendations"].append({
+                "priority": "medium",
+                "action": f"Review resolution of similar past incident {match.label_id}",
+                "details": match.root_cause or match.question,
+                "resolution": match.resolution
+            })
+
+    def _describe_findings(self, analysis: Dict[str, Any]) -> List[str]:
+        """Collect the textual issues found by the health analysis."""
+        findings = []
+        control_plane = analysis.get("control_plane_status") or {}
+        findings.extend(str(issue) for issue in control_plane.get("critical_issues", []))
+
+        tracing = analysis.get("tracing_analysis") or {}
+        findings.extend(str(issue) for issue in tracing.get("service_health", {}).get("issues", []))
+        findings.extend(
+            f"{error.get('service', '')} {error.get('operation', '')} {error.get('error_type', '')} {error.get('message', '')}"
+            for error in tracing.get("error_analysis", [])[:20]
+        )
+        findings.extend(issue["description"] for issue in analysis["correlated_issues"])
+        return findings
+
+# Orchestrator instance is created on first use
+__getattr__ = lazy_attributes(
+    __name__,
+    orchestrator=lambda module: OrchestratorAgent()
+)
 
 # Example usage:
 # analysis = orchestrator.analyze_system_health(
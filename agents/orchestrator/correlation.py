@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Lagged correlation between control-plane and service time series.
+
+Series from any source (the control-plane collector's ring buffers,
+Prometheus range queries, per-service trace timelines) are binned onto one
+time grid, with gaps carried forward. The cause grid starts max_lag steps
+before the effect grid, so a cause leading by up to max_lag is compared
+over the whole effect window. For every lag from 0 to max_lag steps the
+cause rows are correlated with the effect rows shifted by that lag in a
+single matrix product, so all (cause, effect) pairs cost one z-normalization
+and one matmul per lag. Each pair keeps the lag with the strongest
+correlation; candidates are ranked by strength, then by how far the cause
+leads the effect.
+"""
+from typing import Dict, Any, Optional, List, Tuple, TYPE_CHECKING
+import math
+import numpy as np
+
+if TYPE_CHECKING:
+    from ..common.timeseries import TimeSeriesStore
+
+# |r| below which a pair is not reported
+MIN_CORRELATION = 0.6
+# Overlapping bins a pair needs at its lag
+MIN_SAMPLES = 8
+# Bins with a real observation a series needs to take part
+MIN_OBSERVED_BINS = 5
+
+TimeSeries = Tuple[np.ndarray, np.ndarray]
+
+def align(
+    series: Dict[str, TimeSeries], start: float, step: float, bins: int, min_observed: int = MIN_OBSERVED_BINS
+) -> Tuple[List[str], np.ndarray]:
+    """Bin series onto the grid start + k * step, k < bins; rows are bin means, gaps carried forward.
+
+    Series with fewer than min_observed non-empty bins, or that never change, are dropped.
+    """
+    names = []
+    rows = []
+    for name, (times, values) in series.items():
+        times = np.asarray(times, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        keep = np.isfinite(values) & (times >= start) & (times < start + bins * step)
+        if keep.sum() < min_observed:
+            continue
+        index = ((times[keep] - start) // step).astype(np.int64)
+        counts = np.bincount(index, minlength=bins)
+        if np.count_nonzero(counts) < min_observed:
+            continue
+        sums = np.bincount(index, weights=values[keep], minlength=bins)
+        row = np.full(bins, np.nan)
+        observed = counts > 0
+        row[observed] = sums[observed] / counts[observed]
+        # Carry the last observation forward, and the first one back to the start
+        positions = np.where(observed, np.arange(bins), 0)
+        np.maximum.accumulate(positions, out=positions)
+        row = row[positions]
+        row[:np.argmax(observed)] = row[np.argmax(observed)]
+        if np.ptp(row) == 0:
+            continue
+        names.append(name)
+        rows.append(row)
+    return names, np.vstack(rows) if rows else np.zeros((0, bins))
+
+def lagged_correlations(causes: np.ndarray, effects: np.ndarray, max_lag: int) -> np.ndarray:
+    """Pearson r of every cause row against every effect row max_lag..0 steps later: (lags, causes, effects).
+
+    Cause rows may start earlier than effect rows by as many extra bins as
+    they have; lags beyond that history shorten the overlap.
+    """
+    bins = effects.shape[1]
+    history = causes.shape[1] - bins
+    max_lag = max(0, min(max_lag, bins + history - 2))
+    result = np.zeros((max_lag + 1, causes.shape[0], effects.shape[0]))
+    for lag in range(max_lag + 1):
+        # Effect bin e pairs with cause bin e + history - lag
+        skipped = max(0, lag - history)
+        first = max(0, history - lag)
+        cause = _standardize(causes[:, first:first + bins - skipped])
+        effect = _standardize(effects[:, skipped:])
+        result[lag] = cause @ effect.T / (bins - skipped)
+    return result
+
+def rank_causes(
+    causes: Dict[str, TimeSeries],
+    effects: Dict[str, TimeSeries],
+    start: float,
+    end: float,
+    step: float,
+    max_lag_seconds: float = 300.0,
+    min_correlation: float = MIN_CORRELATION
+) -> Optional[List[Dict[str, Any]]]:
+    """Candidate causes of each effect series, strongest first.
+
+    Effects are binned from start to end and causes from max_lag_seconds
+    earlier. Returns None when there are too few usable series or bins to
+    say anything, and an empty list when nothing correlates.
+    """
+    bins = int((end - start) // step) + 1
+    if bins < MIN_SAMPLES:
+        return None
+    max_lag = int(max_lag_seconds // step)
+    cause_names, cause_rows = align(causes, start - max_lag * step, step, bins + max_lag)
+    effect_names, effect_rows = align(effects, start, step, bins)
+    if not cause_names or not effect_names:
+        return None
+
+    correlations = lagged_correlations(cause_rows, effect_rows, max_lag)
+    strength = np.abs(correlations)
+    best_lag = strength.argmax(axis=0)
+    best = np.take_along_axis(correlations, best_lag[None], axis=0)[0]
+
+    ranked = []
+    for i, j in zip(*np.nonzero(np.abs(best) >= min_correlation)):
+        cause, effect = cause_names[i], effect_names[j]
+        if cause == effect:
+            continue
+        lag = int(best_lag[i, j])
+        ranked.append({
+            "cause": cause,
+            "effect": effect,
+            "correlation": round(float(best[i, j]), 3),
+            "lead_seconds": lag * step,
+            "samples": bins
+        })
+    ranked.sort(key=lambda item: (round(abs(item["correlation"]), 2), item["lead_seconds"]), reverse=True)
+    return ranked
+
+def series_from_timeline(timeline: Dict[str, Any], prefix: str = "trace.") -> Dict[str, TimeSeries]:
+    """Series of a tracing timeline: trace.<service>.latency_ms and trace.<service>.error_rate."""
+    step = timeline.get("step") or 0
+    if not step:
+        return {}
+    result = {}
+    for service, metrics in timeline.get("series", {}).items():
+        for metric in ("latency_ms", "error_rate"):
+            values = np.array([math.nan if v is None else v for v in metrics.get(metric, [])], dtype=np.float64)
+            times = timeline["start"] + step * np.arange(len(values))
+            result[f"{prefix}{service}.{metric}"] = (times, values)
+    return result
+
+def series_from_store(store: "TimeSeriesStore", start: float, prefixes: Tuple[str, ...] = ("",)) -> Dict[str, TimeSeries]:
+    """Windows of every series in a TimeSeriesStore with one of the prefixes."""
+    result = {}
+    for prefix in prefixes:
+        for name in store.names(prefix):
+            result[name] = store.window(name, start)
+    return result
+
+def series_from_prometheus(answers: Dict[str, List[Dict[str, Any]]]) -> Dict[str, TimeSeries]:
+    """Range query results by name; several series of one query get their labels appended."""
+    result = {}
+    for name, series in answers.items():
+        for item in series:
+            labels = ",".join(f"{k}={v}" for k, v in sorted(item["metric"].items()) if k != "__name__")
+            key = f"{name}{{{labels}}}" if len(series) > 1 else name
+            values = np.array([v for _, v in item["values"]], dtype=np.float64)
+            result[key] = (np.array([t for t, _ in item["values"]], dtype=np.float64), values)
+    return result
+
+def _standardize(rows: np.ndarray) -> np.ndarray:
+    std = rows.std(axis=1, keepdims=True)
+    # Rows constant over this window carry no signal
+    std[std == 0] = np.inf
+    return (rows - rows.mean(axis=1, keepdims=True)) / std
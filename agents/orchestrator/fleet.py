@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Cluster registry and the cross-cluster view of per-cluster health analyses.
+
+A registry lists the clusters of a fleet with their kubectl API, Jaeger and
+Prometheus endpoints, in the shape of pkg/types ClusterContext:
+
+    {"clusters": [{"name": "eu-1", "region": "eu-west-1",
+                   "api_url": "http://...:8000", "jaeger_url": "http://...:30686",
+                   "prometheus_url": "http://...:30090", "deadline": 45}]}
+
+merge_fleet reduces each cluster's analysis to a few comparable numbers
+(critical issues, API server latency, pending pods, service p95 latency and
+errors, ...), all of which are worse when higher, and flags the clusters
+that are much worse than the rest of the fleet on any of them. Outliers are
+judged by a robust z-score around the fleet median, scaled by the median
+absolute deviation, so one bad cluster does not hide itself by widening the
+spread.
+"""
+from typing import Dict, Any, Optional, List
+from dataclasses import dataclass, field
+from datetime import datetime
+import json
+import math
+import os
+import statistics
+
+CLUSTER_REGISTRY_PATH = os.getenv("CLUSTER_REGISTRY", "")
+# Seconds a cluster's analysis may take before it is reported as timed out
+CLUSTER_DEADLINE = float(os.getenv("CLUSTER_DEADLINE", "60"))
+# Clusters analyzed at the same time
+FLEET_CONCURRENCY = int(os.getenv("FLEET_CONCURRENCY", "8"))
+# Seconds a fleet analysis waits for clusters still queued for a worker before reporting
+# them unreachable; 0 allows one full deadline per round of FLEET_CONCURRENCY clusters
+FLEET_DEADLINE = float(os.getenv("FLEET_DEADLINE", "0"))
+# Robust z-score from which a cluster's value is reported as an outlier
+OUTLIER_SCORE = 3.5
+# Clusters with a value a metric needs before outliers are looked for
+MIN_FLEET_SIZE = 3
+LOCAL_CLUSTER = "local"
+
+@dataclass
+class Cluster:
+    """A cluster of the fleet and the endpoints its agents talk to."""
+    name: str
+    api_url: str = "http://localhost:8000"
+    jaeger_url: str = "http://localhost:30686"
+    prometheus_url: Optional[str] = None
+    region: str = ""
+    deadline: float = CLUSTER_DEADLINE
+    labels: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def local(self) -> bool:
+        return self.name == LOCAL_CLUSTER
+
+class ClusterRegistry:
+    """Clusters by name, in registry order."""
+
+    def __init__(self, clusters: List[Cluster]):
+        self.clusters = {cluster.name: cluster for cluster in clusters}
+
+    @classmethod
+    def load(cls, path: Optional[str] = CLUSTER_REGISTRY_PATH) -> "ClusterRegistry":
+        """Registry from a JSON file; without one, just the local cluster."""
+        if not path:
+            return cls([Cluster(LOCAL_CLUSTER)])
+        with open(path) as f:
+            document = json.load(f)
+        return cls.from_dict(document)
+
+    @classmethod
+    def from_dict(cls, document: Dict[str, Any]) -> "ClusterRegistry":
+        known = set(Cluster.__dataclass_fields__)
+        clusters = []
+        for entry in document.get("clusters", []):
+            if "name" not in entry:
+                raise ValueError(f"cluster entry without a name: {entry}")
+            clusters.append(Cluster(**{key: value for key, value in entry.items() if key in known}))
+        return cls(clusters)
+
+    def __len__(self) -> int:
+        return len(self.clusters)
+
+    def __iter__(self):
+        return iter(self.clusters.values())
+
+    def select(self, names: Optional[List[str]] = None) -> List[Cluster]:
+        """The named clusters, or all of them; unknown names raise KeyError."""
+        if not names:
+            return list(self.clusters.values())
+        return [self.clusters[name] for name in names]
+
+def fleet_budget(clusters: List[Cluster], concurrency: int = FLEET_CONCURRENCY) -> float:
+    """Seconds a fleet analysis of clusters may take before queued clusters are given up on."""
+    if FLEET_DEADLINE > 0:
+        return FLEET_DEADLINE
+    rounds = math.ceil(len(clusters) / max(1, concurrency))
+    return rounds * max((cluster.deadline for cluster in clusters), default=CLUSTER_DEADLINE)
+
+def cluster_summary(analysis: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    """The comparable numbers of one cluster's health analysis; None where it was not analyzed."""
+    control_plane = analysis.get("control_plane_status") or {}
+    tracing = analysis.get("tracing_analysis") or {}
+    api_latency = (control_plane.get("api_server_metrics") or {}).get("request_latency") or {}
+    scheduler = control_plane.get("scheduler_analysis") or {}
+    allocation = scheduler.get("node_allocation") or {}
+    latency = tracing.get("latency_analysis") or {}
+    return {
+        "critical_issues": len(control_plane["critical_issues"]) if control_plane else None,
+        "api_server_p99_max_s": max(api_latency.values()) if api_latency else None,
+        "etcd_unhealthy_endpoints": (control_plane.get("etcd_health") or {}).get("unhealthy_endpoints"),
+        "failed_schedules": scheduler.get("failed_schedules"),
+        "pending_pods": allocation.get("pending_pods"),
+        "cpu_requested_percent": allocation.get("cpu_requested_percent"),
+        "service_p95_latency_ms": latency.get("p95"),
+        "service_error_spans": sum(error.get("count", 0) for error in tracing["error_analysis"]) if tracing else None,
+        "service_issues": len(tracing["service_health"]["issues"]) if tracing else None
+    }
+
+def find_outliers(values: Dict[str, float], min_fleet: int = MIN_FLEET_SIZE, threshold: float = OUTLIER_SCORE) -> List[Dict[str, Any]]:
+    """Clusters whose value is far above the fleet median, by robust z-score; every metric is worse higher."""
+    if len(values) < min_fleet:
+        return []
+    median = statistics.median(values.values())
+    deviation = statistics.median(abs(value - median) for value in values.values())
+    outliers = []
+    for cluster, value in values.items():
+        if value <= median:
+            continue
+        if deviation:
+            score = 0.6745 * (value - median) / deviation
+            if abs(score) < threshold:
+                continue
+        else:
+            # Most of the fleet agrees exactly; anything else stands out
+            score = None
+        outliers.append({"cluster": cluster, "value": value, "fleet_median": median, "score": score and round(score, 2)})
+    return outliers
+
+def merge_fleet(
+    analyses: Dict[str, Dict[str, Any]],
+    failures: Dict[str, str],
+    clusters: Dict[str, Cluster],
+    seconds: Dict[str, float]
+) -> Dict[str, Any]:
+    """Cross-cluster view: per-cluster summaries, the outliers among them and the fleet's health counts."""
+    view: Dict[str, Any] = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "clusters": {},
+        "outliers": [],
+        "fleet_health": {}
+    }
+    summaries = {}
+    for name, cluster in clusters.items():
+        entry: Dict[str, Any] = {"region": cluster.region, "seconds": seconds.get(name)}
+        if name in failures:
+            entry.update(status="unreachable", error=failures[name])
+            health = "unreachable"
+        else:
+            analysis = analyses[name]
+            summaries[name] = entry["summary"] = cluster_summary(analysis)
+            control_plane = analysis.get("control_plane_status") or {}
+            tracing = analysis.get("tracing_analysis") or {}
+            health = control_plane.get("overall_health") or "unknown"
+            entry.update(
+                status="ok",
+                overall_health=health,
+                service_status=tracing.get("service_health", {}).get("status"),
+                critical_issues=control_plane.get("critical_issues", [])[:5],
+                correlated_issues=[issue["description"] for issue in analysis.get("correlated_issues", [])[:3]]
+            )
+        view["fleet_health"][health] = view["fleet_health"].get(health, 0) + 1
+        view["clusters"][name] = entry
+
+    metrics = {metric for summary in summaries.values() for metric in summary}
+    for metric in sorted(metrics):
+        values = {name: summary[metric] for name, summary in summaries.items() if summary.get(metric) is not None}
+        for outlier in find_outliers(values):
+            view["outliers"].append({"metric": metric, **outlier})
+    # Unbounded scores (the rest of the fleet agrees exactly) first, then by distance from the median
+    view["outliers"].sort(key=lambda item: (item["score"] is not None, -abs(item["score"] or 0)))
+    return view
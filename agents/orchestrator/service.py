@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""Asyncio HTTP front-end for the OrchestratorAgent.
+
+One warm process serves many users: the orchestrator, its agents and their
+caches are created once and shared by all requests. Admission control caps
+the number of requests being processed and the number waiting for a slot;
+anything beyond that is rejected with 429 so callers back off instead of
+piling up behind a slow cluster or LLM.
+
+Endpoints:
+    POST /v1/query                  {"query": "...", "conversation_id": "..."}
+    POST /v1/health-analysis        AnalysisRequest fields as JSON
+    POST /v1/fleet-health-analysis  AnalysisRequest fields, "clusters": [...], "details": false
+    GET  /healthz                   liveness
+    GET  /stats                     admission counters and API server limits
+
+Add ``?stream=1`` (or ``Accept: application/x-ndjson``) to a POST to receive
+newline-delimited JSON events (queued, started, result) over a chunked
+response as the request progresses.
+"""
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable, Union, TYPE_CHECKING, get_args, get_origin, get_type_hints
+from contextvars import ContextVar
+from dataclasses import MISSING, dataclass, fields
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+import asyncio
+import json
+import os
+import time
+
+from ..common.concurrency import api_server_limiter
+
+if TYPE_CHECKING:
+    from .agent import AnalysisRequest, OrchestratorAgent
+
+STATUS_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    504: "Gateway Timeout",
+}
+
+# Executor work started by the request being dispatched; its slot is held until all of it finishes
+_executor_work: ContextVar[Optional[List[Future]]] = ContextVar("executor_work", default=None)
+
+@dataclass
+class ServiceConfig:
+    """Limits and listen address for the orchestrator service."""
+    host: str = "127.0.0.1"
+    port: int = 8080
+    max_concurrency: int = 100
+    max_queue_depth: int = 200
+    request_timeout: float = 30.0
+    max_body_bytes: int = 1024 * 1024
+    keepalive_timeout: float = 15.0
+
+    @classmethod
+    def from_env(cls) -> "ServiceConfig":
+        """Build the configuration from ORCHESTRATOR_* environment variables."""
+        return cls(
+            host=os.getenv("ORCHESTRATOR_HOST", cls.host),
+            port=int(os.getenv("ORCHESTRATOR_PORT", cls.port)),
+            max_concurrency=int(os.getenv("ORCHESTRATOR_MAX_CONCURRENCY", cls.max_concurrency)),
+            max_queue_depth=int(os.getenv("ORCHESTRATOR_MAX_QUEUE_DEPTH", cls.max_queue_depth)),
+            request_timeout=float(os.getenv("ORCHESTRATOR_REQUEST_TIMEOUT", cls.request_timeout)),
+        )
+
+class HTTPError(Exception):
+    """Error that maps directly onto an HTTP response."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class AdmissionController:
+    """Bounds in-flight work and the queue of requests waiting for a slot."""
+
+    def __init__(self, max_concurrency: int, max_queue_depth: int):
+        self.max_concurrency = max_concurrency
+        self.max_queue_depth = max_queue_depth
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    def try_enqueue(self) -> bool:
+        """Reserve a queue position; False means the caller must be rejected."""
+        if self.waiting >= self.max_queue_depth and self._slots.locked():
+            self.rejected += 1
+            return False
+        self.waiting += 1
+        return True
+
+    async def acquire(self) -> None:
+        """Wait for a processing slot after a successful try_enqueue."""
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        self.admitted += 1
+
+    def release(self) -> None:
+        self.active -= 1
+        self._slots.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "max_concurrency": self.max_concurrency,
+            "max_queue_depth": self.max_queue_depth
+        }
+
+class OrchestratorService:
+    """Serves process_query, analyze_system_health and analyze_fleet_health over HTTP."""
+
+    def __init__(
+        self,
+        orchestrator: Optional["OrchestratorAgent"] = None,
+        config: Optional[ServiceConfig] = None
+    ):
+        self.config = config or ServiceConfig.from_env()
+        self._orchestrator = orchestrator
+        self._admission: Optional[AdmissionController] = None
+        # analyze_system_health is synchronous and blocks on kubectl/Jaeger I/O
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.config.max_concurrency,
+            thread_name_prefix="orchestrator"
+        )
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._routes: Dict[Tuple[str, str], Callable[[Dict[str, Any]], Awaitable[Any]]] = {
+            ("POST", "/v1/query"): self._run_query,
+            ("POST", "/v1/health-analysis"): self._run_health_analysis,
+            ("POST", "/v1/fleet-health-analysis"): self._run_fleet_health_analysis,
+        }
+
+    @property
+    def orchestrator(self) -> "OrchestratorAgent":
+        """The shared orchestrator, created on first use and kept warm."""
+        if self._orchestrator is None:
+            from .agent import OrchestratorAgent
+            self._orchestrator = OrchestratorAgent()
+        return self._orchestrator
+
+    @property
+    def admission(self) -> AdmissionController:
+        # Created lazily so the semaphore binds to the running event loop
+        if self._admission is None:
+            self._admission = AdmissionController(self.config.max_concurrency, self.config.max_queue_depth)
+        return self._admission
+
+    async def start(self) -> None:
+        """Start listening; the bound port is written back to the config."""
+        self.orchestrator  # warm up before accepting traffic
+        self._server = await asyncio.start_server(
+            self._handle_connection,
+            self.config.host,
+            self.config.port,
+            backlog=self.config.max_concurrency + self.config.max_queue_depth
+        )
+        self.config.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run_query(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        query = payload.get("query")
+        if not isinstance(query, str) or not query.strip():
+            raise HTTPError(400, "Field 'query' must be a non-empty string")
+        return await self.orchestrator.process_query(query, payload.get("conversation_id"))
+
+    async def _run_health_analysis(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        request = self._analysis_request(payload)
+        return await self._in_executor(self.orchestrator.analyze_system_health, request)
+
+    async def _run_fleet_health_analysis(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        payload = dict(payload)
+        clusters = payload.pop("clusters", None)
+        details = payload.pop("details", False)
+        if clusters is not None and (not isinstance(clusters, list) or not all(isinstance(c, str) for c in clusters)):
+            raise HTTPError(400, "Field 'clusters' must be a list of cluster names")
+        if not isinstance(details, bool):
+            raise HTTPError(400, "Field 'details' must be a boolean")
+        request = self._analysis_request(payload)
+        unknown = set(clusters or ()) - {cluster.name for cluster in self.orchestrator.registry}
+        if unknown:
+            raise HTTPError(400, f"Unknown clusters: {', '.join(sorted(unknown))}")
+        return await self._in_executor(self.orchestrator.analyze_fleet_health, request, clusters, details)
+
+    async def _in_executor(self, function: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking call on the executor, recorded against the current request."""
+        future = self._executor.submit(function, *args)
+        work = _executor_work.get()
+        if work is not None:
+            work.append(future)
+        return await asyncio.wrap_future(future)
+
+    def _analysis_request(self, payload: Dict[str, Any]) -> "AnalysisRequest":
+        from .agent import AnalysisRequest
+
+        allowed = {f.name: f for f in fields(AnalysisRequest)}
+        unknown = set(payload) - set(allowed)
+        if unknown:
+            raise HTTPError(400, f"Unknown fields: {', '.join(sorted(unknown))}")
+        missing = [
+            name for name, f in allowed.items()
+            if f.default is MISSING and f.default_factory is MISSING and name not in payload
+        ]
+        if missing:
+            raise HTTPError(400, f"Missing fields: {', '.join(sorted(missing))}")
+        hints = get_type_hints(AnalysisRequest)
+        for name, value in payload.items():
+            if not _matches_type(value, hints[name]):
+                raise HTTPError(400, f"Field '{name}' must be {_type_name(hints[name])}")
+        return AnalysisRequest(**payload)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), self.config.keepalive_timeout)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except HTTPError as e:
+                    await self._write_json(writer, e.status, {"error": e.message}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                method, target, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._dispatch(writer, method, target, headers, body, keep_alive)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_request(
+        self, reader: asyncio.StreamReader
+    ) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        """Read one HTTP/1.1 request; None when the client closed the connection."""
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if not e.partial:
+                return None
+            raise
+        except asyncio.LimitOverrunError:
+            raise HTTPError(413, "Request headers too large")
+
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", "0") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > self.config.max_body_bytes:
+            raise HTTPError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, headers, body
+
+    async def _dispatch(
+        self,
+        writer: asyncio.StreamWriter,
+        method: str,
+        target: str,
+        headers: Dict[str, str],
+        body: bytes,
+        keep_alive: bool
+    ) -> None:
+        url = urlsplit(target)
+        if url.path == "/healthz" and method == "GET":
+            await self._write_json(writer, 200, {"status": "ok"}, keep_alive)
+            return
+        if url.path == "/stats" and method == "GET":
+            stats = {**self.admission.stats(), "api_server_limiter": api_server_limiter.snapshot()}
+            await self._write_json(writer, 200, stats, keep_alive)
+            return
+
+        handler = self._routes.get((method, url.path))
+        if handler is None:
+            known_path = any(path == url.path for _, path in self._routes)
+            status = 405 if known_path else 404
+            await self._write_json(writer, status, {"error": STATUS_REASONS[status]}, keep_alive)
+            return
+
+        try:
+            payload = json.loads(body or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("body must be a JSON object")
+        except ValueError as e:
+            await self._write_json(writer, 400, {"error": f"Invalid JSON body: {e}"}, keep_alive)
+            return
+
+        stream = (
+            parse_qs(url.query).get("stream", ["0"])[0] in ("1", "true")
+            or "application/x-ndjson" in headers.get("accept", "")
+        )
+
+        admission = self.admission
+        if not admission.try_enqueue():
+            await self._write_json(
+                writer, 429, {"error": "Server is at capacity, retry later"}, keep_alive,
+                extra_headers={"Retry-After": "1"}
+            )
+            return
+
+        if stream:
+            await self._write_stream_head(writer, keep_alive)
+            await self._write_chunk(writer, {"event": "queued", "waiting": admission.waiting})
+
+        started = time.monotonic()
+        await admission.acquire()
+        work: List[Future] = []
+        token = _executor_work.set(work)
+        try:
+            if stream:
+                await self._write_chunk(writer, {"event": "started", "queued_ms": _elapsed_ms(started)})
+            status, result = 200, await asyncio.wait_for(handler(payload), self.config.request_timeout)
+        except HTTPError as e:
+            status, result = e.status, {"error": e.message}
+        except asyncio.TimeoutError:
+            status, result = 504, {"error": f"Request exceeded {self.config.request_timeout}s"}
+        except Exception as e:
+            status, result = 500, {"error": str(e)}
+        finally:
+            _executor_work.reset(token)
+            self._release_when_done(work)
+
+        if stream:
+            event = "result" if status == 200 else "error"
+            await self._write_chunk(writer, {"event": event, "status": status, "elapsed_ms": _elapsed_ms(started), "data": result})
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        else:
+            await self._write_json(writer, status, result, keep_alive)
+
+    def _release_when_done(self, work: List[Future]) -> None:
+        """Release the request's admission slot once its executor work is finished.
+
+        A timed-out request's thread keeps running, and keeps its slot so the
+        concurrency and queue limits still hold.
+        """
+        admission = self.admission
+        running = [future for future in work if not future.done()]
+        if not running:
+            admission.release()
+            return
+        loop = asyncio.get_running_loop()
+        remaining = len(running)
+
+        def finished() -> None:
+            nonlocal remaining
+            remaining -= 1
+            if not remaining:
+                admission.release()
+
+        def done(_: Future) -> None:
+            try:
+                loop.call_soon_threadsafe(finished)
+            except RuntimeError:
+                pass  # The loop is closed; nothing is left to admit
+
+        for future in running:
+            future.add_done_callback(done)
+
+    async def _write_json(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        payload: Any,
+        keep_alive: bool,
+        extra_headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        body = json.dumps(payload, default=str).encode()
+        headers = {
+            "Content-Type": "application/json",
+            "Content-Length": str(len(body)),
+            "Connection": "keep-alive" if keep_alive else "close",
+            **(extra_headers or {})
+        }
+        writer.write(_response_head(status, headers) + body)
+        await writer.drain()
+
+    async def _write_stream_head(self, writer: asyncio.StreamWriter, keep_alive: bool) -> None:
+        headers = {
+            "Content-Type": "application/x-ndjson",
+            "Transfer-Encoding": "chunked",
+            "Connection": "keep-alive" if keep_alive else "close"
+        }
+        writer.write(_response_head(200, headers))
+        await writer.drain()
+
+    async def _write_chunk(self, writer: asyncio.StreamWriter, event: Dict[str, Any]) -> None:
+        data = json.dumps(event, default=str).encode() + b"\n"
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        await writer.drain()
+
+def _matches_type(value: Any, hint: Any) -> bool:
+    """Whether a decoded JSON value fits a field's type hint; booleans are not numbers."""
+    for option in get_args(hint) if get_origin(hint) is Union else (hint,):
+        if option is Any:
+            return True
+        if option is type(None):
+            if value is None:
+                return True
+        elif option is float:
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return True
+        elif isinstance(value, option) and (option is bool or not isinstance(value, bool)):
+            return True
+    return False
+
+def _type_name(hint: Any) -> str:
+    options = get_args(hint) if get_origin(hint) is Union else (hint,)
+    return " or ".join("null" if option is type(None) else getattr(option, "__name__", str(option)) for option in options)
+
+def _response_head(status: int, headers: Dict[str, str]) -> bytes:
+    lines = [f"HTTP/1.1 {status} {STATUS_REASONS.get(status, '')}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.monotonic() - started) * 1000, 2)
+
+def main() -> None:
+    """Run the orchestrator service until interrupted."""
+    config = ServiceConfig.from_env()
+    service = OrchestratorService(config=config)
+    print(f"Orchestrator service listening on http://{config.host}:{config.port}")
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
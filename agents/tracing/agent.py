@@ -1,43 +1,99 @@
 #!/usr/bin/env python3
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Sequence, Set, Tuple
+from array import array
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+from functools import cached_property
+import atexit
+import math
 import requests
-from langchain_core.tools import tool
 import json
+import os
+import time
+
+from ..common import cassette
+from ..common.kubectl import KubectlClient
+from ..common.lazy import lazy_attributes, lazy_tool
+from .baselines import DEFAULT_BASELINE_PATH, LatencyBaselines
+from .critical_path import analyze_critical_paths
+from .errors import ErrorSignatureSketch
+from .graph import DEFAULT_GRAPH_PATH, DependencyGraph
+from .model import StringTable, TraceBatch, decode_traces
+from .spill import SpanFile
+from .timeline import ServiceTimeline, busiest_services, service_timeline
+
+# Share of tail critical-path time above which one operation is reported as dominant
+DOMINANT_CRITICAL_SHARE = 0.3
+# Fallback threshold while no latency baseline is established
+HIGH_LATENCY_P95_MS = 1000
+# Share of a batch's spans scored against baselines from which the fallback is no longer needed
+BASELINE_COVERAGE = 0.95
+MAX_REPORTED_ANOMALIES = 10
+# Requests for at least this many traces are spilled to a span file instead of held in memory
+TRACE_SPILL_MIN_TRACES = int(os.getenv("TRACE_SPILL_MIN_TRACES", "2000"))
+# Traces fetched per Jaeger query when spilling; the window is split into that many slices
+TRACE_FETCH_PAGE = int(os.getenv("TRACE_FETCH_PAGE", "500"))
+# Window fetched when a spilled request has no start time
+TRACE_SPILL_LOOKBACK = timedelta(hours=1)
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# (parent service, child service) interned IDs -> [calls, errors]
+EdgeCounts = Dict[Tuple[int, int], List[int]]
 
 @dataclass
 class TraceRequest:
     """Request for tracing information."""
     service_name: str
     operation_name: Optional[str] = None
+    # Microseconds since the epoch, or an ISO 8601 time (UTC unless it has an offset)
     start_time: Optional[str] = None
     end_time: Optional[str] = None
     min_duration: Optional[str] = None
     max_duration: Optional[str] = None
     tags: Optional[Dict[str, str]] = None
     limit: int = 20
+    # Spill traces to disk and analyze them in segments; None decides by limit
+    spill: Optional[bool] = None
+
+def epoch_micros(value: Any) -> int:
+    """A Jaeger query time, in microseconds since the epoch, from that, an ISO 8601 string or a datetime."""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        if value.strip().isdigit():
+            return int(value)
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - EPOCH) // timedelta(microseconds=1)
 
 class JaegerClient:
     """Client for interacting with Jaeger's Query API."""
     
-    def __init__(self, base_url: str = "http://localhost:30686"):
+    def __init__(self, base_url: str = "http://localhost:30686", timeout: Optional[float] = None):
         self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """GET a Query API path and return the decoded JSON body."""
+        def live() -> Any:
+            response = self.session.get(f"{self.base_url}{path}", params=params, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+        return cassette.through("jaeger", {"path": path, "params": params}, live)
     
     def get_services(self) -> List[str]:
         """Get list of available services."""
         try:
-            response = requests.get(f"{self.base_url}/api/services")
-            response.raise_for_status()
-            return response.json()["data"]
+            return self._get("/api/services")["data"]
         except Exception as e:
             return []
     
     def get_operations(self, service: str) -> List[str]:
         """Get list of operations for a service."""
         try:
-            response = requests.get(f"{self.base_url}/api/operations", params={"service": service})
-            response.raise_for_status()
-            return response.json()["data"]
+            return self._get("/api/operations", {"service": service})["data"]
         except Exception as e:
             return []
     
@@ -51,9 +107,9 @@ class JaegerClient:
         if request.operation_name:
             params["operation"] = request.operation_name
         if request.start_time:
-            params["start"] = request.start_time
+            params["start"] = epoch_micros(request.start_time)
         if request.end_time:
-            params["end"] = request.end_time
+            params["end"] = epoch_micros(request.end_time)
         if request.min_duration:
             params["minDuration"] = request.min_duration
         if request.max_duration:
@@ -62,45 +118,68 @@ class JaegerClient:
             params["tags"] = json.dumps(request.tags)
         
         try:
-            response = requests.get(f"{self.base_url}/api/traces", params=params)
-            response.raise_for_status()
-            return response.json()["data"]
+            return self._get("/api/traces", params)["data"]
         except Exception as e:
             return []
     
     def get_trace(self, trace_id: str) -> Dict:
         """Get a specific trace by ID."""
         try:
-            response = requests.get(f"{self.base_url}/api/traces/{trace_id}")
-            response.raise_for_status()
-            return response.json()["data"][0]
+            return self._get(f"/api/traces/{trace_id}")["data"][0]
         except Exception as e:
             return {}
 
+    def get_dependencies(self, lookback_ms: int = 3600 * 1000) -> List[Dict]:
+        """Get service dependency links aggregated by Jaeger over the lookback window."""
+        params = {"endTs": int(time.time() * 1000), "lookback": lookback_ms}
+        try:
+            return self._get("/api/dependencies", params)["data"] or []
+        except Exception as e:
+            return []
+
 class TracingAgent:
     """Agent for application-level tracing through Jaeger."""
     
-    def __init__(self):
-        self.jaeger = JaegerClient()
-        self.k8s_api_url = "http://localhost:8000"
+    def __init__(
+        self,
+        jaeger_url: str = "http://localhost:30686",
+        k8s_api_url: str = "http://localhost:8000",
+        kubectl: Optional[KubectlClient] = None,
+        cluster: Optional[str] = None,
+        timeout: Optional[float] = None
+    ):
+        self.jaeger = JaegerClient(jaeger_url, timeout)
+        self.k8s_api_url = k8s_api_url
+        self.kubectl = kubectl or KubectlClient(k8s_api_url)
+        # Graph and baselines of other clusters are kept apart from the local one's
+        self.cluster = cluster
+
+    @cached_property
+    def dependency_graph(self) -> DependencyGraph:
+        """Service graph accumulated from every trace batch, loaded on first use."""
+        graph = DependencyGraph.load(self._state_path(DEFAULT_GRAPH_PATH))
+        atexit.register(graph.save, True)
+        return graph
+
+    @cached_property
+    def latency_baselines(self) -> LatencyBaselines:
+        """Per-operation latency baselines, loaded on first use."""
+        baselines = LatencyBaselines.load(self._state_path(DEFAULT_BASELINE_PATH))
+        atexit.register(baselines.save, True)
+        return baselines
 
     def execute_kubectl(self, command: str, namespace: Optional[str] = None) -> Dict[str, Any]:
         """Execute a kubectl command through the API."""
-        try:
-            response = requests.post(
-                f"{self.k8s_api_url}/execute",
-                json={
-                    "command": command,
-                    "namespace": namespace
-                },
-                timeout=30
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            return {"error": str(e)}
+        return self.kubectl.execute(command, namespace)
 
-    @tool("list_traced_services")
+    def _state_path(self, path: str) -> str:
+        """path for the local cluster, path with the cluster name before its extension otherwise."""
+        if not self.cluster or not path:
+            return path
+        root, extension = os.path.splitext(path)
+        return f"{root}.{self.cluster}{extension}"
+
+    @lazy_tool("list_traced_services")
     def list_traced_services(self) -> str:
         """List all services that are being traced in Jaeger."""
         services = self.jaeger.get_services()
@@ -109,7 +188,7 @@ class TracingAgent:
         
         return "Traced services:\n" + "\n".join(f"- {service}" for service in services)
 
-    @tool("get_service_operations")
+    @lazy_tool("get_service_operations")
     def get_service_operations(self, service_name: str) -> str:
         """Get all traced operations for a specific service."""
         operations = self.jaeger.get_operations(service_name)
@@ -118,9 +197,20 @@ class TracingAgent:
         
         return f"Operations for {service_name}:\n" + "\n".join(f"- {op}" for op in operations)
 
-    @tool("analyze_service_traces")
+    @lazy_tool("analyze_service_traces")
     def analyze_service_traces(self, request: TraceRequest) -> Dict[str, Any]:
         """Analyze traces for a service and provide insights."""
+        spill = request.spill if request.spill is not None else request.limit >= TRACE_SPILL_MIN_TRACES
+        if spill:
+            with SpanFile() as spans:
+                self._spill_traces(request, spans)
+                if not len(spans):
+                    return {
+                        "status": "error",
+                        "message": f"No traces found for service {request.service_name}"
+                    }
+                return self._analyze_span_file(request.service_name, spans)
+
         traces = self.jaeger.find_traces(request)
         if not traces:
             return {
@@ -128,84 +218,214 @@ class TracingAgent:
                 "message": f"No traces found for service {request.service_name}"
             }
         
+        # Decode once; the raw Jaeger JSON is not kept past this point
+        batch = decode_traces(traces)
+        del traces
+
         # Analyze trace data
+        latency_stats = self._analyze_latencies(batch.trace_duration)
+        errors = self._find_error_traces(batch)
+        dependencies = self._analyze_dependencies(batch)
+        critical_path = analyze_critical_paths(batch)
+        latency_scores = self.latency_baselines.score_and_update(batch)
+        self.latency_baselines.save()
+        self._record_dependencies(batch.strings, self._new_dependencies(batch, {}))
         analysis = {
             "service": request.service_name,
-            "trace_count": len(traces),
-            "latency_stats": self._analyze_latencies(traces),
-            "error_traces": self._find_error_traces(traces),
-            "dependencies": self._analyze_dependencies(traces),
-            "insights": self._generate_insights(traces)
+            "trace_count": len(batch),
+            "latency_stats": latency_stats,
+            "error_traces": errors["signatures"],
+            "error_summary": {key: value for key, value in errors.items() if key != "signatures"},
+            "dependencies": dependencies,
+            "critical_path": critical_path,
+            "timeline": service_timeline(batch),
+            "latency_anomalies": [score for score in latency_scores if score["anomalous"]][:MAX_REPORTED_ANOMALIES],
+            "insights": self._generate_insights(
+                len(batch), latency_stats, errors, dependencies, critical_path, latency_scores, len(batch.spans)
+            )
         }
         
         return analysis
 
-    @tool("get_service_dependencies")
+    def _spill_traces(self, request: TraceRequest, spans: SpanFile) -> None:
+        """Fetch the request's traces into a span file, one time slice of TRACE_FETCH_PAGE traces at a time."""
+        end = epoch_micros(request.end_time) if request.end_time else epoch_micros(datetime.now(timezone.utc))
+        start = (
+            epoch_micros(request.start_time) if request.start_time
+            else end - TRACE_SPILL_LOOKBACK // timedelta(microseconds=1)
+        )
+        slices = max(1, math.ceil(request.limit / TRACE_FETCH_PAGE))
+        bounds = [start + (end - start) * index // slices for index in range(slices + 1)]
+        # A trace crossing a slice boundary is returned for both slices
+        seen: Set[str] = set()
+        for index in range(slices):
+            page = replace(
+                request,
+                start_time=str(bounds[index]),
+                end_time=str(bounds[index + 1]),
+                limit=min(TRACE_FETCH_PAGE, request.limit)
+            )
+            traces = [trace for trace in self.jaeger.find_traces(page) if trace.get("traceID") not in seen]
+            seen.update(trace.get("traceID") for trace in traces)
+            spans.add_traces(traces)
+            del traces
+        spans.flush()
+
+    def _analyze_span_file(self, service_name: str, spans: SpanFile) -> Dict[str, Any]:
+        """Latency, error, dependency and timeline analysis of a span file, one segment at a time.
+
+        Critical paths and latency baselines need every trace at once and
+        are left to in-memory analysis.
+        """
+        # The timeline's grid and services come from the file's totals, which must include buffered traces
+        spans.flush()
+        durations = array("q")
+        sketch = ErrorSignatureSketch()
+        error_traces = 0
+        edges: EdgeCounts = {}
+        new_edges: EdgeCounts = {}
+        timeline = None
+        if spans.first_start is not None:
+            timeline = ServiceTimeline(spans.first_start, spans.last_start, busiest_services(spans.service_spans))
+        for batch in spans.segments():
+            durations.extend(batch.trace_duration)
+            sketch.add_batch(batch)
+            error_traces += batch.error_trace_count()
+            self._count_dependencies(batch, edges)
+            self._new_dependencies(batch, new_edges)
+            if timeline is not None:
+                timeline.add(batch)
+
+        latency_stats = self._analyze_latencies(durations)
+        errors = {"error_trace_count": error_traces, **sketch.summary()}
+        dependencies = self._dependency_list(spans.strings, edges)
+        self._record_dependencies(spans.strings, new_edges)
+        return {
+            "service": service_name,
+            "trace_count": len(spans),
+            "latency_stats": latency_stats,
+            "error_traces": errors["signatures"],
+            "error_summary": {key: value for key, value in errors.items() if key != "signatures"},
+            "dependencies": dependencies,
+            "timeline": timeline.to_dict(spans.strings) if timeline else {"start": 0.0, "step": 0.0, "series": {}},
+            "spill": spans.stats(),
+            "insights": self._generate_insights(len(spans), latency_stats, errors, dependencies)
+        }
+
+    @lazy_tool("analyze_critical_path")
+    def analyze_critical_path(self, request: TraceRequest) -> Dict[str, Any]:
+        """Find which services and operations dominate a service's p50/p95 latency."""
+        batch = decode_traces(self.jaeger.find_traces(request))
+        if not len(batch):
+            return {
+                "status": "error",
+                "message": f"No traces found for service {request.service_name}"
+            }
+
+        return {
+            "service": request.service_name,
+            **analyze_critical_paths(batch)
+        }
+
+    @lazy_tool("get_service_dependencies")
     def get_service_dependencies(self, service_name: str) -> Dict[str, Any]:
         """Get and analyze service dependencies from traces."""
         request = TraceRequest(service_name=service_name, limit=50)
-        traces = self.jaeger.find_traces(request)
-        
-        dependencies = self._analyze_dependencies(traces)
+        batch = decode_traces(self.jaeger.find_traces(request))
+        self.dependency_graph.merge_dependencies(self.jaeger.get_dependencies())
+        self._record_dependencies(batch.strings, self._new_dependencies(batch, {}))
+
+        # Answer from everything merged so far, not just this sample
+        graph = self.dependency_graph
+        upstream = graph.upstream(service_name)
+        downstream = graph.downstream(service_name)
+        dependencies = graph.edges([service_name, *(node["service"] for node in upstream + downstream)])
         return {
             "service": service_name,
             "dependencies": dependencies,
             "dependency_count": len(dependencies),
+            "upstream": upstream,
+            "downstream": downstream,
             "analysis": self._analyze_dependency_health(dependencies)
         }
 
-    def _analyze_latencies(self, traces: List[Dict]) -> Dict[str, Any]:
-        """Analyze latency patterns in traces."""
-        durations = [trace.get("duration", 0) for trace in traces]
+    @lazy_tool("get_blast_radius")
+    def get_blast_radius(self, service_name: str) -> Dict[str, Any]:
+        """Find which services are affected if a service is slow or failing, without fetching traces."""
+        graph = self.dependency_graph
+        if service_name not in graph:
+            graph.merge_dependencies(self.jaeger.get_dependencies())
+        return {
+            **graph.blast_radius(service_name),
+            "error_paths": graph.error_paths(service_name)
+        }
+
+    def _new_dependencies(self, batch: TraceBatch, counts: EdgeCounts) -> EdgeCounts:
+        """Add the calls of the batch's traces that the dependency graph has not merged yet."""
+        self._count_dependencies(batch, counts, self.dependency_graph.unmerged(batch.trace_ids))
+        return counts
+
+    def _record_dependencies(self, strings: StringTable, counts: EdgeCounts) -> None:
+        """Merge edge counts of newly seen traces into the dependency graph."""
+        self.dependency_graph.merge_edges(self._dependency_list(strings, counts))
+        self.dependency_graph.save()
+
+    def _analyze_latencies(self, trace_durations: Sequence[int]) -> Dict[str, Any]:
+        """Analyze latency patterns in traces, in milliseconds."""
+        # Jaeger durations are in microseconds
+        durations = [duration / 1000 for duration in sorted(trace_durations)]
         if not durations:
             return {}
         
         return {
-            "min": min(durations),
-            "max": max(durations),
+            "unit": "ms",
+            "min": durations[0],
+            "max": durations[-1],
             "avg": sum(durations) / len(durations),
-            "p95": sorted(durations)[int(len(durations) * 0.95)],
-            "p99": sorted(durations)[int(len(durations) * 0.99)]
+            "p95": durations[int(len(durations) * 0.95)],
+            "p99": durations[int(len(durations) * 0.99)]
         }
 
-    def _find_error_traces(self, traces: List[Dict]) -> List[Dict]:
-        """Find traces containing errors."""
-        error_traces = []
-        for trace in traces:
-            for span in trace.get("spans", []):
-                if any(tag.get("key") == "error" for tag in span.get("tags", [])):
-                    error_traces.append({
-                        "trace_id": trace.get("traceID"),
-                        "service": span.get("serviceName"),
-                        "operation": span.get("operationName"),
-                        "error_type": self._get_error_type(span)
-                    })
-        return error_traces
-
-    def _analyze_dependencies(self, traces: List[Dict]) -> List[Dict]:
+    def _find_error_traces(self, batch: TraceBatch) -> Dict[str, Any]:
+        """Summarize errors as their most frequent signatures, with exemplar traces."""
+        sketch = ErrorSignatureSketch()
+        sketch.add_batch(batch)
+        return {
+            "error_trace_count": batch.error_trace_count(),
+            **sketch.summary()
+        }
+
+    def _analyze_dependencies(self, batch: TraceBatch) -> List[Dict]:
         """Analyze service dependencies from traces."""
-        dependencies = {}
-        for trace in traces:
-            for span in trace.get("spans", []):
-                service = span.get("serviceName")
-                refs = span.get("references", [])
-                for ref in refs:
-                    parent_span = self._find_span_by_id(traces, ref.get("spanID"))
-                    if parent_span:
-                        parent_service = parent_span.get("serviceName")
-                        key = f"{parent_service}->{service}"
-                        if key not in dependencies:
-                            dependencies[key] = {
-                                "source": parent_service,
-                                "target": service,
-                                "count": 0,
-                                "errors": 0
-                            }
-                        dependencies[key]["count"] += 1
-                        if self._has_error(span):
-                            dependencies[key]["errors"] += 1
-        
-        return list(dependencies.values())
+        counts: EdgeCounts = {}
+        self._count_dependencies(batch, counts)
+        return self._dependency_list(batch.strings, counts)
+
+    def _count_dependencies(self, batch: TraceBatch, counts: EdgeCounts, traces: Optional[List[int]] = None) -> None:
+        """Add a batch's parent -> child service calls, or those of some of its traces, to edge counts keyed by interned IDs."""
+        spans = batch.spans
+        rows = range(len(spans)) if traces is None else (row for trace in traces for row in batch.trace_rows(trace))
+        for row in rows:
+            parent = spans.parent[row]
+            if parent < 0:
+                continue
+            key = (spans.service[parent], spans.service[row])
+            edge = counts.get(key)
+            if edge is None:
+                edge = counts[key] = [0, 0]
+            edge[0] += 1
+            edge[1] += spans.error[row]
+
+    def _dependency_list(self, strings: StringTable, counts: EdgeCounts) -> List[Dict]:
+        return [
+            {
+                "source": strings[source],
+                "target": strings[target],
+                "count": count,
+                "errors": errors
+            }
+            for (source, target), (count, errors) in counts.items()
+        ]
 
     def _analyze_dependency_health(self, dependencies: List[Dict]) -> Dict[str, Any]:
         """Analyze the health of service dependencies."""
@@ -221,54 +441,69 @@ class TracingAgent:
             ]
         }
 
-    def _generate_insights(self, traces: List[Dict]) -> List[str]:
+    def _generate_insights(
+        self,
+        trace_count: int,
+        latency_stats: Dict[str, Any],
+        errors: Dict[str, Any],
+        dependencies: List[Dict],
+        critical_path: Optional[Dict[str, Any]] = None,
+        latency_scores: Optional[List[Dict[str, Any]]] = None,
+        span_count: int = 0
+    ) -> List[str]:
         """Generate insights from trace analysis."""
         insights = []
-        latency_stats = self._analyze_latencies(traces)
-        error_traces = self._find_error_traces(traces)
+        latency_scores = latency_scores or []
         
-        if latency_stats.get("p95", 0) > 1000:  # 1 second
+        # Judge latency against each operation's own baseline at this time of day
+        for score in latency_scores[:MAX_REPORTED_ANOMALIES]:
+            if score["anomalous"]:
+                insights.append(
+                    f"Abnormal latency in {score['service']} {score['operation']}: p50 "
+                    f"{score['observed_p50_ms']:.1f}ms vs {score['baseline_p50_ms']:.1f}ms usual "
+                    f"(z={score['z_score']:.1f})"
+                )
+        # Operations without a baseline yet are still caught by the trace-level p95
+        scored_spans = sum(score["spans"] for score in latency_scores)
+        covered = span_count > 0 and scored_spans >= span_count * BASELINE_COVERAGE
+        if not covered and latency_stats.get("p95", 0) > HIGH_LATENCY_P95_MS:
             insights.append("High latency detected (p95 > 1s)")
         
-        if len(error_traces) > len(traces) * 0.1:  # 10% error rate
+        if errors["error_trace_count"] > trace_count * 0.1:  # 10% of traces
             insights.append("High error rate detected (>10%)")
+            for signature in errors["signatures"][:3]:
+                message = f": {signature['message']}" if signature["message"] else ""
+                insights.append(
+                    f"{signature['count']} errors in {signature['service']} {signature['operation']} "
+                    f"({signature['error_type']}{message})"
+                )
         
-        dependencies = self._analyze_dependencies(traces)
         for dep in dependencies:
             if dep["errors"] / dep["count"] > 0.1:
                 insights.append(f"High error rate in dependency {dep['source']} -> {dep['target']}")
+
+        # The operation holding most of the critical path in the slowest traces
+        operations = (critical_path or {}).get("operations")
+        if operations and operations[0]["tail_share"] >= DOMINANT_CRITICAL_SHARE:
+            top = operations[0]
+            insights.append(
+                f"{top['service']} {top['operation']} accounts for {top['tail_share']:.0%} of the critical path "
+                f"in traces at or above p95 ({top['critical_path_p95_ms']:.1f}ms at p95, "
+                f"{top['self_time_ms']:.1f}ms total self time)"
+            )
         
         return insights
 
-    def _get_error_type(self, span: Dict) -> str:
-        """Extract error type from span tags."""
-        for tag in span.get("tags", []):
-            if tag.get("key") == "error.type":
-                return tag.get("value", "unknown")
-        return "unknown"
-
-    def _find_span_by_id(self, traces: List[Dict], span_id: str) -> Optional[Dict]:
-        """Find a span by its ID across all traces."""
-        for trace in traces:
-            for span in trace.get("spans", []):
-                if span.get("spanID") == span_id:
-                    return span
-        return None
-
-    def _has_error(self, span: Dict) -> bool:
-        """Check if a span contains an error."""
-        return any(
-            tag.get("key") == "error" and tag.get("value", False)
-            for tag in span.get("tags", [])
-        )
-
-# Create the agent instance
-tracing_agent = TracingAgent()
-
-# List of available tools
-tracing_tools = [
-    tracing_agent.list_traced_services,
-    tracing_agent.get_service_operations,
-    tracing_agent.analyze_service_traces,
-    tracing_agent.get_service_dependencies
-] 
\ No newline at end of file
+# Agent instance and tool list are built on first use
+__getattr__ = lazy_attributes(
+    __name__,
+    tracing_agent=lambda module: TracingAgent(),
+    tracing_tools=lambda module: [
+        module.tracing_agent.list_traced_services,
+        module.tracing_agent.get_service_operations,
+        module.tracing_agent.analyze_service_traces,
+        module.tracing_agent.analyze_critical_path,
+        module.tracing_agent.get_service_dependencies,
+        module.tracing_agent.get_blast_radius
+    ]
+)
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""Online latency baselines per (service, operation) and hour of day.
+
+Each span updates an exponentially weighted mean and variance of its log
+duration in the bucket for its service, operation and hour of day, in O(1).
+An analysis scores every operation in a batch against its baseline before
+adding the batch to it. The score is the z-score of the batch's median log
+duration, so "slow" is judged against that operation's own normal latency
+at that time of day, rather than a fixed threshold.
+
+Baselines are stored compactly as one float64 triple (mean, variance,
+weight) per bucket:
+
+    MAGIC
+    uint32 header length, JSON header {version, alpha, buckets, keys}
+    float64[len(keys) * buckets * 3]
+"""
+from typing import Dict, Any, Optional, List, Tuple
+from array import array
+from datetime import datetime, timezone
+import json
+import math
+import os
+import struct
+import threading
+import time
+
+from .model import TraceBatch
+
+DEFAULT_BASELINE_PATH = os.getenv(
+    "LATENCY_BASELINE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "k8s-labeler", "latency_baselines.bin")
+)
+# Weight of each new span; the baseline reflects roughly the last 1/alpha spans of a bucket
+ALPHA = float(os.getenv("LATENCY_BASELINE_ALPHA", "0.01"))
+# Spans a bucket needs before it is used for scoring
+MIN_BASELINE_SPANS = int(os.getenv("LATENCY_BASELINE_MIN_SPANS", "50"))
+ANOMALY_Z_SCORE = float(os.getenv("LATENCY_ANOMALY_Z", "3.0"))
+TIME_OF_DAY_BUCKETS = 24
+# Operations tracked; operation names carrying IDs would otherwise grow the table without bound
+MAX_OPERATIONS = 20000
+# Floor on the standard deviation of log duration, so very stable operations are not flagged for noise
+MIN_LOG_STD = 0.05
+SAVE_INTERVAL = 60.0
+
+MAGIC = b"K8SLAT1\n"
+HEADER = struct.Struct("<I")
+BASELINE_VERSION = 1
+
+class LatencyBaselines:
+    """EWMA mean and variance of log span duration per operation and hour bucket."""
+
+    def __init__(self, path: Optional[str] = None, alpha: float = ALPHA, buckets: int = TIME_OF_DAY_BUCKETS):
+        self.path = path
+        self.alpha = alpha
+        self.buckets = buckets
+        self.dropped = 0
+        # "service\x1foperation" -> [mean, variance, weight] * buckets
+        self._baselines: Dict[str, array] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = 0.0
+
+    @classmethod
+    def load(cls, path: Optional[str] = DEFAULT_BASELINE_PATH, alpha: float = ALPHA) -> "LatencyBaselines":
+        """Open stored baselines; a missing, unreadable or incompatible file starts empty."""
+        baselines = cls(path or None, alpha)
+        if not path or not os.path.exists(path):
+            return baselines
+        try:
+            with open(path, "rb") as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    return baselines
+                (length,) = HEADER.unpack(f.read(HEADER.size))
+                header = json.loads(f.read(length))
+                values = array("d")
+                values.frombytes(f.read())
+        except (OSError, ValueError, struct.error):
+            return baselines
+        if header.get("version") != BASELINE_VERSION or header.get("buckets") != baselines.buckets:
+            return baselines
+        width = 3 * baselines.buckets
+        if len(values) != width * len(header["keys"]):
+            return baselines
+        for index, key in enumerate(header["keys"]):
+            baselines._baselines[key] = values[index * width:(index + 1) * width]
+        return baselines
+
+    def __len__(self) -> int:
+        return len(self._baselines)
+
+    def bucket_of(self, timestamp_us: int) -> int:
+        hour = datetime.fromtimestamp(timestamp_us / 1_000_000, timezone.utc).hour
+        return hour * self.buckets // 24
+
+    def observe(self, service: str, operation: str, timestamp_us: int, duration_us: int) -> None:
+        """Add one span."""
+        with self._lock:
+            self._update(_key(service, operation), self.bucket_of(timestamp_us), math.log1p(max(duration_us, 0)))
+
+    def baseline(self, service: str, operation: str, bucket: int) -> Optional[Tuple[float, float, float]]:
+        """(mean, variance, weight) of log duration, or None if never observed."""
+        values = self._baselines.get(_key(service, operation))
+        if values is None or not values[3 * bucket + 2]:
+            return None
+        return values[3 * bucket], values[3 * bucket + 1], values[3 * bucket + 2]
+
+    def score_and_update(self, batch: TraceBatch, min_spans: int = MIN_BASELINE_SPANS) -> List[Dict[str, Any]]:
+        """Score each operation of a batch against its baseline, then add the batch.
+
+        Returns every scored operation whose baseline is established, most
+        anomalous first; `anomalous` marks a z-score at or above LATENCY_ANOMALY_Z.
+        """
+        spans = batch.spans
+        strings = batch.strings
+        # Log durations grouped by (interned service, interned operation, bucket)
+        groups: Dict[Tuple[int, int, int], List[float]] = {}
+        hours: Dict[int, int] = {}
+        for row in range(len(spans)):
+            # Bucket lookups are cached per hour since epoch
+            hour = spans.start[row] // 3_600_000_000
+            bucket = hours.get(hour)
+            if bucket is None:
+                bucket = hours[hour] = self.bucket_of(spans.start[row])
+            group = (spans.service[row], spans.operation[row], bucket)
+            values = groups.get(group)
+            if values is None:
+                values = groups[group] = []
+            values.append(math.log1p(max(spans.duration[row], 0)))
+
+        scores = []
+        with self._lock:
+            for (service, operation, bucket), values in groups.items():
+                key = _key(strings[service], strings[operation])
+                baseline = self._baselines.get(key)
+                if baseline is not None and baseline[3 * bucket + 2] >= min_spans:
+                    mean, variance = baseline[3 * bucket], baseline[3 * bucket + 1]
+                    values.sort()
+                    observed = values[len(values) // 2]
+                    z = (observed - mean) / max(math.sqrt(variance), MIN_LOG_STD)
+                    scores.append({
+                        "service": strings[service],
+                        "operation": strings[operation],
+                        "hour_bucket": bucket,
+                        "spans": len(values),
+                        "observed_p50_ms": round(math.expm1(observed) / 1000, 3),
+                        "baseline_p50_ms": round(math.expm1(mean) / 1000, 3),
+                        "z_score": round(z, 2),
+                        "anomalous": z >= ANOMALY_Z_SCORE
+                    })
+                # Scored first so an incident does not hide itself by shifting its own baseline
+                for value in values:
+                    self._update(key, bucket, value)
+        scores.sort(key=lambda score: score["z_score"], reverse=True)
+        return scores
+
+    def save(self, force: bool = False) -> bool:
+        """Write the baselines if they changed; at most once per SAVE_INTERVAL unless forced."""
+        if not self.path or not self._dirty:
+            return False
+        now = time.time()
+        if not force and now - self._saved_at < SAVE_INTERVAL:
+            return False
+        with self._lock:
+            keys = list(self._baselines)
+            values = array("d")
+            for key in keys:
+                values.extend(self._baselines[key])
+            self._dirty = False
+            self._saved_at = now
+        header = json.dumps({
+            "version": BASELINE_VERSION, "alpha": self.alpha, "buckets": self.buckets, "keys": keys
+        }, separators=(",", ":")).encode()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(MAGIC + HEADER.pack(len(header)) + header)
+            values.tofile(f)
+        os.replace(temporary, self.path)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "operations": len(self._baselines),
+            "buckets": self.buckets,
+            "alpha": self.alpha,
+            "dropped": self.dropped
+        }
+
+    def _update(self, key: str, bucket: int, value: float) -> None:
+        values = self._baselines.get(key)
+        if values is None:
+            if len(self._baselines) >= MAX_OPERATIONS:
+                self.dropped += 1
+                return
+            values = self._baselines[key] = array("d", bytes(24 * self.buckets))
+        offset = 3 * bucket
+        weight = values[offset + 2] + 1
+        # Plain running mean until 1/alpha spans have been seen, then exponential weighting
+        alpha = max(self.alpha, 1.0 / weight)
+        delta = value - values[offset]
+        values[offset] += alpha * delta
+        values[offset + 1] = (1 - alpha) * (values[offset + 1] + alpha * delta * delta)
+        values[offset + 2] = weight
+        self._dirty = True
+
+def _key(service: str, operation: str) -> str:
+    return f"{service}\x1f{operation}"
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Critical path and self time of spans in a TraceBatch.
+
+The critical path of a trace is the chain of work that determined its end
+to end duration: walking back from the end of a span, the child that
+finished last (before the walk's cursor) was on the critical path, then
+the child that finished before that child started, and so on; any gap not
+covered by a child is the span's own critical time. Self time is a span's
+duration minus the union of its children's intervals.
+
+Both are computed per trace in time linear in its span count (plus sorting
+each span's children) and aggregated across traces per operation and per
+service. Jaeger times are in microseconds; reported values are in ms.
+"""
+from typing import Dict, Any, List, Tuple
+from array import array
+
+from .model import TraceBatch
+
+# Traces at or above this latency quantile make up the tail
+TAIL_QUANTILE = 0.95
+
+def children_by_row(batch: TraceBatch, rows: range) -> Dict[int, List[int]]:
+    """Child rows of every parent in one trace."""
+    parent = batch.spans.parent
+    children: Dict[int, List[int]] = {}
+    for row in rows:
+        if parent[row] >= 0:
+            children.setdefault(parent[row], []).append(row)
+    return children
+
+def self_times(batch: TraceBatch) -> array:
+    """Exclusive time of every span: its duration not covered by any child."""
+    start = batch.spans.start
+    duration = batch.spans.duration
+    result = array("q", duration)
+    for trace_index in range(len(batch)):
+        for row, children in children_by_row(batch, batch.trace_rows(trace_index)).items():
+            low, high = start[row], start[row] + duration[row]
+            covered = 0
+            cursor = low
+            for child in sorted(children, key=start.__getitem__):
+                child_start = max(start[child], cursor)
+                child_end = min(start[child] + duration[child], high)
+                if child_end > child_start:
+                    covered += child_end - child_start
+                    cursor = child_end
+            result[row] = duration[row] - covered
+    return result
+
+def critical_path(batch: TraceBatch, trace_index: int) -> Dict[int, int]:
+    """Critical time of each span of one trace on its critical path, by row."""
+    start = batch.spans.start
+    duration = batch.spans.duration
+    rows = batch.trace_rows(trace_index)
+    if not rows:
+        return {}
+    children = children_by_row(batch, rows)
+    roots = [row for row in rows if batch.spans.parent[row] < 0]
+    # With several roots (missing parents), follow the one that ends last
+    root = max(roots or rows, key=lambda row: start[row] + duration[row])
+
+    critical: Dict[int, int] = {}
+    # Frames of [row, window start, cursor, children latest-ending first, next child]
+    stack = [[root, start[root], start[root] + duration[root],
+              sorted(children.get(root, ()), key=lambda c: start[c] + duration[c], reverse=True), 0]]
+    while stack:
+        frame = stack[-1]
+        row, low, cursor, ordered, position = frame
+        descended = False
+        while position < len(ordered) and cursor > low:
+            child = ordered[position]
+            position += 1
+            child_start = max(start[child], low)
+            child_end = min(start[child] + duration[child], cursor)
+            if child_end <= child_start:
+                # Starts after the cursor: it ran in parallel with a later child
+                continue
+            critical[row] = critical.get(row, 0) + cursor - child_end
+            frame[2], frame[4] = child_start, position
+            stack.append([child, child_start, child_end,
+                          sorted(children.get(child, ()), key=lambda c: start[c] + duration[c], reverse=True), 0])
+            descended = True
+            break
+        if descended:
+            continue
+        critical[row] = critical.get(row, 0) + max(0, cursor - low)
+        stack.pop()
+    return critical
+
+def analyze_critical_paths(batch: TraceBatch, limit: int = 10) -> Dict[str, Any]:
+    """Per-operation and per-service contributions to the critical path.
+
+    For each operation, reports its critical-path time at p50 and p95 across
+    traces, its share of all critical time, and its share in tail traces
+    (latency at or above p95), plus its total self time.
+    """
+    traces = len(batch)
+    if not traces:
+        return {"trace_count": 0, "operations": [], "services": []}
+    spans = batch.spans
+    self_time = self_times(batch)
+
+    # Critical time per trace, keyed by interned (service, operation) IDs
+    per_trace: Dict[Tuple[int, int], array] = {}
+    self_totals: Dict[Tuple[int, int], int] = {}
+    span_counts: Dict[Tuple[int, int], int] = {}
+    for row in range(len(spans)):
+        key = (spans.service[row], spans.operation[row])
+        self_totals[key] = self_totals.get(key, 0) + self_time[row]
+        span_counts[key] = span_counts.get(key, 0) + 1
+    for trace_index in range(traces):
+        for row, critical in critical_path(batch, trace_index).items():
+            key = (spans.service[row], spans.operation[row])
+            column = per_trace.get(key)
+            if column is None:
+                column = per_trace[key] = array("q", [0]) * traces
+            column[trace_index] += critical
+
+    durations = sorted(batch.trace_duration)
+    tail_threshold = _quantile(durations, TAIL_QUANTILE)
+    tail = [t for t in range(traces) if batch.trace_duration[t] >= tail_threshold]
+
+    operations = _contributions(per_trace, tail, self_totals, span_counts)
+    services_per_trace: Dict[int, array] = {}
+    service_self: Dict[int, int] = {}
+    service_spans: Dict[int, int] = {}
+    for (service, _), column in per_trace.items():
+        merged = services_per_trace.get(service)
+        if merged is None:
+            services_per_trace[service] = array("q", column)
+        else:
+            for t in range(traces):
+                merged[t] += column[t]
+    for key, total in self_totals.items():
+        service = key[0]
+        service_self[service] = service_self.get(service, 0) + total
+        service_spans[service] = service_spans.get(service, 0) + span_counts[key]
+    services = _contributions(services_per_trace, tail, service_self, service_spans)
+
+    for entry in operations:
+        service, operation = entry.pop("key")
+        entry["service"] = batch.strings[service]
+        entry["operation"] = batch.strings[operation]
+    for entry in services:
+        entry["service"] = batch.strings[entry.pop("key")]
+
+    return {
+        "trace_count": traces,
+        "latency_ms": {
+            "p50": _ms(_quantile(durations, 0.5)),
+            "p95": _ms(tail_threshold)
+        },
+        "tail_trace_count": len(tail),
+        "operations": operations[:limit],
+        "services": services[:limit]
+    }
+
+def _contributions(
+    per_trace: Dict[Any, array],
+    tail: List[int],
+    self_totals: Dict[Any, int],
+    span_counts: Dict[Any, int]
+) -> List[Dict[str, Any]]:
+    total = sum(sum(column) for column in per_trace.values()) or 1
+    tail_total = sum(column[t] for column in per_trace.values() for t in tail) or 1
+    entries = []
+    for key, column in per_trace.items():
+        values = sorted(column)
+        entries.append({
+            "key": key,
+            "critical_path_p50_ms": _ms(_quantile(values, 0.5)),
+            "critical_path_p95_ms": _ms(_quantile(values, 0.95)),
+            "share": round(sum(column) / total, 3),
+            "tail_share": round(sum(column[t] for t in tail) / tail_total, 3),
+            "self_time_ms": _ms(self_totals.get(key, 0)),
+            "spans": span_counts.get(key, 0)
+        })
+    entries.sort(key=lambda entry: (entry["tail_share"], entry["share"]), reverse=True)
+    return entries
+
+def _quantile(values: List[int], q: float) -> int:
+    return values[min(int(len(values) * q), len(values) - 1)] if values else 0
+
+def _ms(microseconds: float) -> float:
+    return round(microseconds / 1000, 3)
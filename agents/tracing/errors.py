@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Top error signatures of a span stream in bounded memory.
+
+Each error span is reduced to a signature (service, operation, error.type,
+normalized message) and counted with the Space-Saving algorithm: at most
+`capacity` signatures are tracked; an unseen signature arriving when the
+sketch is full replaces the least frequent one and inherits its count, so
+any signature occurring more than total/capacity times is guaranteed to be
+tracked and counts are overestimated by at most the recorded `error`.
+"""
+from typing import Dict, Any, Optional, List, Tuple
+from datetime import datetime, timezone
+import heapq
+import os
+
+from .model import TraceBatch
+
+# Signatures tracked, and reported, per analysis
+ERROR_SIGNATURE_CAPACITY = int(os.getenv("ERROR_SIGNATURE_CAPACITY", "64"))
+ERROR_SIGNATURES_REPORTED = 10
+EXEMPLAR_TRACES = 3
+
+Signature = Tuple[str, str, str, str]
+
+class SignatureCounter:
+    """Count, overestimate, time range and exemplar traces of one signature."""
+    __slots__ = ("signature", "count", "error", "first_seen", "last_seen", "trace_ids")
+
+    def __init__(self, signature: Signature, count: int, error: int, timestamp: int):
+        self.signature = signature
+        self.count = count
+        self.error = error
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.trace_ids: List[str] = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        service, operation, error_type, message = self.signature
+        return {
+            "service": service,
+            "operation": operation,
+            "error_type": error_type,
+            "message": message,
+            "count": self.count,
+            # Upper bound on how much of count belongs to evicted signatures
+            "count_error": self.error,
+            "first_seen": _isoformat(self.first_seen),
+            "last_seen": _isoformat(self.last_seen),
+            "trace_ids": list(self.trace_ids)
+        }
+
+class ErrorSignatureSketch:
+    """Space-Saving top-K counter over error signatures."""
+
+    def __init__(self, capacity: int = ERROR_SIGNATURE_CAPACITY, exemplars: int = EXEMPLAR_TRACES):
+        self.capacity = capacity
+        self.exemplars = exemplars
+        self.total = 0
+        self._counters: Dict[Signature, SignatureCounter] = {}
+        # (count, sequence, signature); entries go stale as counts grow and are fixed lazily
+        self._heap: List[Tuple[int, int, Signature]] = []
+        self._sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    def add(self, signature: Signature, timestamp: int, trace_id: Optional[str] = None, count: int = 1) -> None:
+        """Count one occurrence (timestamp in epoch microseconds, as in Jaeger)."""
+        self.total += count
+        counter = self._counters.get(signature)
+        if counter is None:
+            if len(self._counters) < self.capacity:
+                counter = SignatureCounter(signature, count, 0, timestamp)
+            else:
+                evicted = self._pop_min()
+                counter = SignatureCounter(signature, evicted.count + count, evicted.count, timestamp)
+            self._counters[signature] = counter
+            self._push(counter)
+        else:
+            counter.count += count
+            counter.first_seen = min(counter.first_seen, timestamp)
+            counter.last_seen = max(counter.last_seen, timestamp)
+        if trace_id and len(counter.trace_ids) < self.exemplars and trace_id not in counter.trace_ids:
+            counter.trace_ids.append(trace_id)
+
+    def add_batch(self, batch: TraceBatch) -> None:
+        """Count every error span of a batch."""
+        spans = batch.spans
+        strings = batch.strings
+        # Signatures are built once per distinct combination of interned IDs
+        signatures: Dict[Tuple[int, int, int, int], Signature] = {}
+        for row in batch.error_rows():
+            ids = (spans.service[row], spans.operation[row], spans.error_type[row], spans.error_message[row])
+            signature = signatures.get(ids)
+            if signature is None:
+                signature = signatures[ids] = (strings[ids[0]], strings[ids[1]], strings[ids[2]],
+                                               strings[ids[3]] if ids[3] else "")
+            self.add(signature, spans.start[row], batch.trace_ids[spans.trace[row]])
+
+    def top(self, n: int = ERROR_SIGNATURES_REPORTED) -> List[Dict[str, Any]]:
+        """The n most frequent signatures, most frequent first."""
+        counters = heapq.nlargest(n, self._counters.values(), key=lambda counter: counter.count)
+        return [counter.to_dict() for counter in counters]
+
+    def summary(self, n: int = ERROR_SIGNATURES_REPORTED) -> Dict[str, Any]:
+        return {
+            "error_spans": self.total,
+            "signatures_tracked": len(self._counters),
+            "signatures": self.top(n)
+        }
+
+    def _push(self, counter: SignatureCounter) -> None:
+        self._sequence += 1
+        heapq.heappush(self._heap, (counter.count, self._sequence, counter.signature))
+
+    def _pop_min(self) -> SignatureCounter:
+        while True:
+            count, _, signature = heapq.heappop(self._heap)
+            counter = self._counters[signature]
+            if counter.count == count:
+                del self._counters[signature]
+                return counter
+            # Counted again since it was pushed: requeue at its current count
+            self._push(counter)
+
+def _isoformat(microseconds: int) -> str:
+    return datetime.fromtimestamp(microseconds / 1_000_000, timezone.utc).isoformat()
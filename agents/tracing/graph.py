@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""Service dependency graph merged incrementally from traces and Jaeger.
+
+Every trace batch the tracing agent decodes, and every /api/dependencies
+response, is merged into one graph instead of being rebuilt from a small
+trace sample per call, so edges on low-traffic paths are kept once seen.
+Call and error counts decay exponentially with DEPENDENCY_HALF_LIFE so the
+graph follows the current topology; edges decayed below MIN_EDGE_CALLS are
+dropped when the graph is saved. Health analyses fetch overlapping windows
+of recent traces, so the IDs of the last MAX_MERGED_TRACES traces merged
+are kept with the graph, and a trace seen again adds nothing.
+
+Callers and callees are kept in two adjacency maps, and every query is a
+single breadth-first search, O(V + E):
+
+    upstream(service)     transitive callers
+    downstream(service)   transitive callees
+    blast_radius(service) callers affected when service is slow or failing,
+                          and the entrypoints (services nothing calls) they reach
+    error_paths(service)  erroring call chains below service, ending at the
+                          deepest erroring dependency
+"""
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+from collections import OrderedDict, deque
+import json
+import os
+import threading
+import time
+
+# Graph file; empty keeps the graph in memory only
+DEFAULT_GRAPH_PATH = os.getenv(
+    "DEPENDENCY_GRAPH_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "k8s-labeler", "dependencies.json")
+)
+# Seconds after which an edge's counts have halved
+HALF_LIFE = float(os.getenv("DEPENDENCY_HALF_LIFE", str(6 * 3600)))
+# Minimum seconds between writes of the graph file
+SAVE_INTERVAL = 60.0
+MIN_EDGE_CALLS = 0.01
+# Error rate above which an edge is part of an error propagation path
+ERROR_PATH_MIN_RATE = 0.05
+# Trace IDs remembered so a trace fetched again is not counted twice
+MAX_MERGED_TRACES = int(os.getenv("DEPENDENCY_MERGED_TRACES", "50000"))
+
+GRAPH_VERSION = 1
+
+class Edge:
+    """Decayed call and error counts of one caller -> callee edge."""
+    __slots__ = ("calls", "errors", "updated", "last_seen")
+
+    def __init__(self, calls: float = 0.0, errors: float = 0.0, updated: float = 0.0, last_seen: float = 0.0):
+        self.calls = calls
+        self.errors = errors
+        self.updated = updated
+        self.last_seen = last_seen
+
+    def decay(self, now: float, half_life: float) -> None:
+        """Bring the counts forward to now."""
+        if now > self.updated:
+            factor = 0.5 ** ((now - self.updated) / half_life)
+            self.calls *= factor
+            self.errors *= factor
+            self.updated = now
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.calls if self.calls > 0 else 0.0
+
+class DependencyGraph:
+    """Caller/callee adjacency maps of decayed edges, optionally persisted as JSON."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        half_life: float = HALF_LIFE,
+        max_merged_traces: int = MAX_MERGED_TRACES
+    ):
+        self.path = path
+        self.half_life = half_life
+        self.max_merged_traces = max_merged_traces
+        # caller -> callee -> edge, and callee -> caller -> the same edge
+        self._callees: Dict[str, Dict[str, Edge]] = {}
+        self._callers: Dict[str, Dict[str, Edge]] = {}
+        # IDs of the traces merged most recently, oldest first
+        self._merged_traces: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = 0.0
+
+    @classmethod
+    def load(cls, path: Optional[str] = DEFAULT_GRAPH_PATH, half_life: float = HALF_LIFE) -> "DependencyGraph":
+        """Open the graph stored at path; a missing or unreadable file gives an empty graph."""
+        graph = cls(path or None, half_life)
+        if not path or not os.path.exists(path):
+            return graph
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return graph
+        if data.get("version") != GRAPH_VERSION:
+            return graph
+        for source, target, calls, errors, updated, last_seen in data.get("edges", []):
+            graph._insert(source, target, Edge(calls, errors, updated, last_seen))
+        graph._merged_traces.update((trace_id, None) for trace_id in data.get("traces", [])[-graph.max_merged_traces:])
+        return graph
+
+    def __len__(self) -> int:
+        return sum(len(callees) for callees in self._callees.values())
+
+    def __contains__(self, service: str) -> bool:
+        return service in self._callees or service in self._callers
+
+    def unmerged(self, trace_ids: Iterable[str]) -> List[int]:
+        """Positions of the trace IDs not merged before; they count as merged from now on."""
+        fresh = []
+        with self._lock:
+            merged = self._merged_traces
+            for position, trace_id in enumerate(trace_ids):
+                if trace_id in merged:
+                    merged.move_to_end(trace_id)
+                    continue
+                merged[trace_id] = None
+                fresh.append(position)
+            while len(merged) > self.max_merged_traces:
+                merged.popitem(last=False)
+            if fresh:
+                self._dirty = True
+        return fresh
+
+    def merge_edges(self, edges: Iterable[Dict[str, Any]], now: Optional[float] = None) -> None:
+        """Add observed calls: dicts with source, target, count and errors, as built from traces."""
+        now = time.time() if now is None else now
+        with self._lock:
+            for observed in edges:
+                edge = self._edge(observed["source"], observed["target"], now)
+                edge.decay(now, self.half_life)
+                edge.calls += observed.get("count", 0)
+                edge.errors += observed.get("errors", 0)
+                edge.last_seen = now
+            self._dirty = True
+
+    def merge_dependencies(self, links: Iterable[Dict[str, Any]], now: Optional[float] = None) -> None:
+        """Merge Jaeger /api/dependencies links (parent, child, callCount, errorCount).
+
+        The counts cover the whole lookback window, and the same window is
+        returned again by the next request, so they raise an edge's counts
+        to at least the reported value instead of adding to them.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            for link in links:
+                if not link.get("parent") or not link.get("child"):
+                    continue
+                edge = self._edge(link["parent"], link["child"], now)
+                edge.decay(now, self.half_life)
+                edge.calls = max(edge.calls, float(link.get("callCount", 0)))
+                edge.errors = max(edge.errors, float(link.get("errorCount", 0)))
+                edge.last_seen = now
+            self._dirty = True
+
+    def edges(self, services: Optional[Iterable[str]] = None, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Edges touching any of services (all edges by default), in the trace dependency format."""
+        now = time.time() if now is None else now
+        with self._lock:
+            if services is None:
+                pairs = [(s, t, e) for s, callees in self._callees.items() for t, e in callees.items()]
+            else:
+                seen = set()
+                pairs = []
+                for service in services:
+                    for source, target, edge in self._edges_of(service):
+                        if (source, target) not in seen:
+                            seen.add((source, target))
+                            pairs.append((source, target, edge))
+            result = []
+            for source, target, edge in pairs:
+                edge.decay(now, self.half_life)
+                if edge.calls < MIN_EDGE_CALLS:
+                    continue
+                result.append({
+                    "source": source,
+                    "target": target,
+                    "count": round(edge.calls, 2),
+                    "errors": round(edge.errors, 2),
+                    "last_seen": edge.last_seen
+                })
+        return result
+
+    def upstream(self, service: str, max_depth: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Transitive callers of service, nearest first; via is the next hop towards service."""
+        with self._lock:
+            reached = self._search(service, self._callers, max_depth)
+        return [{"service": node, "depth": depth, "via": via} for node, (depth, via) in reached.items()]
+
+    def downstream(self, service: str, max_depth: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Transitive callees of service, nearest first; via is the hop they are reached from."""
+        with self._lock:
+            reached = self._search(service, self._callees, max_depth)
+        return [{"service": node, "depth": depth, "via": via} for node, (depth, via) in reached.items()]
+
+    def blast_radius(self, service: str, now: Optional[float] = None) -> Dict[str, Any]:
+        """Services whose requests depend on service, with the call path from each."""
+        now = time.time() if now is None else now
+        with self._lock:
+            reached = self._search(service, self._callers, None)
+            affected = []
+            for node, (depth, via) in reached.items():
+                edge = self._callees[node][via]
+                edge.decay(now, self.half_life)
+                affected.append({
+                    "service": node,
+                    "depth": depth,
+                    "path": _path(reached, node, service),
+                    "calls": round(edge.calls, 2)
+                })
+            entrypoints = [node for node in reached if not self._callers.get(node)]
+        return {
+            "service": service,
+            "known": service in self,
+            "affected": affected,
+            "entrypoints": entrypoints
+        }
+
+    def error_paths(
+        self,
+        service: str,
+        min_error_rate: float = ERROR_PATH_MIN_RATE,
+        now: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Chains of erroring calls from service down to where the errors start.
+
+        Follows callee edges whose error rate is at least min_error_rate; each
+        path ends at a service none of whose own calls error, the likely origin.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            def erroring(node: str) -> Iterable[str]:
+                for callee, edge in self._callees.get(node, {}).items():
+                    edge.decay(now, self.half_life)
+                    if edge.calls >= MIN_EDGE_CALLS and edge.error_rate >= min_error_rate:
+                        yield callee
+
+            reached: Dict[str, Tuple[int, Optional[str]]] = {service: (0, None)}
+            queue = deque([service])
+            origins = []
+            while queue:
+                node = queue.popleft()
+                has_erroring_callee = False
+                for callee in erroring(node):
+                    has_erroring_callee = True
+                    if callee not in reached:
+                        reached[callee] = (reached[node][0] + 1, node)
+                        queue.append(callee)
+                if not has_erroring_callee and node != service:
+                    origins.append(node)
+
+            paths = []
+            for origin in origins:
+                path = _path(reached, origin, service)[::-1]
+                rates = [round(self._callees[a][b].error_rate, 3) for a, b in zip(path, path[1:])]
+                paths.append({"origin": origin, "path": path, "error_rates": rates})
+        paths.sort(key=lambda item: min(item["error_rates"]), reverse=True)
+        return paths
+
+    def save(self, force: bool = False) -> bool:
+        """Write the graph if it changed; at most once per SAVE_INTERVAL unless forced."""
+        if not self.path or not self._dirty:
+            return False
+        now = time.time()
+        if not force and now - self._saved_at < SAVE_INTERVAL:
+            return False
+        with self._lock:
+            rows = []
+            expired = []
+            for source, callees in self._callees.items():
+                for target, edge in callees.items():
+                    edge.decay(now, self.half_life)
+                    if edge.calls < MIN_EDGE_CALLS:
+                        expired.append((source, target))
+                        continue
+                    rows.append([source, target, round(edge.calls, 4), round(edge.errors, 4),
+                                 edge.updated, edge.last_seen])
+            # Removing can drop a caller's whole entry, so not while iterating
+            for source, target in expired:
+                self._remove(source, target)
+            traces = list(self._merged_traces)
+            self._dirty = False
+            self._saved_at = now
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump({"version": GRAPH_VERSION, "edges": rows, "traces": traces}, f, separators=(",", ":"))
+        os.replace(temporary, self.path)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "services": len(set(self._callees) | set(self._callers)),
+            "edges": len(self),
+            "half_life": self.half_life
+        }
+
+    def _edge(self, source: str, target: str, now: float) -> Edge:
+        edge = self._callees.get(source, {}).get(target)
+        if edge is None:
+            edge = self._insert(source, target, Edge(updated=now))
+        return edge
+
+    def _insert(self, source: str, target: str, edge: Edge) -> Edge:
+        self._callees.setdefault(source, {})[target] = edge
+        self._callers.setdefault(target, {})[source] = edge
+        return edge
+
+    def _remove(self, source: str, target: str) -> None:
+        del self._callees[source][target]
+        del self._callers[target][source]
+        if not self._callees[source]:
+            del self._callees[source]
+        if not self._callers[target]:
+            del self._callers[target]
+
+    def _edges_of(self, service: str) -> Iterable[Tuple[str, str, Edge]]:
+        for target, edge in self._callees.get(service, {}).items():
+            yield service, target, edge
+        for source, edge in self._callers.get(service, {}).items():
+            yield source, service, edge
+
+    def _search(
+        self, service: str, adjacency: Dict[str, Dict[str, Edge]], max_depth: Optional[int]
+    ) -> Dict[str, Tuple[int, str]]:
+        """Breadth-first search from service: reached node -> (depth, node it was reached from)."""
+        reached: Dict[str, Tuple[int, str]] = {}
+        queue = deque([(service, 0)])
+        visited = {service}
+        while queue:
+            node, depth = queue.popleft()
+            if max_depth is not None and depth >= max_depth:
+                continue
+            for neighbour in adjacency.get(node, ()):
+                if neighbour not in visited:
+                    visited.add(neighbour)
+                    reached[neighbour] = (depth + 1, node)
+                    queue.append((neighbour, depth + 1))
+        return reached
+
+def _path(reached: Dict[str, Tuple[int, Optional[str]]], node: str, service: str) -> List[str]:
+    """Hops from node back to service through the search tree."""
+    path = [node]
+    while node != service:
+        node = reached[node][1]
+        path.append(node)
+    return path
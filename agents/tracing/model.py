@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+from typing import Dict, Any, Optional, List, Iterator
+from array import array
+import re
+
+ERROR_TAG = "error"
+ERROR_TYPE_TAG = "error.type"
+# Tags and log fields that carry an error's message, most specific first
+ERROR_MESSAGE_KEYS = ("error.message", "exception.message", "otel.status_description", "error.object", "message")
+UNKNOWN = "unknown"
+MAX_ERROR_MESSAGE = 160
+
+# Variable parts of error messages, replaced so that equal errors share one signature
+MESSAGE_PATTERNS = (
+    (re.compile(r"\b([a-z0-9]+(?:-[a-z0-9]+)*)-[a-z0-9]{8,10}-[a-z0-9]{5}\b"), r"\1-<pod>"),
+    (re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"), "<uuid>"),
+    (re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b"), "<ip>"),
+    (re.compile(r"\b(?:0x)?(?=[0-9a-fA-F]*\d)(?=[0-9a-fA-F]*[a-fA-F])[0-9a-fA-F]{6,}\b"), "<hex>"),
+    (re.compile(r"'[^']*'|\"[^\"]*\""), "<str>"),
+    (re.compile(r"\d+(?:\.\d+)?"), "<n>"),
+    (re.compile(r"\s+"), " "),
+)
+
+class StringTable:
+    """Interns repeated strings (services, operations, error types) as small ints."""
+    __slots__ = ("_ids", "values")
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self.values: List[str] = []
+        self.intern(UNKNOWN)
+
+    def intern(self, value: Optional[str]) -> int:
+        value = UNKNOWN if value is None else str(value)
+        string_id = self._ids.get(value)
+        if string_id is None:
+            string_id = len(self.values)
+            self._ids[value] = string_id
+            self.values.append(value)
+        return string_id
+
+    def lookup(self, value: str) -> Optional[int]:
+        """Return the ID of an already interned string, or None."""
+        return self._ids.get(value)
+
+    def __getitem__(self, string_id: int) -> str:
+        return self.values[string_id]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+class SpanTable:
+    """Struct-of-arrays storage for decoded spans.
+
+    Row i of every column describes one span. Spans of a trace are stored
+    contiguously; parent links are row indices (-1 for roots) resolved once
+    at decode time.
+    """
+    __slots__ = ("trace", "span_id", "parent", "service", "operation",
+                 "start", "duration", "error", "error_type", "error_message")
+
+    def __init__(self):
+        self.trace = array("I")
+        self.span_id = array("Q")
+        self.parent = array("i")
+        self.service = array("I")
+        self.operation = array("I")
+        self.start = array("q")
+        self.duration = array("q")
+        self.error = array("b")
+        self.error_type = array("I")
+        self.error_message = array("I")
+
+    def __len__(self) -> int:
+        return len(self.span_id)
+
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in (
+            self.trace, self.span_id, self.parent, self.service, self.operation,
+            self.start, self.duration, self.error, self.error_type, self.error_message
+        ))
+
+class TraceBatch:
+    """Compact, columnar view over a set of Jaeger traces.
+
+    Service and operation names are interned in `strings`, Jaeger's
+    `processes` map is resolved once per trace, and error flags and error
+    types are precomputed so the analyses never rescan tag lists.
+    """
+    __slots__ = ("strings", "spans", "trace_ids", "trace_offsets", "trace_start", "trace_duration")
+
+    def __init__(self, strings: Optional[StringTable] = None):
+        self.strings = strings or StringTable()
+        self.spans = SpanTable()
+        self.trace_ids: List[str] = []
+        # Spans of trace t occupy rows trace_offsets[t]:trace_offsets[t + 1]
+        self.trace_offsets = array("I", [0])
+        self.trace_start = array("q")
+        self.trace_duration = array("q")
+
+    def __len__(self) -> int:
+        return len(self.trace_ids)
+
+    def trace_rows(self, trace_index: int) -> range:
+        return range(self.trace_offsets[trace_index], self.trace_offsets[trace_index + 1])
+
+    def error_rows(self) -> Iterator[int]:
+        """Row indices of spans flagged as errors."""
+        error = self.spans.error
+        return (row for row in range(len(error)) if error[row])
+
+    def service_name(self, row: int) -> str:
+        return self.strings[self.spans.service[row]]
+
+    def operation_name(self, row: int) -> str:
+        return self.strings[self.spans.operation[row]]
+
+    def error_type(self, row: int) -> str:
+        return self.strings[self.spans.error_type[row]]
+
+    def error_message(self, row: int) -> str:
+        return self.strings[self.spans.error_message[row]]
+
+    def error_trace_count(self) -> int:
+        """Number of traces with at least one error span."""
+        trace = self.spans.trace
+        return len({trace[row] for row in self.error_rows()})
+
+    def add_trace(self, trace: Dict[str, Any]) -> None:
+        """Decode one Jaeger trace and append its spans."""
+        strings = self.strings
+        spans = self.spans
+        trace_index = len(self.trace_ids)
+        first_row = len(spans)
+
+        services = {
+            process_id: strings.intern(process.get("serviceName"))
+            for process_id, process in (trace.get("processes") or {}).items()
+        }
+
+        rows_by_span_id: Dict[str, int] = {}
+        references: List[Optional[str]] = []
+        trace_start = None
+        trace_end = None
+        for span in trace.get("spans", []):
+            row = len(spans)
+            span_id = span.get("spanID") or ""
+            rows_by_span_id[span_id] = row
+
+            # Older payloads carry serviceName on the span itself
+            service = services.get(span.get("processID"))
+            if service is None:
+                service = strings.intern(span.get("serviceName"))
+
+            error = False
+            error_type = 0
+            messages: Dict[str, Any] = {}
+            for tag in span.get("tags", ()):
+                key = tag.get("key")
+                if key == ERROR_TAG:
+                    error = bool(tag.get("value", False))
+                elif key == ERROR_TYPE_TAG:
+                    error_type = strings.intern(tag.get("value", UNKNOWN))
+                elif key in ERROR_MESSAGE_KEYS:
+                    messages[key] = tag.get("value")
+            error_message = 0
+            if error:
+                message = _error_message(messages, span.get("logs"))
+                if message:
+                    error_message = strings.intern(normalize_error_message(message))
+
+            start = int(span.get("startTime", 0))
+            duration = int(span.get("duration", 0))
+            trace_start = start if trace_start is None else min(trace_start, start)
+            trace_end = start + duration if trace_end is None else max(trace_end, start + duration)
+
+            spans.trace.append(trace_index)
+            spans.span_id.append(_span_id_to_int(span_id))
+            spans.parent.append(-1)
+            spans.service.append(service)
+            spans.operation.append(strings.intern(span.get("operationName")))
+            spans.start.append(start)
+            spans.duration.append(duration)
+            spans.error.append(1 if error else 0)
+            spans.error_type.append(error_type)
+            spans.error_message.append(error_message)
+            references.append(_parent_span_id(span))
+
+        # Parent links can only be resolved once every span of the trace is known
+        for offset, parent_span_id in enumerate(references):
+            if parent_span_id is not None:
+                spans.parent[first_row + offset] = rows_by_span_id.get(parent_span_id, -1)
+
+        self.trace_ids.append(trace.get("traceID", ""))
+        self.trace_offsets.append(len(spans))
+        self.trace_start.append(trace_start or 0)
+        # Prefer an explicit trace duration when the payload carries one
+        duration = trace.get("duration")
+        if duration is None:
+            duration = (trace_end - trace_start) if trace_start is not None else 0
+        self.trace_duration.append(int(duration))
+
+def decode_traces(traces: List[Dict[str, Any]], strings: Optional[StringTable] = None) -> TraceBatch:
+    """Decode Jaeger trace JSON into a compact TraceBatch."""
+    batch = TraceBatch(strings)
+    for trace in traces:
+        batch.add_trace(trace)
+    return batch
+
+def normalize_error_message(message: str) -> str:
+    """Error message with IDs, addresses, numbers and quoted values replaced by placeholders."""
+    message = str(message)[:4 * MAX_ERROR_MESSAGE]
+    for pattern, placeholder in MESSAGE_PATTERNS:
+        message = pattern.sub(placeholder, message)
+    return message.strip()[:MAX_ERROR_MESSAGE]
+
+def _error_message(tags: Dict[str, Any], logs: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+    """The message of an error span, from its tags or else its error log events."""
+    for key in ERROR_MESSAGE_KEYS:
+        if tags.get(key):
+            return tags[key]
+    for log in logs or ():
+        fields = {field.get("key"): field.get("value") for field in log.get("fields", ())}
+        for key in ERROR_MESSAGE_KEYS:
+            if fields.get(key):
+                return fields[key]
+    return None
+
+def _parent_span_id(span: Dict[str, Any]) -> Optional[str]:
+    """Return the CHILD_OF parent span ID, falling back to the first reference."""
+    references = span.get("references") or []
+    for ref in references:
+        if ref.get("refType", "CHILD_OF") == "CHILD_OF":
+            return ref.get("spanID")
+    return references[0].get("spanID") if references else None
+
+def _span_id_to_int(span_id: str) -> int:
+    try:
+        return int(span_id, 16) & 0xFFFFFFFFFFFFFFFF
+    except ValueError:
+        return 0
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Append-only span file for analyzing more traces than fit in memory.
+
+Decoded traces are buffered in a TraceBatch and written out as a segment
+once it holds segment_spans spans. A segment is the TraceBatch's columns
+as stored in memory (trace, span ID, parent row, service, operation, start,
+duration, error flags; then trace offsets, starts, durations and IDs), each
+padded to 8 bytes, after a header with the span and trace counts and the
+byte length of every column. Segments hold whole traces, and parent rows
+and trace indices are local to their segment.
+
+Reading maps one segment at a time and hands it out as a TraceBatch whose
+columns are memoryviews over the mapping, so the existing analyses run on
+it without copying. The mapping is closed before the next segment is
+mapped, which keeps resident memory to about one segment whatever the file
+size. Strings stay interned in memory in the file's StringTable; the file
+is scratch space for one analysis and is deleted on close.
+"""
+from typing import Dict, Any, Optional, List, Iterable, Iterator, Tuple
+from collections import Counter
+import mmap
+import os
+import struct
+import tempfile
+
+from .model import StringTable, TraceBatch
+
+# Directory for span files; empty uses the system temporary directory
+SPAN_SPILL_DIR = os.getenv("SPAN_SPILL_DIR", "")
+# Spans per segment, which bounds the memory an analysis of a span file holds
+SPAN_SEGMENT_SPANS = int(os.getenv("SPAN_SEGMENT_SPANS", "65536"))
+
+FILE_MAGIC = b"SPANFIL1"
+SEGMENT_MAGIC = b"SEG1"
+SPAN_COLUMNS = (
+    ("trace", "I"), ("span_id", "Q"), ("parent", "i"), ("service", "I"), ("operation", "I"),
+    ("start", "q"), ("duration", "q"), ("error", "b"), ("error_type", "I"), ("error_message", "I")
+)
+TRACE_COLUMNS = (("trace_offsets", "I"), ("trace_start", "q"), ("trace_duration", "q"))
+# Span and trace counts, then the byte length of every column and of the trace IDs
+SEGMENT_HEADER = struct.Struct(f"<4sII4x{len(SPAN_COLUMNS) + len(TRACE_COLUMNS) + 1}Q")
+
+class SpanFileError(ValueError):
+    pass
+
+class SpanFile:
+    """Traces spilled to disk as columnar segments, read back one segment at a time."""
+
+    def __init__(
+        self,
+        strings: Optional[StringTable] = None,
+        segment_spans: int = SPAN_SEGMENT_SPANS,
+        directory: Optional[str] = SPAN_SPILL_DIR
+    ):
+        self.strings = strings or StringTable()
+        self.segment_spans = segment_spans
+        descriptor, self.path = tempfile.mkstemp(prefix="spans-", suffix=".bin", dir=directory or None)
+        self._file = os.fdopen(descriptor, "w+b")
+        self._file.write(FILE_MAGIC)
+        self._pending = TraceBatch(self.strings)
+        # (offset, spans, traces, column lengths) of every segment written
+        self._segments: List[Tuple[int, int, int, Tuple[int, ...]]] = []
+        self._reading = False
+        self.spans = 0
+        self.traces = 0
+        self.first_start: Optional[int] = None
+        self.last_start: Optional[int] = None
+        # Interned service ID -> spans, for choosing the services worth a timeline
+        self.service_spans: Counter = Counter()
+
+    def __len__(self) -> int:
+        return self.traces + len(self._pending)
+
+    def __enter__(self) -> "SpanFile":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    @property
+    def nbytes(self) -> int:
+        return os.fstat(self._file.fileno()).st_size if not self._file.closed else 0
+
+    def add_traces(self, traces: Iterable[Dict[str, Any]]) -> int:
+        """Decode Jaeger traces into the file, writing a segment whenever one is full; returns the traces added."""
+        added = 0
+        for trace in traces:
+            self._pending.add_trace(trace)
+            added += 1
+            if len(self._pending.spans) >= self.segment_spans:
+                self.flush()
+        return added
+
+    def append(self, batch: TraceBatch) -> None:
+        """Write a decoded batch as one segment; it must share the file's string table."""
+        if batch.strings is not self.strings:
+            raise SpanFileError("batch must be decoded with the span file's string table")
+        if not len(batch):
+            return
+        spans = batch.spans
+        columns = [getattr(spans, name) for name, _ in SPAN_COLUMNS]
+        columns += [getattr(batch, name) for name, _ in TRACE_COLUMNS]
+        trace_ids = "\n".join(batch.trace_ids).encode()
+        lengths = tuple(column.itemsize * len(column) for column in columns) + (len(trace_ids),)
+
+        self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell()
+        self._file.write(SEGMENT_HEADER.pack(SEGMENT_MAGIC, len(spans), len(batch), *lengths))
+        for column, length in zip(columns, lengths):
+            column.tofile(self._file)
+            self._file.write(bytes(_padding(length)))
+        self._file.write(trace_ids)
+        self._file.write(bytes(_padding(len(trace_ids))))
+        self._segments.append((offset, len(spans), len(batch), lengths))
+
+        self.spans += len(spans)
+        self.traces += len(batch)
+        first, last = min(spans.start), max(spans.start)
+        self.first_start = first if self.first_start is None else min(self.first_start, first)
+        self.last_start = last if self.last_start is None else max(self.last_start, last)
+        self.service_spans.update(spans.service)
+
+    def flush(self) -> None:
+        """Write the buffered traces out as a segment."""
+        if len(self._pending):
+            self.append(self._pending)
+            self._pending = TraceBatch(self.strings)
+        self._file.flush()
+
+    def segments(self) -> Iterator[TraceBatch]:
+        """Every segment as a TraceBatch over its mapping, valid only until the next one is requested."""
+        self.flush()
+        if self._reading:
+            raise SpanFileError("span file is already being read")
+        self._reading = True
+        try:
+            for offset, span_count, trace_count, lengths in self._segments:
+                # Mappings start on an allocation boundary
+                base = offset - offset % mmap.ALLOCATIONGRANULARITY
+                size = offset - base + SEGMENT_HEADER.size + sum(length + _padding(length) for length in lengths)
+                mapping = mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_READ, offset=base)
+                views: List[memoryview] = []
+                try:
+                    batch = self._segment(mapping, offset - base, span_count, trace_count, lengths, views)
+                    yield batch
+                finally:
+                    # The mapping cannot close while views of it exist
+                    for view in reversed(views):
+                        view.release()
+                    mapping.close()
+        finally:
+            self._reading = False
+
+    def close(self) -> None:
+        """Close and delete the file."""
+        if not self._file.closed:
+            self._file.close()
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "traces": len(self),
+            "spans": self.spans + len(self._pending.spans),
+            "segments": len(self._segments),
+            "file_bytes": self.nbytes,
+            "strings": len(self.strings)
+        }
+
+    def _segment(
+        self,
+        mapping: mmap.mmap,
+        position: int,
+        span_count: int,
+        trace_count: int,
+        lengths: Tuple[int, ...],
+        views: List[memoryview]
+    ) -> TraceBatch:
+        whole = memoryview(mapping)
+        views.append(whole)
+        magic, spans, traces, *_ = SEGMENT_HEADER.unpack_from(whole, position)
+        if magic != SEGMENT_MAGIC or (spans, traces) != (span_count, trace_count):
+            raise SpanFileError(f"corrupt segment at offset {position} of {self.path}")
+        position += SEGMENT_HEADER.size
+
+        batch = TraceBatch(self.strings)
+        for (name, code), length in zip(SPAN_COLUMNS + TRACE_COLUMNS, lengths):
+            raw = whole[position:position + length]
+            column = raw.cast(code)
+            views.extend((raw, column))
+            target = batch.spans if (name, code) in SPAN_COLUMNS else batch
+            setattr(target, name, column)
+            position += length + _padding(length)
+        trace_ids = bytes(whole[position:position + lengths[-1]]).decode()
+        batch.trace_ids = trace_ids.split("\n") if trace_count else []
+        return batch
+
+def _padding(length: int) -> int:
+    return -length % 8
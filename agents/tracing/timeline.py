@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Per-service latency and error series binned from a TraceBatch.
+
+A service's latency in a bin is the mean duration of its entry spans (spans
+whose parent belongs to another service, or roots) that started in the bin;
+its error rate is the share of its spans in the bin flagged as errors.
+ServiceTimeline accumulates the same series over several batches on one
+grid, such as the segments of a spilled span file.
+"""
+from typing import Dict, Any, List, Optional
+import math
+
+from .model import StringTable, TraceBatch
+
+TIMELINE_BINS = 60
+TIMELINE_MAX_SERVICES = 10
+
+class ServiceTimeline:
+    """Binned series of chosen services over a fixed grid, accumulated batch by batch.
+
+    Batches must share one string table. Entry spans are recognized through
+    their parent row, so a trace must not be split across batches.
+    """
+
+    def __init__(self, first: int, last: int, services: List[int], bins: int = TIMELINE_BINS):
+        # Whole seconds keep the grid aligned with control-plane samples
+        self.step = max(1, math.ceil((last - first + 1) / bins / 1_000_000))
+        self.start = first // 1_000_000
+        self.count = int((last // 1_000_000 - self.start) // self.step) + 1
+        self.columns = {service: index for index, service in enumerate(services)}
+        self.latency_sum = [[0.0] * self.count for _ in services]
+        self.entries = [[0] * self.count for _ in services]
+        self.errors = [[0] * self.count for _ in services]
+        self.totals = [[0] * self.count for _ in services]
+
+    def add(self, batch: TraceBatch) -> None:
+        spans = batch.spans
+        columns = self.columns
+        for row in range(len(spans)):
+            column = columns.get(spans.service[row])
+            if column is None:
+                continue
+            index = int((spans.start[row] // 1_000_000 - self.start) // self.step)
+            if not 0 <= index < self.count:
+                continue
+            self.totals[column][index] += 1
+            self.errors[column][index] += spans.error[row]
+            parent = spans.parent[row]
+            if parent < 0 or spans.service[parent] != spans.service[row]:
+                self.latency_sum[column][index] += spans.duration[row]
+                self.entries[column][index] += 1
+
+    def to_dict(self, strings: StringTable) -> Dict[str, Any]:
+        series = {}
+        for service, column in self.columns.items():
+            series[strings[service]] = {
+                "latency_ms": [_ratio(self.latency_sum[column][i], self.entries[column][i], 1000) for i in range(self.count)],
+                "error_rate": [_ratio(self.errors[column][i], self.totals[column][i]) for i in range(self.count)],
+                "spans": self.totals[column]
+            }
+        return {"start": float(self.start), "step": float(self.step), "series": series}
+
+def busiest_services(span_counts: Dict[int, int], max_services: int = TIMELINE_MAX_SERVICES) -> List[int]:
+    """Interned IDs of the services with the most spans."""
+    return sorted(span_counts, key=span_counts.__getitem__, reverse=True)[:max_services]
+
+def service_timeline(
+    batch: TraceBatch,
+    bins: int = TIMELINE_BINS,
+    max_services: int = TIMELINE_MAX_SERVICES
+) -> Dict[str, Any]:
+    """Binned series of the busiest services; start and step are in epoch seconds."""
+    spans = batch.spans
+    if not len(spans):
+        return {"start": 0.0, "step": 0.0, "series": {}}
+    span_counts: Dict[int, int] = {}
+    for service in spans.service:
+        span_counts[service] = span_counts.get(service, 0) + 1
+    timeline = ServiceTimeline(min(spans.start), max(spans.start), busiest_services(span_counts, max_services), bins)
+    timeline.add(batch)
+    return timeline.to_dict(batch.strings)
+
+def _ratio(total: float, count: int, scale: float = 1) -> Optional[float]:
+    return round(total / count / scale, 4) if count else None
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Compare loading labels from exported shards against per-file JSON.
+
+Generates --labels records from the repository's training-data labels,
+writes them both as pretty-printed files (a --files sample) and as an
+export, then reports export time, compression ratio, streaming throughput
+and random-access latency of the shards next to the per-file baseline.
+
+Usage:
+    python benchmarks/dataset_export.py [--labels 200000] [--files 20000] [--shard-size-mb 64]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.labels.export import ShardedDataset, corpus_records, export_dataset
+
+def _records(count: int):
+    templates = list(corpus_records())
+    for i in range(count):
+        template = templates[i % len(templates)]
+        yield {**template, "id": f"{template['id']}-{i}", "path": f"synthetic/{i}.json"}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--labels", type=int, default=200_000)
+    parser.add_argument("--files", type=int, default=20_000, help="size of the per-file baseline")
+    parser.add_argument("--shard-size-mb", type=float, default=64)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        files_dir = os.path.join(workdir, "files")
+        os.makedirs(files_dir)
+        for i, record in enumerate(_records(args.files)):
+            with open(os.path.join(files_dir, f"{i}.json"), "w") as f:
+                json.dump(record["label"], f, indent=4)
+        started = time.perf_counter()
+        for name in os.listdir(files_dir):
+            with open(os.path.join(files_dir, name)) as f:
+                json.load(f)
+        per_file = (time.perf_counter() - started) / args.files
+        print(f"per-file JSON:   {1 / per_file:10.0f} records/s")
+
+        export_dir = os.path.join(workdir, "export")
+        started = time.perf_counter()
+        manifest = export_dataset(_records(args.labels), export_dir, shard_bytes=int(args.shard_size_mb * 2**20))
+        shards = [shard for split in manifest["splits"].values() for shard in split["shards"]]
+        raw = sum(shard["uncompressed_bytes"] for shard in shards)
+        packed = sum(shard["bytes"] for shard in shards)
+        print(f"export:          {time.perf_counter() - started:10.2f} s for {args.labels} records "
+              f"in {len(shards)} shards, {raw / packed:.1f}x smaller than compact JSONL")
+
+        dataset = ShardedDataset(export_dir, "train")
+        started = time.perf_counter()
+        count = sum(1 for _ in dataset)
+        print(f"stream:          {count / (time.perf_counter() - started):10.0f} records/s")
+
+        rng = random.Random(0)
+        positions = [rng.randrange(len(dataset)) for _ in range(10_000)]
+        started = time.perf_counter()
+        for position in positions:
+            dataset[position]
+        elapsed = time.perf_counter() - started
+        print(f"random access:   {elapsed / len(positions) * 1e6:10.1f} us/record")
+        dataset.close()
+
+if __name__ == "__main__":
+    main()
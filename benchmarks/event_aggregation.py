@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Throughput and memory of the event aggregation pipeline.
+
+TECHNICAL_DESIGN.md §8.2 targets maxEventsPerSecond: 1000 with batchSize
+100. This benchmark replays a synthetic cluster stream (pod events, `top`
+samples every 15s per pod and log lines) through EventAggregator as fast as
+it is accepted and reports items/s against that target, peak tracked
+objects and open windows, and the peak input queue depth. --sink-latency
+simulates a slow consumer to show backpressure keeping queues bounded.
+
+Usage:
+    python benchmarks/event_aggregation.py [--items 200000] [--pods 5000]
+        [--event-fraction 0.05] [--sink-latency 0]
+"""
+from typing import Iterator, List
+import argparse
+import asyncio
+import os
+import random
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.events.aggregator import AggregatorConfig, EventAggregator
+from agents.events.model import MODIFIED, AggregatedEvent, PodLog, ResourceEvent, ResourceMetrics, StreamItem
+from agents.events.sources import ReplaySource
+
+TARGET_EVENTS_PER_SECOND = 1000
+
+REASONS = ["BackOff", "Unhealthy", "OOMKilling", "FailedScheduling", "Pulled", "Killing"]
+LOG_LINES = [
+    "INFO request completed in 12ms",
+    "WARN slow upstream response from cart service",
+    "ERROR connection refused: redis:6379",
+    "INFO health check ok",
+]
+
+def synthetic_stream(items: int, pods: int, event_fraction: float, rate: float, seed: int = 0) -> Iterator[StreamItem]:
+    """A cluster-like stream at `rate` items per second of event time."""
+    rng = random.Random(seed)
+    names = [(f"ns-{i % 40}", f"pod-{i}") for i in range(pods)]
+    start = 1_700_000_000.0
+    next_sample = {}
+    # Incidents concentrate on a small set of unhealthy pods
+    hot = names[:max(1, pods // 50)]
+    for index in range(items):
+        now = start + index / rate
+        roll = rng.random()
+        if roll < event_fraction:
+            namespace, name = rng.choice(hot) if rng.random() < 0.8 else rng.choice(names)
+            yield ResourceEvent(MODIFIED, "Pod", namespace, name, now, rng.choice(REASONS), "synthetic event")
+            continue
+        namespace, name = rng.choice(names)
+        if roll < 0.4 and now >= next_sample.get(name, 0.0):
+            next_sample[name] = now + 15.0
+            yield ResourceMetrics("Pod", namespace, name, now, rng.uniform(1, 900), rng.uniform(2e7, 9e8))
+        else:
+            if rng.random() < 0.5:
+                namespace, name = rng.choice(hot)
+            message = rng.choice(LOG_LINES)
+            yield PodLog(namespace, name, "app", message, now, "error" if "ERROR" in message else "info")
+
+async def run(args: argparse.Namespace) -> None:
+    config = AggregatorConfig(batch_size=100, queue_size=args.queue_size, max_keys=args.max_keys)
+    aggregator = EventAggregator(config)
+    sizes: List[int] = []
+
+    async def sink(batch: List[AggregatedEvent]) -> None:
+        sizes.append(len(batch))
+        if args.sink_latency:
+            await asyncio.sleep(args.sink_latency)
+
+    stream = synthetic_stream(args.items, args.pods, args.event_fraction, args.rate)
+    started = time.perf_counter()
+    stats = await aggregator.run([ReplaySource(stream)], sink)
+    elapsed = time.perf_counter() - started
+
+    total = sum(stats.received.values())
+    throughput = total / elapsed
+    print(f"items:            {total} ({stats.received})")
+    print(f"elapsed:          {elapsed:.2f}s")
+    print(f"throughput:       {throughput:,.0f} items/s "
+          f"({throughput / TARGET_EVENTS_PER_SECOND:.1f}x the {TARGET_EVENTS_PER_SECOND}/s target)")
+    print(f"aggregated:       {stats.emitted} in {stats.batches} batches "
+          f"(mean {stats.emitted / max(stats.batches, 1):.1f}, max {max(sizes, default=0)})")
+    print(f"peak objects:     {stats.peak_keys} (limit {config.max_keys}), evicted {stats.evicted_keys}")
+    print(f"peak windows:     {stats.peak_open_windows}, closed early {stats.closed_early}")
+    print(f"peak queue depth: {stats.peak_queue_depth} (limit {config.queue_size})")
+    print(f"truncated items:  {stats.truncated_items}")
+    print(f"max RSS:          {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=200000)
+    parser.add_argument("--pods", type=int, default=5000)
+    parser.add_argument("--event-fraction", type=float, default=0.05)
+    parser.add_argument("--rate", type=float, default=1000.0, help="event-time items per second of the stream")
+    parser.add_argument("--queue-size", type=int, default=1000)
+    parser.add_argument("--max-keys", type=int, default=10000)
+    parser.add_argument("--sink-latency", type=float, default=0.0, help="seconds per sink batch")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Ingest and query cost of the EventIndex on a noisy namespace.
+
+Generates --events Event objects for --pods crash-looping pods (BackOff,
+Unhealthy probes with varying addresses and latencies, Pulled, Created),
+lists them --relists times with growing counts as the API server would, and
+reports ingest time, per-object query time, and the size of one pod's
+events as listed versus compacted.
+
+Usage:
+    python benchmarks/event_index.py [--pods 500] [--events 50000] [--relists 5]
+"""
+from typing import Dict, Any, List
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.events.model import format_time
+from agents.k8s_control.events import EventIndex
+
+MESSAGES = [
+    ("Warning", "BackOff", "Back-off restarting failed container app in pod {pod}_shop(5d1c9f4e-8a0b-4c1e-9b7a-{n:012d})"),
+    ("Warning", "Unhealthy", 'Readiness probe failed: Get "http://10.1.{a}.{b}:8080/healthz": context deadline exceeded after {n}ms'),
+    ("Warning", "Unhealthy", "Liveness probe failed: HTTP probe failed with statuscode: 503"),
+    ("Normal", "Pulled", 'Container image "registry.local/shop/app:1.4.{a}" already present on machine'),
+    ("Normal", "Created", "Created container app"),
+]
+
+def synthetic_events(pods: int, events: int, seed: int = 1) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    now = time.time()
+    items = []
+    for i in range(events):
+        pod = f"checkout-7c9d8f6b5-{i % pods:05d}"
+        event_type, reason, template = rng.choice(MESSAGES)
+        stamp = format_time(now - rng.uniform(0, 3000))
+        items.append({
+            "metadata": {"name": f"{pod}.{i:x}", "namespace": "shop", "uid": f"uid-{i}"},
+            "involvedObject": {"kind": "Pod", "namespace": "shop", "name": pod},
+            "type": event_type,
+            "reason": reason,
+            "message": template.format(pod=pod, n=rng.randrange(10 ** 6), a=rng.randrange(256), b=rng.randrange(256)),
+            "count": 1,
+            "firstTimestamp": stamp,
+            "lastTimestamp": stamp
+        })
+    return items
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pods", type=int, default=500)
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument("--relists", type=int, default=5)
+    args = parser.parse_args()
+
+    items = synthetic_events(args.pods, args.events)
+    index = EventIndex()
+    started = time.perf_counter()
+    for _ in range(args.relists):
+        for item in items:
+            item["count"] += 1
+        index.ingest(items, "shop")
+    ingest = time.perf_counter() - started
+    print(f"{args.relists} listings of {args.events} events: {ingest / args.relists * 1000:.1f}ms per listing, "
+          f"{len(index)} groups for {index.ingested} occurrences")
+
+    names = [f"checkout-7c9d8f6b5-{i:05d}" for i in range(args.pods)]
+    started = time.perf_counter()
+    for name in names:
+        index.query(name, "shop")
+    print(f"query per object: {(time.perf_counter() - started) / len(names) * 1e6:.1f}us")
+
+    pod = names[0]
+    listed = [item for item in items if item["involvedObject"]["name"] == pod]
+    raw = sum(len(f"{item['lastTimestamp']} {item['type']} {item['reason']} pod/{pod} {item['message']}") + 1 for item in listed)
+    compacted = len(json.dumps(index.query(pod, "shop")))
+    print(f"events of one pod: {len(listed)} listed ({raw} bytes) -> {len(index.query(pod, 'shop'))} groups ({compacted} bytes)")
+
+if __name__ == "__main__":
+    main()
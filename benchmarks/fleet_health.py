@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""Fleet health analysis against local stand-in clusters.
+
+Starts --clusters HTTP servers on localhost, each answering both the kubectl
+/execute API and the Jaeger Query API with a small healthy cluster after
+--latency seconds per call. One cluster is degraded (slow API server,
+failing schedules, slow and failing spans) and should come out as the
+outlier; with --hung, one more cluster answers too slowly for its deadline
+and should be reported unreachable. Reports the wall time of analyzing the
+clusters one after another against analyze_fleet_health, and the merged
+view's health counts and outliers.
+
+Usage:
+    python benchmarks/fleet_health.py [--clusters 6] [--latency 0.05] [--deadline 10] [--hung]
+"""
+from typing import Dict, Any, List
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Stand-in clusters leave no dependency graph or baselines behind
+os.environ.setdefault("DEPENDENCY_GRAPH_PATH", "")
+os.environ.setdefault("LATENCY_BASELINE_PATH", "")
+
+from agents.orchestrator.agent import AnalysisRequest, OrchestratorAgent
+from agents.orchestrator.fleet import ClusterRegistry
+
+SERVICES = ["frontend", "checkout", "payments", "inventory"]
+
+def control_plane_pod(component: str) -> Dict[str, Any]:
+    return {
+        "metadata": {"name": f"{component}-control-plane", "namespace": "kube-system"},
+        "status": {"phase": "Running", "containerStatuses": [{"name": component, "ready": True, "restartCount": 0}]}
+    }
+
+def api_server_metrics(slow: bool) -> str:
+    lines = []
+    for resource, verb in (("pods", "LIST"), ("nodes", "GET"), ("events", "WATCH")):
+        # Most requests within 0.1s; a slow API server's p99 lands past a second
+        counts = {0.05: 300, 0.1: 500, 1.0: 800, 5.0: 1000} if slow else {0.05: 900, 0.1: 990, 1.0: 1000, 5.0: 1000}
+        counts["+Inf"] = 1000
+        for bound, count in counts.items():
+            lines.append(
+                f'apiserver_request_duration_seconds_bucket{{resource="{resource}",verb="{verb}",le="{bound}"}} {count}'
+            )
+    return "\n".join(lines)
+
+def nodes_and_pods(kind: str, degraded: bool) -> List[Dict[str, Any]]:
+    if kind == "nodes":
+        return [
+            {
+                "metadata": {"name": f"node-{i}", "labels": {}},
+                "spec": {},
+                "status": {"allocatable": {"cpu": "8", "memory": "32Gi", "pods": "110"}}
+            }
+            for i in range(3)
+        ]
+    pods = []
+    for i in range(30 if degraded else 10):
+        pod = {
+            "metadata": {"name": f"app-{i}", "namespace": "shop", "creationTimestamp": "2024-01-01T00:00:00Z"},
+            "spec": {"containers": [{"resources": {"requests": {"cpu": "2" if degraded else "500m", "memory": "1Gi"}}}]},
+            "status": {"phase": "Running"}
+        }
+        if degraded and i >= 10:
+            pod["status"]["phase"] = "Pending"
+        else:
+            pod["spec"]["nodeName"] = f"node-{i % 3}"
+        pods.append(pod)
+    return pods
+
+def execute(command: str, degraded: bool) -> Dict[str, Any]:
+    if command.startswith("get pods -n kube-system -l component="):
+        return {"items": [control_plane_pod(command.split("component=")[1].split()[0])]}
+    if "etcdctl endpoint health" in command:
+        return {"output": "https://10.0.0.1:2379: healthy: successfully committed proposal: took = 2ms"}
+    if "etcdctl endpoint status" in command:
+        return {"output": "[]"}
+    if command == "get --raw /metrics":
+        return {"output": api_server_metrics(degraded)}
+    if command.startswith("logs -n kube-system -l component=kube-scheduler"):
+        failed = 40 if degraded else 1
+        lines = [f"Successfully bound pod shop/app-{i} to node-{i % 3}" for i in range(50)]
+        lines += [f"Failed to schedule pod shop/app-{i}: 0/3 nodes are available: 3 Insufficient cpu" for i in range(failed)]
+        return {"output": "\n".join(lines)}
+    if command.startswith("get nodes"):
+        return {"items": nodes_and_pods("nodes", degraded)}
+    if command.startswith("get pods -A"):
+        return {"items": nodes_and_pods("pods", degraded)}
+    return {"items": [], "output": ""}
+
+def traces(service: str, degraded: bool, count: int = 50) -> List[Dict[str, Any]]:
+    rng = random.Random(service)
+    now = int(time.time() * 1e6)
+    data = []
+    for t in range(count):
+        trace_id = f"{rng.getrandbits(64):016x}"
+        duration = int(rng.uniform(20_000, 60_000) * (8 if degraded else 1))
+        error = degraded and t % 3 == 0
+        spans = [{
+            "traceID": trace_id,
+            "spanID": f"{t:08x}root",
+            "operationName": f"GET /{service}",
+            "references": [],
+            "startTime": now - t * 1_000_000,
+            "duration": duration,
+            "tags": [{"key": "error", "type": "bool", "value": True}] if error else [],
+            "logs": [{"fields": [{"key": "message", "value": "upstream connect error 503"}]}] if error else [],
+            "processID": "p1"
+        }, {
+            "traceID": trace_id,
+            "spanID": f"{t:08x}db",
+            "operationName": "SELECT",
+            "references": [{"refType": "CHILD_OF", "traceID": trace_id, "spanID": f"{t:08x}root"}],
+            "startTime": now - t * 1_000_000 + 1000,
+            "duration": duration // 2,
+            "tags": [],
+            "processID": "p2"
+        }]
+        data.append({
+            "traceID": trace_id,
+            "spans": spans,
+            "processes": {"p1": {"serviceName": service, "tags": []}, "p2": {"serviceName": "postgres", "tags": []}}
+        })
+    return data
+
+def stand_in(latency: float, degraded: bool) -> ThreadingHTTPServer:
+    """A kubectl /execute and Jaeger Query API server for one cluster."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args: Any) -> None:
+            pass
+
+        def reply(self, body: Any) -> None:
+            time.sleep(latency)
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self) -> None:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            self.reply(execute(request["command"], degraded))
+
+        def do_GET(self) -> None:
+            url = urlparse(self.path)
+            service = dict(pair.split("=", 1) for pair in url.query.split("&") if "=" in pair).get("service", "frontend")
+            if url.path == "/api/services":
+                self.reply({"data": SERVICES})
+            elif url.path == "/api/traces":
+                self.reply({"data": traces(service, degraded)})
+            else:
+                self.reply({"data": []})
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clusters", type=int, default=6)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per call")
+    parser.add_argument("--deadline", type=float, default=10.0, help="seconds per cluster")
+    parser.add_argument("--hung", action="store_true", help="add a cluster that misses its deadline")
+    parser.add_argument("--service", default="frontend")
+    args = parser.parse_args()
+
+    entries = []
+    for i in range(args.clusters + int(args.hung)):
+        hung = i == args.clusters
+        degraded = i == 1
+        # A hung cluster answers each call in a tenth of the deadline, far too slowly for the whole analysis
+        server = stand_in(args.deadline / 10 if hung else args.latency, degraded)
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        name = "hung" if hung else f"cluster-{i}"
+        entries.append({"name": name, "api_url": url, "jaeger_url": url, "region": f"region-{i % 3}", "deadline": args.deadline})
+    registry = ClusterRegistry.from_dict({"clusters": entries})
+    request = AnalysisRequest(service_name=args.service, time_window=60)
+
+    reachable = [cluster for cluster in registry if cluster.name != "hung"]
+    started = time.perf_counter()
+    for cluster in reachable:
+        # Fresh agents, so neither run profits from the other's caches
+        OrchestratorAgent(cluster)._analyze_cluster(request)
+    sequential = time.perf_counter() - started
+    print(f"{len(reachable)} clusters one after another: {sequential:.2f}s")
+
+    orchestrator = OrchestratorAgent(registry=registry)
+    started = time.perf_counter()
+    view = orchestrator.analyze_fleet_health(request)
+    fleet = time.perf_counter() - started
+    print(f"{len(registry)} clusters with analyze_fleet_health: {fleet:.2f}s ({sequential / fleet:.1f}x)")
+    print(f"fleet health: {view['fleet_health']}")
+    for name, entry in view["clusters"].items():
+        if entry["status"] != "ok":
+            print(f"  {name}: {entry['status']} after {entry['seconds']}s ({entry['error']})")
+    for outlier in view["outliers"]:
+        print(f"  outlier {outlier['cluster']}: {outlier['metric']} = {outlier['value']} (fleet median {outlier['fleet_median']})")
+
+if __name__ == "__main__":
+    main()
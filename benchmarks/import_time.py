@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Measure the startup cost of the agents package with ``python -X importtime``.
+
+Each module is imported in a fresh interpreter several times and the best run
+is reported, together with the heaviest top-level dependencies it pulled in.
+
+Usage:
+    python benchmarks/import_time.py [--runs N] [--top N] [module ...]
+"""
+from typing import Dict, List, Tuple
+import argparse
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = [
+    "agents.k8s.agent",
+    "agents.k8s_control.agent",
+    "agents.observability.agent",
+    "agents.tracing.agent",
+    "agents.orchestrator.agent",
+]
+
+def measure_import(module: str) -> Tuple[int, Dict[str, int]]:
+    """Import `module` in a fresh interpreter and parse the importtime report.
+
+    Returns the total wall time in microseconds and the cumulative time of
+    every top-level package that was imported.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        last_line = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+        raise RuntimeError(f"import {module} failed: {last_line}")
+
+    total = 0
+    top_level: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative_us, raw_name = line[len("import time:"):].split("|")
+        # Nesting depth is encoded as two spaces per level in the module column
+        depth = (len(raw_name) - len(raw_name.lstrip()) - 1) // 2
+        if depth == 0:
+            top_level[raw_name.strip()] = int(cumulative_us)
+            total += int(cumulative_us)
+    return total, top_level
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=5, help="imports per module, best run is reported")
+    parser.add_argument("--top", type=int, default=8, help="heaviest top-level imports to show")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        runs: List[Tuple[int, Dict[str, int]]] = []
+        try:
+            for _ in range(args.runs):
+                runs.append(measure_import(module))
+        except RuntimeError as e:
+            print(f"{module}: {e}")
+            continue
+
+        total, top_level = min(runs, key=lambda run: run[0])
+        print(f"{module}: {total / 1000:.1f} ms (best of {args.runs})")
+        heaviest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        for name, cumulative in heaviest:
+            print(f"    {cumulative / 1000:8.1f} ms  {name}")
+
+if __name__ == "__main__":
+    main()
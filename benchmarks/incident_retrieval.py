@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Measure similar-incident lookup latency at corpus scale.
+
+Builds a LabelIndex over --labels synthetic incident records derived from
+the repository's training-data labels (with randomized vocabulary mixed
+in so documents differ), then times top-k queries shaped like the
+findings OrchestratorAgent.analyze_system_health passes to the index.
+
+Usage:
+    python benchmarks/incident_retrieval.py [--labels 100000] [--queries 500] [--k 3]
+"""
+import argparse
+import dataclasses
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.labels.corpus import DEFAULT_LABEL_ROOT, SHAPE_BASIC_QA, iter_label_files, load_label
+from agents.labels.retrieval import LabelIndex
+
+QUERIES = [
+    "checkout jaeger pod OOMKilled restart count 5 memory limit",
+    "otel-collector CrashLoopBackOff spans export failures to jaeger-collector",
+    "High error rate in dependency: frontend -> cartservice timeout",
+    "etcd leader changes slow disk fsync api server latency",
+    "scheduler FailedScheduling insufficient memory pending pods",
+]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--labels", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    templates = [
+        record for record in (load_label(path) for path in iter_label_files(DEFAULT_LABEL_ROOT))
+        if record.shape != SHAPE_BASIC_QA
+    ]
+    vocabulary = [f"term{i}" for i in range(50_000)]
+    records = []
+    for i in range(args.labels):
+        template = templates[i % len(templates)]
+        noise = " ".join(rng.choice(vocabulary) for _ in range(20))
+        records.append(dataclasses.replace(
+            template, label_id=f"{template.label_id}-{i}", data={},
+            question=f"{template.question} {noise}"
+        ))
+
+    started = time.perf_counter()
+    index = LabelIndex(records)
+    print(f"index build:   {time.perf_counter() - started:.2f}s for {len(index)} labels")
+
+    latencies = []
+    for i in range(args.queries):
+        started = time.perf_counter()
+        index.search(QUERIES[i % len(QUERIES)], k=args.k)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    print(f"query latency: p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms (target < 100 ms)")
+
+if __name__ == "__main__":
+    main()
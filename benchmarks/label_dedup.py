@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Time near-duplicate detection on a synthetic corpus.
+
+Builds --labels in-memory label records: distinct incidents made from the
+repository's labels plus random vocabulary, and a --dup-rate share of
+near-copies of them with a few words changed and new timestamps. Reports
+the MinHash/LSH run time and the recall on planted pairs whose exact
+shingle Jaccard similarity reaches the threshold.
+
+Usage:
+    python benchmarks/label_dedup.py [--labels 100000] [--dup-rate 0.3] [--threshold 0.8]
+"""
+import argparse
+import dataclasses
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.labels.dedup import dedup_text, find_duplicates, load_records, shingles
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--labels", type=int, default=100_000)
+    parser.add_argument("--dup-rate", type=float, default=0.3)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    templates = load_records()
+    vocabulary = [f"w{i}" for i in range(20_000)]
+    originals = int(args.labels * (1 - args.dup_rate))
+    records = []
+    for i in range(originals):
+        template = templates[i % len(templates)]
+        story = " ".join(rng.choice(vocabulary) for _ in range(40))
+        records.append(dataclasses.replace(
+            template, path=f"synthetic/{i}.json", data={}, root_cause=f"{story} {template.root_cause}"
+        ))
+    planted = 0
+    expected = set()
+    while len(records) < args.labels:
+        source = records[rng.randrange(originals)]
+        words = source.root_cause.split()
+        for _ in range(2):
+            words[rng.randrange(len(words))] = rng.choice(vocabulary)
+        duplicate = dataclasses.replace(
+            source, path=f"synthetic/dup-{planted}.json", root_cause=" ".join(words),
+            timestamp=f"2025-05-{rng.randrange(1, 29):02d}T00:00:00Z"
+        )
+        records.append(duplicate)
+        planted += 1
+        a = set(shingles(dedup_text(source)).tolist())
+        b = set(shingles(dedup_text(duplicate)).tolist())
+        if len(a & b) / len(a | b) >= args.threshold:
+            expected.add((source.path, duplicate.path))
+
+    started = time.perf_counter()
+    clusters = find_duplicates(records, threshold=args.threshold)
+    elapsed = time.perf_counter() - started
+    cluster_of = {path: index for index, cluster in enumerate(clusters) for path in cluster.members}
+    recovered = sum(
+        1 for a, b in expected
+        if a in cluster_of and cluster_of.get(a) == cluster_of.get(b)
+    )
+    print(f"labels:     {len(records)} ({planted} planted near-duplicates, "
+          f"{len(expected)} with Jaccard >= {args.threshold})")
+    print(f"clusters:   {len(clusters)}, recall {recovered / max(len(expected), 1):.3f}")
+    print(f"time:       {elapsed:.2f}s ({elapsed / len(records) * 1e6:.0f} us/label)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Benchmark the label store on a synthetic corpus.
+
+Clones the repository's training-data labels into a temporary directory
+until it holds --labels files (varying IDs, timestamps and namespaces),
+then measures a full ingest, a no-op re-ingest, an incremental ingest
+after editing 2% of the files, and the latency of typical lookups.
+
+Usage:
+    python benchmarks/label_store.py [--labels 100000] [--queries 200]
+"""
+from typing import List
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.labels.corpus import DEFAULT_LABEL_ROOT, INCIDENT_ID_KEYS, iter_label_files
+from agents.labels.store import LabelStore
+
+NAMESPACES = ["observability", "monitoring", "otel-demo", "boutique", "sock-shop", "bank-of-anthos"]
+
+def _generate(root: str, count: int, seed: int = 11) -> List[str]:
+    rng = random.Random(seed)
+    templates = []
+    for path in iter_label_files(DEFAULT_LABEL_ROOT):
+        with open(path) as f:
+            templates.append((os.path.relpath(os.path.dirname(path), DEFAULT_LABEL_ROOT), json.load(f)))
+    paths = []
+    for i in range(count):
+        directory, template = templates[i % len(templates)]
+        label = json.loads(json.dumps(template))
+        stamp = f"2025-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}T{rng.randrange(24):02d}:00:00Z"
+        for key in ("perf_observation", *INCIDENT_ID_KEYS):
+            if key in label:
+                label[key] = f"{label[key]}-{i}"
+        if "timestamp" in label:
+            label["timestamp"] = stamp
+        if isinstance(label.get("metadata"), dict):
+            label["metadata"]["namespace"] = rng.choice(NAMESPACES)
+        os.makedirs(os.path.join(root, directory), exist_ok=True)
+        path = os.path.join(root, directory, f"synthetic-{i:07d}.json")
+        with open(path, "w") as f:
+            json.dump(label, f)
+        paths.append(path)
+    return paths
+
+def _timed(label: str, action):
+    started = time.perf_counter()
+    result = action()
+    print(f"{label:<28} {time.perf_counter() - started:8.2f}s  {getattr(result, '__dict__', '')}")
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--labels", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        root = os.path.join(workdir, "training-data")
+        started = time.perf_counter()
+        paths = _generate(root, args.labels)
+        print(f"{'generate corpus':<28} {time.perf_counter() - started:8.2f}s")
+
+        store = LabelStore(os.path.join(workdir, "labels.db"), root)
+        _timed("full ingest", store.ingest)
+        _timed("re-ingest (no changes)", store.ingest)
+        for path in paths[::100]:
+            with open(path, "a") as f:
+                f.write("\n")
+        for path in paths[1::100]:
+            with open(path) as f:
+                label = json.load(f)
+            label["question"] = "Edited question about jaeger memory pressure"
+            with open(path, "w") as f:
+                json.dump(label, f)
+        _timed("ingest after editing 2%", store.ingest)
+
+        queries = [
+            ("full-text", lambda: store.search("jaeger oom memory", limit=10)),
+            ("full-text + category", lambda: store.search("collector export", limit=10, category="troubleshooting")),
+            ("namespace + time range", lambda: store.search(namespace="monitoring", since="2025-06-01", until="2025-07-01", limit=50)),
+            ("tag", lambda: store.search(tag="helm", limit=50)),
+            ("get by id", lambda: store.get("perf-2025031607-7")),
+        ]
+        for name, query in queries:
+            latencies = []
+            for _ in range(args.queries):
+                started = time.perf_counter()
+                query()
+                latencies.append(time.perf_counter() - started)
+            latencies.sort()
+            print(f"{name:<28} p50 {latencies[len(latencies) // 2] * 1000:6.2f} ms  "
+                  f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.2f} ms")
+        store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Build and query time of NodeCapacityIndex on a synthetic cluster.
+
+Generates --nodes nodes in a few pools (some tainted, some cordoned) and
+--pods pods with quantities in the forms kubectl returns, bound to random
+nodes, then times building the index from the two lists, fitting --queries
+pods of random size with and without a selector and toleration, and
+explaining a pod that fits nowhere.
+
+Usage:
+    python benchmarks/node_fit.py [--nodes 5000] [--pods 150000] [--queries 1000]
+"""
+from typing import Dict, Any, List
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.k8s.capacity import NodeCapacityIndex, parse_requests
+
+POOLS = [
+    # (label, cpu, memory, taint)
+    ("general", "16", "64Gi", None),
+    ("compute", "64000m", "131072Mi", None),
+    ("memory", "32", "256Gi", None),
+    ("gpu", "48", "196Gi", {"key": "nvidia.com/gpu", "value": "present", "effect": "NoSchedule"}),
+]
+CPU_REQUESTS = ["100m", "250m", "500m", "1", "2", "0.5"]
+MEMORY_REQUESTS = ["128Mi", "256Mi", "512Mi", "1Gi", "2Gi", "536870912"]
+
+def synthetic_cluster(nodes: int, pods: int, seed: int = 1) -> Dict[str, List[Dict[str, Any]]]:
+    rng = random.Random(seed)
+    node_items = []
+    for i in range(nodes):
+        pool, cpu, memory, taint = POOLS[i % len(POOLS)]
+        node_items.append({
+            "metadata": {"name": f"node-{i}", "labels": {"pool": pool, "zone": f"zone-{i % 3}"}},
+            "spec": {"taints": [taint] if taint else [], "unschedulable": rng.random() < 0.01},
+            "status": {"allocatable": {"cpu": cpu, "memory": memory, "pods": "110", "ephemeral-storage": "95Gi"}}
+        })
+    pod_items = []
+    for i in range(pods):
+        container = {"resources": {"requests": {"cpu": rng.choice(CPU_REQUESTS), "memory": rng.choice(MEMORY_REQUESTS)}}}
+        pod_items.append({
+            "metadata": {"name": f"pod-{i}", "namespace": f"ns-{i % 50}"},
+            "spec": {"nodeName": f"node-{rng.randrange(nodes)}", "containers": [container]},
+            "status": {"phase": "Running"}
+        })
+    return {"nodes": node_items, "pods": pod_items}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=5000)
+    parser.add_argument("--pods", type=int, default=150000)
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    cluster = synthetic_cluster(args.nodes, args.pods)
+    started = time.perf_counter()
+    index = NodeCapacityIndex(cluster["nodes"], cluster["pods"])
+    build = time.perf_counter() - started
+    print(f"{args.nodes} nodes, {args.pods} pods: index built in {build * 1000:.1f}ms")
+
+    rng = random.Random(2)
+    queries = [parse_requests(f"{rng.randint(1, 40)}", f"{rng.randint(1, 200)}Gi") for _ in range(args.queries)]
+    tolerations = [{"key": "nvidia.com/gpu", "operator": "Exists"}]
+    for label, selector, tolerated in (("resources only", None, None), ("selector + toleration", {"pool": "gpu"}, tolerations)):
+        started = time.perf_counter()
+        fitting = 0
+        for requests in queries:
+            fitting += index.fit(requests, selector, tolerated)["fitting_nodes"]
+        elapsed = time.perf_counter() - started
+        print(f"fit, {label:22} {elapsed / len(queries) * 1000:7.3f}ms per query, {fitting / len(queries):.0f} nodes fit on average")
+
+    started = time.perf_counter()
+    message = index.fit(parse_requests("300", "1Ti"))["message"]
+    print(f"explain unplaceable pod      {(time.perf_counter() - started) * 1000:7.3f}ms: {message}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Requests and points fetched by PrometheusClient for a refreshing dashboard.
+
+Starts the local fake Prometheus from tests/fake_prometheus.py (query_range
+only, including the batched label_replace(...) or ... form), then replays
+a dashboard of --panels range queries over a --window refreshed every
+--refresh seconds, with and without batching and the step-aligned cache.
+Reports HTTP requests, points transferred and wall time for each mode.
+
+Usage:
+    python benchmarks/promql_cache.py [--panels 6] [--series 20] [--window 21600] [--step 30] [--refreshes 30]
+"""
+from typing import Dict, Any, List
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.observability.prometheus import PrometheusClient
+from tests.fake_prometheus import FakePrometheus, serve
+
+def run(url: str, panels: List[str], args: argparse.Namespace, batched: bool, cached: bool) -> Dict[str, Any]:
+    client = PrometheusClient(url, cache_max_points=10_000_000 if cached else 0)
+    FakePrometheus.reset(args.series)
+    now = time.time()
+    started = time.perf_counter()
+    for refresh in range(args.refreshes):
+        # Refreshes of a dashboard that ended in the past, so its window is settled
+        end = now - (args.refreshes - refresh) * args.refresh
+        if batched:
+            client.query_range_many({panel: panel for panel in panels}, end - args.window, end, args.step)
+        else:
+            for panel in panels:
+                client.query_range(panel, end - args.window, end, args.step)
+    return {
+        "requests": FakePrometheus.requests,
+        "points": FakePrometheus.points,
+        "seconds": time.perf_counter() - started
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--panels", type=int, default=6)
+    parser.add_argument("--series", type=int, default=20)
+    parser.add_argument("--window", type=float, default=6 * 3600)
+    parser.add_argument("--step", type=float, default=30)
+    parser.add_argument("--refresh", type=float, default=60)
+    parser.add_argument("--refreshes", type=int, default=30)
+    args = parser.parse_args()
+
+    server, url = serve()
+    panels = [f'rate(panel_{i}_total{{job="bench"}}[5m])' for i in range(args.panels)]
+
+    print(f"{args.panels} panels x {args.series} series, {args.window / 3600:.1f}h window at {args.step:g}s step, "
+          f"{args.refreshes} refreshes")
+    for batched, cached in ((False, False), (True, False), (True, True)):
+        result = run(url, panels, args, batched, cached)
+        mode = f"{'batched' if batched else 'per panel'}{' + cache' if cached else ''}"
+        print(f"{mode:18} {result['requests']:6} requests {result['points']:10} points {result['seconds']:7.2f}s")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
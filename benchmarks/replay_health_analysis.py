@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Offline profiling of OrchestratorAgent.analyze_system_health.
+
+With --record, runs the analysis once against the live kubectl service and
+Jaeger and writes every call to the cassette. Without it, replays the
+cassette --repeat times (optionally sleeping the recorded latencies) and
+reports the time per analysis; --profile prints the hottest functions of
+the replayed runs, which is the analysis code itself since no I/O happens.
+
+Usage:
+    python benchmarks/replay_health_analysis.py incident.cassette --service frontend --record
+    python benchmarks/replay_health_analysis.py incident.cassette --service frontend [--repeat 20] [--profile]
+"""
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.common.cassette import RECORD, REPLAY, use_cassette
+from agents.orchestrator.agent import AnalysisRequest, OrchestratorAgent
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("cassette")
+    parser.add_argument("--service", default=None)
+    parser.add_argument("--operation", default=None)
+    parser.add_argument("--time-window", type=int, default=60, help="minutes")
+    parser.add_argument("--record", action="store_true", help="record a live run instead of replaying")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--latency", action="store_true", help="replay with the recorded latencies")
+    parser.add_argument("--profile", action="store_true")
+    args = parser.parse_args()
+
+    request = AnalysisRequest(
+        service_name=args.service,
+        operation_name=args.operation,
+        time_window=args.time_window
+    )
+    agent = OrchestratorAgent()
+
+    if args.record:
+        with use_cassette(args.cassette, RECORD) as cassette:
+            started = time.perf_counter()
+            agent.analyze_system_health(request)
+            elapsed = time.perf_counter() - started
+        print(f"recorded {cassette.calls} calls in {elapsed:.2f}s to {args.cassette}")
+        return
+
+    profiler = cProfile.Profile() if args.profile else None
+    timings = []
+    for _ in range(args.repeat):
+        # A fresh cassette per run so repeated requests replay from the start
+        with use_cassette(args.cassette, REPLAY, latency=args.latency) as cassette:
+            started = time.perf_counter()
+            if profiler:
+                profiler.enable()
+            agent.analyze_system_health(request)
+            if profiler:
+                profiler.disable()
+            timings.append(time.perf_counter() - started)
+    timings.sort()
+    print(f"{args.repeat} runs, {cassette.calls} calls each, {cassette.misses} misses")
+    print(f"min {timings[0] * 1000:.1f}ms  median {timings[len(timings) // 2] * 1000:.1f}ms  "
+          f"max {timings[-1] * 1000:.1f}ms")
+    if profiler:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+
+if __name__ == "__main__":
+    main()
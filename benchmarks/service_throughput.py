@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Load test the orchestrator HTTP service against the API scaling targets.
+
+TECHNICAL_DESIGN.md §8.2 sets maxRequestsPerSecond: 500 and
+maxConcurrentRequests: 100. This benchmark starts OrchestratorService
+in-process with a stand-in orchestrator whose LLM and cluster calls are
+simulated sleeps, then drives it with keep-alive HTTP clients and reports
+throughput, latency percentiles and 429 rejections.
+
+Usage:
+    python benchmarks/service_throughput.py [--clients 100] [--duration 10]
+        [--llm-latency 0.05] [--cluster-latency 0.02] [--endpoint query]
+"""
+from typing import Dict, Any, List, Optional
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.orchestrator.service import OrchestratorService, ServiceConfig
+
+TARGET_RPS = 500
+TARGET_CONCURRENCY = 100
+
+class StandInOrchestrator:
+    """Benchmark-only stand-in for OrchestratorAgent with simulated latencies."""
+
+    def __init__(self, llm_latency: float, cluster_latency: float):
+        self.llm_latency = llm_latency
+        self.cluster_latency = cluster_latency
+
+    async def process_query(self, query: str, conversation_id: Optional[str] = None) -> Dict[str, Any]:
+        # Entity classification, reasoning and synthesis are three LLM round trips
+        for _ in range(3):
+            await asyncio.sleep(self.llm_latency)
+        return {"conversation_id": conversation_id or "bench", "response": f"answer to {query}"}
+
+    def analyze_system_health(self, request: Any) -> Dict[str, Any]:
+        time.sleep(self.cluster_latency)
+        return {"overall_health": "healthy", "service": request.service_name}
+
+async def _client(port: int, path: str, body: bytes, deadline: float, latencies: List[float], counts: Dict[int, int]) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    request = (
+        f"POST {path} HTTP/1.1\r\nHost: bench\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n"
+    ).encode() + body
+    try:
+        while time.monotonic() < deadline:
+            started = time.monotonic()
+            writer.write(request)
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            status = int(head.split(b" ", 2)[1])
+            length = next(
+                int(line.split(b":", 1)[1])
+                for line in head.split(b"\r\n")
+                if line.lower().startswith(b"content-length:")
+            )
+            await reader.readexactly(length)
+            counts[status] = counts.get(status, 0) + 1
+            if status == 200:
+                latencies.append(time.monotonic() - started)
+            elif status == 429:
+                await asyncio.sleep(0.01)
+    finally:
+        writer.close()
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+async def run(args: argparse.Namespace) -> None:
+    config = ServiceConfig(
+        port=0,
+        max_concurrency=args.max_concurrency,
+        max_queue_depth=args.max_queue_depth
+    )
+    service = OrchestratorService(
+        orchestrator=StandInOrchestrator(args.llm_latency, args.cluster_latency),
+        config=config
+    )
+    await service.start()
+
+    if args.endpoint == "query":
+        path, body = "/v1/query", json.dumps({"query": "Why is checkout slow?"}).encode()
+    else:
+        path, body = "/v1/health-analysis", json.dumps({"service_name": "checkout"}).encode()
+
+    latencies: List[float] = []
+    counts: Dict[int, int] = {}
+    started = time.monotonic()
+    deadline = started + args.duration
+    await asyncio.gather(*(
+        _client(config.port, path, body, deadline, latencies, counts)
+        for _ in range(args.clients)
+    ))
+    elapsed = time.monotonic() - started
+    await service.stop()
+
+    rps = counts.get(200, 0) / elapsed
+    print(f"endpoint:        {path}")
+    print(f"clients:         {args.clients} (target concurrency {TARGET_CONCURRENCY})")
+    print(f"throughput:      {rps:.1f} req/s (target {TARGET_RPS})")
+    print(f"latency p50/p95/p99: {_percentile(latencies, 0.5) * 1000:.1f} / "
+          f"{_percentile(latencies, 0.95) * 1000:.1f} / {_percentile(latencies, 0.99) * 1000:.1f} ms")
+    print(f"responses:       {dict(sorted(counts.items()))}")
+    print(f"meets targets:   {rps >= TARGET_RPS and args.clients >= TARGET_CONCURRENCY}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=TARGET_CONCURRENCY)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per simulated LLM call")
+    parser.add_argument("--cluster-latency", type=float, default=0.02, help="seconds per simulated health analysis")
+    parser.add_argument("--endpoint", choices=["query", "health"], default="query")
+    parser.add_argument("--max-concurrency", type=int, default=TARGET_CONCURRENCY)
+    parser.add_argument("--max-queue-depth", type=int, default=200)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
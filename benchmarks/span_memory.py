@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Compare memory of raw Jaeger trace JSON against the compact span model.
+
+Generates synthetic Jaeger payloads shaped like /api/traces responses,
+measures peak allocations while holding the decoded JSON versus a
+TraceBatch built from it, and times the dependency analysis on each.
+
+Usage:
+    python benchmarks/span_memory.py [--traces 2000] [--spans 20] [--services 15]
+"""
+from typing import Dict, Any, List
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.tracing.model import decode_traces
+
+def _synthetic_payload(traces: int, spans: int, services: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    data: List[Dict[str, Any]] = []
+    for t in range(traces):
+        processes = {f"p{s}": {"serviceName": f"service-{s}", "tags": []} for s in range(services)}
+        trace_spans = []
+        for s in range(spans):
+            span: Dict[str, Any] = {
+                "traceID": f"{t:032x}",
+                "spanID": f"{t * spans + s:016x}",
+                "operationName": f"operation-{rng.randrange(10)}",
+                "processID": f"p{rng.randrange(services)}",
+                "startTime": 1_700_000_000_000_000 + s * 100,
+                "duration": rng.randrange(100, 100_000),
+                "tags": [{"key": "http.status_code", "type": "int64", "value": 200}],
+                "references": []
+            }
+            if s:
+                span["references"] = [{"refType": "CHILD_OF", "traceID": f"{t:032x}",
+                                       "spanID": f"{t * spans + rng.randrange(s):016x}"}]
+            if rng.random() < 0.02:
+                span["tags"].append({"key": "error", "type": "bool", "value": True})
+            trace_spans.append(span)
+        data.append({"traceID": f"{t:032x}", "spans": trace_spans, "processes": processes})
+    return json.dumps(data)
+
+def _measure(build):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    value = build()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, current, peak, elapsed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--traces", type=int, default=2000)
+    parser.add_argument("--spans", type=int, default=20, help="spans per trace")
+    parser.add_argument("--services", type=int, default=15)
+    args = parser.parse_args()
+
+    payload = _synthetic_payload(args.traces, args.spans, args.services)
+    raw, raw_bytes, _, parse_time = _measure(lambda: json.loads(payload))
+    batch, batch_bytes, decode_peak, decode_time = _measure(lambda: decode_traces(raw))
+
+    total_spans = len(batch.spans)
+    print(f"spans:            {total_spans} in {len(batch)} traces")
+    print(f"raw JSON objects: {raw_bytes / 2**20:.1f} MiB ({raw_bytes / total_spans:.0f} B/span), parse {parse_time:.2f}s")
+    print(f"compact model:    {batch_bytes / 2**20:.1f} MiB ({batch_bytes / total_spans:.0f} B/span), decode {decode_time:.2f}s")
+    print(f"decode peak:      {decode_peak / 2**20:.1f} MiB")
+    print(f"span columns:     {batch.spans.nbytes() / 2**20:.1f} MiB, {len(batch.strings)} interned strings")
+    print(f"reduction:        {raw_bytes / max(batch_bytes, 1):.1f}x")
+
+if __name__ == "__main__":
+    main()
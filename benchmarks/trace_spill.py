@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Peak memory of analyzing a large trace window spilled to a span file.
+
+A fake Jaeger client serves --traces synthetic traces of --spans spans
+(1.2M spans by default), one every 50ms, answering each /api/traces query
+with the traces that start inside its microsecond window, as Jaeger does.
+The agent's _spill_traces pages through the window in slices of
+TRACE_FETCH_PAGE traces into a SpanFile with segments of --segment-spans
+spans, then the latency, error, dependency and timeline analyses run over
+it. Peak RSS of that run is checked against --max-rss-mb; the exit status
+is 1 above it. With --in-memory, the same traces are then held and analyzed
+the in-memory way for comparison (run second, since peak RSS only grows).
+
+Usage:
+    python benchmarks/trace_spill.py [--traces 50000] [--spans 24] [--max-rss-mb 256] [--in-memory]
+"""
+from typing import Dict, Any, List
+import argparse
+import gc
+import os
+import random
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Synthetic traces leave no dependency graph behind
+os.environ.setdefault("DEPENDENCY_GRAPH_PATH", "")
+
+from agents.tracing.agent import TRACE_FETCH_PAGE, TraceRequest, TracingAgent, epoch_micros
+from agents.tracing.model import decode_traces
+from agents.tracing.spill import SpanFile
+from agents.tracing.timeline import service_timeline
+
+MESSAGES = ["upstream connect error 503 to 10.0.3.17:8080", "context deadline exceeded after 3000ms", "connection reset by peer"]
+
+STARTED = 1_700_000_000_000_000
+# Microseconds between trace starts
+SPACING = 50_000
+
+def synthetic_trace(t: int, spans: int, services: int, seed: int = 11) -> Dict[str, Any]:
+    """Trace number t, as Jaeger's /api/traces returns it."""
+    rng = random.Random(seed * 1_000_003 + t)
+    processes = {f"p{s}": {"serviceName": f"service-{s}", "tags": []} for s in range(services)}
+    trace_id = f"{t:032x}"
+    trace_start = STARTED + t * SPACING
+    trace_spans = []
+    for s in range(spans):
+        span: Dict[str, Any] = {
+            "traceID": trace_id,
+            "spanID": f"{t * spans + s:016x}",
+            "operationName": f"operation-{rng.randrange(12)}",
+            "processID": f"p{(s * 7 + t) % services}",
+            "startTime": trace_start + s * 200,
+            "duration": int(rng.lognormvariate(8, 1)),
+            "tags": [{"key": "http.status_code", "type": "int64", "value": 200}],
+            "references": []
+        }
+        if s:
+            span["references"] = [{"refType": "CHILD_OF", "traceID": trace_id,
+                                   "spanID": f"{t * spans + rng.randrange(s):016x}"}]
+        if rng.random() < 0.01:
+            span["tags"].append({"key": "error", "type": "bool", "value": True})
+            span["tags"].append({"key": "error.message", "type": "string", "value": rng.choice(MESSAGES)})
+        trace_spans.append(span)
+    return {"traceID": trace_id, "spans": trace_spans, "processes": processes}
+
+class FakeJaeger:
+    """Answers find_traces with the synthetic traces starting inside the query window, up to its limit."""
+
+    def __init__(self, traces: int, spans: int, services: int):
+        self.traces = traces
+        self.spans = spans
+        self.services = services
+        self.queries = 0
+
+    def find_traces(self, request: TraceRequest) -> List[Dict[str, Any]]:
+        self.queries += 1
+        start, end = epoch_micros(request.start_time), epoch_micros(request.end_time)
+        first = max(0, -(-(start - STARTED) // SPACING))
+        last = min(self.traces, (end - STARTED) // SPACING + 1, first + request.limit)
+        return [synthetic_trace(t, self.spans, self.services) for t in range(first, last)]
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--traces", type=int, default=50000)
+    parser.add_argument("--spans", type=int, default=24, help="spans per trace")
+    parser.add_argument("--services", type=int, default=20)
+    parser.add_argument("--segment-spans", type=int, default=65536)
+    parser.add_argument("--max-rss-mb", type=float, default=256)
+    parser.add_argument("--in-memory", action="store_true", help="also analyze the traces held in memory")
+    args = parser.parse_args()
+
+    agent = TracingAgent()
+    agent.jaeger = FakeJaeger(args.traces, args.spans, args.services)
+    request = TraceRequest(
+        "service-0", start_time=str(STARTED), end_time=str(STARTED + args.traces * SPACING), limit=args.traces, spill=True
+    )
+    gc.collect()
+    baseline = peak_rss_mb()
+
+    started = time.perf_counter()
+    with SpanFile(segment_spans=args.segment_spans) as spans:
+        agent._spill_traces(request, spans)
+        spilled = time.perf_counter() - started
+        stats = spans.stats()
+        started = time.perf_counter()
+        analysis = agent._analyze_span_file("service-0", spans)
+        analyzed = time.perf_counter() - started
+    peak = peak_rss_mb()
+    print(f"{agent.jaeger.queries} queries of up to {TRACE_FETCH_PAGE} traces: {stats['spans']} spans in "
+          f"{stats['traces']} traces -> {stats['segments']} segments, "
+          f"{stats['file_bytes'] / 2**20:.1f} MiB ({stats['file_bytes'] / stats['spans']:.0f} B/span)")
+    print(f"spill {spilled:.1f}s, analysis {analyzed:.1f}s: p95 {analysis['latency_stats']['p95']:.1f}ms, "
+          f"{analysis['error_summary']['error_spans']} error spans, {len(analysis['dependencies'])} edges")
+    print(f"peak RSS {peak:.0f} MiB ({baseline:.0f} MiB before), ceiling {args.max_rss_mb:.0f} MiB")
+    exceeded = peak > args.max_rss_mb
+
+    if args.in_memory:
+        started = time.perf_counter()
+        # What find_traces returns for the whole window, then the decoded batch
+        traces = [synthetic_trace(t, args.spans, args.services) for t in range(args.traces)]
+        batch = decode_traces(traces)
+        del traces
+        agent._analyze_latencies(batch.trace_duration)
+        agent._find_error_traces(batch)
+        agent._analyze_dependencies(batch)
+        service_timeline(batch)
+        print(f"in memory: {time.perf_counter() - started:.1f}s, peak RSS {peak_rss_mb():.0f} MiB")
+
+    if exceeded:
+        print("spilled analysis exceeded the memory ceiling")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Local fake Prometheus serving /api/v1/query_range, for tests and benchmarks.
+
+Any expression yields `series` deterministic series with one point per
+step, including the batched `label_replace(...) or ...` form that
+PrometheusClient sends, whose parts get their __query__ label back.
+"""
+from typing import Dict, Any, List, Tuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+import json
+import math
+import re
+import threading
+import zlib
+
+from agents.observability.prometheus import BATCH_LABEL
+
+BATCHED_PART = re.compile(r'label_replace\((.+?), "' + BATCH_LABEL + r'", "(\d+)", "", ""\)')
+
+class FakePrometheus(BaseHTTPRequestHandler):
+    """Deterministic series for any expression: `series` per query, one point per step."""
+    series = 20
+    # Answer batched queries with an error, as Prometheus does when one part is not an instant vector
+    reject_batches = False
+    requests = 0
+    points = 0
+    # (query, start, end, step) of every request
+    queries: List[Tuple[str, float, float, float]] = []
+    lock = threading.Lock()
+
+    @classmethod
+    def reset(cls, series: int = 20, reject_batches: bool = False) -> None:
+        with cls.lock:
+            cls.series = series
+            cls.reject_batches = reject_batches
+            cls.requests = cls.points = 0
+            cls.queries = []
+
+    def do_POST(self) -> None:
+        form = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        query, start, end, step = (form[key][0] for key in ("query", "start", "end", "step"))
+        parts: List[Tuple[str, Dict[str, str]]] = [
+            (expr, {BATCH_LABEL: index}) for expr, index in BATCHED_PART.findall(query)
+        ] or [(query, {})]
+        with self.lock:
+            FakePrometheus.queries.append((query, float(start), float(end), float(step)))
+            FakePrometheus.requests += 1
+        if len(parts) > 1 and self.reject_batches:
+            self.reply(400, {"status": "error", "errorType": "bad_data", "error": "vector cannot contain metrics with the same labelset"})
+            return
+
+        result = []
+        timestamps = _range(float(start), float(end), float(step))
+        for expr, extra in parts:
+            for n in range(self.series):
+                values = [[t, str(value(expr, n, t))] for t in timestamps]
+                result.append({"metric": {"__name__": "fake", "instance": f"node-{n}", **extra}, "values": values})
+        with self.lock:
+            FakePrometheus.points += len(result) * len(timestamps)
+        self.reply(200, {"status": "success", "data": {"resultType": "matrix", "result": result}})
+
+    def reply(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+def value(expr: str, series: int, timestamp: float) -> float:
+    """The fake's sample of one series of expr at timestamp."""
+    return round(50 + 40 * math.sin(timestamp / 600 + zlib.crc32(expr.encode()) + series), 3)
+
+def serve() -> Tuple[ThreadingHTTPServer, str]:
+    """Start the fake on a free local port; returns the server and its URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakePrometheus)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def _range(start: float, end: float, step: float) -> List[float]:
+    count = int((end - start) // step) + 1
+    return [start + i * step for i in range(max(count, 0))]
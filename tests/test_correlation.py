@@ -0,0 +1,22 @@
+from agents.orchestrator.correlation import rank_causes
+import numpy as np
+
+def test_leading_cause_is_compared_using_history_before_the_window():
+    step, start, bins, lead = 10.0, 1_000.0, 12, 5
+    rng = np.random.RandomState(3)
+    # The cause is observed from lead steps before the window; the effect follows it lead steps later
+    cause_times = start + step * np.arange(-lead, bins)
+    cause_values = rng.normal(size=len(cause_times))
+    effect_times = start + step * np.arange(bins)
+    effect_values = cause_values[:bins] * 2 + 1
+
+    ranked = rank_causes(
+        {"etcd.latency": (cause_times, cause_values)},
+        {"trace.checkout.latency_ms": (effect_times, effect_values)},
+        start, start + step * (bins - 1), step, max_lag_seconds=lead * step
+    )
+
+    assert ranked and ranked[0]["cause"] == "etcd.latency"
+    assert ranked[0]["lead_seconds"] == lead * step
+    assert ranked[0]["correlation"] == 1.0
+    assert ranked[0]["samples"] == bins
@@ -0,0 +1,89 @@
+import json
+import time
+import pytest
+
+from agents.tracing.graph import DependencyGraph, MIN_EDGE_CALLS
+
+HOUR = 3600.0
+
+def test_new_edges_are_stamped_with_the_callers_time():
+    graph = DependencyGraph(half_life=HOUR)
+    then = time.time() - 2 * HOUR
+    graph.merge_edges([{"source": "frontend", "target": "cart", "count": 8, "errors": 0}], now=then)
+    graph.merge_dependencies([{"parent": "cart", "child": "redis", "callCount": 8}], now=then)
+
+    edges = {(edge["source"], edge["target"]): edge for edge in graph.edges(now=then + 2 * HOUR)}
+    # Two half-lives since the merge
+    assert edges[("frontend", "cart")]["count"] == 2.0
+    assert edges[("cart", "redis")]["count"] == 2.0
+
+def test_save_drops_decayed_edges_and_keeps_saving(tmp_path):
+    path = tmp_path / "dependencies.json"
+    graph = DependencyGraph(str(path), half_life=1.0)
+    old = time.time() - 60
+    graph.merge_edges([
+        {"source": "frontend", "target": "cart", "count": 1},
+        {"source": "cart", "target": "redis", "count": 1},
+    ], now=old)
+    graph.merge_edges([{"source": "frontend", "target": "checkout", "count": 10}])
+
+    assert graph.save(force=True)
+    assert json.loads(path.read_text())["edges"][0][:2] == ["frontend", "checkout"]
+    assert len(graph) == 1
+    assert "cart" not in graph and "redis" not in graph
+
+    graph.merge_edges([{"source": "checkout", "target": "payments", "count": 10}])
+    assert graph.save(force=True)
+    assert len(json.loads(path.read_text())["edges"]) == 2
+
+def test_saved_graph_loads_back(tmp_path):
+    path = str(tmp_path / "dependencies.json")
+    graph = DependencyGraph(path)
+    graph.merge_edges([{"source": "frontend", "target": "cart", "count": 5, "errors": 1}])
+    graph.save(force=True)
+
+    loaded = DependencyGraph.load(path)
+    assert [(node["service"], node["depth"]) for node in loaded.downstream("frontend")] == [("cart", 1)]
+    assert loaded.edges()[0]["count"] >= 5 - MIN_EDGE_CALLS
+
+def test_traces_are_merged_once():
+    graph = DependencyGraph()
+    assert graph.unmerged(["a", "b"]) == [0, 1]
+    assert graph.unmerged(["b", "c", "a"]) == [1]
+
+def test_merged_trace_ids_are_bounded_oldest_first(tmp_path):
+    path = str(tmp_path / "dependencies.json")
+    graph = DependencyGraph(path, max_merged_traces=2)
+    graph.unmerged(["a", "b"])
+    # Seeing a again makes b the oldest
+    graph.unmerged(["a", "c"])
+    graph.save(force=True)
+
+    loaded = DependencyGraph.load(path)
+    assert loaded.unmerged(["a", "b", "c"]) == [1]
+
+def test_overlapping_trace_fetches_count_each_call_once():
+    pytest.importorskip("requests")
+    from agents.tracing.agent import TracingAgent
+    from agents.tracing.model import decode_traces
+
+    def trace(trace_id: str) -> dict:
+        return {
+            "traceID": trace_id,
+            "processes": {"p1": {"serviceName": "frontend"}, "p2": {"serviceName": "cart"}},
+            "spans": [
+                {"traceID": trace_id, "spanID": "1", "operationName": "GET /", "processID": "p1", "startTime": 0, "duration": 10},
+                {"traceID": trace_id, "spanID": "2", "operationName": "get", "processID": "p2", "startTime": 1, "duration": 5,
+                 "references": [{"refType": "CHILD_OF", "spanID": "1"}]},
+            ]
+        }
+
+    agent = TracingAgent()
+    agent.__dict__["dependency_graph"] = DependencyGraph()
+    for trace_ids in (["t1", "t2"], ["t2", "t3"]):
+        batch = decode_traces([trace(trace_id) for trace_id in trace_ids])
+        agent._record_dependencies(batch.strings, agent._new_dependencies(batch, {}))
+
+    (edge,) = agent.dependency_graph.edges()
+    assert (edge["source"], edge["target"]) == ("frontend", "cart")
+    assert round(edge["count"]) == 3
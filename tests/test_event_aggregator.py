@@ -0,0 +1,51 @@
+import asyncio
+import pytest
+
+from agents.events.aggregator import AggregatorConfig, EventAggregator
+from agents.events.model import PodLog, ResourceEvent, ResourceMetrics
+from agents.events.sources import ReplaySource
+
+def pod_items(name: str, start: float) -> list:
+    return [
+        ResourceMetrics("Pod", "shop", name, start, cpu_millicores=100),
+        PodLog("shop", name, "app", "ERROR connection refused", start + 5, level="error"),
+        ResourceEvent("Warning", "Pod", "shop", name, start + 10, reason="BackOff"),
+        # After the window closes: joined to nothing
+        PodLog("shop", name, "app", "ERROR still failing", start + 100, level="error"),
+    ]
+
+def test_replayed_streams_are_joined_into_windows_and_batched():
+    config = AggregatorConfig(window_before=20, window_after=30, allowed_lateness=0, batch_size=2, queue_size=4)
+    sources = [ReplaySource(pod_items(f"cart-{n}", 1000.0 + n)) for n in range(3)]
+    batches = []
+
+    async def sink(batch):
+        batches.append(batch)
+
+    stats = asyncio.run(EventAggregator(config).run(sources, sink))
+
+    assert [len(batch) for batch in batches] == [2, 1]
+    assert (stats.emitted, stats.batches) == (3, 2)
+    windows = {window.key: window for batch in batches for window in batch}
+    assert sorted(windows) == ["shop/Pod/cart-0", "shop/Pod/cart-1", "shop/Pod/cart-2"]
+    window = windows["shop/Pod/cart-1"]
+    assert (window.window_start, window.window_end) == (991.0, 1041.0)
+    assert window.main_event.reason == "BackOff"
+    assert [sample.timestamp for sample in window.metrics] == [1001.0]
+    assert [line.message for line in window.logs] == ["ERROR connection refused"]
+
+def test_a_failing_sink_stops_every_stage():
+    config = AggregatorConfig(window_before=20, window_after=30, allowed_lateness=0, batch_size=1, queue_size=1)
+    # Far more items than the queues hold, so the sources are blocked when the sink fails
+    items = [item for n in range(50) for item in pod_items(f"cart-{n}", 1000.0 + 200 * n)]
+
+    async def sink(batch):
+        raise RuntimeError("sink down")
+
+    async def run() -> None:
+        before = asyncio.all_tasks()
+        with pytest.raises(RuntimeError):
+            await EventAggregator(config).run([ReplaySource(items), ReplaySource(list(items))], sink)
+        assert asyncio.all_tasks() == before
+
+    asyncio.run(asyncio.wait_for(run(), 5))
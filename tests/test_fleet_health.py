@@ -0,0 +1,44 @@
+import threading
+import time
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("requests")
+
+from agents.orchestrator import fleet
+from agents.orchestrator.agent import AnalysisRequest, OrchestratorAgent
+from agents.orchestrator.fleet import Cluster, ClusterRegistry
+
+class FakeClusterAgent:
+    """Analyzes instantly, or blocks until released when hung."""
+
+    def __init__(self, release: threading.Event, hung: bool):
+        self.release = release
+        self.hung = hung
+
+    def _analyze_cluster(self, request: AnalysisRequest) -> dict:
+        if self.hung:
+            self.release.wait(10)
+        return {}
+
+def test_clusters_queued_behind_a_hung_one_are_reported_unreachable(monkeypatch):
+    monkeypatch.setattr(fleet, "FLEET_CONCURRENCY", 1)
+    monkeypatch.setattr(fleet, "FLEET_DEADLINE", 0)
+    clusters = [Cluster("ok", deadline=0.2), Cluster("hung", deadline=0.2), Cluster("queued", deadline=0.2)]
+    orchestrator = OrchestratorAgent(registry=ClusterRegistry(clusters))
+    release = threading.Event()
+    orchestrator._cluster_agent = lambda cluster: FakeClusterAgent(release, cluster.name == "hung")
+
+    started = time.perf_counter()
+    try:
+        view = orchestrator.analyze_fleet_health(AnalysisRequest(service_name="frontend"))
+    finally:
+        release.set()
+    elapsed = time.perf_counter() - started
+
+    statuses = {name: entry["status"] for name, entry in view["clusters"].items()}
+    assert statuses == {"ok": "ok", "hung": "unreachable", "queued": "unreachable"}
+    assert "deadline" in view["clusters"]["hung"]["error"]
+    assert "still queued" in view["clusters"]["queued"]["error"]
+    # Three rounds of one cluster at a 0.2s deadline
+    assert elapsed < 0.6 + 0.5
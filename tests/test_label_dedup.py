@@ -0,0 +1,36 @@
+from agents.labels import dedup
+from agents.labels.corpus import LabelRecord
+import numpy as np
+
+def record(name: str, question: str) -> LabelRecord:
+    return LabelRecord(label_id=name, path=f"performance/{name}.json", category="performance",
+                       shape="observation", label_type="performance", question=question)
+
+def test_bucket_members_are_compared_with_each_other_not_only_the_first(monkeypatch):
+    bands, rows = dedup.lsh_parameters(0.8, 128)
+    positions = np.arange(128, dtype=np.uint32)
+    # All three share band 0. Elsewhere y and z agree on all but one row of
+    # every band, so they share no other bucket; x matches neither
+    x = np.where(positions < rows, 0, 1000 + positions)
+    y = np.where(positions < rows, 0, 5000 + positions)
+    z = np.where((positions >= rows) & (positions % rows == 0), 9000 + positions, y)
+    signatures = {"x": x, "y": y, "z": z}
+    monkeypatch.setattr(dedup, "shingles", lambda text, size=3: text.split()[0])
+    monkeypatch.setattr(dedup.MinHasher, "signature", lambda self, key: signatures[key].astype(np.uint32))
+
+    records = [record(name, f"{name} question") for name in "xyz"]
+    clusters = dedup.find_duplicates(records, threshold=0.8)
+
+    assert [cluster.members for cluster in clusters] == [["performance/y.json", "performance/z.json"]]
+    assert clusters[0].similarity == round(1 - (bands - 1) / 128, 3)
+
+def test_near_copies_are_clustered_and_distinct_labels_are_not():
+    story = ("pod checkout in namespace shop is oom killed repeatedly after the cache grows "
+             "without bound under load and the container restarts every few minutes")
+    records = [
+        record("a", story),
+        record("b", story + " again"),
+        record("c", "node disk pressure evicts pods on node-3 after image garbage collection stalls"),
+    ]
+    clusters = dedup.find_duplicates(records, threshold=0.8)
+    assert [cluster.members for cluster in clusters] == [["performance/a.json", "performance/b.json"]]
@@ -0,0 +1,46 @@
+from agents.events.model import MODIFIED, ResourceEvent
+from agents.labels.rules import LabelRule, PodCrashRule, RuleEngine
+import pytest
+
+ENVIRONMENT = {"cluster_type": "development", "k8s_version": "1.28.5"}
+START = 1_742_108_400.0
+
+def backoff(name: str, timestamp: float) -> ResourceEvent:
+    return ResourceEvent(MODIFIED, "Pod", "shop", name, timestamp, "BackOff", f"Back-off restarting {name}", {"severity": "Warning"})
+
+def test_crashes_of_two_pods_in_one_hour_get_distinct_ids():
+    engine = RuleEngine(environment=ENVIRONMENT)
+    labels = []
+    for second in range(3):
+        for name in ("checkout-1", "checkout-2"):
+            labels.extend(engine.process(backoff(name, START + second * 10)))
+
+    assert not engine.rejected
+    ids = [label.data["perf_observation"] for label in labels]
+    assert len(ids) == 2 and len(set(ids)) == 2
+    assert all(id.startswith("crash-2025031607-") for id in ids)
+    assert len({label.path for label in labels}) == 2
+
+def test_engine_requires_the_cluster_version(monkeypatch):
+    monkeypatch.delenv("LABEL_K8S_VERSION", raising=False)
+    with pytest.raises(ValueError, match="k8s_version"):
+        RuleEngine()
+    with pytest.raises(ValueError, match="k8s_version"):
+        RuleEngine(environment={"cluster_type": "production", "k8s_version": "latest"})
+
+def test_default_environment_produces_valid_labels(monkeypatch):
+    monkeypatch.setenv("LABEL_K8S_VERSION", "v1.29.2")
+    engine = RuleEngine()
+    labels = [label for second in range(3) for label in engine.process(backoff("api-0", START + second))]
+
+    assert not engine.rejected
+    assert [label.data["environment"]["k8s_version"] for label in labels] == ["v1.29.2"]
+
+def test_rules_must_implement_the_rule_interface():
+    class Partial(LabelRule):
+        def new_state(self):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+    assert PodCrashRule().new_state() is not None
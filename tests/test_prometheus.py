@@ -0,0 +1,74 @@
+import math
+import time
+import pytest
+
+pytest.importorskip("requests")
+
+from agents.observability.prometheus import BATCH_LABEL, PrometheusClient
+from tests.fake_prometheus import FakePrometheus, serve, value
+
+STEP = 30.0
+# A settled window: a day ago, on the step grid
+T0 = math.floor((time.time() - 86400) / STEP) * STEP
+
+@pytest.fixture(scope="module")
+def url():
+    server, url = serve()
+    yield url
+    server.shutdown()
+
+@pytest.fixture
+def client(url):
+    FakePrometheus.reset(series=1)
+    return PrometheusClient(url)
+
+def timestamps(results):
+    return [t for t, _ in results[0]["values"]]
+
+def test_start_and_end_are_aligned_down_to_the_step(client):
+    results = client.query_range("up", T0 + 7, T0 + 10 * STEP + 29, STEP)
+
+    (query, start, end, step), = FakePrometheus.queries
+    assert (start, end, step) == (T0, T0 + 10 * STEP, STEP)
+    assert timestamps(results) == [T0 + i * STEP for i in range(11)]
+
+def test_overlapping_query_fetches_only_the_uncovered_tail(client):
+    client.query_range("up", T0, T0 + 20 * STEP, "30s")
+    results = client.query_range("up", T0 + 5 * STEP, T0 + 30 * STEP, "30s")
+
+    assert [(start, end) for _, start, end, _ in FakePrometheus.queries] == [
+        (T0, T0 + 20 * STEP), (T0 + 21 * STEP, T0 + 30 * STEP)
+    ]
+    assert timestamps(results) == [T0 + i * STEP for i in range(5, 31)]
+    assert results[0]["values"][0][1] == value("up", 0, T0 + 5 * STEP)
+    assert client.stats()["points_from_cache"] == 16
+
+def test_several_expressions_share_one_batched_query(client):
+    answers = client.query_range_many({"up": "up", "rate": "rate(x_total[5m])"}, T0, T0 + 4 * STEP, STEP)
+
+    (query, *_), = FakePrometheus.queries
+    assert " or " in query and query.count("label_replace(") == 2
+    for name, expr in (("up", "up"), ("rate", "rate(x_total[5m])")):
+        (series,) = answers[name]
+        assert BATCH_LABEL not in series["metric"]
+        assert series["values"] == [[T0 + i * STEP, value(expr, 0, T0 + i * STEP)] for i in range(5)]
+
+def test_rejected_batch_falls_back_to_one_query_per_expression(client):
+    FakePrometheus.reset(series=1, reject_batches=True)
+    answers = client.query_range_many({"up": "up", "rate": "rate(x_total[5m])"}, T0, T0 + 4 * STEP, STEP)
+
+    assert [query for query, *_ in FakePrometheus.queries[1:]] == ["up", "rate(x_total[5m])"]
+    assert answers["rate"][0]["values"][0] == [T0, value("rate(x_total[5m])", 0, T0)]
+
+def test_least_recently_used_ranges_are_evicted_past_cache_max_points(url):
+    FakePrometheus.reset(series=1)
+    # Each query caches 21 points; room for two
+    client = PrometheusClient(url, cache_max_points=50)
+    for expr in ("a", "b", "c"):
+        client.query_range(expr, T0, T0 + 20 * STEP, STEP)
+    assert client.stats()["cached_queries"] == 2
+
+    client.query_range("c", T0, T0 + 20 * STEP, STEP)
+    assert FakePrometheus.requests == 3
+    client.query_range("a", T0, T0 + 20 * STEP, STEP)
+    assert FakePrometheus.requests == 4
@@ -0,0 +1,16 @@
+import pytest
+
+from agents.common.result_store import ResultStore
+
+LOG = "\n".join(["ok", "error: disk full", "ok", "error: timeout", "ok"])
+
+@pytest.mark.parametrize("max_matches", [0, -1])
+def test_grep_without_a_match_budget_returns_nothing(max_matches):
+    store = ResultStore()
+    assert store.grep(store.put(LOG, "logs"), "error", max_matches=max_matches) == []
+
+def test_grep_stops_at_max_matches():
+    store = ResultStore()
+    handle = store.put(LOG, "logs")
+    assert store.grep(handle, "error", max_matches=1) == ["1: error: disk full"]
+    assert store.grep(handle, "error", max_matches=1, context=1) == ["0- ok", "1: error: disk full", "2- ok"]
@@ -0,0 +1,87 @@
+import asyncio
+import json
+import time
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("requests")
+
+from agents.orchestrator.service import HTTPError, OrchestratorService, ServiceConfig
+
+def analysis_request(payload: dict):
+    return OrchestratorService._analysis_request(None, payload)
+
+def test_valid_payload_builds_the_request():
+    request = analysis_request({"service_name": "checkout", "time_window": 30, "include_tracing": False})
+    assert (request.service_name, request.time_window, request.include_tracing) == ("checkout", 30, False)
+    assert analysis_request({"service_name": None}).service_name is None
+
+@pytest.mark.parametrize("payload, message", [
+    ({"service_nam": "checkout"}, "Unknown fields: service_nam"),
+    ({"time_window": "30"}, "Field 'time_window' must be int or null"),
+    ({"time_window": True}, "Field 'time_window' must be int or null"),
+    ({"include_tracing": "no"}, "Field 'include_tracing' must be bool"),
+    ({"service_name": ["checkout"]}, "Field 'service_name' must be str or null"),
+])
+def test_bad_payloads_are_rejected_with_400(payload, message):
+    with pytest.raises(HTTPError) as error:
+        analysis_request(payload)
+    assert error.value.status == 400
+    assert error.value.message == message
+
+class SlowOrchestrator:
+    """Stands in for the orchestrator; every health analysis blocks its thread for a second."""
+
+    def analyze_system_health(self, request) -> dict:
+        time.sleep(1.0)
+        return {"status": "ok"}
+
+async def exchange(port: int, raw: bytes) -> tuple:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw)
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = int(next(line.split(b":")[1] for line in head.split(b"\r\n") if line.lower().startswith(b"content-length")))
+    body = json.loads(await reader.readexactly(length))
+    writer.close()
+    return int(head.split(b" ")[1]), body
+
+def post(path: str, body: dict) -> bytes:
+    data = json.dumps(body).encode()
+    return f"POST {path} HTTP/1.1\r\nContent-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data
+
+async def with_service(test) -> None:
+    config = ServiceConfig(port=0, max_concurrency=2, max_queue_depth=0, request_timeout=0.2)
+    service = OrchestratorService(SlowOrchestrator(), config)
+    await service.start()
+    try:
+        await test(service.config.port)
+    finally:
+        await service.stop()
+
+def test_timed_out_work_keeps_its_slot_until_the_thread_finishes():
+    async def test(port: int) -> None:
+        analysis = post("/v1/health-analysis", {"service_name": "checkout"})
+        statuses = await asyncio.gather(exchange(port, analysis), exchange(port, analysis))
+        assert [status for status, _ in statuses] == [504, 504]
+
+        _, stats = await exchange(port, b"GET /stats HTTP/1.1\r\nConnection: close\r\n\r\n")
+        assert stats["active"] == 2
+        # Both threads are still busy, so there is no slot and no queue room
+        status, _ = await exchange(port, analysis)
+        assert status == 429
+
+        await asyncio.sleep(1.0)
+        _, stats = await exchange(port, b"GET /stats HTTP/1.1\r\nConnection: close\r\n\r\n")
+        assert stats["active"] == 0
+
+    asyncio.run(with_service(test))
+
+@pytest.mark.parametrize("length", ["abc", "-5"])
+def test_invalid_content_length_is_rejected_with_400(length):
+    async def test(port: int) -> None:
+        raw = f"POST /v1/health-analysis HTTP/1.1\r\nContent-Length: {length}\r\n\r\n{{}}".encode()
+        status, body = await exchange(port, raw)
+        assert (status, body) == (400, {"error": "Invalid Content-Length"})
+
+    asyncio.run(with_service(test))
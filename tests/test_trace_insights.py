@@ -0,0 +1,19 @@
+import pytest
+
+pytest.importorskip("requests")
+
+from agents.tracing.agent import TracingAgent
+
+NO_ERRORS = {"error_trace_count": 0, "signatures": []}
+SLOW = {"p95": 2500.0}
+
+def score(spans: int) -> dict:
+    return {"service": "checkout", "operation": "GET /cart", "spans": spans, "anomalous": False}
+
+def test_p95_fallback_stays_while_baselines_cover_part_of_the_batch():
+    insights = TracingAgent()._generate_insights(10, SLOW, NO_ERRORS, [], latency_scores=[score(40)], span_count=100)
+    assert "High latency detected (p95 > 1s)" in insights
+
+def test_p95_fallback_is_dropped_once_baselines_cover_the_batch():
+    insights = TracingAgent()._generate_insights(10, SLOW, NO_ERRORS, [], latency_scores=[score(100)], span_count=100)
+    assert "High latency detected (p95 > 1s)" not in insights
@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+import pytest
+
+pytest.importorskip("requests")
+
+from agents.tracing import agent as tracing
+from agents.tracing.agent import TraceRequest, TracingAgent, epoch_micros
+from agents.tracing.spill import SpanFile
+
+STARTED = 1_700_000_000_000_000
+SPACING = 1_000_000
+
+def trace(t: int) -> dict:
+    trace_id = f"{t:032x}"
+    return {
+        "traceID": trace_id,
+        "spans": [{
+            "traceID": trace_id, "spanID": f"{t:016x}", "operationName": "GET /", "processID": "p1",
+            "startTime": STARTED + t * SPACING, "duration": 1000 + t, "tags": [], "references": []
+        }],
+        "processes": {"p1": {"serviceName": "frontend", "tags": []}}
+    }
+
+class FakeJaeger:
+    """Serves one trace a second, returning those that start inside the query window like /api/traces."""
+
+    def __init__(self, traces: int):
+        self.traces = traces
+        self.windows = []
+
+    def find_traces(self, request: TraceRequest) -> list:
+        # Jaeger rejects anything but integer microseconds
+        start, end = int(request.start_time), int(request.end_time)
+        self.windows.append((start, end))
+        first = max(0, -(-(start - STARTED) // SPACING))
+        last = min(self.traces, (end - STARTED) // SPACING + 1, first + request.limit)
+        return [trace(t) for t in range(first, last)]
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_FETCH_PAGE", 10)
+    agent = TracingAgent()
+    agent.jaeger = FakeJaeger(traces=40)
+    return agent
+
+def test_window_is_paged_in_microseconds_and_every_trace_is_spilled_once(agent):
+    request = TraceRequest("frontend", start_time=str(STARTED), end_time=str(STARTED + 40 * SPACING), limit=40)
+    with SpanFile() as spans:
+        agent._spill_traces(request, spans)
+        assert len(spans) == 40
+
+    windows = agent.jaeger.windows
+    assert len(windows) == 4
+    assert windows[0][0] == STARTED and windows[-1][1] == STARTED + 40 * SPACING
+    assert all(previous[1] == following[0] for previous, following in zip(windows, windows[1:]))
+
+def test_iso_times_are_accepted(agent):
+    start = datetime.fromtimestamp(STARTED / 1e6, timezone.utc)
+    request = TraceRequest("frontend", start_time=start.isoformat(), end_time="2023-11-14T22:14:00Z", limit=20)
+    with SpanFile() as spans:
+        agent._spill_traces(request, spans)
+        assert len(spans) == 20
+
+    assert agent.jaeger.windows[0][0] == STARTED
+    assert agent.jaeger.windows[-1][1] == epoch_micros("2023-11-14T22:14:00+00:00")
+
+def test_epoch_micros_treats_naive_times_as_utc():
+    assert epoch_micros(str(STARTED)) == STARTED
+    assert epoch_micros("2023-11-14T22:13:20") == STARTED
+    assert epoch_micros(datetime(2023, 11, 14, 22, 13, 20, tzinfo=timezone.utc)) == STARTED